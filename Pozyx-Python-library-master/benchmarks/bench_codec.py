@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+bench_codec.py - Micro-benchmark of the ByteStructure codec.
+
+Compares the decode time per DeviceRange, SensorData and PositioningData of the
+precompiled struct codec with the former per-byte and per-field implementation,
+and does the same for encoding a DeviceCoordinates to its hex string.
+
+Usage: python benchmarks/bench_codec.py [--number N]
+"""
+import struct
+import timeit
+from argparse import ArgumentParser
+
+from pypozyx import DeviceRange, SensorData, PositioningData, DeviceCoordinates, Coordinates
+
+
+def legacy_load_bytes(structure, byte_data):
+    """The former ByteStructure.load_bytes: per-byte hex parsing, per-field unpacking"""
+    structure.byte_data = byte_data
+    s = ''.encode()
+    for i in range(int(len(byte_data) / 2)):
+        index = 2 * i
+        s += struct.pack('B', int(byte_data[index:index + 2], 16))
+    index = 0
+    structure.data = [0] * len(structure.data_format)
+    for i in range(len(structure.data_format)):
+        data_len = struct.calcsize(structure.data_format[i])
+        structure.data[i] = struct.unpack(structure.data_format[i], s[index:index + data_len])[0]
+        index += data_len
+    structure.load(structure.data)
+
+
+def legacy_load_hex_string(structure):
+    """The former ByteStructure.load_hex_string: per-field packing, per-byte hex formatting"""
+    new_format = ''
+    for i in range(len(structure.data)):
+        new_format += 'B' * struct.calcsize(structure.data_format[i])
+    s = ''.encode()
+    for i in range(len(structure.data)):
+        s += struct.pack(structure.data_format[i], structure.data[i])
+    byte_data = list(struct.unpack(new_format, s))
+    s = ''
+    for i in range(len(byte_data)):
+        s += '%0.2x' % byte_data[i]
+    structure.byte_data = s
+
+
+def positioning_data_with_ranges():
+    positioning_data = PositioningData(0b1 | (1 << 15))
+    positioning_data.set_amount_of_ranges(4)
+    return positioning_data
+
+
+def time_per_call(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = ArgumentParser(description="ByteStructure codec micro-benchmark")
+    parser.add_argument('--number', type=int, default=20000, help="calls per timing run")
+    args = parser.parse_args()
+
+    cases = [
+        ("DeviceRange", DeviceRange()),
+        ("SensorData", SensorData()),
+        ("PositioningData", positioning_data_with_ranges()),
+    ]
+
+    print("%-28s %12s %12s %9s" % ("operation", "legacy (us)", "codec (us)", "speedup"))
+    for name, structure in cases:
+        byte_data = ''.join('%0.2x' % (i * 37 % 256) for i in range(structure.byte_size))
+        legacy = time_per_call(lambda: legacy_load_bytes(structure, byte_data), args.number)
+        codec = time_per_call(lambda: structure.load_bytes(byte_data), args.number)
+        print("%-28s %12.2f %12.2f %8.1fx" % ("decode " + name, legacy, codec, legacy / codec))
+
+    coordinates = DeviceCoordinates(0x6e30, 1, Coordinates(-1000, 2000, 300))
+    legacy = time_per_call(lambda: legacy_load_hex_string(coordinates), args.number)
+    codec = time_per_call(coordinates.load_hex_string, args.number)
+    print("%-28s %12.2f %12.2f %8.1fx" % ("encode DeviceCoordinates", legacy, codec, legacy / codec))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+bench_configuration.py - Time to configure a device, with a write and a fixed sleep per setting
+versus a transaction committing coalesced writes confirmed by reading them back.
+
+Configures the positioning, ranging, LED and interrupt settings of the local device and of a
+remote one and saves the positioning registers to flash, first by calling the setters one by
+one and saveConfiguration, which sleep DELAY_LOCAL_WRITE or DELAY_REMOTE_WRITE after every write
+and DELAY_FLASH after the save, then with the same setters adding to a RegisterTransaction
+that is committed at once. Prints the configuration time per device of both. The registers are
+saved again every round, and the flash details can't confirm saving registers that are saved
+already, so after the first round the committed transactions wait DELAY_FLASH after the save too.
+
+Without a Pozyx, --simulator runs it against a simulated Pozyx behind a pty, with real-time UWB
+frame timing and --latency modelling the USB round trip.
+
+Usage: python benchmarks/bench_configuration.py [--port PORT --remote ID | --simulator [--latency S]] [--rounds N]
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from pypozyx import PozyxConstants, PozyxRegisters, PozyxSerial, POZYX_SUCCESS, get_first_pozyx_serial_port
+from pypozyx.pozyx_simulator import SIMULATED_REMOTE_ID, reference_network, reference_port
+
+SAVED_REGISTERS = [PozyxRegisters.POSITIONING_FILTER, PozyxRegisters.POSITIONING_ALGORITHM]
+
+
+def configure(pozyx, remote_id, transaction=None):
+    """Sets the configuration with the setters, added to transaction when given, returns the status"""
+    status = POZYX_SUCCESS
+    status &= pozyx.setInterruptMask(0, remote_id, transaction=transaction)
+    status &= pozyx.setPositionFilter(PozyxConstants.FILTER_TYPE_MOVING_AVERAGE, 5, remote_id, transaction=transaction)
+    status &= pozyx.setLedConfig(0x3f, remote_id, transaction=transaction)
+    status &= pozyx.setPositionAlgorithm(PozyxConstants.POSITIONING_ALGORITHM_UWB_ONLY, PozyxConstants.DIMENSION_3D,
+                                         remote_id, transaction=transaction)
+    status &= pozyx.setSelectionOfAnchors(PozyxConstants.ANCHOR_SELECT_AUTO, 4, remote_id, transaction=transaction)
+    status &= pozyx.setUpdateInterval(200, remote_id, transaction=transaction)
+    status &= pozyx.setRangingProtocol(PozyxConstants.RANGE_PROTOCOL_PRECISION, remote_id, transaction=transaction)
+    return status
+
+
+def configure_directly(pozyx, remote_id):
+    status = configure(pozyx, remote_id)
+    return status & pozyx.saveRegisters(SAVED_REGISTERS, remote_id)
+
+
+def configure_in_transaction(pozyx, remote_id):
+    transaction = pozyx.registerTransaction(remote_id)
+    configure(pozyx, remote_id, transaction)
+    transaction.save(PozyxConstants.FLASH_SAVE_REGISTERS, SAVED_REGISTERS)
+    return transaction.commit()
+
+
+def seconds_per_device(configure_device, pozyx, remote_id, rounds):
+    start = perf_counter()
+    successes = 0
+    for i in range(rounds):
+        successes += configure_device(pozyx, remote_id) == POZYX_SUCCESS
+    return (perf_counter() - start) / rounds, successes / float(rounds)
+
+
+def main():
+    parser = ArgumentParser(description="Device configuration time with sleeps versus committed transactions")
+    parser.add_argument('--port', default=None, help="serial port of the Pozyx, defaults to the first one found")
+    parser.add_argument('--remote', default=None, help="hexadecimal ID of the remote device to configure")
+    parser.add_argument('--rounds', type=int, default=5, help="configurations per measurement")
+    parser.add_argument('--simulator', action='store_true', help="use a simulated Pozyx behind a pty")
+    parser.add_argument('--latency', type=float, default=0.001, help="simulated USB round trip in seconds")
+    args = parser.parse_args()
+
+    if args.simulator:
+        simulated_port = reference_port(reference_network(SIMULATED_REMOTE_ID, real_time=True), args.latency)
+        pozyx = PozyxSerial(simulated_port.name, suppress_warnings=True)
+        remote_id = SIMULATED_REMOTE_ID
+    else:
+        port = args.port if args.port is not None else get_first_pozyx_serial_port()
+        if port is None:
+            print("No Pozyx connected. Check your USB cable or your driver!")
+            return
+        pozyx = PozyxSerial(port)
+        remote_id = int(args.remote, 16) if args.remote is not None else None
+
+    print("%-8s %22s %22s %9s" % ("device", "setters + sleeps", "committed transaction", "speedup"))
+    for name, device_id in (("local", None), ("remote", remote_id)):
+        if name == "remote" and device_id is None:
+            continue
+        before, before_success = seconds_per_device(configure_directly, pozyx, device_id, args.rounds)
+        after, after_success = seconds_per_device(configure_in_transaction, pozyx, device_id, args.rounds)
+        print("%-8s %11.1f ms (%3.0f%%) %11.1f ms (%3.0f%%) %8.1fx" % (
+            name, before * 1e3, 100 * before_success, after * 1e3, 100 * after_success, before / after))
+    pozyx.ser.close()
+
+
+if __name__ == '__main__':
+    main()
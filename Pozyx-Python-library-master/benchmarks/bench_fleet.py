@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+bench_fleet.py - Ranging throughput of a PozyxFleet with an increasing amount of masters.
+
+Ranges with a set of anchors through a PozyxFleet of the first 1, 2, ... masters and prints
+the measurements per second and the speedup over a single master.
+
+Without Pozyx devices, --simulator runs it against simulated masters behind ptys, with four
+anchors, real-time UWB frame timing and --latency modelling the USB round trip. The simulated
+medium doesn't model collisions between the masters, so the speedup is an upper bound.
+
+Usage: python benchmarks/bench_fleet.py [--anchors ID [ID ...] | --simulator [--masters N] [--latency S]] [--rounds N]
+"""
+from argparse import ArgumentParser
+from time import time
+
+from pypozyx import PozyxSerial, POZYX_SUCCESS, get_pozyx_ports
+from pypozyx.fleet import PozyxFleet
+from pypozyx.pozyx_simulator import SIMULATED_ANCHOR_IDS, reference_network, reference_port
+
+
+def measurements_per_second(masters, anchor_ids, rounds):
+    with PozyxFleet(masters) as fleet:
+        fleet.round(anchor_ids)  # lets the polling strategies learn the ranging time
+        start = time()
+        successes = 0
+        for i in range(rounds):
+            # a round per master keeps every master busy
+            results = fleet.round(anchor_ids * len(masters))
+            successes += sum(result.status == POZYX_SUCCESS for result in results)
+        return successes / (time() - start)
+
+
+def main():
+    parser = ArgumentParser(description="PozyxFleet ranging throughput per amount of masters")
+    parser.add_argument('--anchors', nargs='+', default=None, help="hexadecimal IDs of the devices to range with")
+    parser.add_argument('--rounds', type=int, default=30, help="rounds of ranging with all anchors per master")
+    parser.add_argument('--simulator', action='store_true', help="use simulated masters behind ptys")
+    parser.add_argument('--masters', type=int, default=3, help="amount of simulated masters")
+    parser.add_argument('--latency', type=float, default=0.001, help="simulated USB round trip in seconds")
+    args = parser.parse_args()
+
+    ports = []
+    if args.simulator:
+        network = reference_network(real_time=True)
+        ports = [reference_port(network, args.latency, 0x6200 + i, (1000 * i, 2000, 1000))
+                 for i in range(args.masters)]
+        masters = [PozyxSerial(port.name, suppress_warnings=True) for port in ports]
+        anchor_ids = SIMULATED_ANCHOR_IDS
+    else:
+        if args.anchors is None:
+            print("Pass the IDs of the devices to range with with --anchors")
+            return
+        masters = [PozyxSerial(port) for port in get_pozyx_ports()]
+        if not masters:
+            print("No Pozyx connected. Check your USB cable or your driver!")
+            return
+        anchor_ids = [int(anchor_id, 16) for anchor_id in args.anchors]
+
+    print("%-8s %10s %8s" % ("masters", "ranges/s", "speedup"))
+    single = None
+    for amount in range(1, len(masters) + 1):
+        rate = measurements_per_second(masters[:amount], anchor_ids, args.rounds)
+        single = single or rate
+        print("%-8i %10.1f %7.2fx" % (amount, rate, rate / single))
+    for master in masters:
+        master.ser.close()
+    for port in ports:
+        port.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+bench_network_config.py - Time to bring a network of simulated Pozyx devices to a configuration.
+
+Configures the UWB and positioning settings of --devices remote tags and the masters, saving
+them to flash, first the way a script does it with the setters, setUWBSettings and saveRegisters
+on every device, then with a NetworkConfigurator on 1 to --masters masters, and applies the
+configuration once more to time the check of an already configured network. Prints the total
+time of every way.
+
+Usage: python benchmarks/bench_network_config.py [--devices N] [--masters M]
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from pypozyx import PozyxConstants, PozyxRegisters, UWBSettings
+from pypozyx.network_config import LOCAL, NetworkConfigurator, parse_network_config
+from pypozyx.pozyx_simulator import PozyxSimulator, reference_network
+
+NETWORK_CONFIG = {
+    'uwb': {'channel': 2, 'bitrate': 1, 'prf': 2, 'plen': 0x08, 'gain_db': 11.5},
+    'positioning': {'algorithm': 'tracking', 'dimension': '2d', 'filter': 'moving_average', 'filter_strength': 5,
+                    'update_interval': 200},
+    'save_to_flash': True,
+}
+
+
+def simulated_masters(devices, masters):
+    network = reference_network()
+    device_ids = [0x6100 + index for index in range(devices)]
+    for index, device_id in enumerate(device_ids):
+        network.add_device(device_id, (1000 * index, 1000, 0))
+    return [PozyxSimulator(network=network, network_id=0x6200 + index) for index in range(masters)], device_ids
+
+
+def configure_with_setters(pozyx, device_ids):
+    uwb_settings = UWBSettings(2, 1, 2, 0x08, 11.5)
+    for device_id in device_ids:
+        pozyx.setPositionFilter(PozyxConstants.FILTER_TYPE_MOVING_AVERAGE, 5, device_id)
+        pozyx.setPositionAlgorithm(PozyxConstants.POSITIONING_ALGORITHM_TRACKING, PozyxConstants.DIMENSION_2D,
+                                   device_id)
+        pozyx.setUpdateInterval(200, device_id)
+        pozyx.saveRegisters([PozyxRegisters.POSITIONING_FILTER, PozyxRegisters.POSITIONING_ALGORITHM,
+                             PozyxRegisters.POSITIONING_INTERVAL], device_id)
+        pozyx.setUWBSettings(uwb_settings, device_id, save_to_flash=True)
+    pozyx.setUWBSettings(uwb_settings, save_to_flash=True)
+
+
+def main():
+    parser = ArgumentParser(description="Network configuration time with setters versus a NetworkConfigurator")
+    parser.add_argument('--devices', type=int, default=6, help="remote devices to configure")
+    parser.add_argument('--masters', type=int, default=3, help="maximum amount of masters")
+    args = parser.parse_args()
+
+    masters, device_ids = simulated_masters(args.devices, 1)
+    start = perf_counter()
+    configure_with_setters(masters[0], device_ids)
+    print("%-28s %9.1f ms" % ("setters, one by one", (perf_counter() - start) * 1e3))
+
+    config = dict(NETWORK_CONFIG, devices={device_id: {} for device_id in device_ids})
+    config['devices'][LOCAL] = {}
+    for amount in range(1, args.masters + 1):
+        masters, device_ids = simulated_masters(args.devices, amount)
+        configurator = NetworkConfigurator(masters, parse_network_config(config))
+        report = configurator.apply()
+        print("%-28s %9.1f ms (%s)" % ("configurator, %i master%s" % (amount, 's' if amount > 1 else ''),
+                                       report.duration * 1e3, 'success' if report.success else 'failed'))
+    report = configurator.apply()
+    print("%-28s %9.1f ms (%s)" % ("configurator, configured", report.duration * 1e3,
+                                   'unchanged' if report.success and not any(
+                                       result.writes for result in report.results) else 'changed'))
+
+
+if __name__ == '__main__':
+    main()
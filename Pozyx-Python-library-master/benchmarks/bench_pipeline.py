@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+bench_pipeline.py - Throughput comparison of the blocking and the pipelined serial paths.
+
+Reads a set of registers, performs a set of register functions and reads a full RX
+buffer, first one blocking exchange at a time and then through the pipeline of a PozyxSerial
+created with pipelined=True, and prints the operations per second of both.
+
+Without a Pozyx, --simulator runs it against a simulated Pozyx behind a pty, with --latency
+modelling the USB round trip.
+
+Usage: python benchmarks/bench_pipeline.py [--port PORT | --simulator [--latency S]] [--repeat N] [--max-in-flight N]
+"""
+from argparse import ArgumentParser
+from time import time
+
+from pypozyx import PozyxSerial, SingleRegister, Data, get_first_pozyx_serial_port
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.pozyx_simulator import reference_network, reference_port
+
+
+def register_reads():
+    return [(PozyxRegisters.WHO_AM_I, Data([0] * 5)),
+            (PozyxRegisters.INTERRUPT_STATUS, SingleRegister()),
+            (PozyxRegisters.NETWORK_ID, SingleRegister(size=2)),
+            (PozyxRegisters.UWB_CHANNEL, Data([0] * 4)),
+            (PozyxRegisters.POSITIONING_FILTER, SingleRegister()),
+            (PozyxRegisters.POSITION_X, Data([0] * 3, 'iii')),
+            (PozyxRegisters.ACCELERATION_X, Data([0] * 3, 'hhh')),
+            (PozyxRegisters.EULER_ANGLE_HEADING, Data([0] * 3, 'hhh'))]
+
+
+def rx_buffer_reads():
+    return [(PozyxRegisters.READ_RX_DATA, Data([offset, 25]), Data([0] * 25)) for offset in range(0, 100, 25)]
+
+
+def time_operations(perform, repeat):
+    start = time()
+    operations = 0
+    for i in range(repeat):
+        operations += perform()
+    return operations / (time() - start)
+
+
+def main():
+    parser = ArgumentParser(description="Blocking versus pipelined serial throughput")
+    parser.add_argument('--port', default=None, help="serial port of the Pozyx, defaults to the first one found")
+    parser.add_argument('--repeat', type=int, default=100, help="times every batch is performed")
+    parser.add_argument('--max-in-flight', type=int, default=None, help="pipeline window size")
+    parser.add_argument('--simulator', action='store_true', help="use a simulated Pozyx behind a pty")
+    parser.add_argument('--latency', type=float, default=0.001, help="simulated USB round trip in seconds")
+    args = parser.parse_args()
+
+    if args.simulator:
+        simulated_port = reference_port(reference_network(real_time=True), args.latency)
+        pozyx = PozyxSerial(simulated_port.name, suppress_warnings=True, pipelined=True)
+    else:
+        port = args.port if args.port is not None else get_first_pozyx_serial_port()
+        if port is None:
+            print("No Pozyx connected. Check your USB cable or your driver!")
+            quit()
+        pozyx = PozyxSerial(port, pipelined=True)
+
+    def blocking_reads():
+        operations = register_reads()
+        for address, data in operations:
+            pozyx.regRead(address, data)
+        return len(operations)
+
+    def pipelined_reads():
+        operations = register_reads()
+        with pozyx.pipeline(args.max_in_flight) as pipeline:
+            for address, data in operations:
+                pipeline.read(address, data)
+        return len(operations)
+
+    def blocking_functions():
+        operations = rx_buffer_reads()
+        for address, params, data in operations:
+            pozyx.regFunction(address, params, data)
+        return len(operations)
+
+    def pipelined_functions():
+        operations = rx_buffer_reads()
+        with pozyx.pipeline(args.max_in_flight) as pipeline:
+            for address, params, data in operations:
+                pipeline.function(address, params, data)
+        return len(operations)
+
+    print("%-22s %14s %14s %9s" % ("batch", "blocking op/s", "pipelined op/s", "speedup"))
+    for name, blocking, pipelined in [("register reads", blocking_reads, pipelined_reads),
+                                      ("RX buffer functions", blocking_functions, pipelined_functions)]:
+        blocking_rate = time_operations(blocking, args.repeat)
+        pipelined_rate = time_operations(pipelined, args.repeat)
+        print("%-22s %14.0f %14.0f %8.1fx" % (name, blocking_rate, pipelined_rate, pipelined_rate / blocking_rate))
+
+
+if __name__ == "__main__":
+    main()
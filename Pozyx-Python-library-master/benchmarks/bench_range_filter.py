@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+bench_range_filter.py - Throughput of RangeFilter, streaming and in NumPy batches.
+
+Filters a range log, by default a synthesized log of a million measurements with spikes,
+dropouts and NLOS stretches, or a log spilled by a TimeSeriesBuffer with --log. Prints the
+measurements per second of filtering in batches and one at a time, and the fractions of
+rejected and NLOS measurements.
+
+Usage: python benchmarks/bench_range_filter.py [--log PATH] [--samples N] [--batch N] [--streaming N]
+"""
+from argparse import ArgumentParser
+from time import time
+
+import numpy as np
+
+from pypozyx.tools.range_filter import RangeFilter
+from pypozyx.tools.time_series import RANGE_DTYPE, read_spill
+
+
+def synthesize_log(count, seed=0):
+    random = np.random.RandomState(seed)
+    samples = np.zeros(count, dtype=RANGE_DTYPE)
+    samples['timestamp'] = np.arange(count) * 10
+    # a device walking back and forth between 2 and 8 m
+    walk = 5000 + 3000 * np.sin(np.arange(count) / 2000.0)
+    samples['distance'] = np.maximum(walk + random.normal(0, 30, count), 1)
+    samples['RSS'] = -80 + random.normal(0, 1.5, count)
+    samples['device_id'] = 0x6001
+    samples['distance'][random.rand(count) < 0.02] += random.randint(1000, 20000)
+    samples['distance'][random.rand(count) < 0.02] = 0
+    # NLOS stretches of 200 measurements: longer ranges with a lower RSS
+    for start in random.randint(0, count - 200, count // 5000):
+        samples['distance'][start:start + 200] += 400
+        samples['RSS'][start:start + 200] -= 10
+    return samples
+
+
+def main():
+    parser = ArgumentParser(description="RangeFilter throughput")
+    parser.add_argument('--log', default=None, help="range log spilled by a TimeSeriesBuffer")
+    parser.add_argument('--samples', type=int, default=1000000, help="size of the synthesized log")
+    parser.add_argument('--batch', type=int, default=65536, help="measurements per batch")
+    parser.add_argument('--streaming', type=int, default=100000, help="measurements filtered one at a time")
+    parser.add_argument('--window', type=int, default=15, help="window of the filter")
+    args = parser.parse_args()
+
+    samples = read_spill(args.log) if args.log else synthesize_log(args.samples)
+
+    range_filter = RangeFilter(window=args.window)
+    start = time()
+    for offset in range(0, len(samples), args.batch):
+        range_filter.process_batch(samples[offset:offset + args.batch])
+    batch_rate = len(samples) / (time() - start)
+    statistics = range_filter.statistics()
+
+    streamed = samples[:args.streaming]
+    range_filter = RangeFilter(window=args.window)
+    distances, rss = streamed['distance'].tolist(), streamed['RSS'].tolist()
+    start = time()
+    for distance, RSS in zip(distances, rss):
+        range_filter.process(distance, RSS)
+    streaming_rate = len(streamed) / (time() - start)
+
+    print("%i measurements, window %i" % (len(samples), args.window))
+    print("batches of %i: %.0f measurements/s" % (args.batch, batch_rate))
+    print("one at a time: %.0f measurements/s" % streaming_rate)
+    print("rejected: %.1f%%, NLOS: %.1f%%" % (100.0 * statistics['rejected'] / statistics['count'],
+                                             100.0 * statistics['nlos'] / statistics['count']))
+
+
+if __name__ == '__main__':
+    main()
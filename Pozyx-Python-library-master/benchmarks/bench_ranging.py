@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+bench_ranging.py - Throughput comparison of sequential doRanging calls and doRangingMany.
+
+Ranges with a set of anchors, first calling doRanging per anchor and then with one
+doRangingMany call per round, and prints the measurements per second of both.
+
+Without a Pozyx, --simulator runs it against a simulated Pozyx behind a pty, with four
+anchors, real-time UWB frame timing and --latency modelling the USB round trip.
+
+Usage: python benchmarks/bench_ranging.py [--port PORT --anchors ID [ID ...] | --simulator [--latency S]] [--rounds N]
+"""
+from argparse import ArgumentParser
+from time import time
+
+from pypozyx import PozyxSerial, DeviceRange, POZYX_SUCCESS, get_first_pozyx_serial_port
+from pypozyx.pozyx_simulator import SIMULATED_ANCHOR_IDS, reference_network, reference_port
+
+
+def sequential_round(pozyx, anchor_ids):
+    successes = 0
+    for anchor_id in anchor_ids:
+        successes += pozyx.doRanging(anchor_id, DeviceRange()) == POZYX_SUCCESS
+    return successes
+
+
+def batched_round(pozyx, anchor_ids):
+    return sum(measurement.status == POZYX_SUCCESS for measurement in pozyx.doRangingMany(anchor_ids))
+
+
+def measurements_per_second(perform_round, pozyx, anchor_ids, rounds):
+    perform_round(pozyx, anchor_ids)  # lets the polling strategy learn the ranging time
+    start = time()
+    successes = 0
+    for i in range(rounds):
+        successes += perform_round(pozyx, anchor_ids)
+    elapsed = time() - start
+    return successes / elapsed, successes / float(rounds * len(anchor_ids))
+
+
+def main():
+    parser = ArgumentParser(description="Sequential versus batched ranging throughput")
+    parser.add_argument('--port', default=None, help="serial port of the Pozyx, defaults to the first one found")
+    parser.add_argument('--anchors', nargs='+', default=None, help="hexadecimal IDs of the devices to range with")
+    parser.add_argument('--rounds', type=int, default=50, help="rounds of ranging with all anchors")
+    parser.add_argument('--simulator', action='store_true', help="use a simulated Pozyx behind a pty")
+    parser.add_argument('--latency', type=float, default=0.001, help="simulated USB round trip in seconds")
+    args = parser.parse_args()
+
+    if args.simulator:
+        simulated_port = reference_port(reference_network(real_time=True), args.latency)
+        pozyx = PozyxSerial(simulated_port.name, suppress_warnings=True)
+        anchor_ids = SIMULATED_ANCHOR_IDS
+    else:
+        port = args.port if args.port is not None else get_first_pozyx_serial_port()
+        if port is None:
+            print("No Pozyx connected. Check your USB cable or your driver!")
+            return
+        if args.anchors is None:
+            print("Pass the IDs of the devices to range with with --anchors")
+            return
+        pozyx = PozyxSerial(port)
+        anchor_ids = [int(anchor_id, 16) for anchor_id in args.anchors]
+
+    sequential, sequential_success = measurements_per_second(sequential_round, pozyx, anchor_ids, args.rounds)
+    batched, batched_success = measurements_per_second(batched_round, pozyx, anchor_ids, args.rounds)
+    print("%-14s %10s %10s" % ("", "ranges/s", "success"))
+    print("%-14s %10.1f %9.0f%%" % ("doRanging", sequential, 100 * sequential_success))
+    print("%-14s %10.1f %9.0f%%" % ("doRangingMany", batched, 100 * batched_success))
+    print("speedup: %.2fx" % (batched / sequential))
+    pozyx.ser.close()
+
+
+if __name__ == '__main__':
+    main()
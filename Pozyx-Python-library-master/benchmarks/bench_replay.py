@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+bench_replay.py - Throughput of the library on recorded traffic, replayed at CPU speed.
+
+Records a session of ranging with four anchors, positioning and sensor reads, then replays it
+with a ReplayTransport as fast as possible and with the original timing. Prints the rounds per
+second of the live session and both replays, and the size of the recording. The fast replay
+measures only the encoding, decoding and processing of the library, so a drop in its rate is a
+regression of the library itself.
+
+Without --recording, the session is recorded on a simulated Pozyx behind a pty with --latency
+modelling the USB round trip, and kept at --record when given. With --recording, a recording
+of this workload made earlier, for instance with a real Pozyx through --port, is replayed.
+
+Usage: python benchmarks/bench_replay.py [--rounds N] [--record PATH | --recording PATH] [--port PORT] [--latency S]
+"""
+import os
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+
+from pypozyx import PozyxSerial, Coordinates, DeviceCoordinates, DeviceRange, EulerAngles, SensorData
+from pypozyx.pozyx_simulator import SIMULATED_ANCHORS, reference_network, reference_port
+from pypozyx.recording import ReplayTransport, SerialRecorder, read_recording
+
+
+def workload(pozyx, rounds):
+    """Ranges with every anchor, positions and reads the sensors every round, returns the rounds per second"""
+    for anchor_id, position in SIMULATED_ANCHORS:
+        pozyx.addDevice(DeviceCoordinates(anchor_id, 1, Coordinates(*position)))
+    start = perf_counter()
+    for i in range(rounds):
+        for anchor_id, position in SIMULATED_ANCHORS:
+            pozyx.doRanging(anchor_id, DeviceRange())
+        pozyx.doPositioning(Coordinates())
+        pozyx.getAllSensorData(SensorData())
+        pozyx.getEulerAngles_deg(EulerAngles())
+    return rounds / (perf_counter() - start)
+
+
+def record(path, rounds, port, latency):
+    if port is not None:
+        pozyx = PozyxSerial(port)
+        with SerialRecorder(pozyx, path):
+            return workload(pozyx, rounds)
+    with reference_port(reference_network(real_time=True), latency) as simulated_port:
+        pozyx = PozyxSerial(simulated_port.name, suppress_warnings=True)
+        with SerialRecorder(pozyx, path):
+            rate = workload(pozyx, rounds)
+        pozyx.ser.close()
+    return rate
+
+
+def main():
+    parser = ArgumentParser(description="Library throughput on replayed serial traffic")
+    parser.add_argument('--rounds', type=int, default=50, help="rounds of the workload")
+    parser.add_argument('--record', default=None, help="file to keep the recording in")
+    parser.add_argument('--recording', default=None, help="replay this recording of the workload instead")
+    parser.add_argument('--port', default=None, help="record with the Pozyx on this serial port")
+    parser.add_argument('--latency', type=float, default=0.001, help="simulated USB round trip in seconds")
+    parser.add_argument('--repeat', type=int, default=5, help="amount of fast replays, the best counts")
+    args = parser.parse_args()
+
+    path = args.recording
+    if path is None:
+        path = args.record or os.path.join(tempfile.mkdtemp(), 'session.pzxrec')
+        if args.port is None:
+            print("Recording on a simulated Pozyx")
+        live = record(path, args.rounds, args.port, args.latency)
+        print("%-14s %10.1f rounds/s" % ("live", live))
+
+    start, records = read_recording(path)
+    size = os.path.getsize(path)
+    print("recording: %i records, %i bytes, %.1f bytes per record" % (len(records), size, size / float(len(records))))
+    fast = max(workload(ReplayTransport(path), args.rounds) for i in range(args.repeat))
+    print("%-14s %10.1f rounds/s" % ("fast replay", fast))
+    timed = workload(ReplayTransport(path, timing=True), args.rounds)
+    print("%-14s %10.1f rounds/s" % ("timed replay", timed))
+
+
+if __name__ == '__main__':
+    main()
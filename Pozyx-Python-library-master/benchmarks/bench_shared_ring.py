@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+bench_shared_ring.py - Latency of publishing records to reader processes through a SharedRing.
+
+One writer process publishes records stamped with their perf_counter time at a fixed rate,
+while N reader processes poll the ring for the latest record. Every reader measures the delay
+from the stamp until it read the record, and the latency percentiles are printed per amount
+of readers, together with the records every reader missed. With --queue, the same records are
+also pickled to the readers through a multiprocessing Queue per reader, for comparison.
+
+perf_counter is the system-wide monotonic clock on Linux, so the stamps of the writer can be
+compared with the times of the readers.
+
+Usage: python benchmarks/bench_shared_ring.py [--readers N [N ...]] [--records N] [--rate HZ] [--idle S] [--queue]
+"""
+from argparse import ArgumentParser
+from multiprocessing import Event, Process, Queue
+from time import perf_counter, sleep
+
+import numpy as np
+
+from pypozyx import DeviceRange
+from pypozyx.tools.shared_ring import SharedRing
+
+# the RANGE_DTYPE fields with the sequence and host time of publishing
+LATENCY_DTYPE = np.dtype([('sequence', '<u8'), ('time', '<f8'), ('timestamp', '<u4'), ('distance', '<u4'),
+                          ('RSS', '<i2'), ('device_id', '<u2')])
+
+
+def reader(name, records, idle, ready, results):
+    ring = SharedRing.attach(name)
+    latencies = np.zeros(records)
+    seen = np.zeros(records, dtype=bool)
+    ready.set()
+    last = -1
+    written = 0
+    while last < records - 1:
+        if ring.written == written:
+            # yields the processor to the writer and other readers when there are fewer cores than processes
+            sleep(idle)
+            continue
+        written = ring.written
+        record = ring.latest()
+        now = perf_counter()
+        last = int(record['sequence'])
+        latencies[last] = now - record['time']
+        seen[last] = True
+    ring.close()
+    results.put((latencies[seen], records - int(seen.sum())))
+
+
+def queue_reader(queue, records, ready, results):
+    latencies = []
+    ready.set()
+    for i in range(records):
+        sequence, time, device_range = queue.get()
+        latencies.append(perf_counter() - time)
+    results.put((np.array(latencies), 0))
+
+
+def wait_until(deadline):
+    delay = deadline - perf_counter()
+    if delay > 0:
+        sleep(delay)
+
+
+def run_queues(readers, records, rate):
+    queues = [Queue() for i in range(readers)]
+    results = Queue()
+    ready_events = [Event() for i in range(readers)]
+    processes = [Process(target=queue_reader, args=(queue, records, ready, results))
+                 for queue, ready in zip(queues, ready_events)]
+    for process in processes:
+        process.start()
+    for ready in ready_events:
+        ready.wait()
+    deadline = perf_counter()
+    for sequence in range(records):
+        deadline += 1.0 / rate
+        wait_until(deadline)
+        record = (sequence, perf_counter(), DeviceRange(sequence, 4521, -80))
+        for queue in queues:
+            queue.put(record)
+    collected = [results.get() for process in processes]
+    for process in processes:
+        process.join()
+    latencies = np.concatenate([latencies for latencies, missed in collected]) * 1e6
+    return np.percentile(latencies, [50, 90, 99, 99.9]), 0.0
+
+
+def run(readers, records, rate, idle):
+    ring = SharedRing(capacity=1024, dtype=LATENCY_DTYPE)
+    results = Queue()
+    ready_events = [Event() for i in range(readers)]
+    processes = [Process(target=reader, args=(ring.name, records, idle, ready, results)) for ready in ready_events]
+    for process in processes:
+        process.start()
+    for ready in ready_events:
+        ready.wait()
+    period = 1.0 / rate
+    deadline = perf_counter()
+    for sequence in range(records):
+        deadline += period
+        wait_until(deadline)
+        ring.publish(sequence, perf_counter(), sequence, 4521, -80, 0x6001)
+    collected = [results.get() for process in processes]
+    for process in processes:
+        process.join()
+    ring.close()
+    ring.unlink()
+    latencies = np.concatenate([latencies for latencies, missed in collected]) * 1e6
+    missed = sum(missed for latencies, missed in collected)
+    return np.percentile(latencies, [50, 90, 99, 99.9]), missed / float(readers)
+
+
+def main():
+    parser = ArgumentParser(description="SharedRing latency with one writer and N readers")
+    parser.add_argument('--readers', type=int, nargs='+', default=[1, 2, 4], help="amounts of reader processes")
+    parser.add_argument('--records', type=int, default=20000, help="records published per run")
+    parser.add_argument('--rate', type=float, default=2000.0, help="records published per second")
+    parser.add_argument('--queue', action='store_true', help="also measure pickling through Queues")
+    parser.add_argument('--idle', type=float, default=0.0, help="seconds a reader sleeps when there's no new record, 0 just yields")
+    args = parser.parse_args()
+
+    print("%i records at %.0f Hz" % (args.records, args.rate))
+    for readers in args.readers:
+        percentiles, missed = run(readers, args.records, args.rate, args.idle)
+        print("SharedRing, %i reader(s): latency p50 %.1f us, p90 %.1f us, p99 %.1f us, p99.9 %.1f us, "
+              "%.1f records missed per reader" % ((readers,) + tuple(percentiles) + (missed,)))
+        if args.queue:
+            percentiles, missed = run_queues(readers, args.records, args.rate)
+            print("Queue,      %i reader(s): latency p50 %.1f us, p90 %.1f us, p99 %.1f us, p99.9 %.1f us"
+                  % ((readers,) + tuple(percentiles)))
+
+
+if __name__ == '__main__':
+    main()
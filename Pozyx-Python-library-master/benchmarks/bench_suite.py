@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+"""
+bench_suite.py - Benchmark suite of the pypozyx hot paths, with JSON baselines to catch regressions.
+
+Runs without a Pozyx: the transport benchmarks run on a simulated Pozyx, once directly on its
+registers (simulator) and once through PozyxSerial's text protocol over an in-process loopback
+to the simulated device (serial), so they time the library and not a serial port.
+
+    codec/decode/<structure>, codec/encode/<structure>    every ByteStructure subclass
+    command/regRead, command/regWrite, command/regFunction    formatting the serial commands
+    command/functionResponse    parsing a register function's response
+    ranging/local, ranging/remote    a doRanging cycle with an anchor, locally and by a remote tag
+    positioning/withData    doPositioningWithData with the ranges
+    rxbuffer/<size>    readRXBufferData, in MAX_SERIAL_SIZE chunks
+    discovery/sweep    a discovery of all devices and reading the device list
+
+Every benchmark reports the best time per call of --repeat runs, each run lasting at least
+--min-time. run writes the results as JSON, a baseline, and compare compares a baseline with
+other results, or with a new run, and exits with status 1 when a benchmark got slower than the
+threshold, so it can guard a CI job. The timings are machine specific, so no baseline is shipped:
+make one with run --output on the machine that runs the comparisons, before the change, and
+compare with it after the change. compare refuses, with exit status 2, results of another
+machine, Python implementation or Python major.minor version than the baseline unless --force
+is given; the platform string is recorded but not checked, as it changes with every kernel update.
+
+    python benchmarks/bench_suite.py run --output baseline.json
+    python benchmarks/bench_suite.py compare baseline.json
+
+Usage:
+    python benchmarks/bench_suite.py list
+    python benchmarks/bench_suite.py run [--output PATH] [--filter REGEX] [--min-time S] [--repeat N]
+    python benchmarks/bench_suite.py compare BASELINE [RESULTS] [--threshold FRACTION] [--filter REGEX] [--force]
+"""
+import json
+import platform
+import re
+import struct
+import sys
+import timeit
+from argparse import ArgumentParser
+from collections import OrderedDict
+from time import time
+
+import pypozyx
+from pypozyx import (PozyxConstants, PozyxRegisters, PozyxSerial, Coordinates, Data, DeviceCoordinates,
+                     DeviceList, DeviceRange, PositioningData, SensorData, TXInfo)
+from pypozyx.lib import PozyxLib
+from pypozyx.polling import FixedPolling
+from pypozyx.pozyx_serial import (load_function_response, serial_function_command, serial_read_commands,
+                                  serial_write_commands)
+from pypozyx.pozyx_simulator import (SIMULATED_ANCHORS, SIMULATED_LOCAL_ID, SIMULATED_LOCAL_POSITION,
+                                     SIMULATED_REMOTE_ID, PozyxSimulator, reference_network)
+from pypozyx.structures.byte_structure import ByteStructure
+from pypozyx.structures.device_information import DeviceDetails
+from pypozyx.tools.discovery import get_device_list
+
+FORMAT_VERSION = 1
+# results are only comparable when these are the same
+ENVIRONMENT_KEYS = ('machine', 'implementation', 'python')
+
+TRANSPORTS = ['simulator', 'serial']
+
+# instances of the structures that can't be constructed without arguments, or are empty without them.
+# DeviceDetails isn't imported by pypozyx itself, listing it here makes byte_structures find it too
+STRUCTURE_SAMPLES = {
+    'Data': lambda: Data([0] * 16),
+    'DeviceDetails': DeviceDetails,
+    'DeviceList': lambda: DeviceList(list_size=8),
+    'PositioningData': lambda: positioning_data_with_ranges(),
+    'TXInfo': lambda: TXInfo(0x6000),
+}
+
+# the benchmarks as (name, function returning the callable to time)
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Registers a function setting up a benchmark, returning the callable to time"""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+class LoopbackSerial(object):
+    """Serial port connected in-process to a SimulatedPozyxDevice, answering every line at once"""
+
+    def __init__(self, device):
+        self.device = device
+        self.responses = []
+
+    def write(self, data):
+        for line in data.decode().split('\r'):
+            if line:
+                response = self.device.handle_line(line)
+                if response is not None:
+                    self.responses.append(response.encode())
+        return len(data)
+
+    def readline(self):
+        return self.responses.pop(0) if self.responses else b''
+
+    def close(self):
+        pass
+
+
+class LoopbackPozyx(PozyxSerial):
+    """A PozyxSerial on a LoopbackSerial, running the text protocol without a port"""
+
+    def __init__(self, device):
+        # there's no port to connect to, so PozyxSerial's initialisation is skipped
+        PozyxLib.__init__(self)
+        self.print_output = False
+        self.suppress_warnings = True
+        self.port = 'loopback'
+        self.ser = LoopbackSerial(device)
+
+
+def positioning_data_with_ranges():
+    positioning_data = PositioningData(0b1 | (1 << 15))
+    positioning_data.set_amount_of_ranges(len(SIMULATED_ANCHORS))
+    return positioning_data
+
+
+def byte_structures():
+    """Returns every ByteStructure subclass, by name"""
+    structures = {}
+    pending = [ByteStructure]
+    while pending:
+        for subclass in pending.pop().__subclasses__():
+            if subclass.__module__.startswith('pypozyx.'):
+                structures[subclass.__name__] = subclass
+            pending.append(subclass)
+    return OrderedDict(sorted(structures.items()))
+
+
+def simulated_pozyx(transport):
+    """Returns a Pozyx interface on a deterministic simulated network with four anchors and a remote tag"""
+    network = reference_network(SIMULATED_REMOTE_ID)
+    device = network.add_device(SIMULATED_LOCAL_ID, SIMULATED_LOCAL_POSITION)
+    pozyx = PozyxSimulator(device=device) if transport == 'simulator' else LoopbackPozyx(device)
+    # the simulated clock only advances with the exchanges, sleeping between polls only adds noise
+    pozyx.setPollingStrategy(FixedPolling(0))
+    return pozyx
+
+
+def sample_byte_data(structure):
+    return ''.join('%0.2x' % (i * 37 % 256) for i in range(structure.byte_size))
+
+
+def register_codec_benchmarks():
+    """Registers decoding and encoding every ByteStructure, in the directions the structure supports,
+    as the sensor values for instance are only read and TXInfo only written"""
+    for name, structure_class in byte_structures().items():
+        sample = STRUCTURE_SAMPLES.get(name, structure_class)
+
+        def decode(sample=sample):
+            structure = sample()
+            byte_data = sample_byte_data(structure)
+            return lambda: structure.load_bytes(byte_data)
+
+        def encode(sample=sample):
+            return sample().load_hex_string
+
+        for direction, setup in (('decode', decode), ('encode', encode)):
+            try:
+                setup()()
+            except (NotImplementedError, struct.error):
+                continue
+            benchmark('codec/%s/%s' % (direction, name))(setup)
+
+
+register_codec_benchmarks()
+
+
+@benchmark('command/regRead')
+def command_read():
+    return lambda: serial_read_commands(PozyxRegisters.ACCELERATION_X, SensorData.byte_size)
+
+
+@benchmark('command/regWrite')
+def command_write():
+    coordinates = DeviceCoordinates(0x6001, 1, Coordinates(5000, 5000, 500))
+    return lambda: serial_write_commands(PozyxRegisters.POSITION_X, coordinates)
+
+
+@benchmark('command/regFunction')
+def command_function():
+    params = Data([0x6001], 'H')
+    device_range = DeviceRange()
+    return lambda: serial_function_command(PozyxRegisters.GET_DEVICE_RANGE_INFO, params, device_range)
+
+
+@benchmark('command/functionResponse')
+def command_function_response():
+    device_range = DeviceRange()
+    response = '01' + sample_byte_data(device_range)
+    return lambda: load_function_response(response, device_range)
+
+
+def register_transport_benchmarks():
+    for transport in TRANSPORTS:
+        def ranging_local(transport=transport):
+            pozyx = simulated_pozyx(transport)
+            return lambda: pozyx.doRanging(0x6001, DeviceRange())
+
+        def ranging_remote(transport=transport):
+            pozyx = simulated_pozyx(transport)
+            return lambda: pozyx.doRanging(0x6001, DeviceRange(), remote_id=SIMULATED_REMOTE_ID)
+
+        def positioning_with_data(transport=transport):
+            pozyx = simulated_pozyx(transport)
+            for anchor_id, position in SIMULATED_ANCHORS:
+                pozyx.addDevice(DeviceCoordinates(anchor_id, 1, Coordinates(*position)))
+            return lambda: pozyx.doPositioningWithData(positioning_data_with_ranges())
+
+        def rx_buffer(size, transport=transport):
+            pozyx = simulated_pozyx(transport)
+            return lambda: pozyx.readRXBufferData(Data([0] * size))
+
+        def discovery_sweep(transport=transport):
+            pozyx = simulated_pozyx(transport)
+
+            def sweep():
+                pozyx.clearDevices()
+                pozyx.doDiscoveryAll(slots=3, slot_duration=0.01)
+                return get_device_list(pozyx)
+            return sweep
+
+        suffix = '[%s]' % transport
+        benchmark('ranging/local' + suffix)(ranging_local)
+        benchmark('ranging/remote' + suffix)(ranging_remote)
+        benchmark('positioning/withData' + suffix)(positioning_with_data)
+        for size in (PozyxConstants.MAX_SERIAL_SIZE, PozyxConstants.MAX_BUF_SIZE):
+            benchmark('rxbuffer/%i%s' % (size, suffix))(lambda size=size, rx_buffer=rx_buffer: rx_buffer(size))
+        benchmark('discovery/sweep' + suffix)(discovery_sweep)
+
+
+register_transport_benchmarks()
+
+
+def time_benchmark(function, min_time, repeat):
+    """Returns the best and median time per call of repeat runs lasting at least min_time, and the calls per run"""
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    times = sorted(run / number for run in timer.repeat(number=number, repeat=repeat))
+    return times[0], times[len(times) // 2], number
+
+
+def run(pattern=None, min_time=0.2, repeat=5, verbose=True):
+    """Runs the benchmarks with a name matching pattern, returning the results"""
+    results = OrderedDict()
+    for name, setup in BENCHMARKS:
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        best, median, number = time_benchmark(setup(), min_time, repeat)
+        results[name] = {'seconds': best, 'median': median, 'number': number, 'repeat': repeat}
+        if verbose:
+            print("%-40s %12s" % (name, format_duration(best)))
+    return {'version': FORMAT_VERSION, 'created': time(), 'pypozyx': getattr(pypozyx, '__version__', None),
+            'python': '%i.%i' % sys.version_info[:2], 'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'machine': platform.machine(), 'results': results}
+
+
+def compare(baseline, results, threshold=0.15):
+    """Compares results with a baseline, returning (name, baseline s, result s, relative change) per
+    benchmark in both, and the names of the regressions, the benchmarks slower than the threshold"""
+    rows = []
+    regressions = []
+    for name, result in results['results'].items():
+        if name not in baseline['results']:
+            continue
+        before = baseline['results'][name]['seconds']
+        after = result['seconds']
+        change = after / before - 1.0
+        rows.append((name, before, after, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def environment_differences(baseline, results):
+    """Returns (key, baseline value, result value) of every ENVIRONMENT_KEYS the results differ in"""
+    return [(key, baseline.get(key), results.get(key)) for key in ENVIRONMENT_KEYS
+            if baseline.get(key) != results.get(key)]
+
+
+def format_duration(seconds):
+    if seconds < 1e-3:
+        return '%.2f us' % (seconds * 1e6)
+    return '%.3f ms' % (seconds * 1e3)
+
+
+def load(path):
+    with open(path) as results_file:
+        results = json.load(results_file)
+    if results.get('version') != FORMAT_VERSION:
+        raise ValueError("%s isn't a version %i benchmark result" % (path, FORMAT_VERSION))
+    return results
+
+
+def main():
+    parser = ArgumentParser(description="pypozyx benchmark suite")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('list', help="list the benchmarks")
+    run_parser = commands.add_parser('run', help="run the benchmarks and store the results")
+    run_parser.add_argument('--output', default=None, help="JSON file to write the results to")
+    compare_parser = commands.add_parser('compare', help="compare results with a baseline")
+    compare_parser.add_argument('baseline', help="JSON file of the baseline")
+    compare_parser.add_argument('results', nargs='?', default=None,
+                                help="JSON file of the results to compare, runs the benchmarks when left out")
+    compare_parser.add_argument('--threshold', type=float, default=0.15,
+                                help="relative slowdown flagged as a regression, 0.15 is 15%%")
+    compare_parser.add_argument('--force', action='store_true',
+                                help="compare even when the results come from another environment")
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument('--filter', default=None, help="only run benchmarks matching this regex")
+        command_parser.add_argument('--min-time', type=float, default=0.2, help="minimal duration of a run in seconds")
+        command_parser.add_argument('--repeat', type=int, default=5, help="runs per benchmark, the best counts")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name, setup in BENCHMARKS:
+            print(name)
+    elif args.command == 'run':
+        results = run(args.filter, args.min_time, args.repeat)
+        if args.output is not None:
+            with open(args.output, 'w') as output_file:
+                json.dump(results, output_file, indent=1)
+    elif args.command == 'compare':
+        baseline = load(args.baseline)
+        if args.results is not None:
+            results = load(args.results)
+        else:
+            pattern = args.filter if args.filter is not None else '|'.join(re.escape(name)
+                                                                             for name in baseline['results'])
+            results = run(pattern, args.min_time, args.repeat, verbose=False)
+        differences = environment_differences(baseline, results)
+        for key, before, after in differences:
+            print("%s differs: %s in the baseline, %s in the results" % (key, before, after))
+        if differences and not args.force:
+            print("the baseline was made in another environment, make one here with run --output or pass --force")
+            sys.exit(2)
+        rows, regressions = compare(baseline, results, args.threshold)
+        print("%-40s %12s %12s %9s" % ("benchmark", "baseline", "current", "change"))
+        for name, before, after, change in rows:
+            print("%-40s %12s %12s %+8.1f%%%s" % (name, format_duration(before), format_duration(after),
+                                                   change * 100, "  REGRESSION" if name in regressions else ""))
+        missing = [name for name in baseline['results'] if name not in results['results']]
+        if missing and args.filter is None:
+            print("not in the results: %s" % ', '.join(missing))
+        if regressions:
+            print("%i of %i benchmarks regressed more than %.0f%%" % (len(regressions), len(rows),
+                                                                      args.threshold * 100))
+            sys.exit(1)
+        print("no regressions in %i benchmarks" % len(rows))
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+bench_tracing.py - Overhead of tracing on Pozyx operations.
+
+Times a cheap operation, a local register read, and a large one, reading all sensor data, on a
+simulated Pozyx three ways:
+before a Tracer is ever attached, with a Tracer attached and after detaching it again, and
+prints the time per call and the overhead against the untraced interface. Tracing off should
+cost nothing, as detaching removes the tracing from the interface again.
+
+Usage: python benchmarks/bench_tracing.py [--number N]
+"""
+import timeit
+from argparse import ArgumentParser
+
+from pypozyx import SensorData, SingleRegister
+from pypozyx.pozyx_simulator import SIMULATED_LOCAL_ID, PozyxSimulator, reference_network
+from pypozyx.tracing import Tracer
+
+
+def time_per_call(function, number, repeat=5):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = ArgumentParser(description="Tracing overhead per operation")
+    parser.add_argument('--number', type=int, default=20000, help="calls per measurement")
+    args = parser.parse_args()
+
+    pozyx = PozyxSimulator(network=reference_network(), network_id=SIMULATED_LOCAL_ID)
+    whoami = SingleRegister()
+    sensor_data = SensorData()
+    operations = [('getWhoAmI', lambda: pozyx.getWhoAmI(whoami), args.number),
+                  ('getAllSensorData', lambda: pozyx.getAllSensorData(sensor_data), args.number)]
+
+    untraced = {name: time_per_call(function, number) for name, function, number in operations}
+    tracer = Tracer()
+    pozyx.setTracer(tracer)
+    traced = {name: time_per_call(function, number) for name, function, number in operations}
+    pozyx.setTracer(None)
+    detached = {name: time_per_call(function, number) for name, function, number in operations}
+
+    print("%-16s %12s %12s %12s %14s" % ("", "untraced", "traced", "tracing off", "off overhead"))
+    for name, function, number in operations:
+        print("%-16s %9.2f us %9.2f us %9.2f us %11.1f ns" % (
+            name, untraced[name] * 1e6, traced[name] * 1e6, detached[name] * 1e6,
+            (detached[name] - untraced[name]) * 1e9))
+    print()
+    print(tracer.dump())
+
+
+if __name__ == '__main__':
+    main()
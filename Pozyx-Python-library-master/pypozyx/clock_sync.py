@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""pypozyx.clock_sync - contains ClockSync, mapping the millisecond clocks of Pozyx devices on host time.
+
+The timestamps of range measurements are in milliseconds since the measuring device started,
+while the host runs on its own monotonic clock (perf_counter). Every ranging exchange tells when
+the device clock read its timestamp: somewhere between the host sending the command and the host
+seeing the result. A DeviceClock fits host time on device time through the middles of these
+exchanges with an online weighted regression, weighing short exchanges most, which gives the
+offset between the clocks and the skew of the device clock in ppm. Old exchanges are gradually
+forgotten, so the fit follows drift of the skew with temperature.
+
+Every device timestamp is mapped on host time with an error bound of three standard errors of
+the fit plus the half millisecond resolution of the device clock. The 32 bit wraparound of the
+device clock is handled, as long as exchanges are less than 24 days apart.
+
+Set on a Pozyx interface with setClockSync, doRanging and doRangingMany record every ranging
+exchange, and a RangingStream stamps its records with their host time.
+
+Example usage:
+    >>> pozyx.setClockSync(ClockSync())
+    >>> pozyx.doRanging(0x6e30, device_range)
+    >>> pozyx.getClockSync().to_host(None, device_range.timestamp)
+    (1043.2171, 0.0012)
+    >>> pozyx.getClockSync().statistics()
+    {None: {'offset': 1021.934, 'skew_ppm': 12.1, 'error': 0.0011, 'exchanges': 214}}
+"""
+from math import sqrt
+from time import perf_counter
+
+# the device clocks count milliseconds in 32 bits
+TIMESTAMP_WRAP = 2 ** 32
+
+
+def device_key(device_id):
+    """Returns the key of a device in ClockSync: its network ID as integer, None for the local device"""
+    if device_id is None or isinstance(device_id, int):
+        return device_id
+    return device_id[0]
+
+
+class DeviceClock(object):
+    """Online fit of host time on the millisecond clock of one device.
+
+    Args:
+        forgetting (optional): factor on the weight of the previous exchanges for every new
+            exchange, closer to 1 remembers longer. Default is 0.995.
+        resolution (optional): resolution of the device clock in seconds. Default is 0.001.
+    """
+
+    def __init__(self, forgetting=0.995, resolution=0.001):
+        self.forgetting = forgetting
+        self.resolution = resolution
+        self.reset()
+
+    def reset(self):
+        """Forgets every exchange"""
+        self.exchanges = 0
+        self.last_timestamp = None
+        self.last_device_time = 0.0
+        # weighted means and co-moments of device time and host minus device time
+        self.weight = 0.0
+        self.squared_weight = 0.0
+        self.mean_device = 0.0
+        self.mean_offset = 0.0
+        self.co_device = 0.0
+        self.co_cross = 0.0
+        self.co_offset = 0.0
+        self.mean_half_width = 0.0
+
+    def unwrap(self, timestamp):
+        """Returns a timestamp in ms as device time in seconds, continuing after the wraparound"""
+        if self.last_timestamp is None:
+            return timestamp / 1000.0
+        elapsed = (timestamp - self.last_timestamp) % TIMESTAMP_WRAP
+        if elapsed >= TIMESTAMP_WRAP // 2:
+            elapsed -= TIMESTAMP_WRAP
+        return self.last_device_time + elapsed / 1000.0
+
+    def add_exchange(self, timestamp, host_send, host_receive):
+        """Adds an exchange in which the device clock read timestamp, in ms, between the host times in seconds"""
+        device_time = self.unwrap(timestamp)
+        if device_time >= self.last_device_time or self.last_timestamp is None:
+            self.last_timestamp = timestamp
+            self.last_device_time = device_time
+        half_width = max((host_receive - host_send) / 2.0, self.resolution / 2.0)
+        offset = (host_send + host_receive) / 2.0 - device_time
+        weight = 1.0 / (half_width * half_width)
+
+        forgetting = self.forgetting if self.exchanges else 0.0
+        self.weight = forgetting * self.weight + weight
+        self.squared_weight = forgetting * forgetting * self.squared_weight + weight * weight
+        fraction = weight / self.weight
+        device_delta = device_time - self.mean_device
+        offset_delta = offset - self.mean_offset
+        self.mean_device += fraction * device_delta
+        self.mean_offset += fraction * offset_delta
+        self.co_device = forgetting * self.co_device + weight * device_delta * (device_time - self.mean_device)
+        self.co_cross = forgetting * self.co_cross + weight * device_delta * (offset - self.mean_offset)
+        self.co_offset = forgetting * self.co_offset + weight * offset_delta * (offset - self.mean_offset)
+        self.mean_half_width += fraction * (half_width - self.mean_half_width)
+        self.exchanges += 1
+
+    @property
+    def skew(self):
+        """The rate at which host time runs faster than device time, minus 1"""
+        if self.exchanges < 3 or self.co_device <= 0:
+            return 0.0
+        return self.co_cross / self.co_device
+
+    @property
+    def offset(self):
+        """Host time in seconds at device time 0"""
+        return self.mean_offset - self.skew * self.mean_device
+
+    def residual_variance(self):
+        """Returns the weighted variance of the exchange middles around the fit in s^2.
+
+        The device clock reads its timestamp anywhere in an exchange, so the variance is at least
+        that of a uniform distribution over a mean exchange.
+        """
+        variance = 0.0
+        if self.weight > 0:
+            variance = max(self.co_offset - self.skew * self.co_cross, 0.0) / self.weight
+        return max(variance, self.mean_half_width ** 2 / 3.0)
+
+    def to_host(self, timestamp):
+        """Returns the host time in seconds of a device timestamp in ms, and its error bound in seconds.
+
+        Without exchanges, the host time is None.
+        """
+        if not self.exchanges:
+            return None, float('inf')
+        device_time = self.unwrap(timestamp)
+        effective_exchanges = self.weight ** 2 / self.squared_weight
+        leverage = 1.0 / effective_exchanges
+        if self.co_device > 0 and self.exchanges >= 3:
+            leverage += (device_time - self.mean_device) ** 2 / self.co_device * self.weight / effective_exchanges
+        standard_error = sqrt(self.residual_variance() * leverage)
+        host_time = device_time + self.mean_offset + self.skew * (device_time - self.mean_device)
+        return host_time, 3 * standard_error + self.resolution / 2.0
+
+    def latency(self, timestamp, host_receive=None):
+        """Returns the time in seconds from a device timestamp in ms until the host received it, default now"""
+        host_time, error = self.to_host(timestamp)
+        if host_time is None:
+            return None
+        return (perf_counter() if host_receive is None else host_receive) - host_time
+
+    def statistics(self):
+        """Returns the offset, the skew in ppm, the error bound now and the amount of exchanges"""
+        error = self.to_host(self.last_timestamp)[1] if self.exchanges else float('inf')
+        return {'offset': self.offset, 'skew_ppm': self.skew * 1e6, 'error': error, 'exchanges': self.exchanges}
+
+
+class ClockSync(object):
+    """A DeviceClock per device, keyed on network ID with None for the local device.
+
+    Args:
+        kwargs: the arguments of the DeviceClock of every device.
+    """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.clocks = {}
+
+    def clock(self, device_id=None):
+        """Returns the DeviceClock of a device, creating it if needed"""
+        device_id = device_key(device_id)
+        if device_id not in self.clocks:
+            self.clocks[device_id] = DeviceClock(**self.kwargs)
+        return self.clocks[device_id]
+
+    def add_exchange(self, device_id, timestamp, host_send, host_receive):
+        """Adds a ranging exchange of a device, see DeviceClock.add_exchange"""
+        self.clock(device_id).add_exchange(timestamp, host_send, host_receive)
+
+    def to_host(self, device_id, timestamp):
+        """Returns the host time of a timestamp of a device and its error bound, see DeviceClock.to_host"""
+        device_id = device_key(device_id)
+        if device_id not in self.clocks:
+            return None, float('inf')
+        return self.clocks[device_id].to_host(timestamp)
+
+    def latency(self, device_id, timestamp, host_receive=None):
+        """Returns the time from a timestamp of a device until the host received it, see DeviceClock.latency"""
+        device_id = device_key(device_id)
+        if device_id not in self.clocks:
+            return None
+        return self.clocks[device_id].latency(timestamp, host_receive)
+
+    def statistics(self):
+        """Returns the statistics of every device clock, by network ID"""
+        return {device_id: clock.statistics() for device_id, clock in self.clocks.items()}
@@ -1,18 +1,105 @@
 #!/usr/bin/env python
 """pypozyx.core - core Pozyx interface and inter-Pozyx communication functionality through the PozyxCore class"""
-from time import sleep, time
+from time import sleep
 
 from pypozyx.definitions.bitmasks import PozyxBitmasks
 from pypozyx.definitions.constants import PozyxConstants, POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
 from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.pipeline import CommandPipeline
+from pypozyx.polling import (AdaptivePolling, OPERATION_REMOTE_READ, OPERATION_REMOTE_WRITE,
+                             OPERATION_REMOTE_FUNCTION)
 from pypozyx.structures.generic import (Data, SingleRegister, dataCheck, is_functioncall,
                                         is_reg_readable, is_reg_writable)
 from pypozyx.structures.device import RXInfo, TXInfo
+from pypozyx.transaction import RegisterTransaction
 
 from warnings import warn
 
 
-class PozyxCore(object):
+def remote_operation_data(address, params):
+    """Returns the TX data of a remote operation on address with params, a ByteStructure-derived object"""
+    return Data([0, address] + params.data, 'BB' + params.data_format)
+
+
+def rx_buffer_reads(data, offset=0):
+    """Returns the (params, partial data) of the READ_RX_DATA functions reading data from the RX buffer at offset"""
+    _MAX_SERIAL_SIZE = PozyxConstants.MAX_SERIAL_SIZE
+    runs = int(data.byte_size / _MAX_SERIAL_SIZE)
+    reads = []
+    for i in range(runs + 1):
+        size = _MAX_SERIAL_SIZE if i < runs else data.byte_size - runs * _MAX_SERIAL_SIZE
+        partial_data = Data([0] * size)
+        reads.append((Data([offset + i * _MAX_SERIAL_SIZE, partial_data.byte_size]), partial_data))
+    return reads
+
+
+def remote_function_response(data):
+    """Returns the container of a remote function's response: its status followed by data"""
+    return Data([0] + data.data, 'B' + data.data_format)
+
+
+def load_remote_function_response(response, data):
+    """Loads a remote function's response in data, returning the function's status"""
+    if len(response) > 1:
+        data.load(response[1:])
+    return response[0]
+
+
+class PozyxHooks(object):
+    """The polling strategy, register cache, clock synchronisation and tracer of a Pozyx interface.
+
+    These are shared by PozyxCore and AsyncPozyxSerial, all of them are off or default until set.
+    """
+
+    def getPollingStrategy(self):
+        """Returns the polling strategy used while waiting for interrupt flags, an AdaptivePolling by default"""
+        if getattr(self, '_polling', None) is None:
+            self._polling = AdaptivePolling()
+        return self._polling
+
+    def setPollingStrategy(self, polling):
+        """Sets the polling strategy used while waiting for interrupt flags, see pypozyx.polling"""
+        self._polling = polling
+
+    def getRegisterCache(self):
+        """Returns the RegisterCache shadowing the devices' configuration registers, None when disabled"""
+        return getattr(self, '_register_cache', None)
+
+    def setRegisterCache(self, register_cache):
+        """Sets the RegisterCache used by getRead, setWrite and useFunction, None disables caching.
+
+        See pypozyx.register_cache.
+        """
+        self._register_cache = register_cache
+
+    def getClockSync(self):
+        """Returns the ClockSync mapping the device clocks on host time, None when disabled"""
+        return getattr(self, '_clock_sync', None)
+
+    def setClockSync(self, clock_sync):
+        """Sets the ClockSync that ranging exchanges are recorded in, None disables it.
+
+        See pypozyx.clock_sync.
+        """
+        self._clock_sync = clock_sync
+
+    def getTracer(self):
+        """Returns the Tracer tracing the operations of this interface, None when tracing is off"""
+        return getattr(self, '_tracer', None)
+
+    def setTracer(self, tracer):
+        """Sets the Tracer that traces the operations of this interface, None turns tracing off.
+
+        See pypozyx.tracing.
+        """
+        if self.getTracer() is not None:
+            self.getTracer().detach(self)
+        self._tracer = tracer
+        if tracer is not None:
+            tracer.attach(self)
+
+
+class PozyxCore(PozyxHooks):
     """Implements virtual core Pozyx interfacing functions such as regRead,
     regWrite and regFunction, which have to be implemented in the derived interface.
     Auxiliary functions for core functionality, getRead, setWrite, useFunction,
@@ -57,6 +144,120 @@ class PozyxCore(object):
         raise NotImplementedError(
             'You need to override this function in your derived interface!')
 
+    def pipeline(self):
+        """Returns a CommandPipeline to submit a batch of register operations to.
+
+        This interface performs the operations one by one, derived interfaces that
+        can have several commands in flight override this with a pipelined version.
+        """
+        return CommandPipeline(self)
+
+    def registerTransaction(self, remote_id=None):
+        """Returns a RegisterTransaction, fusing the register reads and writes added to it.
+
+        Its commit confirms the writes by reading them back instead of sleeping after them.
+
+        Args:
+            remote_id (optional): Remote Pozyx ID.
+        """
+        return RegisterTransaction(self, remote_id)
+
+    def transactionRead(self, address, data, remote_id=None, transaction=None, callback=None):
+        """Reads Pozyx register data as part of a transaction.
+
+        Without a transaction, the read is performed right away in a transaction of its own.
+
+        Args:
+            address: The register address
+            data: A ByteStructure - derived object that is the container of the read data.
+            remote_id (optional): Remote ID for remote read, only used without transaction.
+            transaction (optional): RegisterTransaction to add the read to.
+            callback (optional): called with data after it's read successfully.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT. POZYX_SUCCESS when added to a transaction.
+        """
+        if transaction is not None:
+            transaction.read(address, data, callback)
+            return POZYX_SUCCESS
+        transaction = self.registerTransaction(remote_id)
+        transaction.read(address, data, callback)
+        return transaction.execute()
+
+    def transactionWrite(self, address, data, remote_id=None, transaction=None):
+        """Writes data to Pozyx registers as part of a transaction.
+
+        Without a transaction, the write is performed right away with setWrite.
+
+        Args:
+            address: The register address
+            data: A ByteStructure - derived object that contains the data to be written.
+            remote_id (optional): Remote ID for remote write, only used without transaction.
+            transaction (optional): RegisterTransaction to add the write to.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT. POZYX_SUCCESS when added to a transaction.
+        """
+        if transaction is not None:
+            transaction.write(address, data)
+            return POZYX_SUCCESS
+        return self.setWrite(address, data, remote_id)
+
+    def regReadBatch(self, operations):
+        """Performs a batch of register reads, pipelined if the interface supports it.
+
+        Args:
+            operations: list of (address, data) tuples, with data the ByteStructure-derived
+                container for the read starting at address.
+
+        Returns:
+            list of POZYX_SUCCESS, POZYX_FAILURE, one for every read in the batch
+        """
+        with self.pipeline() as pipeline:
+            futures = [pipeline.read(address, data) for address, data in operations]
+        return [future.result() for future in futures]
+
+    def regWriteBatch(self, operations):
+        """Performs a batch of register writes, pipelined if the interface supports it.
+
+        Args:
+            operations: list of (address, data) tuples, with data the ByteStructure-derived
+                object to write starting at address.
+
+        Returns:
+            list of POZYX_SUCCESS, POZYX_FAILURE, one for every write in the batch
+        """
+        with self.pipeline() as pipeline:
+            futures = [pipeline.write(address, data) for address, data in operations]
+        return [future.result() for future in futures]
+
+    def regFunctionBatch(self, operations):
+        """Performs a batch of register functions, pipelined if the interface supports it.
+
+        Args:
+            operations: list of (address, params, data) tuples, with params and data the
+                ByteStructure-derived parameters and output container of the function.
+
+        Returns:
+            list of the status of every function in the batch
+        """
+        with self.pipeline() as pipeline:
+            futures = [pipeline.function(address, params, data) for address, params, data in operations]
+        return [future.result() for future in futures]
+
+    def prepareRemoteTX(self, send_data):
+        """Auxiliary. Writes the remote operation in send_data to the TX buffer and clears the interrupt status.
+
+        Both are sent in one pipeline, before the TX data gets sent to the remote device.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE
+        """
+        with self.pipeline() as pipeline:
+            status = pipeline.function(PozyxRegisters.WRITE_TX_DATA, send_data, Data([]))
+            pipeline.read(PozyxRegisters.INTERRUPT_STATUS, SingleRegister())
+        return status.result()
+
     def remoteRegWrite(self, destination, address, data):
         """Performs regWrite on a remote Pozyx device.
 
@@ -71,16 +272,14 @@ class PozyxCore(object):
         if len(data) > PozyxConstants.MAX_BUF_SIZE - 1:
             return POZYX_FAILURE
 
-        send_data = Data([0, address] + data.data, 'BB' + data.data_format)
-        status = self.regFunction(PozyxRegisters.WRITE_TX_DATA, send_data, Data([]))
+        status = self.prepareRemoteTX(remote_operation_data(address, data))
         if status != POZYX_SUCCESS:
             return status
 
-        self.getInterruptStatus(SingleRegister())
         status = self.sendTXWrite(destination)
         if status != POZYX_SUCCESS:
             return status
-        return self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 0.5)
+        return self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 0.5, operation=OPERATION_REMOTE_WRITE)
 
     def remoteRegRead(self, destination, address, data):
         """Performs regRead on a remote Pozyx device.
@@ -101,16 +300,15 @@ class PozyxCore(object):
             return POZYX_FAILURE
 
         send_data = Data([0, address, data.byte_size])
-        status = self.regFunction(PozyxRegisters.WRITE_TX_DATA, send_data, Data([]))
+        status = self.prepareRemoteTX(send_data)
         if status != POZYX_SUCCESS:
             return status
 
-        self.getInterruptStatus(SingleRegister())
         status = self.sendTXRead(destination)
         if status != POZYX_SUCCESS:
             return status
 
-        status = self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 1)
+        status = self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 1, operation=OPERATION_REMOTE_READ)
         if status == POZYX_SUCCESS:
             rx_info = RXInfo()
             self.getRxInfo(rx_info)
@@ -133,28 +331,24 @@ class PozyxCore(object):
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        send_data = Data([0, address] + params.data, 'BB' + params.data_format)
-        status = self.regFunction(PozyxRegisters.WRITE_TX_DATA, send_data, Data([]))
+        status = self.prepareRemoteTX(remote_operation_data(address, params))
         if status != POZYX_SUCCESS:
             return status
 
-        self.getInterruptStatus(SingleRegister())
         status = self.sendTXFunction(destination)
         if status != POZYX_SUCCESS:
             return status
 
-        status = self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 1)
+        status = self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 1, operation=OPERATION_REMOTE_FUNCTION)
         if status == POZYX_SUCCESS:
             rx_info = RXInfo()
             self.getRxInfo(rx_info)
             if rx_info.remote_id == destination and rx_info.amount_of_bytes == data.byte_size + 1:
-                return_data = Data([0] + data.data, 'B' + data.data_format)
+                return_data = remote_function_response(data)
                 status = self.readRXBufferData(return_data)
                 if status != POZYX_SUCCESS:
                     return status
-                if len(return_data) > 1:
-                    data.load(return_data[1:])
-                return return_data[0]
+                return load_remote_function_response(return_data, data)
             else:
                 return POZYX_FAILURE
         return status
@@ -186,26 +380,27 @@ class PozyxCore(object):
         interrupt = SingleRegister()
         return self.getInterruptStatus(interrupt)
 
-    def waitForFlagSafe(self, interrupt_flag, timeout_s, interrupt=None):
-        """Performs waitForFlag in polling mode.
+    def waitForFlagSafe(self, interrupt_flag, timeout_s, interrupt=None, operation=None, interval=None):
+        """Performs waitForFlag in polling mode, polling as decided by the polling strategy.
 
         Args:
             interrupt_flag: Flag of interrupt type to check the interrupt register against.
             timeout_s: duration to wait for the interrupt in seconds.
             interrupt (optional): Container for the interrupt status register data.
+            operation (optional): Type of the operation waited on, lets the polling strategy learn its duration.
+            interval (optional): Polling interval overriding the strategy's.
 
         Returns:
-            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+            True, False
         """
         if interrupt is None:
             interrupt = SingleRegister()
-        start = time()
-        while (time() - start) < timeout_s:
+
+        def poll():
             status = self.getInterruptStatus(interrupt)
-            if (interrupt[0] & interrupt_flag) and status == POZYX_SUCCESS:
-                return True
-            sleep(PozyxConstants.DELAY_POLLING_FAST)
-        return False
+            return bool(interrupt[0] & interrupt_flag) and status == POZYX_SUCCESS
+
+        return self.getPollingStrategy().wait(poll, timeout_s, operation, interval)
 
     ## \addtogroup core
     # @{
@@ -237,6 +432,12 @@ class PozyxCore(object):
         else:
             status = self.remoteRegWrite(remote_id, address, data)
             sleep(remote_delay)
+        register_cache = self.getRegisterCache()
+        if register_cache is not None:
+            if status == POZYX_SUCCESS:
+                register_cache.store_written(remote_id, address, data)
+            else:
+                register_cache.invalidate(remote_id, address, data.byte_size)
         return status
 
     def getRead(self, address, data, remote_id=None):
@@ -261,10 +462,16 @@ class PozyxCore(object):
         if not is_reg_readable(address):
             if not self.suppress_warnings:
                 warn("Register 0x%0.02x isn't readable" % address, stacklevel=3)
+        register_cache = self.getRegisterCache()
+        if register_cache is not None and register_cache.load(remote_id, address, data):
+            return POZYX_SUCCESS
         if remote_id is None:
-            return self.regRead(address, data)
+            status = self.regRead(address, data)
         else:
-            return self.remoteRegRead(remote_id, address, data)
+            status = self.remoteRegRead(remote_id, address, data)
+        if register_cache is not None and status == POZYX_SUCCESS:
+            register_cache.store(remote_id, address, data)
+        return status
 
     def useFunction(self, function, params=None, data=None, remote_id=None):
         """Activates a Pozyx register function either locally or remotely.
@@ -288,14 +495,22 @@ class PozyxCore(object):
                 warn("Register 0x%0.02x isn't a function register" % function, stacklevel=3)
         params = Data([]) if params is None else params
         data = Data([]) if data is None else data
+        register_cache = self.getRegisterCache()
+        if register_cache is not None:
+            status = register_cache.load_function(remote_id, function, params, data)
+            if status is not None:
+                return status
         if remote_id is None:
-            return self.regFunction(function, params, data)
+            status = self.regFunction(function, params, data)
         else:
-            return self.remoteRegFunction(remote_id, function, params, data)
+            status = self.remoteRegFunction(remote_id, function, params, data)
+        if register_cache is not None:
+            register_cache.function_called(remote_id, function, params, data, status)
+        return status
 
     # wait for flag functions
 
-    def checkForFlag(self, interrupt_flag, timeout_s, interrupt=None):
+    def checkForFlag(self, interrupt_flag, timeout_s, interrupt=None, operation=None):
         """Performs waitForFlag_safe and checks against errors or timeouts.
 
         This abstracts the waitForFlag status check routine commonly encountered
@@ -306,6 +521,7 @@ class PozyxCore(object):
             interrupt_flag: Flag of interrupt type to check the interrupt register against.
             timeout_s: duration to wait for the interrupt in seconds
             interrupt (optional): Container for the interrupt status register data.
+            operation (optional): Type of the operation waited on, see pypozyx.polling.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -313,7 +529,7 @@ class PozyxCore(object):
         if interrupt is None:
             interrupt = SingleRegister()
         error_interrupt_mask = PozyxBitmasks.INT_MASK_ERR
-        if self.waitForFlagSafe(interrupt_flag | error_interrupt_mask, timeout_s, interrupt):
+        if self.waitForFlagSafe(interrupt_flag | error_interrupt_mask, timeout_s, interrupt, operation):
             if (interrupt[0] & error_interrupt_mask) == error_interrupt_mask:
                 return POZYX_FAILURE
             else:
@@ -339,20 +555,14 @@ class PozyxCore(object):
         if data.byte_size + offset > PozyxConstants.MAX_BUF_SIZE:
             return POZYX_FAILURE
 
-        _MAX_SERIAL_SIZE = PozyxConstants.MAX_SERIAL_SIZE
-
+        with self.pipeline() as pipeline:
+            partial_reads = [(pipeline.function(PozyxRegisters.READ_RX_DATA, params, partial_data), partial_data)
+                             for params, partial_data in rx_buffer_reads(data, offset)]
         status = POZYX_SUCCESS
-        runs = int(data.byte_size / _MAX_SERIAL_SIZE)
         total_byte_data = ""
-        for i in range(runs):
-            partial_data = Data([0] * _MAX_SERIAL_SIZE)
-            status &= self.regFunction(PozyxRegisters.READ_RX_DATA, Data([offset + i * _MAX_SERIAL_SIZE,
-                                                            partial_data.byte_size]), partial_data)
+        for partial_status, partial_data in partial_reads:
+            status &= partial_status.result()
             total_byte_data += partial_data.byte_data
-        partial_data = Data([0] * (data.byte_size - runs * _MAX_SERIAL_SIZE))
-        status &= self.regFunction(PozyxRegisters.READ_RX_DATA, Data([offset + runs * _MAX_SERIAL_SIZE,
-                                                        partial_data.byte_size]), partial_data)
-        total_byte_data += partial_data.byte_data
         data.load_bytes(total_byte_data)
         return status
 
@@ -375,14 +585,18 @@ class PozyxCore(object):
         # have to account for the parameter taking up a byte
         _MAX_SERIAL_SIZE = PozyxConstants.MAX_SERIAL_SIZE - 1
 
-        status = POZYX_SUCCESS
         data = Data(data.transform_to_bytes())
         runs = int(data.byte_size / _MAX_SERIAL_SIZE)
-        for i in range(runs):
-            status &= self.regFunction(PozyxRegisters.WRITE_TX_DATA, Data([offset + i * _MAX_SERIAL_SIZE]
-                                       + data[i * _MAX_SERIAL_SIZE: (i + 1) * _MAX_SERIAL_SIZE]), Data([]))
-        return status & self.regFunction(PozyxRegisters.WRITE_TX_DATA, Data([offset + runs * _MAX_SERIAL_SIZE]
-                                                             + data[runs * _MAX_SERIAL_SIZE:]), Data([]))
+        with self.pipeline() as pipeline:
+            partial_writes = [pipeline.function(PozyxRegisters.WRITE_TX_DATA, Data([offset + i * _MAX_SERIAL_SIZE]
+                                                + data[i * _MAX_SERIAL_SIZE: (i + 1) * _MAX_SERIAL_SIZE]), Data([]))
+                              for i in range(runs)]
+            partial_writes.append(pipeline.function(PozyxRegisters.WRITE_TX_DATA, Data([offset + runs * _MAX_SERIAL_SIZE]
+                                                    + data[runs * _MAX_SERIAL_SIZE:]), Data([])))
+        status = POZYX_SUCCESS
+        for partial_status in partial_writes:
+            status &= partial_status.result()
+        return status
 
     def sendTXBufferData(self, destination):
         """Sends the transmit buffer's data to the destination device.
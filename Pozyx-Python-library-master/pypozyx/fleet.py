@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+"""pypozyx.fleet - contains PozyxFleet, driving several master Pozyx devices in parallel.
+
+A vehicle can carry more than one master tag, each on its own serial port, for redundancy and
+coverage. A PozyxFleet runs every master in its own worker thread, which is the only thread
+using that master, so the masters exchange with their devices at the same time: serial I/O
+doesn't hold the interpreter lock, so throughput grows about linearly with the masters.
+
+Ranging and positioning jobs are spread over the masters by reachability and load. Every
+master learns how reliably it reaches every device from the results of its jobs, and a job
+goes to the master with the best reachability of its target divided by the jobs it still has
+to do. A master that never tried a target is assumed to reach it, so new targets get tried by
+every master. A failed job is retried on another master, retries times.
+
+With stream, the results of the submitted jobs are also merged into one stream, ordered on the
+host time they came in. A result is only handed out once every busy master started its current
+job after it, so no master can still deliver an older result. The results of round are only
+returned by round, never streamed, so a loop of rounds keeps no results around.
+
+Example usage:
+    >>> with PozyxFleet.open(stream=True) as fleet:
+    ...     for result in fleet.round([0x6001, 0x6002, 0x6003, 0x6004]):
+    ...         print(result.master, hex(result.target), result.status, result.data.distance)
+    ...     fleet.submit_positioning(0x6100)
+    ...     for result in fleet:
+    ...         print(result.kind, result.data)
+"""
+from collections import deque, namedtuple
+from concurrent.futures import Future
+from heapq import heappush, heappop
+from itertools import count
+from threading import Condition, Thread
+from time import perf_counter
+
+from pypozyx.definitions.constants import PozyxConstants, POZYX_SUCCESS
+from pypozyx.pozyx_serial import PozyxSerial, get_pozyx_ports
+from pypozyx.structures.device import DeviceRange
+from pypozyx.structures.sensor_data import Coordinates
+
+JOB_RANGING = 'ranging'
+JOB_POSITIONING = 'positioning'
+
+FleetResult = namedtuple('FleetResult', ['time', 'master', 'kind', 'target', 'status', 'data', 'duration'])
+FleetResult.__doc__ = """Result of a job of a PozyxFleet: the host time it came in, the index of the master that
+did it, JOB_RANGING or JOB_POSITIONING, the target, the status, the DeviceRange or Coordinates and the duration
+of the job in seconds"""
+
+
+class FleetJob(object):
+    """A ranging or positioning job, with the masters that tried it"""
+
+    def __init__(self, kind, target, arguments, retries, stream):
+        self.kind = kind
+        self.target = target
+        self.arguments = arguments
+        self.retries = retries
+        self.stream = stream
+        self.tried = set()
+        self.future = Future()
+
+
+class Reachability(object):
+    """Moving success rate of the jobs of one master with one target.
+
+    Args:
+        smoothing: weight of a new result in the success rate.
+    """
+
+    def __init__(self, smoothing):
+        self.smoothing = smoothing
+        self.rate = 1.0
+        self.attempts = 0
+        self.successes = 0
+
+    def add(self, success):
+        self.attempts += 1
+        self.successes += success
+        self.rate += self.smoothing * (float(success) - self.rate)
+
+
+class FleetWorker(object):
+    """The job queue and worker thread of one master"""
+
+    def __init__(self, fleet, index, pozyx):
+        self.fleet = fleet
+        self.index = index
+        self.pozyx = pozyx
+        self.jobs = deque()
+        self.busy_since = None
+        self.completed = 0
+        self.busy_time = 0.0
+        self.reachability = {}
+        self.thread = Thread(target=self.run)
+        self.thread.daemon = True
+
+    @property
+    def load(self):
+        return len(self.jobs) + (self.busy_since is not None)
+
+    def reach(self, target):
+        reachability = self.reachability.get(target)
+        return 1.0 if reachability is None else reachability.rate
+
+    def run(self):
+        fleet = self.fleet
+        while True:
+            with fleet.condition:
+                while not self.jobs and fleet.running:
+                    fleet.condition.wait()
+                if not self.jobs:
+                    return
+                job = self.jobs.popleft()
+                self.busy_since = perf_counter()
+            start = self.busy_since
+            try:
+                status, data = self.perform(job)
+            except Exception as exception:
+                with fleet.condition:
+                    self.busy_since = None
+                    fleet.pending -= 1
+                    fleet.condition.notify_all()
+                job.future.set_exception(exception)
+                continue
+            end = perf_counter()
+            fleet.complete(self, job, FleetResult(end, self.index, job.kind, job.target, status, data, end - start))
+
+    def perform(self, job):
+        if job.kind == JOB_RANGING:
+            device_range = DeviceRange()
+            return self.pozyx.doRanging(job.target, device_range, **job.arguments), device_range
+        coordinates = Coordinates()
+        return self.pozyx.doPositioning(coordinates, remote_id=job.target, **job.arguments), coordinates
+
+
+class PozyxFleet(object):
+    """Runs ranging and positioning jobs on several master Pozyx devices in parallel.
+
+    Args:
+        masters: the Pozyx interfaces of the masters, one worker thread each.
+        retries (optional): amount of times a failed job is retried on another master. Default is 1.
+        smoothing (optional): weight of a new result in the reachability of a target. Default is 0.2.
+        stream (optional): whether the results of the submitted jobs are kept for the merged stream,
+            until they are iterated over. Default is False.
+    """
+
+    def __init__(self, masters, retries=1, smoothing=0.2, stream=False):
+        if not masters:
+            raise ValueError("A fleet needs at least one master")
+        self.retries = retries
+        self.smoothing = smoothing
+        self.stream = stream
+        self.condition = Condition()
+        self.running = True
+        self.workers = [FleetWorker(self, index, pozyx) for index, pozyx in enumerate(masters)]
+        self.results = []
+        self.sequence = count()
+        self.pending = 0
+        for worker in self.workers:
+            worker.thread.start()
+
+    @classmethod
+    def open(cls, ports=None, print_output=False, suppress_warnings=True, **kwargs):
+        """Opens a PozyxSerial on every port, default every Pozyx port found, and returns their fleet"""
+        ports = get_pozyx_ports() if ports is None else ports
+        if not ports:
+            raise ValueError("No Pozyx ports found")
+        return cls([PozyxSerial(port, print_output=print_output, suppress_warnings=suppress_warnings)
+                    for port in ports], **kwargs)
+
+    @property
+    def masters(self):
+        return [worker.pozyx for worker in self.workers]
+
+    def __len__(self):
+        return len(self.workers)
+
+    def assign(self, job):
+        """Queues a job on the master with the best reachability per queued job, called with the lock held"""
+        candidates = [worker for worker in self.workers if worker.index not in job.tried] or self.workers
+        worker = max(candidates, key=lambda worker: (worker.reach(job.target) / (1.0 + worker.load), -worker.load))
+        job.tried.add(worker.index)
+        worker.jobs.append(job)
+        self.condition.notify_all()
+
+    def submit(self, kind, target, **arguments):
+        """Queues a job and returns the Future of its FleetResult"""
+        return self.enqueue(FleetJob(kind, target, arguments, self.retries, self.stream))
+
+    def enqueue(self, job):
+        with self.condition:
+            if not self.running:
+                raise RuntimeError("The fleet is closed")
+            self.pending += 1
+            self.assign(job)
+        return job.future
+
+    def submit_ranging(self, destination_id, **arguments):
+        """Queues ranging with a device, see doRanging for the arguments, returns the Future of its FleetResult"""
+        return self.submit(JOB_RANGING, destination_id, **arguments)
+
+    def submit_positioning(self, tag_id=None, dimension=PozyxConstants.DIMENSION_3D, height=0,
+                           algorithm=PozyxConstants.POSITIONING_ALGORITHM_UWB_ONLY):
+        """Queues the positioning of a tag, None for the masters themselves, returns the Future of its FleetResult"""
+        return self.submit(JOB_POSITIONING, tag_id, dimension=dimension, height=height, algorithm=algorithm)
+
+    def complete(self, worker, job, result):
+        """Records the result of a job, retrying it on another master when it failed"""
+        success = result.status == POZYX_SUCCESS
+        with self.condition:
+            worker.busy_since = None
+            worker.completed += 1
+            worker.busy_time += result.duration
+            if job.target not in worker.reachability:
+                worker.reachability[job.target] = Reachability(self.smoothing)
+            worker.reachability[job.target].add(success)
+            if not success and job.retries > 0 and len(job.tried) < len(self.workers) and self.running:
+                job.retries -= 1
+                self.assign(job)
+                return
+            self.pending -= 1
+            if job.stream:
+                heappush(self.results, (result.time, next(self.sequence), result))
+            self.condition.notify_all()
+        job.future.set_result(result)
+
+    def watermark(self):
+        """Returns the host time before which no master can deliver another result, called with the lock held"""
+        # queued jobs only start after now, after every result that's in already
+        busy = [worker.busy_since for worker in self.workers if worker.busy_since is not None]
+        return min(busy) if busy else float('inf')
+
+    def next_result(self, timeout=None):
+        """Returns the next FleetResult of the merged stream, None on timeout or when nothing's left"""
+        deadline = None if timeout is None else perf_counter() + timeout
+        with self.condition:
+            while True:
+                if self.results and self.results[0][0] <= self.watermark():
+                    return heappop(self.results)[2]
+                if not self.pending and not self.results:
+                    return None
+                remaining = None if deadline is None else deadline - perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def __iter__(self):
+        """Yields the merged stream of results, until every submitted job is handed out"""
+        while True:
+            result = self.next_result()
+            if result is None:
+                return
+            yield result
+
+    def round(self, destination_ids, **arguments):
+        """Ranges with every device once, spread over the masters, returns the FleetResults in time order"""
+        futures = [self.enqueue(FleetJob(JOB_RANGING, destination_id, arguments, self.retries, False))
+                   for destination_id in destination_ids]
+        return sorted((future.result() for future in futures), key=lambda result: result.time)
+
+    def reachability(self):
+        """Returns the success rate of every master with every target it tried, by master index"""
+        with self.condition:
+            return {worker.index: {target: reachability.rate for target, reachability in worker.reachability.items()}
+                    for worker in self.workers}
+
+    def statistics(self):
+        """Returns per master the completed jobs, the time spent on them and the jobs queued"""
+        with self.condition:
+            return [{'completed': worker.completed, 'busy_time': worker.busy_time, 'queued': worker.load}
+                    for worker in self.workers]
+
+    def close(self):
+        """Lets the masters finish their queued jobs and stops the worker threads"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""pypozyx.histogram - contains LatencyHistogram, counting latencies in buckets with fixed edges.
+
+The multitag scheduler keeps one per tag, the InstrumentedLock of a thread-safe interface one
+for its wait and hold times and a Tracer one per operation, so their percentiles are available
+at any time without keeping every measurement.
+
+The default edges are coarse, a quarter octave apart. log_linear_edges gives the bucket layout
+of HdrHistogram instead: powers of two split in linear sub buckets, so every latency is kept with
+a fixed relative precision over the whole range.
+
+Example usage:
+    >>> histogram = LatencyHistogram(log_linear_edges(significant_digits=3))
+    >>> histogram.record(0.012)
+    >>> histogram.percentile(0.99)
+    0.012
+"""
+from bisect import bisect_left
+from math import ceil, log
+
+# upper edges of the latency histogram buckets in seconds, from 1 ms to 2 s
+DEFAULT_LATENCY_EDGES = [0.001 * 2 ** (i / 4.0) for i in range(45)]
+
+# the edges made by log_linear_edges, shared by the histograms using them
+log_linear_edge_cache = {}
+
+
+def log_linear_edges(lowest=1e-6, highest=3600.0, significant_digits=3):
+    """Returns the bucket edges from lowest to highest in seconds with significant_digits decimal digits
+    of precision, like HdrHistogram.
+
+    lowest is the width of the smallest buckets, every power of two above those is split in
+    buckets of twice the width of the ones below.
+    """
+    key = (lowest, highest, significant_digits)
+    if key not in log_linear_edge_cache:
+        sub_bucket_count = 2 ** int(ceil(log(2 * 10 ** significant_digits, 2)))
+        edges = [lowest * (i + 1) for i in range(sub_bucket_count)]
+        width = 2 * lowest
+        while edges[-1] < highest:
+            top = edges[-1]
+            edges.extend(top + width * (i + 1) for i in range(sub_bucket_count // 2))
+            width *= 2
+        log_linear_edge_cache[key] = tuple(edges)
+    return log_linear_edge_cache[key]
+
+
+class LatencyHistogram(object):
+    """Histogram of latencies with fixed bucket edges.
+
+    Args:
+        edges (optional): the increasing upper edges of the buckets in seconds, latencies above
+            the last edge are counted in an overflow bucket. Default is DEFAULT_LATENCY_EDGES.
+    """
+
+    def __init__(self, edges=None):
+        self.edges = tuple(DEFAULT_LATENCY_EDGES if edges is None else edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def record(self, latency):
+        self.counts[bisect_left(self.edges, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.minimum = latency if self.minimum is None else min(self.minimum, latency)
+        self.maximum = latency if self.maximum is None else max(self.maximum, latency)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """Returns the upper edge of the bucket holding the fraction percentile, the maximum for the overflow bucket"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= rank:
+                return min(self.edges[index], self.maximum) if index < len(self.edges) else self.maximum
+        return self.maximum
+
+    def buckets(self):
+        """Returns the (upper edge, count) of the buckets that aren't empty, None as edge of the overflow bucket"""
+        edges = self.edges + (None,)
+        return [(edges[index], count) for index, count in enumerate(self.counts) if count]
+
+    def merge(self, other):
+        """Adds the counts of a histogram with the same edges"""
+        if other.edges != self.edges:
+            raise ValueError("Can't merge histograms with different bucket edges")
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        for extreme in (other.minimum, other.maximum):
+            if extreme is not None:
+                self.minimum = extreme if self.minimum is None else min(self.minimum, extreme)
+                self.maximum = extreme if self.maximum is None else max(self.maximum, extreme)
+
+    def to_dict(self):
+        """Returns the summary and the buckets that aren't empty, see buckets"""
+        return {'count': self.count, 'mean': self.mean(), 'min': self.minimum, 'max': self.maximum,
+                'p50': self.percentile(0.5), 'p90': self.percentile(0.9), 'p99': self.percentile(0.99),
+                'p99.9': self.percentile(0.999), 'buckets': self.buckets()}
@@ -1,16 +1,54 @@
 #!/usr/bin/env python
 """pypozyx.lib - Contains core and extended Pozyx user functionality through the PozyxLib class."""
 
-from time import sleep
-from pypozyx.core import PozyxCore
+from time import perf_counter, sleep
+from pypozyx.core import PozyxCore, remote_operation_data
+from pypozyx.multitag import MultitagScheduler
+from pypozyx.polling import (OPERATION_RANGING, OPERATION_REMOTE_RANGING, OPERATION_POSITIONING,
+                             OPERATION_REMOTE_POSITIONING)
 from pypozyx.definitions import (PozyxBitmasks, PozyxRegisters, PozyxConstants, POZYX_SUCCESS, POZYX_FAILURE,
                                  POZYX_TIMEOUT, ERROR_MESSAGES)
-from pypozyx.structures.device import NetworkID, UWBSettings, DeviceList, Coordinates, RXInfo, DeviceCoordinates, FilterData, AlgorithmData
+from pypozyx.structures.device import (NetworkID, UWBSettings, DeviceList, Coordinates, RXInfo, DeviceCoordinates,
+                                       FilterData, AlgorithmData, DeviceRange, RangeMeasurement)
 from pypozyx.structures.generic import Data, SingleRegister, dataCheck
 from pypozyx.structures.sensor_data import PositioningData, RangeInformation
 
 from warnings import warn
 
+# the operations of PozyxCore and PozyxLib that take several exchanges which nothing may come in between
+ATOMIC_OPERATIONS = ['waitForFlag', 'waitForFlagSafe', 'waitForFlagSafeFast', 'checkForFlag', 'checkForFlagFast',
+                     'remoteRegWrite', 'remoteRegRead', 'remoteRegFunction', 'remoteRegFunctionOnlyData',
+                     'remoteRegFunctionWithoutCheck', 'sendData', 'sendTXRead', 'sendTXWrite', 'sendTXFunction',
+                     'doRanging', 'doRangingMany', 'rangingWithoutCheck', 'doPositioning', 'doPositioningWithData',
+                     'doDiscovery', 'doOptimalDiscovery', 'doDiscoveryTags', 'doDiscoveryAnchors', 'doDiscoveryAll',
+                     'doAnchorCalibration', 'doFunctionOnDifferentUWB', 'getDeviceIds', 'getAnchorIds', 'getTagIds',
+                     'configureAnchors', 'saveConfiguration', 'saveRegisters', 'setUWBSettings']
+
+
+def positioning_data_command(positioning_data):
+    """Returns the serial command positioning and returning positioning_data, a PositioningData object"""
+    flags = Data([positioning_data.flags], 'H')
+    flags.load_hex_string()
+    return 'F,%0.2x,%s,%i\r' % (PozyxRegisters.DO_POSITIONING_WITH_DATA, flags.byte_data, positioning_data.byte_size + 61)
+
+
+def load_positioning_data_response(response, positioning_data):
+    """Loads the response to positioning_data_command in positioning_data, returning the function's status"""
+    if positioning_data.has_ranges():
+        amount_of_ranges = int(response[2 * positioning_data.byte_size:2 * positioning_data.byte_size + 2], 16)
+        positioning_data.set_amount_of_ranges(amount_of_ranges)
+        response = response[: positioning_data.byte_size * 2 + 2]
+    if len(positioning_data) > 0:
+        positioning_data.load_bytes(response[2:])
+    return int(response[0:2], 16)
+
+
+def set_remote_amount_of_ranges(positioning_data, rx_info):
+    """Sizes positioning_data to the ranges in the remote positioning data received, described by rx_info"""
+    if positioning_data.has_ranges():
+        amount_of_ranges = int((rx_info.amount_of_bytes - positioning_data.byte_size) / RangeInformation.byte_size)
+        positioning_data.set_amount_of_ranges(amount_of_ranges)
+
 
 class Device(object):
     def __init__(self, id_):
@@ -171,7 +209,7 @@ class PozyxLib(PozyxCore):
             return POZYX_FAILURE
         return details
 
-    def setConfigGPIO(self, gpio_num, mode, pull, remote_id=None):
+    def setConfigGPIO(self, gpio_num, mode, pull, remote_id=None, transaction=None):
         """Set the Pozyx's selected GPIO pin configuration(mode and pull).
 
         Args:
@@ -179,6 +217,7 @@ class PozyxLib(PozyxCore):
             mode: GPIO configuration mode. integer mode or SingleRegister(mode)
             pull: GPIO configuration pull. integer pull or SingleRegister(pull)
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -197,7 +236,7 @@ class PozyxLib(PozyxCore):
 
         gpio_register = PozyxRegisters.CONFIG_GPIO_1 + gpio_num - 1
         mask = Data([mode[0] + (pull[0] << 3)])
-        return self.setWrite(gpio_register, mask, remote_id)
+        return self.transactionWrite(gpio_register, mask, remote_id, transaction)
 
     def setGPIO(self, gpio_num, value, remote_id=None):
         """Set the Pozyx's selected GPIO pin output.
@@ -365,15 +404,17 @@ class PozyxLib(PozyxCore):
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        status = self.getWhoAmI(system_details, remote_id=remote_id)
+        if system_details.id is None and remote_id is not None:
+            system_details.id = remote_id
+        transaction = self.registerTransaction(remote_id)
+        transaction.read(PozyxRegisters.WHO_AM_I, system_details)
         if system_details.id is None:
-            if remote_id is None:
-                network_id = NetworkID()
-                status &= self.getNetworkId(network_id)
-                system_details.id = network_id.id
-            else:
-                system_details.id = remote_id
-        return status
+            network_id = NetworkID()
+
+            def load_network_id(data):
+                system_details.id = data.id
+            transaction.read(PozyxRegisters.NETWORK_ID, network_id, load_network_id)
+        return transaction.execute()
 
 
     def getInterruptMask(self, mask, remote_id=None):
@@ -484,33 +525,35 @@ class PozyxLib(PozyxCore):
             return self.getErrorMessage(error_code)
         return "Error: couldn't retrieve error from device."
 
-    def setInterruptMask(self, mask, remote_id=None):
+    def setInterruptMask(self, mask, remote_id=None, transaction=None):
         """Set the Pozyx's interrupt mask.
 
         Args:
             mask: Interrupt mask. See PozyxRegisters.INTERRUPT_MASK register. integer mask or SingleRegister(mask)
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
         if not dataCheck(mask):
             mask = SingleRegister(mask)
-        return self.setWrite(PozyxRegisters.INTERRUPT_MASK, mask, remote_id)
+        return self.transactionWrite(PozyxRegisters.INTERRUPT_MASK, mask, remote_id, transaction)
 
-    def setLedConfig(self, config, remote_id=None):
+    def setLedConfig(self, config, remote_id=None, transaction=None):
         """Set the Pozyx's LED configuration.
 
         Args:
             config: LED configuration. See PozyxRegisters.LED_CONFIGURATION register. integer configuration or SingleRegister(configuration)
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
         if not dataCheck(config):
             config = SingleRegister(config)
-        return self.setWrite(PozyxRegisters.LED_CONFIGURATION, config, remote_id)
+        return self.transactionWrite(PozyxRegisters.LED_CONFIGURATION, config, remote_id, transaction)
 
     ## @}
 
@@ -530,29 +573,31 @@ class PozyxLib(PozyxCore):
         """
         self.saveConfiguration(PozyxConstants.FLASH_SAVE_ANCHOR_IDS, remote_id=remote_id)
 
-    def getUpdateInterval(self, ms, remote_id=None):
+    def getUpdateInterval(self, ms, remote_id=None, transaction=None):
         """Obtains the Pozyx's update interval.
 
         Args:
             ms: Container for the read data. SingleRegister or Data([0]).
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        return self.getRead(PozyxRegisters.POSITIONING_INTERVAL, ms, remote_id)
+        return self.transactionRead(PozyxRegisters.POSITIONING_INTERVAL, ms, remote_id, transaction)
 
-    def getRangingProtocol(self, protocol, remote_id=None):
+    def getRangingProtocol(self, protocol, remote_id=None, transaction=None):
         """Obtains the Pozyx's ranging protocol
 
         Args:
             protocol: Container for the read protocol data. SingleRegister or Data([0])
             remote_id (optional): Remote Pozyx ID
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        return self.getRead(PozyxRegisters.RANGING_PROTOCOL, protocol, remote_id)
+        return self.transactionRead(PozyxRegisters.RANGING_PROTOCOL, protocol, remote_id, transaction)
 
     def setRangingProtocolFast(self, remote_id=None):
         return self.setRangingProtocol(PozyxConstants.RANGE_PROTOCOL_FAST, remote_id=remote_id)
@@ -560,12 +605,13 @@ class PozyxLib(PozyxCore):
     def setRangingProtocolPrecision(self, remote_id=None):
         return self.setRangingProtocol(PozyxConstants.RANGE_PROTOCOL_PRECISION, remote_id=remote_id)
 
-    def setRangingProtocol(self, protocol, remote_id=None):
+    def setRangingProtocol(self, protocol, remote_id=None, transaction=None):
         """Set the Pozyx's ranging protocol.
 
         Args:
             protocol: the new ranging protocol. See PozyxRegisters.RANGING_PROTOCOL register. integer or SingleRegister(protocol)
             remote_id (optional): Remote Pozyx ID
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -575,19 +621,20 @@ class PozyxLib(PozyxCore):
         if not 0 <= protocol[0] <= 1:
             warn("setRangingProtocol: wrong protocol {}".format(protocol[0]))
 
-        return self.setWrite(PozyxRegisters.RANGING_PROTOCOL, protocol, remote_id)
+        return self.transactionWrite(PozyxRegisters.RANGING_PROTOCOL, protocol, remote_id, transaction)
 
-    def getPositioningAlgorithmData(self, algorithm_data, remote_id=None):
+    def getPositioningAlgorithmData(self, algorithm_data, remote_id=None, transaction=None):
         """Obtains the Pozyx's positioning algorithm.
 
         Args:
             algorithm_data: Container for the read data. AlgorithmData or Data([0]).
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        return self.getRead(PozyxRegisters.POSITIONING_ALGORITHM, algorithm_data, remote_id)
+        return self.transactionRead(PozyxRegisters.POSITIONING_ALGORITHM, algorithm_data, remote_id, transaction)
 
     def setPositioningAlgorithmData(self, algorithm_data, remote_id=None):
         """Obtains the Pozyx's positioning algorithm.
@@ -601,61 +648,66 @@ class PozyxLib(PozyxCore):
         """
         return self.setWrite(PozyxRegisters.POSITIONING_ALGORITHM. algorithm_data, remote_id=remote_id)
 
-    def getPositionAlgorithm(self, algorithm, remote_id=None):
+    def getPositionAlgorithm(self, algorithm, remote_id=None, transaction=None):
         """Obtains the Pozyx's positioning algorithm.
 
         Args:
             algorithm: Container for the read data. SingleRegister or Data([0]).
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        status = self.getRead(PozyxRegisters.POSITIONING_ALGORITHM, algorithm, remote_id)
-        algorithm[0] &= 0xF
-        return status
+        def load_algorithm(data):
+            data[0] &= 0xF
+        return self.transactionRead(PozyxRegisters.POSITIONING_ALGORITHM, algorithm, remote_id, transaction, load_algorithm)
 
-    def getPositionDimension(self, dimension, remote_id=None):
+    def getPositionDimension(self, dimension, remote_id=None, transaction=None):
         """Obtains the Pozyx's positioning dimension.
 
         Args:
             dimension: Container the for read data. SingleRegister or Data([0]).
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        status = self.getRead(PozyxRegisters.POSITIONING_ALGORITHM, dimension, remote_id)
-        dimension[0] = (dimension[0] & 0x30) >> 4
-        return status
+        def load_dimension(data):
+            data[0] = (data[0] & 0x30) >> 4
+        return self.transactionRead(PozyxRegisters.POSITIONING_ALGORITHM, dimension, remote_id, transaction, load_dimension)
 
-    def getAnchorSelectionMode(self, mode, remote_id=None):
+    def getAnchorSelectionMode(self, mode, remote_id=None, transaction=None):
         """Obtains the Pozyx's anchor selection mode.
 
         Args:
             mode: Container for the read data. SingleRegister or Data([0]).
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        status = self.getRead(PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS, mode, remote_id)
-        mode[0] = (mode[0] & 0x80) >> 7
-        return status
+        def load_mode(data):
+            data[0] = (data[0] & 0x80) >> 7
+        return self.transactionRead(PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS, mode, remote_id, transaction, load_mode)
 
-    def getNumberOfAnchors(self, nr_anchors, remote_id=None):
+    def getNumberOfAnchors(self, nr_anchors, remote_id=None, transaction=None):
         """Obtains the Pozyx's number of selected anchors.
 
         Args:
             nr_anchors: Container for the read data. SingleRegister or Data([0]).
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        status = self.getRead(PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS, nr_anchors, remote_id)
-        nr_anchors[0] &= 0xF
-        return status
+        def load_nr_anchors(data):
+            data[0] &= 0xF
+        return self.transactionRead(PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS, nr_anchors, remote_id, transaction,
+                                    load_nr_anchors)
 
     def getOperationMode(self, mode, remote_id=None):
         """Obtains the Pozyx's mode of operation.
@@ -760,12 +812,13 @@ class PozyxLib(PozyxCore):
 
         return self.useFunction(PozyxRegisters.GET_DEVICE_RANGE_INFO, device_id, device_range, remote_id)
 
-    def setUpdateInterval(self, ms, remote_id=None):
+    def setUpdateInterval(self, ms, remote_id=None, transaction=None):
         """Set the Pozyx's update interval in ms(milliseconds).
 
         Args:
             ms: Update interval in ms. integer ms or SingleRegister(ms, size=2)
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -774,14 +827,15 @@ class PozyxLib(PozyxCore):
             ms = SingleRegister(ms, size=2)
         if not 100 < ms[0] <= 60000:
             warn("setUpdateInterval: ms not 100 < ms < 60000, is {}".format(ms[0]))
-        return self.setWrite(PozyxRegisters.POSITIONING_INTERVAL, ms, remote_id)
+        return self.transactionWrite(PozyxRegisters.POSITIONING_INTERVAL, ms, remote_id, transaction)
 
-    def setCoordinates(self, coordinates, remote_id=None):
+    def setCoordinates(self, coordinates, remote_id=None, transaction=None):
         """Set the Pozyx's coordinates.
 
         Args:
             coordinates: Desired Pozyx coordinates. Coordinates() or [x, y, z].
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -789,21 +843,22 @@ class PozyxLib(PozyxCore):
         if not dataCheck(coordinates):
             coordinates = Coordinates(
                 coordinates[0], coordinates[1], coordinates[2])
-        return self.setWrite(PozyxRegisters.POSITION_X, coordinates, remote_id)
+        return self.transactionWrite(PozyxRegisters.POSITION_X, coordinates, remote_id, transaction)
 
-    def setHeight(self, height, remote_id=None):
+    def setHeight(self, height, remote_id=None, transaction=None):
         """Sets the Pozyx device's height.
 
         Args:
             height: Desired Pozyx height. integer height or Data([height], 'i').
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
         if not dataCheck(height):
             height = Data([height], 'i')
-        return self.setWrite(PozyxRegisters.POSITION_Z, height, remote_id=remote_id)
+        return self.transactionWrite(PozyxRegisters.POSITION_Z, height, remote_id, transaction)
 
     def setPositioningFilterNone(self, remote_id=None):
         return self.setPositionFilter(PozyxConstants.FILTER_TYPE_NONE, SingleRegister(), remote_id=remote_id)
@@ -817,7 +872,7 @@ class PozyxLib(PozyxCore):
     def setPositioningFilterMovingAverage(self, filter_strength, remote_id=None):
         return self.setPositionFilter(PozyxConstants.FILTER_TYPE_MOVING_AVERAGE, filter_strength, remote_id=remote_id)
 
-    def setPositionFilter(self, filter_type, filter_strength, remote_id=None):
+    def setPositionFilter(self, filter_type, filter_strength, remote_id=None, transaction=None):
         """Set the Pozyx's positioning filter.
 
         Note that currently only PozyxConstants.FILTER_TYPE_MOVING_AVERAGE, PozyxConstants.FILTER_TYPE_MOVING_MEDIAN and PozyxConstants.FILTER_TYPE_FIR are implemented.
@@ -826,6 +881,7 @@ class PozyxLib(PozyxCore):
             filter_type: Positioning filter type. Integer or SingleRegister.
             filter_strength: Positioning filter strength. Integer or SingleRegister.
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -841,9 +897,9 @@ class PozyxLib(PozyxCore):
             warn("setPositionFilter: invalid strength {}, keep between 0 and 15".format(filter_strength[0]))
 
         params = Data([filter_type[0] + (filter_strength[0] << 4)])
-        return self.setWrite(PozyxRegisters.POSITIONING_FILTER, params, remote_id)
+        return self.transactionWrite(PozyxRegisters.POSITIONING_FILTER, params, remote_id, transaction)
 
-    def getPositionFilterData(self, filter_data, remote_id=None):
+    def getPositionFilterData(self, filter_data, remote_id=None, transaction=None):
         """**NEW**! Get the positioning filter data.
 
         Use FilterData if you want to have a ready to go container for this data.
@@ -851,6 +907,7 @@ class PozyxLib(PozyxCore):
         Args:
             filter_data: Container for filter data. SingleRegister or FilterData
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Example:
             >>> pozyx = PozyxLib()  # PozyxSerial has PozyxLib's functions, just for generality
@@ -864,7 +921,7 @@ class PozyxLib(PozyxCore):
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
-        return self.getRead(PozyxRegisters.POSITIONING_FILTER, filter_data, remote_id=remote_id)
+        return self.transactionRead(PozyxRegisters.POSITIONING_FILTER, filter_data, remote_id, transaction)
 
     def getPositionFilterStrength(self, remote_id=None):
         """**NEW**! Get the positioning filter strength.
@@ -893,7 +950,7 @@ class PozyxLib(PozyxCore):
         self.getPositionDimension(dimension, remote_id=remote_id)
         return self.setPositionAlgorithm(PozyxConstants.POSITIONING_ALGORITHM_TRACKING, dimension, remote_id=remote_id)
 
-    def setPositionAlgorithm(self, algorithm, dimension, remote_id=None):
+    def setPositionAlgorithm(self, algorithm, dimension, remote_id=None, transaction=None):
         """Set the Pozyx's positioning algorithm.
 
         Note that currently only PozyxConstants.POSITIONING_ALGORITHM_UWB_ONLY and PozyxConstants.POSITIONING_ALGORITHM_TRACKING are implemented.
@@ -902,6 +959,7 @@ class PozyxLib(PozyxCore):
             algorithm: Positioning algorithm. integer algorithm or SingleRegister(algorithm).
             dimension: Positioning dimension. integer dimension or SingleRegister(dimension).
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -917,7 +975,7 @@ class PozyxLib(PozyxCore):
             warn("setPositionAlgorithm: wrong dimension {}".format(dimension[0]))
 
         params = Data([algorithm[0] + (dimension[0] << 4)])
-        return self.setWrite(PozyxRegisters.POSITIONING_ALGORITHM, params, remote_id)
+        return self.transactionWrite(PozyxRegisters.POSITIONING_ALGORITHM, params, remote_id, transaction)
 
     def setSelectionOfAnchorsAutomatic(self, number_of_anchors, remote_id=None):
         return self.setSelectionOfAnchors(PozyxConstants.ANCHOR_SELECT_AUTO, number_of_anchors, remote_id=remote_id)
@@ -925,13 +983,14 @@ class PozyxLib(PozyxCore):
     def setSelectionOfAnchorsManual(self, number_of_anchors, remote_id=None):
         return self.setSelectionOfAnchors(PozyxConstants.ANCHOR_SELECT_MANUAL, number_of_anchors, remote_id=remote_id)
 
-    def setSelectionOfAnchors(self, mode, number_of_anchors, remote_id=None):
+    def setSelectionOfAnchors(self, mode, number_of_anchors, remote_id=None, transaction=None):
         """Set the Pozyx's coordinates.
 
         Args:
             mode: Anchor selection mode. integer mode or SingleRegister(mode).
             number_of_anchors (int, SingleRegister): Number of anchors used in positioning. integer nr_anchors or SingleRegister(nr_anchors).
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -947,7 +1006,7 @@ class PozyxLib(PozyxCore):
             warn("setSelectionOfAnchors: number of anchors {} not in range 3-16".format(number_of_anchors[0]))
 
         params = Data([(mode[0] << 7) + number_of_anchors[0]])
-        return self.setWrite(PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS, params, remote_id)
+        return self.transactionWrite(PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS, params, remote_id, transaction)
 
     def setPositioningAnchorIds(self, anchors, remote_id=None):
         """Set the anchors the Pozyx will use for positioning.
@@ -998,18 +1057,96 @@ class PozyxLib(PozyxCore):
         self.clearInterruptStatus()
 
         int_flag = PozyxBitmasks.INT_STATUS_FUNC
+        operation = OPERATION_RANGING
         if remote_id is not None:
             int_flag = PozyxBitmasks.INT_STATUS_RX_DATA
+            operation = OPERATION_REMOTE_RANGING
 
+        sent = perf_counter()
         status = self.useFunction(
             PozyxRegisters.DO_RANGING, destination_id, Data([]), remote_id=remote_id)
         if status == POZYX_SUCCESS:
-            status = self.checkForFlag(int_flag, PozyxConstants.DELAY_INTERRUPT)
+            status = self.checkForFlag(int_flag, PozyxConstants.DELAY_INTERRUPT, operation=operation)
             if status == POZYX_SUCCESS:
-                self.getDeviceRangeInfo(destination_id, device_range, remote_id=remote_id)
+                received = perf_counter()
+                range_status = self.getDeviceRangeInfo(destination_id, device_range, remote_id=remote_id)
+                clock_sync = self.getClockSync()
+                if clock_sync is not None and range_status == POZYX_SUCCESS:
+                    clock_sync.add_exchange(remote_id, device_range.timestamp, sent, received)
             return status
         return POZYX_FAILURE
 
+    def doRangingMany(self, destination_ids, remote_id=None):
+        """Performs ranging with several destination devices, back-to-back.
+
+        Locally, every next ranging is started in the same pipelined exchange that reads the
+        previous range, so reading a result overlaps with the next measurement being on air.
+        Remotely, the rangings are performed one by one.
+
+        Args:
+            destination_ids: Network IDs of the destinations to perform ranging with. integers or NetworkID(ID)s
+            remote_id (optional): Remote Pozyx ID.
+
+        Returns:
+            list of RangeMeasurement(destination, timestamp, distance, RSS, status), one for every destination.
+            status is POZYX_SUCCESS, POZYX_FAILURE or POZYX_TIMEOUT.
+
+        Example:
+            >>> for measurement in self.doRangingMany([0x6001, 0x6002, 0x6003]):
+            ...     print("0x%0.4x: %i mm" % (measurement.destination, measurement.distance))
+        """
+        destination_ids = [destination_id[0] if dataCheck(destination_id) else destination_id
+                           for destination_id in destination_ids]
+        for destination_id in destination_ids:
+            if destination_id < 0 or destination_id > 0xFFFF:
+                warn("Destination ID should be between 0x0000 and 0xFFFF, not {}".format(destination_id))
+
+        measurements = []
+        if remote_id is not None:
+            for destination_id in destination_ids:
+                device_range = DeviceRange()
+                status = self.doRanging(destination_id, device_range, remote_id)
+                measurements.append(RangeMeasurement(destination_id, device_range.timestamp, device_range.distance,
+                                                     device_range.RSS, status))
+            return measurements
+        if not destination_ids:
+            return measurements
+
+        clock_sync = self.getClockSync()
+        next_sent = perf_counter()
+        try:
+            with self.pipeline() as pipeline:
+                pipeline.read(PozyxRegisters.INTERRUPT_STATUS, SingleRegister())
+                started = pipeline.function(PozyxRegisters.DO_RANGING, NetworkID(destination_ids[0]), Data([]))
+            for i, destination_id in enumerate(destination_ids):
+                device_range = DeviceRange()
+                sent = next_sent
+                status = POZYX_SUCCESS if started.result() == POZYX_SUCCESS else POZYX_FAILURE
+                if status == POZYX_SUCCESS:
+                    # reading the flag clears it, the next ranging can be started right away
+                    status = self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, PozyxConstants.DELAY_INTERRUPT,
+                                               operation=OPERATION_RANGING)
+                received = next_sent = perf_counter()
+                with self.pipeline() as pipeline:
+                    if i + 1 < len(destination_ids):
+                        started = pipeline.function(PozyxRegisters.DO_RANGING, NetworkID(destination_ids[i + 1]),
+                                                    Data([]))
+                    if status == POZYX_SUCCESS:
+                        range_info = pipeline.function(PozyxRegisters.GET_DEVICE_RANGE_INFO, NetworkID(destination_id),
+                                                       device_range)
+                if status == POZYX_SUCCESS and range_info.result() != POZYX_SUCCESS:
+                    status = POZYX_FAILURE
+                if clock_sync is not None and status == POZYX_SUCCESS:
+                    clock_sync.add_exchange(None, device_range.timestamp, sent, received)
+                measurements.append(RangeMeasurement(destination_id, device_range.timestamp, device_range.distance,
+                                                     device_range.RSS, status))
+        finally:
+            # the rangings bypass useFunction, they add the destinations to the device list
+            register_cache = self.getRegisterCache()
+            if register_cache is not None:
+                register_cache.function_called(None, PozyxRegisters.DO_RANGING, Data([]), Data([]), POZYX_SUCCESS)
+        return measurements
+
     def doRangingSlave(self, destination_id, device_range):
         """Checks whether the device has ranged and if so, reads the range.
 
@@ -1032,6 +1169,18 @@ class PozyxLib(PozyxCore):
             self.getDeviceRangeInfo(destination_id, device_range)
         return status
 
+    def multitagScheduler(self, tag_ids, flags=0b1, timeout=None, max_in_flight=None):
+        """Returns a MultitagScheduler, positioning the tags concurrently instead of one after the other.
+
+        Args:
+            tag_ids: Network IDs of the tags to position, None for the local Pozyx.
+            flags (optional): PositioningData flags of the results. Default is the coordinates only.
+            timeout (optional): Time in seconds to wait for a tag's result. Default is TIMEOUT_REMOTE_POSITIONING.
+            max_in_flight (optional): Maximum amount of tags positioning at once. Default is all tags.
+        """
+        timeout = PozyxConstants.TIMEOUT_REMOTE_POSITIONING if timeout is None else timeout
+        return MultitagScheduler(self, tag_ids, flags=flags, timeout=timeout, max_in_flight=max_in_flight)
+
     def doPositioning(self, position, dimension=PozyxConstants.DIMENSION_3D, height=Data([0], 'i'), algorithm=None, remote_id=None, timeout=None):
         """Performs positioning with the Pozyx. This is probably why you're using Pozyx.
 
@@ -1097,13 +1246,14 @@ class PozyxLib(PozyxCore):
 
         if remote_id is None:
             timeout = PozyxConstants.TIMEOUT_POSITIONING if timeout is None else timeout
-            status = self.checkForFlag(PozyxBitmasks.INT_STATUS_POS, timeout)
+            status = self.checkForFlag(PozyxBitmasks.INT_STATUS_POS, timeout, operation=OPERATION_POSITIONING)
             if status == POZYX_SUCCESS:
                 return self.getCoordinates(position)
             return status
         else:
             timeout = PozyxConstants.TIMEOUT_REMOTE_POSITIONING if timeout is None else timeout
-            if self.waitForFlag(PozyxBitmasks.INT_STATUS_RX_DATA, timeout) == POZYX_SUCCESS:
+            if self.waitForFlagSafe(PozyxBitmasks.INT_STATUS_RX_DATA, timeout,
+                                    operation=OPERATION_REMOTE_POSITIONING):
                 rx_info = Data([0, 0], 'HB')
                 self.getRead(PozyxRegisters.RX_NETWORK_ID, rx_info)
                 if rx_info[0] == remote_id and rx_info[1] == position.byte_size:
@@ -1116,18 +1266,9 @@ class PozyxLib(PozyxCore):
         return POZYX_TIMEOUT
 
     def getPositioningData(self, positioning_data):
-        flags = Data([positioning_data.flags], 'H')
-        flags.load_hex_string()
-        s = 'F,%0.2x,%s,%i\r' % (PozyxRegisters.DO_POSITIONING_WITH_DATA, flags.byte_data, positioning_data.byte_size + 61)
         # very custom solution...
-        r = self.serialExchange(s)
-        if positioning_data.has_ranges():
-            amount_of_ranges = int(r[2 * positioning_data.byte_size:2 * positioning_data.byte_size + 2], 16)
-            positioning_data.set_amount_of_ranges(amount_of_ranges)
-            r = r[: positioning_data.byte_size * 2 + 2]
-        if len(positioning_data) > 0:
-            positioning_data.load_bytes(r[2:])
-        return int(r[0:2], 16)
+        r = self.serialExchange(positioning_data_command(positioning_data))
+        return load_positioning_data_response(r, positioning_data)
 
     # TODO needs a lot of refactoring...
     def doPositioningWithData(self, positioning_data, remote_id=None, timeout=None):
@@ -1138,7 +1279,7 @@ class PozyxLib(PozyxCore):
 
             if status != POZYX_SUCCESS:
                 return status
-            status = self.checkForFlag(PozyxBitmasks.INT_STATUS_POS, timeout)
+            status = self.checkForFlag(PozyxBitmasks.INT_STATUS_POS, timeout, operation=OPERATION_POSITIONING)
             if status == POZYX_SUCCESS:
                 return self.getPositioningData(positioning_data)
             return status
@@ -1147,22 +1288,18 @@ class PozyxLib(PozyxCore):
             flags_data = Data([positioning_data.flags], 'H')
             self.remoteRegFunctionWithoutCheck(remote_id, PozyxRegisters.DO_POSITIONING, flags_data)
 
-            status = self.waitForFlag(PozyxBitmasks.INT_STATUS_RX_DATA, timeout)
-            if status == POZYX_SUCCESS:
+            if self.waitForFlagSafe(PozyxBitmasks.INT_STATUS_RX_DATA, timeout,
+                                    operation=OPERATION_REMOTE_POSITIONING):
                 rx_info = RXInfo()
                 self.getRxInfo(rx_info)
-
-                if positioning_data.has_ranges():
-                    amount_of_ranges = int(
-                        (rx_info.amount_of_bytes - positioning_data.byte_size) / RangeInformation.byte_size)
-                    positioning_data.set_amount_of_ranges(amount_of_ranges)
+                set_remote_amount_of_ranges(positioning_data, rx_info)
 
                 if rx_info.remote_id == remote_id:
                     status = self.readRXBufferData(positioning_data)
                     return status
                 else:
                     return POZYX_FAILURE
-            return status
+            return POZYX_TIMEOUT
 
 
     def doPositioningSlave(self, position, timeout=None):
@@ -1216,31 +1353,23 @@ class PozyxLib(PozyxCore):
 
     ## @}
 
-    def waitForFlagSafeFast(self, interrupt_flag, timeout_s, interrupt=None):
+    def waitForFlagSafeFast(self, interrupt_flag, timeout_s, interrupt=None, operation=None):
         """A fast variation of wait for flag, tripling the polling speed. Useful for ranging on very fast UWB settings.
 
         Returns:
             True, False
         """
-        from time import time, sleep
-        if interrupt is None:
-            interrupt = SingleRegister()
-        start = time()
-        while (time() - start) < timeout_s:
-            sleep(PozyxConstants.DELAY_POLLING * 0.33)
-            status = self.getInterruptStatus(interrupt)
-            if (interrupt[0] & interrupt_flag) and status == POZYX_SUCCESS:
-                return True
-        return False
-
-    def checkForFlagFast(self, interrupt_flag, timeout_s, interrupt=None):
+        return self.waitForFlagSafe(interrupt_flag, timeout_s, interrupt, operation,
+                                    interval=PozyxConstants.DELAY_POLLING * 0.33)
+
+    def checkForFlagFast(self, interrupt_flag, timeout_s, interrupt=None, operation=None):
         """A fast variant of checkForFlag, using waitForFLagFast, useful for ranging on very fast UWB settings.
 
         Args:
             interrupt_flag: Flag of interrupt type to check the interrupt register against.
             timeout_s: duration to wait for the interrupt in seconds
             interrupt (optional): Container for the interrupt status register data.
-
+            operation (optional): Type of the operation waited on, see pypozyx.polling.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -1248,7 +1377,7 @@ class PozyxLib(PozyxCore):
         if interrupt is None:
             interrupt = SingleRegister()
         error_interrupt_mask = PozyxBitmasks.INT_MASK_ERR
-        if self.waitForFlagSafeFast(interrupt_flag | error_interrupt_mask, timeout_s, interrupt):
+        if self.waitForFlagSafeFast(interrupt_flag | error_interrupt_mask, timeout_s, interrupt, operation):
             if (interrupt[0] & error_interrupt_mask) == error_interrupt_mask:
                 return POZYX_FAILURE
             else:
@@ -1262,8 +1391,7 @@ class PozyxLib(PozyxCore):
         Advanded custom internal use only, you're not expected to use this unless you know what you're doing.
 
         """
-        send_data = Data([0, address] + params.data, 'BB' + params.data_format)
-        status = self.regFunction(PozyxRegisters.WRITE_TX_DATA, send_data, Data([]))
+        status = self.regFunction(PozyxRegisters.WRITE_TX_DATA, remote_operation_data(address, params), Data([]))
         if status != POZYX_SUCCESS:
             return status
 
@@ -1272,7 +1400,7 @@ class PozyxLib(PozyxCore):
         if status != POZYX_SUCCESS:
             return status
 
-        status = self.checkForFlagFast(PozyxBitmasks.INT_STATUS_RX_DATA, 1)
+        status = self.checkForFlagFast(PozyxBitmasks.INT_STATUS_RX_DATA, 1, operation=OPERATION_REMOTE_RANGING)
         if status == POZYX_SUCCESS:
             rx_info = RXInfo()
             self.getRxInfo(rx_info)
@@ -2025,8 +2153,7 @@ class PozyxLib(PozyxCore):
 
     # TODO find new group for these four functions?
     def remoteRegFunctionWithoutCheck(self, destination, address, params):
-        send_data = Data([0, address] + params.data, 'BB' + params.data_format)
-        status = self.regFunction(PozyxRegisters.WRITE_TX_DATA, send_data, Data([]))
+        status = self.regFunction(PozyxRegisters.WRITE_TX_DATA, remote_operation_data(address, params), Data([]))
         if status == POZYX_FAILURE:
             return status
 
@@ -2040,7 +2167,7 @@ class PozyxLib(PozyxCore):
 
         return status
 
-    def setUWBSettings(self, uwb_settings, remote_id=None, save_to_flash=False):
+    def setUWBSettings(self, uwb_settings, remote_id=None, save_to_flash=False, transaction=None):
         """
         Set the Pozyx's UWB settings.
 
@@ -2052,6 +2179,8 @@ class PozyxLib(PozyxCore):
 
         Kwargs:
             remote_id: Remote Pozyx ID.
+            transaction: local RegisterTransaction to add the writes, and the save, to, see registerTransaction.
+                A remote device on other UWB settings can't be read back, so a remote transaction isn't used.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -2063,10 +2192,23 @@ class PozyxLib(PozyxCore):
         uwb_registers = Data([uwb_settings.channel, uwb_settings.bitrate +
                     (uwb_settings.prf << 6), uwb_settings.plen])
 
+        if transaction is not None and transaction.remote_id is None:
+            # the gain register follows the others, so the settings are written at once
+            transaction.write(PozyxRegisters.UWB_CHANNEL, uwb_registers)
+            self.getPollingStrategy().set_uwb_settings(uwb_settings)
+            status = self.setUWBGain(gain_register, transaction=transaction)
+            if save_to_flash:
+                transaction.save(PozyxConstants.FLASH_SAVE_REGISTERS, PozyxRegisters.ALL_UWB_REGISTERS)
+            return status
+        if transaction is not None:
+            warn("setUWBSettings: remote UWB settings can't be part of a transaction, setting them right away")
+            remote_id = transaction.remote_id
+
         self.setWrite(PozyxRegisters.UWB_CHANNEL, uwb_registers, remote_id,
                       2 * PozyxConstants.DELAY_LOCAL_WRITE, 2 * PozyxConstants.DELAY_REMOTE_WRITE)
 
         if remote_id is None:
+            self.getPollingStrategy().set_uwb_settings(uwb_settings)
             status = self.setUWBGain(gain_register, remote_id)
             if save_to_flash:
                 status &= self.saveUWBSettings()
@@ -2118,15 +2260,19 @@ class PozyxLib(PozyxCore):
         if not channel_num[0] in PozyxConstants.ALL_UWB_CHANNELS:
             warn("setUWBChannel: {} is wrong channel number".format(channel_num[0]))
 
+        if remote_id is None:
+            # the other UWB settings aren't known here, so the learned polling times can't be keyed on them
+            self.getPollingStrategy().set_uwb_settings(None)
         return self.setWrite(PozyxRegisters.UWB_CHANNEL, channel_num, remote_id)
 
-    def setUWBGain(self, uwb_gain_db, remote_id=None):
+    def setUWBGain(self, uwb_gain_db, remote_id=None, transaction=None):
         """Set the Pozyx's UWB transceiver gain.
 
         Args:
             uwb_gain_db: The new transceiver gain in dB, a value between 0.0 and 33.0.
                 float gain or Data([gain], 'f').
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the write to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -2139,7 +2285,7 @@ class PozyxLib(PozyxCore):
 
         doublegain_db = Data([int(2.0 * uwb_gain_db[0] + 0.5)])
 
-        return self.setWrite(PozyxRegisters.UWB_GAIN, doublegain_db, remote_id)
+        return self.transactionWrite(PozyxRegisters.UWB_GAIN, doublegain_db, remote_id, transaction)
 
     def setTxPower(self, txgain_db, remote_id=None):
         """DEPRECATED: use getUWBGain instead. Set the Pozyx's UWB transceiver gain.
@@ -2164,23 +2310,27 @@ class PozyxLib(PozyxCore):
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE
         """
-        return self.regRead(PozyxRegisters.NETWORK_ID, network_id)
+        return self.getRead(PozyxRegisters.NETWORK_ID, network_id)
 
-    def getUWBSettings(self, UWB_settings, remote_id=None):
+    def getUWBSettings(self, UWB_settings, remote_id=None, transaction=None):
         """Obtains the Pozyx's UWB settings.
 
         Args:
             UWB_settings: Container for the read data.  UWBSettings().
             remote_id (optional): Remote Pozyx ID.
+            transaction (optional): RegisterTransaction to add the read to, see registerTransaction.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
         """
         # The UWB data register size is 4.
         tmp_data = Data([0] * 4)
-        status = self.getRead(PozyxRegisters.UWB_CHANNEL, tmp_data, remote_id)
-        UWB_settings.load(tmp_data.data)
-        return status
+
+        def load_uwb_settings(data):
+            UWB_settings.load(data.data)
+            if remote_id is None and (transaction is None or transaction.remote_id is None):
+                self.getPollingStrategy().set_uwb_settings(UWB_settings)
+        return self.transactionRead(PozyxRegisters.UWB_CHANNEL, tmp_data, remote_id, transaction, load_uwb_settings)
 
     def getUWBChannel(self, channel_num, remote_id=None):
         """Obtains the Pozyx's UWB channel.
@@ -2253,7 +2403,7 @@ class PozyxLib(PozyxCore):
 
     ## @}
 
-    def saveConfiguration(self, save_type, registers=None, remote_id=None):
+    def saveConfiguration(self, save_type, registers=None, remote_id=None, delay=PozyxConstants.DELAY_FLASH):
         """General function to save the Pozyx's configuration to its flash memory.
 
         This constitutes three different Pozyx configurations to save, and each have their specialised derived function:
@@ -2272,6 +2422,7 @@ class PozyxLib(PozyxCore):
             registers (optional): Registers to save to the flash memory. Data([register1, register2, ...]) or [register1, register2, ...]
                 These registers have to be writable. Saving the UWB gain is currently not working.
             remote_id (optional): Remote Pozyx ID.
+            delay (optional): Delay after the save, see RegisterTransaction.commit for confirming it instead.
 
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
@@ -2295,7 +2446,7 @@ class PozyxLib(PozyxCore):
         if status != POZYX_SUCCESS:
             return status
         # give the device some time to save to flash memory
-        sleep(PozyxConstants.DELAY_FLASH)
+        sleep(delay)
         return status
 
     def sendAloha(self, operation, remote_id=None):
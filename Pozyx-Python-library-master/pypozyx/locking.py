@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""pypozyx.locking - contains InstrumentedLock and make_atomic, with which a thread-safe Pozyx interface locks.
+
+A Pozyx answers the commands on its serial port in order, one line per command, so two threads
+sharing an interface get each other's responses when their commands interleave. Operations that
+take several exchanges, like the write, send, poll and read of a remote register read, or the
+trigger, poll and read of doRanging, break as well when another thread's exchanges, or its read of
+the clear-on-read interrupt status, come in between.
+
+A thread-safe interface therefore holds a reentrant lock for every exchange and for the whole of
+every operation in pypozyx.lib.ATOMIC_OPERATIONS. The InstrumentedLock keeps track of how often
+threads had to wait for it, how long they waited and how long it was held, so contention shows up
+in numbers.
+
+Example usage:
+    >>> pozyx = PozyxSerial(port, thread_safe=True)
+    >>> with pozyx.atomic():
+    ...     pozyx.clearDevices()
+    ...     pozyx.addDevice(anchor)
+    >>> pozyx.lock.statistics()['wait_p99']
+    0.0061
+"""
+from functools import wraps
+from threading import Lock, get_ident
+from time import perf_counter
+
+from pypozyx.histogram import LatencyHistogram
+
+# upper edges of the wait and hold time histogram buckets in seconds, from 1 us to 4 s
+DEFAULT_LOCK_EDGES = [1e-6 * 2 ** (i / 4.0) for i in range(89)]
+
+
+class InstrumentedLock(object):
+    """Reentrant lock that measures its contention.
+
+    Only the outermost acquisition of a thread counts, and is timed: the wait until it got the
+    lock and the time until it released it again.
+
+    Args:
+        histogram_edges (optional): bucket edges of the wait and hold time histograms, see LatencyHistogram.
+    """
+
+    def __init__(self, histogram_edges=None):
+        self._lock = Lock()
+        self._owner = None
+        self._depth = 0
+        self._acquired_at = 0.0
+        edges = DEFAULT_LOCK_EDGES if histogram_edges is None else histogram_edges
+        self.waits = LatencyHistogram(edges)
+        self.holds = LatencyHistogram(edges)
+        self.contended = 0
+
+    def acquire(self):
+        thread = get_ident()
+        if self._owner == thread:
+            self._depth += 1
+            return True
+        wait = 0.0
+        if not self._lock.acquire(False):
+            start = perf_counter()
+            self._lock.acquire()
+            wait = perf_counter() - start
+            self.contended += 1
+        self._owner = thread
+        self._depth = 1
+        self.waits.record(wait)
+        self._acquired_at = perf_counter()
+        return True
+
+    def release(self):
+        if self._owner != get_ident():
+            raise RuntimeError("Cannot release a lock held by another thread")
+        self._depth -= 1
+        if self._depth:
+            return
+        self.holds.record(perf_counter() - self._acquired_at)
+        self._owner = None
+        self._lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+    def statistics(self):
+        """Returns the amount of acquisitions, how many had to wait, and the wait and hold times in seconds"""
+        waits, holds = self.waits, self.holds
+        return {'acquisitions': waits.count,
+                'contended': self.contended,
+                'wait_total': waits.total,
+                'wait_max': waits.maximum,
+                'wait_p50': waits.percentile(0.5),
+                'wait_p99': waits.percentile(0.99),
+                'hold_total': holds.total,
+                'hold_max': holds.maximum,
+                'hold_p50': holds.percentile(0.5),
+                'hold_p99': holds.percentile(0.99)}
+
+
+def atomic_operation(operation):
+    """Wraps a method of a Pozyx interface to run under the interface's lock, when it has one"""
+    @wraps(operation)
+    def atomic(self, *args, **kwargs):
+        if self.lock is None:
+            return operation(self, *args, **kwargs)
+        with self.lock:
+            return operation(self, *args, **kwargs)
+    return atomic
+
+
+def make_atomic(cls, names):
+    """Makes the methods with the given names of an interface class atomic, see atomic_operation"""
+    for name in names:
+        setattr(cls, name, atomic_operation(getattr(cls, name)))
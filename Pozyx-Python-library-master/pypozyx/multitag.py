@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+"""pypozyx.multitag - contains MultitagScheduler, positioning many remote tags concurrently.
+
+Positioning remote tags one after the other with doPositioning blocks the master for every
+tag until its result comes back over UWB, while the master does nothing but poll. The
+scheduler sends the positioning trigger to the next tag while the results of the previous
+ones are still in flight, and demultiplexes the results arriving in the RX buffer by the
+RX_NETWORK_ID of their sender. The results are delivered as each tag finishes, so a round
+of positioning takes about as long as the slowest tag instead of the sum of all tags.
+
+The master has a single RX buffer, so results arriving within one poll of each other overwrite
+each other, and so does the acknowledgement every tag sends when it gets triggered. The scheduler
+therefore learns how many polls a tag's result and a trigger's acknowledgement take, and only
+triggers the next tag when its acknowledgement and expected result don't coincide with the
+expected results of the tags in flight. The first tag of the first round is positioned alone
+to learn this. A result that got lost anyway is reported as POZYX_TIMEOUT.
+
+The triggering, polling and demultiplexing is done by RemoteFunctionScheduler, which other
+concurrent remote operations, like the ranging of RangingMatrix, build on as well.
+
+Example usage:
+    >>> scheduler = pozyx.multitagScheduler([0x6e66, 0x6e67, 0x6e68])
+    >>> scheduler.configure(dimension=PozyxConstants.DIMENSION_3D)
+    >>> for result in scheduler.round():
+    ...     print(hex(result.tag_id), result.status, result.position)
+    >>> scheduler.histograms[0x6e66].percentile(0.99)
+    0.071
+"""
+from collections import deque, namedtuple
+from time import perf_counter, sleep
+
+from pypozyx.definitions.bitmasks import PozyxBitmasks
+from pypozyx.definitions.constants import PozyxConstants, POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.histogram import LatencyHistogram
+from pypozyx.structures.device import RXInfo, TXInfo
+from pypozyx.structures.generic import Data, SingleRegister
+from pypozyx.structures.sensor_data import Coordinates, PositioningData, RangeInformation
+
+PositioningResult = namedtuple('PositioningResult', ['tag_id', 'status', 'position', 'positioning_data', 'latency'])
+PositioningResult.__doc__ = """Result of the positioning of one tag by MultitagScheduler, latency in seconds"""
+
+
+class RemoteFunctionScheduler(object):
+    """Performs a time-consuming register function on a set of devices concurrently.
+
+    Every device performs the function at most once at a time, and its reply is recognised by
+    the RX_NETWORK_ID of the device. The local device can be one of the devices, as None.
+    Derived schedulers define the function and how its reply is turned into a result through
+    function, reply_size, remote_result, local_flag, local_result and make_result.
+    While a round runs, the Pozyx interface shouldn't be used for anything else.
+
+    Args:
+        pozyx: the Pozyx interface of the master.
+        device_ids: the network IDs of the devices, None for the local device.
+        timeout (optional): time in seconds to wait for the result of a device.
+        max_in_flight (optional): the maximum amount of devices busy at once. Default is all devices.
+        separation (optional): minimum amount of polls between the expected arrivals of two replies. Default is 3.
+        smoothing (optional): weight of a new measurement in the learned amounts of polls. Default is 0.25.
+        poll_interval (optional): time in seconds between polls of the master. Default is DELAY_POLLING_FAST.
+        histogram_edges (optional): bucket edges of the latency histograms, see LatencyHistogram.
+    """
+
+    def __init__(self, pozyx, device_ids, timeout=PozyxConstants.TIMEOUT_REMOTE_POSITIONING, max_in_flight=None,
+                 separation=3, smoothing=0.25, poll_interval=PozyxConstants.DELAY_POLLING_FAST, histogram_edges=None):
+        self.pozyx = pozyx
+        self.device_ids = list(device_ids)
+        self.timeout = timeout
+        self.max_in_flight = len(self.device_ids) if max_in_flight is None else max_in_flight
+        self.separation = separation
+        self.smoothing = smoothing
+        self.poll_interval = poll_interval
+        self.histogram_edges = histogram_edges
+        self.histograms = {device_id: LatencyHistogram(histogram_edges) for device_id in self.device_ids}
+        # device ID to the time and poll of its trigger
+        self.in_flight = {}
+        self.result_polls = {}
+        self.acknowledgement_polls = None
+        self.polls = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.lost_replies = 0
+
+    # the function and its results, defined by the derived schedulers
+
+    def function(self, device_id):
+        """Returns the register function and its parameters to perform on the device"""
+        raise NotImplementedError()
+
+    def reply_size(self):
+        """Returns the maximum size in bytes of a remote reply"""
+        raise NotImplementedError()
+
+    def remote_result(self, device_id, byte_data):
+        """Returns the (status, value) of a remote reply, None if the reply isn't a result"""
+        raise NotImplementedError()
+
+    local_flag = PozyxBitmasks.INT_STATUS_FUNC
+
+    def local_result(self, interrupt):
+        """Returns the (status, value) of the local device once local_flag was set in the interrupt status"""
+        raise NotImplementedError()
+
+    def make_result(self, device_id, status, value, latency):
+        """Returns the result delivered to the caller"""
+        raise NotImplementedError()
+
+    # scheduling
+
+    def trigger(self, device_id):
+        """Makes a device start the function, returns the status of sending it"""
+        address, params = self.function(device_id)
+        if device_id is None:
+            status = self.pozyx.useFunction(address, params)
+        else:
+            with self.pozyx.pipeline() as pipeline:
+                written = pipeline.function(PozyxRegisters.WRITE_TX_DATA,
+                                            Data([0, address] + params.data, 'BB' + params.data_format), Data([]))
+                sent = pipeline.function(PozyxRegisters.SEND_TX_DATA,
+                                         TXInfo(device_id, PozyxConstants.REMOTE_FUNCTION), Data([]))
+            status = POZYX_SUCCESS if written.result() == sent.result() == POZYX_SUCCESS else POZYX_FAILURE
+        if status == POZYX_SUCCESS:
+            self.in_flight[device_id] = (perf_counter(), self.polls)
+        return status
+
+    def poll(self):
+        """Polls the master once, returns the results that arrived.
+
+        The interrupt status, the RX info and, speculatively, the RX buffer are read in a single
+        pipeline. The RX info is read before and after the buffer, so a reply that arrived in
+        between isn't attributed to the wrong device.
+        """
+        self.polls += 1
+        interrupt, rx_info, rx_info_after = SingleRegister(), RXInfo(), RXInfo()
+        remote_in_flight = any(device_id is not None for device_id in self.in_flight)
+        buffer_data = Data([0] * self.reply_size())
+        with self.pozyx.pipeline() as pipeline:
+            pipeline.read(PozyxRegisters.INTERRUPT_STATUS, interrupt)
+            if remote_in_flight:
+                pipeline.read(PozyxRegisters.RX_NETWORK_ID, rx_info)
+                buffer_reads = self.read_rx_buffer(pipeline, buffer_data)
+                pipeline.read(PozyxRegisters.RX_NETWORK_ID, rx_info_after)
+
+        results = []
+        if None in self.in_flight and interrupt[0] & self.local_flag:
+            status, value = self.local_result(interrupt[0])
+            results.append(self.finish(None, status, value))
+        if remote_in_flight and interrupt[0] & PozyxBitmasks.INT_STATUS_RX_DATA:
+            result = self.demultiplex(rx_info, rx_info_after, buffer_reads, buffer_data)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def read_rx_buffer(self, pipeline, data):
+        """Submits reads of the RX buffer into data, returns the reads for load_rx_buffer"""
+        reads = []
+        for offset in range(0, data.byte_size, PozyxConstants.MAX_SERIAL_SIZE):
+            partial_data = Data([0] * min(PozyxConstants.MAX_SERIAL_SIZE, data.byte_size - offset))
+            reads.append((pipeline.function(PozyxRegisters.READ_RX_DATA, Data([offset, partial_data.byte_size]),
+                                            partial_data), partial_data))
+        return reads
+
+    def load_rx_buffer(self, reads, data):
+        """Loads the data of the reads submitted by read_rx_buffer into data, returns their status"""
+        status = POZYX_SUCCESS
+        values = []
+        for future, partial_data in reads:
+            if future.result() != POZYX_SUCCESS:
+                status = POZYX_FAILURE
+            values += partial_data.data
+        data.data = values
+        data.load_hex_string()
+        return status
+
+    def demultiplex(self, rx_info, rx_info_after, buffer_reads, buffer_data):
+        """Returns the result in the RX buffer if it belongs to a device in flight, None otherwise"""
+        device_id = rx_info.remote_id
+        if rx_info.data != rx_info_after.data:
+            self.lost_replies += 1
+            return None
+        if device_id not in self.in_flight or device_id is None:
+            return None
+        if self.load_rx_buffer(buffer_reads, buffer_data) != POZYX_SUCCESS:
+            return self.finish(device_id, POZYX_FAILURE)
+        byte_data = buffer_data.byte_data[:2 * rx_info.amount_of_bytes]
+        if rx_info.amount_of_bytes == 1:
+            # the acknowledgement of the trigger, only a failed one ends the function
+            if int(byte_data, 16) == POZYX_SUCCESS:
+                self.acknowledgement_polls = self.learn(self.acknowledgement_polls,
+                                                        self.polls - self.in_flight[device_id][1])
+                return None
+            return self.finish(device_id, POZYX_FAILURE)
+        result = self.remote_result(device_id, byte_data)
+        if result is None:
+            return None
+        return self.finish(device_id, *result)
+
+    def learn(self, learned, measured):
+        return measured if learned is None else (1 - self.smoothing) * learned + self.smoothing * measured
+
+    def finish(self, device_id, status, value=None):
+        start, start_poll = self.in_flight.pop(device_id)
+        latency = perf_counter() - start
+        if status == POZYX_SUCCESS:
+            self.histograms.setdefault(device_id, LatencyHistogram(self.histogram_edges)).record(latency)
+            self.result_polls[device_id] = self.learn(self.result_polls.get(device_id), self.polls - start_poll)
+        elif status == POZYX_TIMEOUT:
+            self.timeouts += 1
+        else:
+            self.failures += 1
+        return self.make_result(device_id, status, value, latency)
+
+    def expire(self):
+        """Returns a timeout result for every device in flight longer than the timeout"""
+        now = perf_counter()
+        return [self.finish(device_id, POZYX_TIMEOUT)
+                for device_id, (start, start_poll) in list(self.in_flight.items()) if now - start > self.timeout]
+
+    def expected_result_polls(self, device_id):
+        """Returns the learned amount of polls from the trigger to the result of a device, None if unknown"""
+        if device_id in self.result_polls:
+            return self.result_polls[device_id]
+        if self.result_polls:
+            return sum(self.result_polls.values()) / float(len(self.result_polls))
+        return None
+
+    def may_trigger(self, device_id):
+        """Returns whether device_id can be triggered now without its replies colliding with those in flight"""
+        if device_id in self.in_flight:
+            return False
+        if not self.in_flight:
+            return True
+        expected = self.expected_result_polls(device_id)
+        if len(self.in_flight) >= self.max_in_flight or expected is None:
+            return False
+        acknowledgement = self.polls + (1 if self.acknowledgement_polls is None else self.acknowledgement_polls)
+        result = self.polls + expected
+        for other_id, (start, start_poll) in self.in_flight.items():
+            other_expected = self.expected_result_polls(other_id)
+            if other_id is None or other_expected is None:
+                continue
+            other_result = start_poll + other_expected
+            if abs(other_result - acknowledgement) < self.separation or abs(other_result - result) < self.separation:
+                return False
+        return True
+
+    def round(self, device_ids=None):
+        """Performs the function once on every device, yielding the results as each device finishes.
+
+        Args:
+            device_ids (optional): the devices of this round. Default is all devices of the scheduler.
+        """
+        pending = deque(self.device_ids if device_ids is None else device_ids)
+        # a reply that arrived before the round started can't be told apart from a new one
+        self.pozyx.getInterruptStatus(SingleRegister())
+        while pending or self.in_flight:
+            if pending and self.may_trigger(pending[0]):
+                device_id = pending.popleft()
+                if self.trigger(device_id) != POZYX_SUCCESS:
+                    self.failures += 1
+                    yield self.make_result(device_id, POZYX_FAILURE, None, 0.0)
+                    continue
+            for result in self.poll() + self.expire():
+                yield result
+            if self.in_flight and self.poll_interval:
+                sleep(self.poll_interval)
+
+    def run_round(self, device_ids=None):
+        """Performs the function once on every device, returns the results in the order the devices finished"""
+        return list(self.round(device_ids))
+
+    def statistics(self):
+        """Returns the latency mean and percentiles in seconds per device, and the amounts of timeouts and failures"""
+        return {'devices': {device_id: {'count': histogram.count, 'mean': histogram.mean(),
+                                        'p50': histogram.percentile(0.5), 'p90': histogram.percentile(0.9),
+                                        'p99': histogram.percentile(0.99), 'max': histogram.maximum}
+                            for device_id, histogram in self.histograms.items()},
+                'polls': self.polls,
+                'timeouts': self.timeouts,
+                'failures': self.failures,
+                'lost_replies': self.lost_replies}
+
+
+class MultitagScheduler(RemoteFunctionScheduler):
+    """Positions a set of tags concurrently, delivering a PositioningResult as each tag finishes.
+
+    Args:
+        pozyx: the Pozyx interface of the master.
+        tag_ids: the network IDs of the tags to position, None for the local device.
+        flags (optional): the PositioningData flags of the results. Default is the coordinates only.
+        timeout (optional): time in seconds to wait for the result of a tag. Default is TIMEOUT_REMOTE_POSITIONING.
+        max_in_flight (optional): the maximum amount of tags positioning at once. Default is all tags.
+
+    The other keyword arguments are those of RemoteFunctionScheduler.
+    """
+    local_flag = PozyxBitmasks.INT_STATUS_POS
+
+    def __init__(self, pozyx, tag_ids, flags=0b1, timeout=PozyxConstants.TIMEOUT_REMOTE_POSITIONING,
+                 max_in_flight=None, **kwargs):
+        super(MultitagScheduler, self).__init__(pozyx, tag_ids, timeout, max_in_flight, **kwargs)
+        self.flags = flags
+
+    @property
+    def tag_ids(self):
+        return self.device_ids
+
+    def configure(self, dimension=PozyxConstants.DIMENSION_3D, height=1000, algorithm=None):
+        """Sets the positioning dimension, height and algorithm on every tag, like doPositioning does per call.
+
+        Args:
+            dimension (optional): the positioning dimension, see setPositionAlgorithm.
+            height (optional): height of the tags in 2.5D positioning. integer height or Data([height], 'i').
+            algorithm (optional): the positioning algorithm, unchanged without.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        status = POZYX_SUCCESS
+        for tag_id in self.tag_ids:
+            if algorithm is not None:
+                status &= self.pozyx.setPositionAlgorithm(algorithm, dimension, remote_id=tag_id)
+            if dimension == PozyxConstants.DIMENSION_2_5D:
+                status &= self.pozyx.setHeight(height, tag_id)
+        return status
+
+    def positioning_data(self):
+        return PositioningData(self.flags)
+
+    def has_ranges(self):
+        return self.flags & (1 << 15)
+
+    def function(self, tag_id):
+        return PozyxRegisters.DO_POSITIONING, Data([self.flags], 'H')
+
+    def reply_size(self):
+        return PozyxConstants.MAX_BUF_SIZE if self.has_ranges() else self.positioning_data().byte_size
+
+    def remote_result(self, tag_id, byte_data):
+        amount_of_bytes = len(byte_data) // 2
+        position = Coordinates()
+        if amount_of_bytes == Coordinates.byte_size:
+            # firmware before the cloud firmware only returns the coordinates
+            position.load_bytes(byte_data)
+            return POZYX_SUCCESS, (position, None)
+        positioning_data = self.positioning_data()
+        if self.has_ranges():
+            positioning_data.set_amount_of_ranges(
+                int((amount_of_bytes - positioning_data.byte_size) / RangeInformation.byte_size))
+        if amount_of_bytes != positioning_data.byte_size:
+            return None
+        positioning_data.load_bytes(byte_data)
+        if self.flags & 0b1:
+            position.load(positioning_data.containers[0].data[:3])
+        return POZYX_SUCCESS, (position, positioning_data)
+
+    def local_result(self, interrupt):
+        if interrupt & PozyxBitmasks.INT_STATUS_ERR:
+            return POZYX_FAILURE, None
+        position = Coordinates()
+        status = self.pozyx.getCoordinates(position)
+        positioning_data = None
+        if status == POZYX_SUCCESS and self.flags != 0b1:
+            positioning_data = self.positioning_data()
+            status = self.pozyx.getPositioningData(positioning_data)
+        return status, (position, positioning_data)
+
+    def make_result(self, tag_id, status, value, latency):
+        position, positioning_data = (None, None) if value is None else value
+        return PositioningResult(tag_id, status, position, positioning_data, latency)
+
+    def round(self, tag_ids=None):
+        """Positions every tag once, yielding a PositioningResult as each tag finishes.
+
+        Args:
+            tag_ids (optional): the tags to position in this round. Default is all tags of the scheduler.
+        """
+        return super(MultitagScheduler, self).round(tag_ids)
+
+    def statistics(self):
+        """Returns the latency mean and percentiles in seconds per tag, and the amounts of timeouts and failures"""
+        statistics = super(MultitagScheduler, self).statistics()
+        statistics['tags'] = statistics.pop('devices')
+        return statistics
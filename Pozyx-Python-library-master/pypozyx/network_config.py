@@ -0,0 +1,672 @@
+#!/usr/bin/env python
+"""pypozyx.network_config - contains NetworkConfigurator, bringing a network of Pozyx devices to a declared configuration.
+
+A network configuration, read from a JSON or YAML file, declares the UWB settings, positioning
+settings and anchors that the devices should have. Its top level holds the settings of every
+device, its devices section overrides them per device, by device ID or 'local' for the masters:
+
+    uwb: {channel: 5, bitrate: 0, prf: 2, plen: 0x08, gain_db: 11.5}
+    positioning: {algorithm: uwb_only, dimension: 3d, filter: moving_average, filter_strength: 5,
+                  anchor_selection: auto, number_of_anchors: 4, update_interval: 200}
+    ranging_protocol: precision
+    save_to_flash: true
+    devices:
+      local:
+        anchors:
+          - {id: 0x6001, coordinates: [0, 0, 2000]}
+          - {id: 0x6002, coordinates: [5000, 0, 2000]}
+      0x6100: {}
+      0x6101: {positioning: {update_interval: 500}}
+
+The configurator first reads the current state of a device and plans the minimal changes: only
+the registers that differ are written, only the registers that changed or that aren't saved yet
+are saved to flash, and the device list is only rewritten when its anchors differ. A device that
+already has its configuration isn't written at all, so applying a configuration twice changes
+nothing the second time.
+
+The remote devices are spread over the masters, each master running in a thread of its own, so
+the masters configure their devices at the same time. The devices of one master share its radio
+and are configured one after the other. A device a master can't reach is retried on another
+master. The masters themselves are configured after all remote devices, as a change of their UWB
+settings cuts them off from the devices still on the old ones. When a device fails, every device
+that was changed already is rolled back to the state read while planning.
+
+Example usage:
+    >>> config = load_network_config('network.yaml')
+    >>> configurator = NetworkConfigurator([pozyx], config)
+    >>> print(configurator.plan().format(changes=True))
+    >>> report = configurator.apply()
+    >>> print(report.format())
+"""
+import json
+from collections import deque, namedtuple
+from threading import Condition, Thread
+from time import perf_counter
+
+from pypozyx.core import PozyxException
+from pypozyx.definitions.constants import PozyxConstants, POZYX_FAILURE, POZYX_SUCCESS
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.structures.device import DeviceCoordinates, DeviceList, UWBSettings
+from pypozyx.structures.generic import Data, SingleRegister
+from pypozyx.structures.sensor_data import Coordinates
+
+LOCAL = 'local'
+
+ALGORITHMS = {'uwb_only': PozyxConstants.POSITIONING_ALGORITHM_UWB_ONLY,
+              'tracking': PozyxConstants.POSITIONING_ALGORITHM_TRACKING}
+DIMENSIONS = {'2d': PozyxConstants.DIMENSION_2D, '2.5d': PozyxConstants.DIMENSION_2_5D,
+              '3d': PozyxConstants.DIMENSION_3D}
+FILTERS = {'none': PozyxConstants.FILTER_TYPE_NONE, 'fir': PozyxConstants.FILTER_TYPE_FIR,
+           'moving_average': PozyxConstants.FILTER_TYPE_MOVING_AVERAGE,
+           'moving_median': PozyxConstants.FILTER_TYPE_MOVING_MEDIAN}
+ANCHOR_SELECTIONS = {'auto': PozyxConstants.ANCHOR_SELECT_AUTO, 'manual': PozyxConstants.ANCHOR_SELECT_MANUAL}
+RANGING_PROTOCOLS = {'precision': PozyxConstants.RANGE_PROTOCOL_PRECISION,
+                     'fast': PozyxConstants.RANGE_PROTOCOL_FAST}
+
+UWB_KEYS = ('channel', 'bitrate', 'prf', 'plen', 'gain_db')
+POSITIONING_KEYS = ('algorithm', 'dimension', 'filter', 'filter_strength', 'anchor_selection',
+                    'number_of_anchors', 'update_interval')
+DEVICE_KEYS = ('uwb', 'positioning', 'ranging_protocol', 'led_config', 'interrupt_mask', 'anchors', 'save_to_flash')
+
+# the UWB gain can't be saved to flash, see saveRegisters, so it's never missing from it
+SAVED_UWB_REGISTERS = [PozyxRegisters.UWB_CHANNEL, PozyxRegisters.UWB_RATES, PozyxRegisters.UWB_PLEN]
+
+DEVICE_UNCHANGED = 'unchanged'
+DEVICE_PLANNED = 'planned'
+DEVICE_APPLIED = 'applied'
+DEVICE_UNREACHABLE = 'unreachable'
+DEVICE_FAILED = 'failed'
+DEVICE_SKIPPED = 'skipped'
+DEVICE_ROLLED_BACK = 'rolled back'
+
+REGISTER_NAMES = {}
+for _name, _address in sorted(vars(PozyxRegisters).items()):
+    if isinstance(_address, int) and not _name.startswith('_'):
+        REGISTER_NAMES.setdefault(_address, _name)
+
+
+class NetworkConfigError(PozyxException):
+    """Invalid network configuration"""
+    pass
+
+
+def parse_device_id(device_id):
+    """Returns the device ID of a configuration key, an integer or a string like '0x6001', or LOCAL"""
+    if device_id == LOCAL:
+        return LOCAL
+    try:
+        device_id = int(device_id, 0) if isinstance(device_id, str) else int(device_id)
+    except (TypeError, ValueError):
+        raise NetworkConfigError("Invalid device ID %r" % (device_id,))
+    if not 0 <= device_id <= 0xFFFF:
+        raise NetworkConfigError("Device ID 0x%x out of range" % device_id)
+    return device_id
+
+
+def merge(defaults, overrides):
+    """Returns defaults updated with overrides, merging nested dictionaries"""
+    merged = dict(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def choose(name, value, choices):
+    try:
+        return choices[str(value).lower()]
+    except KeyError:
+        raise NetworkConfigError("Invalid %s %r, choose from %s" % (name, value, ', '.join(sorted(choices))))
+
+
+def check_keys(name, content, keys):
+    if not isinstance(content, dict):
+        raise NetworkConfigError("%s should be a mapping, not %r" % (name, content))
+    unknown = set(content) - set(keys)
+    if unknown:
+        raise NetworkConfigError("Unknown %s settings: %s" % (name, ', '.join(sorted(map(str, unknown)))))
+
+
+def uwb_registers(uwb_settings):
+    """Returns the values of the registers UWB_CHANNEL to UWB_GAIN for the UWB settings"""
+    return [uwb_settings.channel, uwb_settings.bitrate + (uwb_settings.prf << 6), uwb_settings.plen,
+            int(2.0 * uwb_settings.gain_db + 0.5)]
+
+
+def anchor_map(anchors):
+    """Returns the device IDs of a list of DeviceCoordinates with their coordinates"""
+    return {anchor.network_id: (anchor.pos.x, anchor.pos.y, anchor.pos.z) for anchor in anchors}
+
+
+def format_device(device_id):
+    return LOCAL if device_id is None else "0x%04x" % device_id
+
+
+class DeviceConfig(object):
+    """The declared configuration of a device, settings that are None are left as they are.
+
+    Args:
+        uwb (optional): UWBSettings of the device.
+        positioning (optional): dictionary of the positioning settings, with the constants of the
+            algorithm, dimension, filter and anchor selection.
+        ranging_protocol (optional): RANGE_PROTOCOL_PRECISION or RANGE_PROTOCOL_FAST.
+        led_config (optional): value of the LED configuration register.
+        interrupt_mask (optional): value of the interrupt mask register.
+        anchors (optional): list of DeviceCoordinates of the device list.
+        save_to_flash (optional): whether the configuration is saved to flash. Default is False.
+    """
+
+    def __init__(self, uwb=None, positioning=None, ranging_protocol=None, led_config=None, interrupt_mask=None,
+                 anchors=None, save_to_flash=False):
+        self.uwb = uwb
+        self.positioning = positioning if positioning is not None else {}
+        self.ranging_protocol = ranging_protocol
+        self.led_config = led_config
+        self.interrupt_mask = interrupt_mask
+        self.anchors = anchors
+        self.save_to_flash = save_to_flash
+
+    @classmethod
+    def from_dict(cls, content, name='device'):
+        """Returns the DeviceConfig of a configuration section, raising NetworkConfigError when it's invalid"""
+        check_keys(name, content, DEVICE_KEYS)
+        uwb = None
+        if content.get('uwb') is not None:
+            check_keys(name + ' uwb', content['uwb'], UWB_KEYS)
+            missing = [key for key in UWB_KEYS if key not in content['uwb']]
+            if missing:
+                raise NetworkConfigError("%s uwb misses %s" % (name, ', '.join(missing)))
+            uwb = UWBSettings(*[content['uwb'][key] for key in UWB_KEYS])
+            uwb.data[3] = int(2.0 * content['uwb']['gain_db'] + 0.5)
+        positioning = {}
+        if content.get('positioning') is not None:
+            section = content['positioning']
+            check_keys(name + ' positioning', section, POSITIONING_KEYS)
+            for first, second in (('algorithm', 'dimension'), ('filter', 'filter_strength'),
+                                  ('anchor_selection', 'number_of_anchors')):
+                # both settings share a register, so they are written together
+                if (first in section) != (second in section):
+                    raise NetworkConfigError("%s positioning needs both %s and %s" % (name, first, second))
+            if 'algorithm' in section:
+                positioning['algorithm'] = choose('algorithm', section['algorithm'], ALGORITHMS)
+                positioning['dimension'] = choose('dimension', section['dimension'], DIMENSIONS)
+            if 'filter' in section:
+                positioning['filter'] = choose('filter', section['filter'], FILTERS)
+                positioning['filter_strength'] = int(section['filter_strength'])
+            if 'anchor_selection' in section:
+                positioning['anchor_selection'] = choose('anchor selection', section['anchor_selection'],
+                                                         ANCHOR_SELECTIONS)
+                positioning['number_of_anchors'] = int(section['number_of_anchors'])
+            if 'update_interval' in section:
+                positioning['update_interval'] = int(section['update_interval'])
+        ranging_protocol = None
+        if content.get('ranging_protocol') is not None:
+            ranging_protocol = choose('ranging protocol', content['ranging_protocol'], RANGING_PROTOCOLS)
+        anchors = None
+        if content.get('anchors') is not None:
+            anchors = []
+            for anchor in content['anchors']:
+                check_keys(name + ' anchor', anchor, ('id', 'coordinates'))
+                if 'id' not in anchor or len(anchor.get('coordinates', ())) != 3:
+                    raise NetworkConfigError("%s anchor %r needs an id and coordinates [x, y, z]" % (name, anchor))
+                x, y, z = anchor['coordinates']
+                anchors.append(DeviceCoordinates(parse_device_id(anchor['id']), PozyxConstants.ANCHOR_MODE,
+                                                 Coordinates(x, y, z)))
+        return cls(uwb, positioning, ranging_protocol, content.get('led_config'), content.get('interrupt_mask'),
+                   anchors, bool(content.get('save_to_flash', False)))
+
+    def add_writes(self, pozyx, transaction):
+        """Adds the register writes of the configuration, except the UWB settings, to transaction"""
+        positioning = self.positioning
+        if 'filter' in positioning:
+            pozyx.setPositionFilter(positioning['filter'], positioning['filter_strength'], transaction=transaction)
+        if 'algorithm' in positioning:
+            pozyx.setPositionAlgorithm(positioning['algorithm'], positioning['dimension'], transaction=transaction)
+        if 'anchor_selection' in positioning:
+            pozyx.setSelectionOfAnchors(positioning['anchor_selection'], positioning['number_of_anchors'],
+                                        transaction=transaction)
+        if 'update_interval' in positioning:
+            pozyx.setUpdateInterval(positioning['update_interval'], transaction=transaction)
+        if self.ranging_protocol is not None:
+            pozyx.setRangingProtocol(self.ranging_protocol, transaction=transaction)
+        if self.led_config is not None:
+            pozyx.setLedConfig(self.led_config, transaction=transaction)
+        if self.interrupt_mask is not None:
+            pozyx.setInterruptMask(self.interrupt_mask, transaction=transaction)
+
+
+def parse_network_config(content):
+    """Returns the DeviceConfig of every device in a network configuration, by device ID or LOCAL.
+
+    Args:
+        content: the network configuration as a dictionary, see the module documentation.
+    """
+    if not isinstance(content, dict):
+        raise NetworkConfigError("A network configuration should be a mapping")
+    defaults = dict(content)
+    devices = defaults.pop('devices', None) or {}
+    DeviceConfig.from_dict(defaults, 'network')
+    if not isinstance(devices, dict):
+        raise NetworkConfigError("devices should be a mapping of device IDs to their settings")
+    configs = {}
+    for key, overrides in devices.items():
+        device_id = parse_device_id(key)
+        if device_id in configs:
+            raise NetworkConfigError("Device %s is configured twice" % key)
+        configs[device_id] = DeviceConfig.from_dict(merge(defaults, overrides or {}), 'device %s' % key)
+    return configs
+
+
+def load_network_config(path):
+    """Reads a network configuration from a JSON file, or a YAML file when PyYAML is installed.
+
+    Returns:
+        the DeviceConfig of every device, by device ID or LOCAL.
+    """
+    with open(path) as config_file:
+        text = config_file.read()
+    if path.endswith('.json'):
+        return parse_network_config(json.loads(text))
+    try:
+        import yaml
+    except ImportError:
+        raise NetworkConfigError("Reading %s needs PyYAML, install it or use a JSON configuration" % path)
+    return parse_network_config(yaml.safe_load(text))
+
+
+def read_device_list(pozyx, remote_id=None):
+    """Returns the status and the DeviceCoordinates of the device list of a device"""
+    list_size = SingleRegister()
+    status = pozyx.getDeviceListSize(list_size, remote_id)
+    if status != POZYX_SUCCESS or list_size.value == 0:
+        return status, []
+    device_list = DeviceList(list_size=list_size.value)
+    status = pozyx.getDeviceIds(device_list, remote_id)
+    devices = []
+    for device_id in device_list if status == POZYX_SUCCESS else []:
+        coordinates = Coordinates()
+        status = pozyx.getDeviceCoordinates(device_id, coordinates, remote_id)
+        if status != POZYX_SUCCESS:
+            break
+        devices.append(DeviceCoordinates(device_id, PozyxConstants.ANCHOR_MODE, coordinates))
+    return status, devices
+
+
+class DevicePlan(object):
+    """The minimal changes that bring a device to its DeviceConfig, planned from its current state.
+
+    writes holds the register writes as (address, new Data, current Data), saves the registers to
+    save to flash, anchors the current and new device list when they differ and uwb the current
+    and new UWBSettings when they differ. The current state is what a rollback restores.
+    """
+
+    def __init__(self, remote_id, config):
+        self.remote_id = remote_id
+        self.config = config
+        self.writes = []
+        self.saves = []
+        self.anchors = None
+        self.save_network = False
+        self.uwb = None
+        self.status = POZYX_SUCCESS
+
+    @property
+    def device(self):
+        return format_device(self.remote_id)
+
+    @property
+    def write_count(self):
+        """Returns the amount of register writes and device list functions the plan performs"""
+        count = len(self.writes) + (self.uwb is not None)
+        if self.anchors is not None:
+            count += 1 + len(self.anchors[1])
+        return count
+
+    @property
+    def save_count(self):
+        """Returns the amount of flash saves the plan performs"""
+        save_uwb = self.uwb is not None and self.config.save_to_flash
+        return bool(self.saves) + save_uwb + 2 * self.save_network
+
+    def __bool__(self):
+        return bool(self.writes or self.saves or self.anchors is not None or self.uwb is not None)
+
+    __nonzero__ = __bool__
+
+    def changes(self):
+        """Returns the planned changes, one line each"""
+        lines = []
+        for address, new, current in self.writes:
+            lines.append("%s: %s -> %s" % (REGISTER_NAMES.get(address, '0x%02x' % address),
+                                          ' '.join('%02x' % value for value in current.data),
+                                          ' '.join('%02x' % value for value in new.data)))
+        if self.saves:
+            lines.append("save to flash: %s" % ', '.join(REGISTER_NAMES.get(register, '0x%02x' % register)
+                                                         for register in self.saves))
+        if self.anchors is not None:
+            lines.append("anchors: %s -> %s" % tuple(', '.join('0x%04x' % device_id for device_id in sorted(anchor_map(
+                anchors))) or 'none' for anchors in self.anchors))
+            if self.save_network:
+                lines.append("save device list to flash")
+        if self.uwb is not None:
+            lines.append("UWB settings: %s -> %s%s" % (self.uwb[0], self.uwb[1],
+                                                       ', saved to flash' if self.config.save_to_flash else ''))
+        return lines
+
+
+DeviceResult = namedtuple('DeviceResult', ['device', 'master', 'status', 'writes', 'saves', 'duration', 'plan'])
+DeviceResult.__doc__ = """Result of configuring a device: its ID or LOCAL, the index of the master that configured it,
+its DEVICE_ status, the amount of writes and flash saves it took, the time spent on it in seconds, rolling back
+included, and its DevicePlan, None when the device couldn't be reached"""
+
+
+class ApplyReport(object):
+    """The results of applying a network configuration, by device, with the total time"""
+
+    def __init__(self, results, duration, dry_run=False):
+        self.results = results
+        self.duration = duration
+        self.dry_run = dry_run
+
+    @property
+    def success(self):
+        return all(result.status in (DEVICE_UNCHANGED, DEVICE_PLANNED, DEVICE_APPLIED) for result in self.results)
+
+    @property
+    def device_time(self):
+        """Returns the sum of the time spent on every device, the time configuring them one by one takes"""
+        return sum(result.duration for result in self.results)
+
+    def format(self, changes=False):
+        """Returns a table of the results, with the planned changes of every device when changes is True"""
+        lines = ["%-8s %6s  %-12s %6s %6s %10s" % ("device", "master", "status", "writes", "saves", "time")]
+        for result in self.results:
+            lines.append("%-8s %6s  %-12s %6i %6i %7.1f ms" % (
+                result.device, result.master, result.status, result.writes, result.saves, result.duration * 1e3))
+            if changes and result.plan is not None:
+                lines.extend("    " + change for change in result.plan.changes())
+        changed = sum(result.writes + result.saves > 0 for result in self.results)
+        lines.append("%i devices, %i %s in %.1f ms, %.1f ms spent on devices" % (
+            len(self.results), changed, 'to change' if self.dry_run else 'changed', self.duration * 1e3,
+            self.device_time * 1e3))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.format()
+
+
+class RolloutQueue(object):
+    """Jobs waiting for the master threads, as (master, item), master None for a job any master can do.
+
+    A job a master couldn't do goes back in the queue for the masters that didn't try it yet.
+    """
+
+    def __init__(self, jobs, masters):
+        self.pending = deque(jobs)
+        self.masters = masters
+        self.tried = {job: set() for job in jobs}
+        self.active = 0
+        self.condition = Condition()
+
+    def take(self, master):
+        """Returns the next job for master, None when there's none left for it"""
+        with self.condition:
+            while True:
+                for job in self.pending:
+                    if job[0] in (None, master) and master not in self.tried[job]:
+                        self.pending.remove(job)
+                        self.tried[job].add(master)
+                        self.active += 1
+                        return job
+                if not self.active:
+                    return None
+                self.condition.wait()
+
+    def done(self, job, retry=False):
+        """Finishes a job, returns whether it's queued again for another master"""
+        with self.condition:
+            self.active -= 1
+            retry = retry and job[0] is None and len(self.tried[job]) < self.masters
+            if retry:
+                self.pending.append(job)
+            self.condition.notify_all()
+            return retry
+
+
+class NetworkConfigurator(object):
+    """Brings the devices of a network to a declared configuration with minimal changes.
+
+    Args:
+        masters: the Pozyx interfaces of the masters, list or a single one.
+        config: the DeviceConfig of every device by device ID, LOCAL for the masters themselves,
+            see load_network_config.
+        rollback (optional): whether the changed devices are rolled back when a device fails. Default is True.
+    """
+
+    def __init__(self, masters, config, rollback=True):
+        if not isinstance(masters, (list, tuple)):
+            masters = [masters]
+        if not masters:
+            raise ValueError("A network configuration needs at least one master")
+        self.masters = list(masters)
+        self.config = config
+        self.rollback = rollback
+
+    def plan_device(self, pozyx, remote_id, config):
+        """Reads the current state of a device and returns the DevicePlan bringing it to config.
+
+        The status of the plan is POZYX_SUCCESS when the whole state could be read.
+        """
+        plan = DevicePlan(remote_id, config)
+        desired = pozyx.registerTransaction(remote_id)
+        config.add_writes(pozyx, desired)
+        current = pozyx.registerTransaction(remote_id)
+        writes = []
+        for operation in desired.operations:
+            address, data = operation[1], operation[2]
+            new = Data(data.transform_to_bytes())
+            writes.append((address, new, Data([0] * new.byte_size)))
+            current.read(address, writes[-1][2])
+        uwb = UWBSettings()
+        if config.uwb is not None:
+            pozyx.getUWBSettings(uwb, transaction=current)
+        plan.status = current.execute()
+        saved = pozyx.getSavedRegisters(remote_id) if config.save_to_flash and plan.status == POZYX_SUCCESS else None
+        if saved is not None and not isinstance(saved, Data):
+            plan.status = saved
+        if plan.status != POZYX_SUCCESS:
+            return plan
+
+        def is_saved(register):
+            return (saved[register // 8] >> (register % 8)) & 0x1
+
+        plan.writes = [(address, new, old) for address, new, old in writes if new.data != old.data]
+        if config.save_to_flash:
+            changed = [address for address, new, old in plan.writes]
+            plan.saves = [address for address, new, old in writes if address in changed or not is_saved(address)]
+        if config.uwb is not None and uwb_registers(uwb) != uwb_registers(config.uwb):
+            plan.uwb = (uwb, config.uwb)
+        elif config.uwb is not None and config.save_to_flash:
+            plan.saves += [register for register in SAVED_UWB_REGISTERS if not is_saved(register)]
+        if config.anchors is not None:
+            plan.status, anchors = read_device_list(pozyx, remote_id)
+            if anchor_map(anchors) != anchor_map(config.anchors):
+                plan.anchors = (anchors, config.anchors)
+                plan.save_network = config.save_to_flash
+        return plan
+
+    def write_registers(self, pozyx, plan, rollback=False):
+        transaction = pozyx.registerTransaction(plan.remote_id)
+        for address, new, current in plan.writes:
+            transaction.write(address, current if rollback else new)
+        if plan.saves:
+            transaction.save(PozyxConstants.FLASH_SAVE_REGISTERS, plan.saves)
+        return transaction.commit()
+
+    def write_anchors(self, pozyx, plan, rollback=False):
+        status = pozyx.clearDevices(plan.remote_id)
+        for anchor in plan.anchors[0 if rollback else 1]:
+            if status == POZYX_SUCCESS:
+                status = pozyx.addDevice(anchor, plan.remote_id)
+        if status == POZYX_SUCCESS and plan.save_network:
+            transaction = pozyx.registerTransaction(plan.remote_id)
+            transaction.save(PozyxConstants.FLASH_SAVE_NETWORK)
+            transaction.save(PozyxConstants.FLASH_SAVE_REGISTERS, [PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS])
+            status = transaction.commit()
+        return status
+
+    def write_uwb(self, pozyx, plan, rollback=False):
+        """Changes the UWB settings of a device, then sets the gain, saves and checks them on the new settings"""
+        current, new = plan.uwb[::-1] if rollback else plan.uwb
+        save_to_flash = plan.config.save_to_flash
+        if plan.remote_id is None:
+            transaction = pozyx.registerTransaction()
+            pozyx.setUWBSettings(new, save_to_flash=save_to_flash, transaction=transaction)
+            return transaction.commit()
+        # the device answers on its new settings already, so the answer to this write is missed
+        pozyx.doFunctionOnDifferentUWB(pozyx.setWrite, current, PozyxRegisters.UWB_CHANNEL,
+                                       Data(uwb_registers(new)[:3]), plan.remote_id, remote_delay=0)
+
+        def finish():
+            transaction = pozyx.registerTransaction(plan.remote_id)
+            pozyx.setUWBGain(new.gain_db, transaction=transaction)
+            if save_to_flash:
+                transaction.save(PozyxConstants.FLASH_SAVE_REGISTERS, PozyxRegisters.ALL_UWB_REGISTERS)
+            check = UWBSettings()
+            pozyx.getUWBSettings(check, transaction=transaction)
+            status = transaction.commit()
+            if status == POZYX_SUCCESS and uwb_registers(check) != uwb_registers(new):
+                status = POZYX_FAILURE
+            return status
+        return pozyx.doFunctionOnDifferentUWB(finish, new)
+
+    def steps(self, plan):
+        """Returns the steps performing the plan, the UWB settings last as they cut off the device"""
+        steps = []
+        if plan.writes or plan.saves:
+            steps.append(self.write_registers)
+        if plan.anchors is not None:
+            steps.append(self.write_anchors)
+        if plan.uwb is not None:
+            steps.append(self.write_uwb)
+        return steps
+
+    def configure_device(self, pozyx, remote_id, config, dry_run=False):
+        """Plans and applies the configuration of a device.
+
+        Returns:
+            the DevicePlan, its DEVICE_ status and the steps that were applied.
+        """
+        plan = self.plan_device(pozyx, remote_id, config)
+        if plan.status != POZYX_SUCCESS:
+            return plan, DEVICE_UNREACHABLE, []
+        if not plan:
+            return plan, DEVICE_UNCHANGED, []
+        if dry_run:
+            return plan, DEVICE_PLANNED, []
+        applied = []
+        for step in self.steps(plan):
+            applied.append(step)
+            if step(pozyx, plan) != POZYX_SUCCESS:
+                return plan, DEVICE_FAILED, applied
+        return plan, DEVICE_APPLIED, applied
+
+    def run(self, work, jobs):
+        """Runs work(master index, item) for the jobs, (master, item) as in RolloutQueue, every master
+        in a thread of its own. work returns whether the job should be retried on another master.
+        """
+        queue = RolloutQueue(jobs, len(self.masters))
+        errors = []
+
+        def worker(index):
+            while True:
+                job = queue.take(index)
+                if job is None:
+                    return
+                retry = False
+                try:
+                    retry = work(index, job[1])
+                except Exception as exception:
+                    errors.append(exception)
+                finally:
+                    queue.done(job, retry)
+
+        threads = [Thread(target=worker, args=(index,)) for index in range(len(self.masters))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def plan(self):
+        """Plans the changes of every device without applying them, see apply"""
+        return self.apply(dry_run=True)
+
+    def apply(self, dry_run=False):
+        """Brings every configured device to its configuration, rolling back on failure.
+
+        The remote devices are configured first, spread over the masters, then the masters themselves.
+        When a device fails or no master reaches it, the devices that aren't done yet are skipped and,
+        with rollback, the changed devices are restored to the state they had.
+
+        Args:
+            dry_run (optional): whether to only plan the changes, without applying them. Default is False.
+
+        Returns:
+            the ApplyReport, with a DeviceResult for every device and master.
+        """
+        start = perf_counter()
+        results = {}
+        applied = {}
+        failed = []
+
+        def configure(master, device):
+            device_id, local_master = device
+            remote_id = None if device_id == LOCAL else device_id
+            if failed and not dry_run:
+                results[device] = DeviceResult(format_device(remote_id), master, DEVICE_SKIPPED, 0, 0, 0.0, None)
+                return False
+            device_start = perf_counter()
+            plan, status, steps = self.configure_device(self.masters[master], remote_id, self.config[device_id], dry_run)
+            results[device] = DeviceResult(plan.device, master, status, plan.write_count, plan.save_count,
+                                           perf_counter() - device_start,
+                                           plan if status != DEVICE_UNREACHABLE else None)
+            if steps:
+                applied[device] = (master, plan, steps)
+            if status == DEVICE_FAILED:
+                failed.append(device)
+            return status == DEVICE_UNREACHABLE
+
+        # a remote device can be configured by any master, a master by itself only
+        remote_devices = [(device_id, None) for device_id in sorted(key for key in self.config if key != LOCAL)]
+        local_devices = [(LOCAL, master) for master in range(len(self.masters))] if LOCAL in self.config else []
+        self.run(configure, [(None, device) for device in remote_devices])
+        failed.extend(device for device in remote_devices if results[device].status == DEVICE_UNREACHABLE)
+        self.run(configure, [(device[1], device) for device in local_devices])
+        failed.extend(device for device in local_devices if results[device].status == DEVICE_UNREACHABLE)
+
+        if failed and applied and self.rollback and not dry_run:
+            self.roll_back(applied, results)
+        return ApplyReport([results[device] for device in remote_devices + local_devices],
+                           perf_counter() - start, dry_run)
+
+    def roll_back(self, applied, results):
+        """Undoes the applied steps of the changed devices in reverse, the masters before the remote
+        devices, each device by the master that changed it. The device that failed stays DEVICE_FAILED"""
+        def undo(master, device):
+            rollback_start = perf_counter()
+            plan, steps = applied[device][1:]
+            success = True
+            for step in reversed(steps):
+                if step(self.masters[master], plan, rollback=True) != POZYX_SUCCESS:
+                    success = False
+            result = results[device]
+            status = DEVICE_ROLLED_BACK if success and result.status != DEVICE_FAILED else DEVICE_FAILED
+            results[device] = result._replace(status=status,
+                                              duration=result.duration + perf_counter() - rollback_start)
+            return False
+
+        self.run(undo, [(applied[device][0], device) for device in applied if device[0] == LOCAL])
+        self.run(undo, [(applied[device][0], device) for device in applied if device[0] != LOCAL])
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""pypozyx.pipeline - contains CommandPipeline, the interface for submitting batches of register operations.
+
+A pipeline collects register reads, writes and functions and resolves each of them to
+a future holding its status, in submission order. The base CommandPipeline executes
+every operation immediately, so it works on any interface. Interfaces that can have
+several commands in flight, like PozyxSerial, return a pipelined implementation from
+their pipeline() method that only sends the commands on flush().
+
+Example usage:
+    >>> who_am_i, network_id = SingleRegister(), NetworkID()
+    >>> with pozyx.pipeline() as pipeline:
+    ...     status = pipeline.read(PozyxRegisters.WHO_AM_I, who_am_i)
+    ...     pipeline.read(PozyxRegisters.NETWORK_ID, network_id)
+    >>> status.result() == POZYX_SUCCESS, who_am_i.value
+    (True, 67)
+"""
+from concurrent.futures import Future
+
+
+def completed_future(result, callback=None):
+    """Returns a future that already holds result, after calling the optional callback on it"""
+    future = Future()
+    if callback is not None:
+        future.add_done_callback(callback)
+    future.set_result(result)
+    return future
+
+
+class CommandPipeline(object):
+    """Sequential command pipeline, performing each submitted operation right away.
+
+    The futures returned by read, write and function resolve to the operation's status,
+    POZYX_SUCCESS or POZYX_FAILURE, or the status byte returned by a register function.
+    The callback, if given, is called with the future once it is done.
+
+    Args:
+        pozyx: the interface to perform the operations on.
+    """
+
+    def __init__(self, pozyx):
+        self.pozyx = pozyx
+
+    def read(self, address, data, callback=None):
+        """Submits a register read of data's size starting at address into data"""
+        return completed_future(self.pozyx.regRead(address, data), callback)
+
+    def write(self, address, data, callback=None):
+        """Submits a register write of data starting at address"""
+        return completed_future(self.pozyx.regWrite(address, data), callback)
+
+    def function(self, address, params, data, callback=None):
+        """Submits a register function with params, storing its output in data"""
+        return completed_future(self.pozyx.regFunction(address, params, data), callback)
+
+    def flush(self):
+        """Performs all submitted operations that haven't been performed yet"""
+        pass
+
+    def cancel(self):
+        """Drops all submitted operations that haven't been performed yet"""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.cancel()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""pypozyx.polling - contains the strategies for polling the Pozyx's interrupt status.
+
+Every poll of the interrupt status is a full round trip to the device, so polling at a fixed
+interval either floods the link or adds latency to every operation. A polling strategy decides
+when to poll while waiting for an interrupt flag. The strategy of an interface is used by
+waitForFlagSafe, and with it by checkForFlag and checkForFlagFast, of both PozyxLib and
+AsyncPozyxSerial.
+
+FixedPolling polls at a fixed interval, like the library always did. AdaptivePolling learns
+how long each operation type takes to complete on the current UWB settings, sleeps until just
+before that time and only then polls densely.
+
+Example usage:
+    >>> pozyx.setPollingStrategy(AdaptivePolling())
+    >>> pozyx.doRanging(0x6e30, device_range)
+    >>> pozyx.getPollingStrategy().last_polls
+    1
+"""
+import asyncio
+from time import perf_counter, sleep
+
+from pypozyx.definitions.constants import PozyxConstants
+
+OPERATION_RANGING = 'ranging'
+OPERATION_REMOTE_RANGING = 'remote_ranging'
+OPERATION_POSITIONING = 'positioning'
+OPERATION_REMOTE_POSITIONING = 'remote_positioning'
+OPERATION_REMOTE_READ = 'remote_read'
+OPERATION_REMOTE_WRITE = 'remote_write'
+OPERATION_REMOTE_FUNCTION = 'remote_function'
+
+
+class FixedPolling(object):
+    """Polls the interrupt status at a fixed interval until the flag is set or the timeout passes.
+
+    Args:
+        interval (optional): time in seconds between polls. Default is DELAY_POLLING_FAST.
+    """
+
+    def __init__(self, interval=PozyxConstants.DELAY_POLLING_FAST):
+        self.interval = interval
+        self.last_polls = 0
+        self.total_polls = 0
+        self.calls = 0
+
+    def wait(self, poll, timeout_s, operation=None, interval=None):
+        """Calls poll until it returns True or timeout_s seconds have passed.
+
+        Args:
+            poll: function polling the interrupt status, returns whether the flag was set.
+            timeout_s: duration to wait for the flag in seconds.
+            operation (optional): type of the operation being waited on, see the OPERATION_ constants.
+            interval (optional): overrides the polling interval for this call.
+
+        Returns:
+            True, False
+        """
+        waiting = self.waiting(timeout_s, operation, interval)
+        try:
+            step = next(waiting)
+            while True:
+                step = waiting.send(poll() if step is None else sleep(step))
+        except StopIteration as stop:
+            return stop.value
+
+    async def wait_async(self, poll, timeout_s, operation=None, interval=None):
+        """Awaits poll until it returns True or timeout_s seconds have passed, yielding to the event loop
+        in between polls. Polls at the same times as wait, with poll a coroutine function.
+
+        Returns:
+            True, False
+        """
+        waiting = self.waiting(timeout_s, operation, interval)
+        try:
+            step = next(waiting)
+            while True:
+                step = waiting.send(await poll() if step is None else await asyncio.sleep(step))
+        except StopIteration as stop:
+            return stop.value
+
+    def waiting(self, timeout_s, operation=None, interval=None):
+        """Generator deciding when wait and wait_async poll.
+
+        It yields None to have the interrupt status polled, and gets sent whether the flag was set,
+        or it yields a time in seconds to sleep. It returns whether the flag was found.
+        """
+        interval = self.interval if interval is None else interval
+        deadline = perf_counter() + timeout_s
+        return (yield from self.polling(deadline, interval))
+
+    def set_uwb_settings(self, uwb_settings):
+        """Sets the UWB settings the following operations run on, None if unknown"""
+        pass
+
+    def polling(self, deadline, interval):
+        """Polls every interval until the flag is set or the deadline passes, counting the polls. See waiting."""
+        polls = 0
+        found = False
+        while perf_counter() < deadline:
+            polls += 1
+            if (yield None):
+                found = True
+                break
+            yield max(0.0, min(interval, deadline - perf_counter()))
+        self.last_polls = polls
+        self.total_polls += polls
+        self.calls += 1
+        return found
+
+
+class AdaptivePolling(FixedPolling):
+    """Learns the completion time of every operation type per UWB setting and sleeps until just before it.
+
+    Operations that weren't seen before, or that have no operation type, are polled at the fixed interval.
+    The learned time is a moving average of the times the flag was found at. When the flag was
+    already set on the first poll after sleeping the operation may have finished earlier, so the
+    learned time is lowered instead.
+
+    Args:
+        interval (optional): time in seconds between the dense polls. Default is DELAY_POLLING_FAST.
+        margin (optional): fraction of the learned time to sleep before polling. Default is 0.8.
+        smoothing (optional): weight of a new measurement in the moving average. Default is 0.25.
+        shrink (optional): factor lowering the learned time when the first poll found the flag. Default is 0.9.
+    """
+
+    def __init__(self, interval=PozyxConstants.DELAY_POLLING_FAST, margin=0.8, smoothing=0.25, shrink=0.9):
+        super(AdaptivePolling, self).__init__(interval)
+        self.margin = margin
+        self.smoothing = smoothing
+        self.shrink = shrink
+        self.uwb_key = None
+        self.expected = {}
+        self.statistics = {}
+
+    def set_uwb_settings(self, uwb_settings):
+        if uwb_settings is None:
+            self.uwb_key = None
+        else:
+            self.uwb_key = (uwb_settings.channel, uwb_settings.bitrate, uwb_settings.prf, uwb_settings.plen)
+
+    def key(self, operation):
+        return operation, self.uwb_key
+
+    def expected_time(self, operation):
+        """Returns the learned completion time of the operation on the current UWB settings, None if unknown"""
+        return self.expected.get(self.key(operation))
+
+    def waiting(self, timeout_s, operation=None, interval=None):
+        """Polls until the flag is set or timeout_s seconds have passed, sleeping until the
+        learned completion time of operation first. See FixedPolling.waiting.
+        """
+        interval = self.interval if interval is None else interval
+        start = perf_counter()
+        deadline = start + timeout_s
+        if operation is None:
+            return (yield from self.polling(deadline, interval))
+
+        key = self.key(operation)
+        expected = self.expected.get(key)
+        slept = False
+        if expected is not None:
+            wake = min(start + self.margin * expected, deadline)
+            if wake > perf_counter():
+                yield max(0.0, wake - perf_counter())
+                slept = True
+        found = yield from self.polling(deadline, interval)
+
+        statistics = self.statistics.setdefault(key, {'calls': 0, 'polls': 0, 'timeouts': 0})
+        statistics['calls'] += 1
+        statistics['polls'] += self.last_polls
+        if not found:
+            statistics['timeouts'] += 1
+            return found
+        elapsed = perf_counter() - start
+        if expected is None:
+            self.expected[key] = elapsed
+        elif slept and self.last_polls == 1:
+            self.expected[key] = self.shrink * min(expected, elapsed)
+        else:
+            self.expected[key] = (1 - self.smoothing) * expected + self.smoothing * elapsed
+        return found
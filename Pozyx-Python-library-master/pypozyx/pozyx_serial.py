@@ -1,11 +1,16 @@
 """pypozyx.pozyx_serial - contains the serial interface with Pozyx through PozyxSerial."""
+import struct
+from concurrent.futures import Future
+from contextlib import contextmanager
 from time import sleep
 from pypozyx.core import PozyxConnectionError
 
 from pypozyx.definitions.constants import (POZYX_SUCCESS, POZYX_FAILURE,
                                            MAX_SERIAL_SIZE)
 
-from pypozyx.lib import PozyxLib
+from pypozyx.lib import ATOMIC_OPERATIONS, PozyxLib
+from pypozyx.locking import InstrumentedLock, make_atomic
+from pypozyx.pipeline import CommandPipeline
 from pypozyx.structures.generic import SingleRegister
 from serial import Serial, VERSION as PYSERIAL_VERSION, SerialException
 from serial.tools.list_ports import comports
@@ -96,6 +101,38 @@ def get_pozyx_ports_windows():
             pozyx_ports.append(port.device)
 
 
+def serial_read_commands(address, byte_size):
+    """Returns the serial commands reading byte_size bytes starting at address, in MAX_SERIAL_SIZE chunks"""
+    runs = int(byte_size / MAX_SERIAL_SIZE)
+    commands = ['R,%0.2x,%i\r' % (address + i * MAX_SERIAL_SIZE, MAX_SERIAL_SIZE) for i in range(runs)]
+    commands.append('R,%0.2x,%i\r' % (address + runs * MAX_SERIAL_SIZE, byte_size - runs * MAX_SERIAL_SIZE))
+    return commands
+
+
+def serial_write_commands(address, data):
+    """Returns the serial commands writing data starting at address, in MAX_SERIAL_SIZE chunks"""
+    data.load_hex_string()
+    runs = int(data.byte_size / MAX_SERIAL_SIZE)
+    commands = ['W,%0.2x,%s\r' % (address + i * MAX_SERIAL_SIZE,
+                                  data.byte_data[2 * i * MAX_SERIAL_SIZE: 2 * (i + 1) * MAX_SERIAL_SIZE])
+                for i in range(runs)]
+    commands.append('W,%0.2x,%s\r' % (address + runs * MAX_SERIAL_SIZE, data.byte_data[2 * runs * MAX_SERIAL_SIZE:]))
+    return commands
+
+
+def serial_function_command(address, params, data):
+    """Returns the serial command performing the function at address with params, returning data"""
+    params.load_hex_string()
+    return 'F,%0.2x,%s,%i\r' % (address, params.byte_data, data.byte_size + 1)
+
+
+def load_function_response(response, data):
+    """Loads a register function's response in data, returning the function's status"""
+    if len(data) > 0:
+        data.load_bytes(response[2:])
+    return int(response[0:2], 16)
+
+
 def is_correct_pyserial_version():
     """Returns whether the pyserial version is supported"""
     version_tags = [int(version_tag)
@@ -110,6 +147,113 @@ def is_correct_pyserial_version():
 # @}
 
 
+class SerialCommandPipeline(CommandPipeline):
+    """Pipelined command queue for PozyxSerial.
+
+    Submitted operations are queued until flush, which writes up to max_in_flight
+    response-bearing commands back-to-back before reading their responses. As the
+    Pozyx answers every read and function command in order with a single line,
+    the responses are matched to the queued operations in order, which resolves
+    their futures and calls their callbacks. Writes don't get a response and resolve
+    once they are sent.
+
+    When a response is missing, malformed or too short for its data, the operation and
+    the remaining ones in its window resolve to POZYX_FAILURE and the responses still
+    coming in are discarded, so that late responses can't be matched to the next window.
+
+    Args:
+        pozyx: the PozyxSerial to send the commands over.
+        max_in_flight (optional): maximum amount of commands awaiting a response at once.
+    """
+    MAX_IN_FLIGHT = 8
+
+    def __init__(self, pozyx, max_in_flight=None):
+        super(SerialCommandPipeline, self).__init__(pozyx)
+        self.max_in_flight = self.MAX_IN_FLIGHT if max_in_flight is None else max(1, max_in_flight)
+        self.queue = []
+
+    def submit(self, commands, handler=None, callback=None):
+        """Queues serial commands, returning the future of their status.
+
+        Args:
+            commands: list of serial command strings.
+            handler (optional): function called with the list of responses of the commands,
+                returning the status. Commands without handler don't expect a response.
+            callback (optional): function called with the future once it is done.
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        self.queue.append((commands, handler, future))
+        return future
+
+    def read(self, address, data, callback=None):
+        def handle(responses):
+            data.load_bytes(''.join(responses))
+            return POZYX_SUCCESS
+        return self.submit(serial_read_commands(address, data.byte_size), handle, callback)
+
+    def write(self, address, data, callback=None):
+        return self.submit(serial_write_commands(address, data), None, callback)
+
+    def function(self, address, params, data, callback=None):
+        def handle(responses):
+            return load_function_response(responses[0], data)
+        return self.submit([serial_function_command(address, params, data)], handle, callback)
+
+    def flush(self):
+        if self.pozyx.lock is not None:
+            with self.pozyx.lock:
+                return self.flush_queue()
+        return self.flush_queue()
+
+    def flush_queue(self):
+        queue, self.queue = self.queue, []
+        window, in_flight = [], 0
+        for operation in queue:
+            commands, handler, future = operation
+            if handler is not None:
+                if window and in_flight + len(commands) > self.max_in_flight:
+                    self.exchange(window)
+                    window, in_flight = [], 0
+                in_flight += len(commands)
+            window.append(operation)
+        if window:
+            self.exchange(window)
+
+    def cancel(self):
+        queue, self.queue = self.queue, []
+        for commands, handler, future in queue:
+            future.cancel()
+
+    def exchange(self, window):
+        """Writes the commands of a window of operations at once and resolves them with their responses"""
+        pozyx = self.pozyx
+        try:
+            pozyx.ser.write(''.join(command for operation in window for command in operation[0]).encode())
+        except SerialException:
+            for commands, handler, future in window:
+                future.set_result(POZYX_FAILURE)
+            return
+        for index, (commands, handler, future) in enumerate(window):
+            if handler is None:
+                future.set_result(POZYX_SUCCESS)
+                continue
+            try:
+                result = handler([pozyx.serialResponse(command) for command in commands])
+            except (SerialException, ValueError, struct.error):
+                # read the responses still on their way, until one is missing, so none is matched later
+                remaining = sum(len(operation[0]) for operation in window[index + 1:] if operation[1] is not None)
+                for i in range(remaining):
+                    if not pozyx.ser.readline():
+                        break
+                pozyx.ser.reset_input_buffer()
+                for commands, handler, future in window[index:]:
+                    future.set_result(POZYX_FAILURE)
+                return
+            future.set_result(result)
+
+
 class PozyxSerial(PozyxLib):
     """This class provides the Pozyx Serial interface, and opens and locks the serial
     port to use with Pozyx. All functionality from PozyxLib and PozyxCore is included.
@@ -123,6 +267,12 @@ class PozyxSerial(PozyxLib):
         suppress_warnings (optional): boolean for suppressing warnings in the Pozyx use, usage not recommended
         debug_trace (optional): boolean for printing the trace on bad serial init (DEPRECATED)
         show_trace (optional): boolean for printing the trace on bad serial init (DEPRECATED)
+        thread_safe (optional): boolean for sharing the interface between threads. Every serial
+            exchange and every operation in ATOMIC_OPERATIONS then runs under an InstrumentedLock,
+            available as lock. Default is False.
+        pipelined (optional): boolean for sending the commands of a pipeline back-to-back, see
+            pipeline. This is only validated against the simulated Pozyx, not yet against the
+            serial input handling of the Pozyx firmware. Default is False.
 
     Example usage:
         >>> pozyx = PozyxSerial('COMX') # Windows
@@ -137,13 +287,20 @@ class PozyxSerial(PozyxLib):
         >>> pozyx = PozyxSerial(serial.tools.list_ports.comports()[0])
     """
 
+    # the InstrumentedLock of a thread-safe interface
+    lock = None
+    # whether pipelines send their commands back-to-back
+    pipelined = False
+
     # \addtogroup core
     # @{
     def __init__(self, port, baudrate=115200, timeout=0.1, write_timeout=0.1,
                  print_output=False, debug_trace=False, show_trace=False,
-                 suppress_warnings=False):
+                 suppress_warnings=False, thread_safe=False, pipelined=False):
         """Initializes the PozyxSerial object. See above for details."""
         super(PozyxSerial, self).__init__()
+        self.lock = InstrumentedLock() if thread_safe else None
+        self.pipelined = pipelined
         self.print_output = print_output
         if debug_trace is True or show_trace is True:
             if not suppress_warnings:
@@ -204,21 +361,9 @@ class PozyxSerial(PozyxLib):
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE
         """
-        data.load_hex_string()
-        index = 0
-        runs = int(data.byte_size / MAX_SERIAL_SIZE)
-        for i in range(runs):
-            s = 'W,%0.2x,%s\r' % (
-                address + index, data.byte_data[2 * index: 2 * (index + MAX_SERIAL_SIZE)])
-            index += MAX_SERIAL_SIZE
-            try:
-                self.ser.write(s.encode())
-            except SerialException:
-                return POZYX_FAILURE
-            # delay(POZYX_DELAY_LOCAL_WRITE)
-        s = 'W,%0.2x,%s\r' % (address + index, data.byte_data[2 * index:])
         try:
-            self.ser.write(s.encode())
+            for s in serial_write_commands(address, data):
+                self.ser.write(s.encode())
         except SerialException:
             return POZYX_FAILURE
         return POZYX_SUCCESS
@@ -234,6 +379,18 @@ class PozyxSerial(PozyxLib):
                 and NL+CR at the end.
         """
         self.ser.write(s.encode())
+        return self.serialResponse(s)
+
+    def serialResponse(self, s):
+        """
+        Auxiliary. Reads the Pozyx's response to a serial message that was sent.
+
+        Args:
+            s: Serial message the response belongs to
+        Returns:
+            Serial message the Pozyx returns, stripped from 'D,' at its start
+                and NL+CR at the end.
+        """
         response = self.ser.readline().decode()
         if self.print_output:
             print('The response to %s is %s.' % (s.strip(), response.strip()))
@@ -256,19 +413,10 @@ class PozyxSerial(PozyxLib):
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE
         """
-        runs = int(data.byte_size / MAX_SERIAL_SIZE)
         r = ''
-        for i in range(runs):
-            s = 'R,%0.2x,%i\r' % (
-                address + i * MAX_SERIAL_SIZE, MAX_SERIAL_SIZE)
-            try:
-                r += self.serialExchange(s)
-            except SerialException:
-                return POZYX_FAILURE
-        s = 'R,%0.2x,%i\r' % (
-            address + runs * MAX_SERIAL_SIZE, data.byte_size - runs * MAX_SERIAL_SIZE)
         try:
-            r += self.serialExchange(s)
+            for s in serial_read_commands(address, data.byte_size):
+                r += self.serialExchange(s)
         except SerialException:
             return POZYX_FAILURE
         data.load_bytes(r)
@@ -289,15 +437,49 @@ class PozyxSerial(PozyxLib):
         Returns:
             POZYX_SUCCESS, POZYX_FAILURE
         """
-        params.load_hex_string()
-        s = 'F,%0.2x,%s,%i\r' % (address, params.byte_data, data.byte_size + 1)
         try:
-            r = self.serialExchange(s)
+            r = self.serialExchange(serial_function_command(address, params, data))
         except SerialException:
             return POZYX_FAILURE
-        if len(data) > 0:
-            data.load_bytes(r[2:])
-        return int(r[0:2], 16)
+        return load_function_response(r, data)
+
+    @contextmanager
+    def atomic(self):
+        """Performs the operations in a with block without other threads' exchanges in between. Nests.
+
+        Only has effect when the interface is thread safe.
+
+        Example:
+            >>> with pozyx.atomic():
+            ...     pozyx.clearDevices()
+            ...     pozyx.addDevice(anchor)
+        """
+        if self.lock is None:
+            yield self
+            return
+        with self.lock:
+            yield self
+
+    def pipeline(self, max_in_flight=None):
+        """Returns a SerialCommandPipeline to submit a batch of register operations to.
+
+        The operations are sent back-to-back when the pipeline is flushed, which happens
+        automatically when it's used as a context manager. Unless the interface was created
+        with pipelined=True, this returns PozyxCore's pipeline instead, which performs every
+        operation when it's submitted, one blocking exchange at a time.
+
+        Args:
+            max_in_flight (optional): maximum amount of commands awaiting a response at once.
+
+        Example:
+            >>> with pozyx.pipeline() as pipeline:
+            ...     pipeline.read(PozyxRegisters.WHO_AM_I, who_am_i)
+            ...     pipeline.function(PozyxRegisters.DO_RANGING, NetworkID(0x6e30), Data([]),
+            ...                       callback=lambda future: print(future.result()))
+        """
+        if not self.pipelined:
+            return super(PozyxSerial, self).pipeline()
+        return SerialCommandPipeline(self, max_in_flight)
 
     def waitForFlag(self, interrupt_flag, timeout_s, interrupt=None):
         """
@@ -318,3 +500,6 @@ class PozyxSerial(PozyxLib):
         if interrupt is None:
             interrupt = SingleRegister()
         return self.waitForFlagSafe(interrupt_flag, timeout_s, interrupt)
+
+
+make_atomic(PozyxSerial, ['regWrite', 'regRead', 'regFunction'] + ATOMIC_OPERATIONS)
@@ -0,0 +1,607 @@
+#!/usr/bin/env python
+"""pypozyx.pozyx_serial_async - contains the asyncio serial interface with Pozyx through AsyncPozyxSerial.
+
+AsyncPozyxSerial offers awaitable versions of the core register access, the remote register
+cycle and the most used PozyxLib operations. It reads the serial port without blocking, by
+registering it with the event loop, and interrupt polling yields to the event loop instead
+of sleeping, so operations on several Pozyx devices can be interleaved with other coroutines
+on a single thread.
+
+Every serial command gets answered with a single line, in order, so commands of concurrent
+coroutines are matched to their responses in the order they were written. Operations that use
+the master's shared state, its clear-on-read interrupt status and its TX and RX buffers, are
+serialized on the master's lock, remote operations included: their flags are polled on the master.
+
+The serial commands and responses are formatted and parsed by the same helpers as PozyxSerial,
+and the interface shares PozyxCore's hooks: interrupt flags are awaited as decided by the polling
+strategy, getRead, setWrite and useFunction go through the register cache, ranging feeds the
+clock synchronisation and a tracer traces the operations, see PozyxHooks.
+
+This uses the event loop's add_reader, so it needs a selector event loop (POSIX).
+
+Example usage:
+    >>> async def main():
+    ...     pozyx = await AsyncPozyxSerial.open('/dev/ttyACM0')
+    ...     device_range = DeviceRange()
+    ...     status = await pozyx.doRanging(0x6e30, device_range)
+    ...     pozyx.close()
+    >>> asyncio.run(main())
+"""
+import asyncio
+from collections import deque
+from time import perf_counter
+from warnings import warn
+
+from pypozyx.core import (PozyxConnectionError, PozyxHooks, remote_operation_data, rx_buffer_reads,
+                          remote_function_response, load_remote_function_response)
+from pypozyx.definitions.bitmasks import PozyxBitmasks
+from pypozyx.definitions.constants import PozyxConstants, POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.lib import (Device, positioning_data_command, load_positioning_data_response,
+                         set_remote_amount_of_ranges)
+from pypozyx.polling import (OPERATION_RANGING, OPERATION_REMOTE_RANGING, OPERATION_POSITIONING,
+                             OPERATION_REMOTE_POSITIONING, OPERATION_REMOTE_READ, OPERATION_REMOTE_WRITE,
+                             OPERATION_REMOTE_FUNCTION)
+from pypozyx.pozyx_serial import (is_pozyx, get_port_object, serial_read_commands, serial_write_commands,
+                                  serial_function_command, load_function_response)
+from pypozyx.structures.device import NetworkID, RXInfo, TXInfo
+from pypozyx.structures.generic import Data, SingleRegister, dataCheck
+from pypozyx.structures.sensor_data import PositioningData
+from pypozyx.tracing import SERIAL_RESPONSE
+from serial import Serial, SerialException
+
+
+class TaskLock(object):
+    """An asyncio lock the task holding it can acquire again, like a threading.RLock"""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._owner = None
+        self._depth = 0
+
+    async def __aenter__(self):
+        task = asyncio.current_task()
+        if self._owner is not task:
+            await self._lock.acquire()
+            self._owner = task
+        self._depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            self._owner = None
+            self._lock.release()
+
+
+class AsyncPozyxSerial(PozyxHooks):
+    """This class provides an asyncio Pozyx Serial interface. Create and connect it with open.
+
+    Args:
+        port (str): Name of the serial port.
+        baudrate (optional): the baudrate of the serial port. Default value is 115200.
+        timeout (optional): timeout for a response of the Pozyx in seconds. Default is 0.1s or 100ms.
+        write_timeout (optional): timeout for writing to the serial port in seconds.
+        print_output (optional): boolean for printing the serial exchanges, mainly for debugging purposes
+        suppress_warnings (optional): boolean for suppressing warnings in the Pozyx use, usage not recommended
+    """
+
+    def __init__(self, port, baudrate=115200, timeout=0.1, write_timeout=0.1,
+                 print_output=False, suppress_warnings=False):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.write_timeout = write_timeout
+        self.print_output = print_output
+        self.suppress_warnings = suppress_warnings
+        self.ser = None
+        self._received = b''
+        self._pending = deque()
+        self._device_locks = {}
+        self._device_mesh = {}
+
+    @classmethod
+    async def open(cls, port, *args, **kwargs):
+        """Creates an AsyncPozyxSerial, connects it to the Pozyx and validates the connection."""
+        pozyx = cls(port, *args, **kwargs)
+        pozyx.connectToPozyx()
+        await asyncio.sleep(0.25)
+        await pozyx.validatePozyx()
+        return pozyx
+
+    def connectToPozyx(self):
+        """Opens the serial port in non-blocking mode and registers it with the event loop"""
+        try:
+            if not is_pozyx(self.port) and not self.suppress_warnings:
+                warn("The passed device is not a recognized Pozyx device, is %s" % get_port_object(self.port).description,
+                     stacklevel=2)
+            self.ser = Serial(port=self.port, baudrate=self.baudrate, timeout=0, write_timeout=self.write_timeout)
+        except SerialException as exc:
+            raise PozyxConnectionError("Wrong or busy serial port, SerialException: {}".format(str(exc)))
+        except Exception as exc:
+            raise PozyxConnectionError("Couldn't connect to Pozyx, {}: {}".format(exc.__class__.__name__, str(exc)))
+        asyncio.get_running_loop().add_reader(self.ser.fileno(), self._readResponses)
+
+    async def validatePozyx(self):
+        """Validates whether the connected device is indeed a Pozyx device"""
+        whoami = SingleRegister()
+        if await self.getWhoAmI(whoami) != POZYX_SUCCESS:
+            raise PozyxConnectionError("Connected to device, but couldn't read serial data. Is it a Pozyx?")
+        if whoami.value != 0x43:
+            raise PozyxConnectionError("POZYX_WHO_AM_I returned 0x%0.2x, something is wrong with Pozyx." % whoami.value)
+
+    def close(self):
+        """Unregisters the serial port from the event loop and closes it"""
+        if self.ser is not None:
+            asyncio.get_running_loop().remove_reader(self.ser.fileno())
+            self.ser.close()
+            self.ser = None
+        self._failPending()
+
+    def deviceLock(self, remote_id=None):
+        """Returns the reentrant TaskLock serializing the operations using the shared state of a device.
+
+        The lock of the master, remote_id None, is held for every operation polling its interrupt status.
+        """
+        if remote_id not in self._device_locks:
+            self._device_locks[remote_id] = TaskLock()
+        return self._device_locks[remote_id]
+
+    # serial exchanges
+
+    def _readResponses(self):
+        try:
+            self._received += self.ser.read(self.ser.in_waiting or 1)
+        except SerialException:
+            self._failPending()
+            return
+        while b'\n' in self._received:
+            line, self._received = self._received.split(b'\n', 1)
+            if self._pending:
+                command, future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(line.decode())
+
+    def _failPending(self):
+        while self._pending:
+            command, future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(SerialException("Pozyx response lost"))
+        self._received = b''
+
+    async def serialExchange(self, s):
+        """
+        Auxiliary. Writes a serial message to the Pozyx and awaits its response.
+
+        Args:
+            s: Serial message to send to the Pozyx
+        Returns:
+            Serial message the Pozyx returns, stripped from 'D,' at its start
+                and NL+CR at the end.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.ser.write(s.encode())
+        # only queued once written, a failed write mustn't take the response of the next command
+        self._pending.append((s, future))
+        written = perf_counter()
+        try:
+            response = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            # responses can't be matched anymore once one went missing
+            self.ser.reset_input_buffer()
+            self._failPending()
+            raise SerialException("No response from Pozyx to %s" % s.strip())
+        tracer = self.getTracer()
+        if tracer is not None:
+            tracer.serial_io(SERIAL_RESPONSE, perf_counter() - written, 0, len(response) + 1)
+        if self.print_output:
+            print('The response to %s is %s.' % (s.strip(), response.strip()))
+        if len(response) == 0 or response[0] != 'D':
+            raise SerialException("Invalid response from Pozyx to %s" % s.strip())
+        return response[2:].rstrip('\r')
+
+    # core interface
+
+    async def regWrite(self, address, data):
+        """
+        Writes data to the Pozyx registers, starting at a register address.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE
+        """
+        try:
+            for s in serial_write_commands(address, data):
+                self.ser.write(s.encode())
+        except SerialException:
+            return POZYX_FAILURE
+        return POZYX_SUCCESS
+
+    async def regRead(self, address, data):
+        """
+        Reads data from the Pozyx registers, starting at a register address. Reads
+        larger than MAX_SERIAL_SIZE are sent in chunks without waiting in between.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE
+        """
+        try:
+            responses = await asyncio.gather(*[self.serialExchange(s)
+                                               for s in serial_read_commands(address, data.byte_size)])
+        except SerialException:
+            return POZYX_FAILURE
+        data.load_bytes(''.join(responses))
+        return POZYX_SUCCESS
+
+    async def regFunction(self, address, params, data):
+        """
+        Performs a register function on the Pozyx, storing its output in data.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE
+        """
+        try:
+            r = await self.serialExchange(serial_function_command(address, params, data))
+        except SerialException:
+            return POZYX_FAILURE
+        return load_function_response(r, data)
+
+    async def getRead(self, address, data, remote_id=None):
+        """Reads Pozyx register data either locally or remotely. See PozyxCore.getRead"""
+        register_cache = self.getRegisterCache()
+        if register_cache is not None and register_cache.load(remote_id, address, data):
+            return POZYX_SUCCESS
+        if remote_id is None:
+            status = await self.regRead(address, data)
+        else:
+            status = await self.remoteRegRead(remote_id, address, data)
+        if register_cache is not None and status == POZYX_SUCCESS:
+            register_cache.store(remote_id, address, data)
+        return status
+
+    async def setWrite(self, address, data, remote_id=None, local_delay=PozyxConstants.DELAY_LOCAL_WRITE,
+                       remote_delay=PozyxConstants.DELAY_REMOTE_WRITE):
+        """Writes data to Pozyx registers either locally or remotely, yielding during the delay after it.
+        See PozyxCore.setWrite"""
+        if remote_id is None:
+            status = await self.regWrite(address, data)
+            await asyncio.sleep(local_delay)
+        else:
+            status = await self.remoteRegWrite(remote_id, address, data)
+            await asyncio.sleep(remote_delay)
+        register_cache = self.getRegisterCache()
+        if register_cache is not None:
+            if status == POZYX_SUCCESS:
+                register_cache.store_written(remote_id, address, data)
+            else:
+                register_cache.invalidate(remote_id, address, data.byte_size)
+        return status
+
+    async def useFunction(self, function, params=None, data=None, remote_id=None):
+        """Activates a Pozyx register function either locally or remotely. See PozyxCore.useFunction"""
+        params = Data([]) if params is None else params
+        data = Data([]) if data is None else data
+        register_cache = self.getRegisterCache()
+        if register_cache is not None:
+            status = register_cache.load_function(remote_id, function, params, data)
+            if status is not None:
+                return status
+        if remote_id is None:
+            status = await self.regFunction(function, params, data)
+        else:
+            status = await self.remoteRegFunction(remote_id, function, params, data)
+        if register_cache is not None:
+            register_cache.function_called(remote_id, function, params, data, status)
+        return status
+
+    async def getInterruptStatus(self, interrupts, remote_id=None):
+        return await self.getRead(PozyxRegisters.INTERRUPT_STATUS, interrupts, remote_id)
+
+    async def clearInterruptStatus(self):
+        return await self.getInterruptStatus(SingleRegister())
+
+    async def waitForFlagSafe(self, interrupt_flag, timeout_s, interrupt=None, operation=None, interval=None):
+        """Polls the interrupt status for the flag as decided by the polling strategy, yielding to the
+        event loop in between polls. See PozyxCore.waitForFlagSafe
+
+        Returns:
+            True, False
+        """
+        if interrupt is None:
+            interrupt = SingleRegister()
+
+        async def poll():
+            status = await self.getInterruptStatus(interrupt)
+            return bool(interrupt[0] & interrupt_flag) and status == POZYX_SUCCESS
+
+        return await self.getPollingStrategy().wait_async(poll, timeout_s, operation, interval)
+
+    async def checkForFlag(self, interrupt_flag, timeout_s, interrupt=None, operation=None):
+        """Awaits the flag like PozyxCore.checkForFlag, checking it against the error flag.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        if interrupt is None:
+            interrupt = SingleRegister()
+        error_interrupt_mask = PozyxBitmasks.INT_MASK_ERR
+        if await self.waitForFlagSafe(interrupt_flag | error_interrupt_mask, timeout_s, interrupt, operation):
+            if (interrupt[0] & error_interrupt_mask) == error_interrupt_mask:
+                return POZYX_FAILURE
+            return POZYX_SUCCESS
+        return POZYX_TIMEOUT
+
+    # remote register cycle
+
+    async def prepareRemoteTX(self, send_data):
+        """Auxiliary. Writes the remote operation to the TX buffer and clears the interrupt status, concurrently."""
+        status, interrupt_status = await asyncio.gather(
+            self.regFunction(PozyxRegisters.WRITE_TX_DATA, send_data, Data([])), self.clearInterruptStatus())
+        return status
+
+    async def sendTX(self, destination, operation):
+        if dataCheck(destination):
+            destination = destination[0]
+        return await self.regFunction(PozyxRegisters.SEND_TX_DATA, TXInfo(destination, operation), Data([]))
+
+    async def getRxInfo(self, rx_info, remote_id=None):
+        return await self.getRead(PozyxRegisters.RX_NETWORK_ID, rx_info, remote_id)
+
+    async def readRXBufferData(self, data, offset=0):
+        """Reads the device's receive buffer's data completely, sending all chunk reads at once.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE
+        """
+        if data.byte_size + offset > PozyxConstants.MAX_BUF_SIZE:
+            return POZYX_FAILURE
+        reads = rx_buffer_reads(data, offset)
+        statuses = await asyncio.gather(*[self.regFunction(PozyxRegisters.READ_RX_DATA, params, partial_data)
+                                          for params, partial_data in reads])
+        status = POZYX_SUCCESS
+        for partial_status in statuses:
+            status &= partial_status
+        data.load_bytes(''.join(partial_data.byte_data for params, partial_data in reads))
+        return status
+
+    async def remoteRegWrite(self, destination, address, data):
+        """Performs regWrite on a remote Pozyx device.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        if len(data) > PozyxConstants.MAX_BUF_SIZE - 1:
+            return POZYX_FAILURE
+        async with self.deviceLock():
+            status = await self.prepareRemoteTX(remote_operation_data(address, data))
+            if status != POZYX_SUCCESS:
+                return status
+            status = await self.sendTX(destination, PozyxConstants.REMOTE_WRITE)
+            if status != POZYX_SUCCESS:
+                return status
+            return await self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 0.5, operation=OPERATION_REMOTE_WRITE)
+
+    async def remoteRegRead(self, destination, address, data):
+        """Performs regRead on a remote Pozyx device.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        if dataCheck(destination):
+            destination = destination[0]
+        if len(data) > PozyxConstants.MAX_BUF_SIZE or destination == 0:
+            return POZYX_FAILURE
+        send_data = Data([0, address, data.byte_size])
+        async with self.deviceLock():
+            status = await self.prepareRemoteTX(send_data)
+            if status != POZYX_SUCCESS:
+                return status
+            status = await self.sendTX(destination, PozyxConstants.REMOTE_READ)
+            if status != POZYX_SUCCESS:
+                return status
+            status = await self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 1, operation=OPERATION_REMOTE_READ)
+            if status != POZYX_SUCCESS:
+                return status
+            rx_info = RXInfo()
+            await self.getRxInfo(rx_info)
+            if rx_info.remote_id == destination and rx_info.amount_of_bytes == data.byte_size:
+                return await self.readRXBufferData(data)
+            return POZYX_FAILURE
+
+    async def remoteRegFunction(self, destination, address, params, data):
+        """Performs regFunction on a remote Pozyx device.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        async with self.deviceLock():
+            status = await self.prepareRemoteTX(remote_operation_data(address, params))
+            if status != POZYX_SUCCESS:
+                return status
+            status = await self.sendTX(destination, PozyxConstants.REMOTE_FUNCTION)
+            if status != POZYX_SUCCESS:
+                return status
+            status = await self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 1, operation=OPERATION_REMOTE_FUNCTION)
+            if status != POZYX_SUCCESS:
+                return status
+            rx_info = RXInfo()
+            await self.getRxInfo(rx_info)
+            if rx_info.remote_id == destination and rx_info.amount_of_bytes == data.byte_size + 1:
+                return_data = remote_function_response(data)
+                status = await self.readRXBufferData(return_data)
+                if status != POZYX_SUCCESS:
+                    return status
+                return load_remote_function_response(return_data, data)
+            return POZYX_FAILURE
+
+    # library operations
+
+    async def getWhoAmI(self, who_am_i, remote_id=None):
+        return await self.getRead(PozyxRegisters.WHO_AM_I, who_am_i, remote_id)
+
+    async def getFirmwareVersion(self, firmware, remote_id=None):
+        return await self.getRead(PozyxRegisters.FIRMWARE_VERSION, firmware, remote_id)
+
+    async def getCoordinates(self, coordinates, remote_id=None):
+        return await self.getRead(PozyxRegisters.POSITION_X, coordinates, remote_id)
+
+    async def getAllSensorData(self, sensor_data, remote_id=None):
+        """Obtains all the Pozyx's sensor data in their default units. See PozyxLib.getAllSensorData"""
+        return await self.getRead(PozyxRegisters.PRESSURE, sensor_data, remote_id)
+
+    async def getDeviceRangeInfo(self, device_id, device_range, remote_id=None):
+        if not dataCheck(device_id):
+            device_id = NetworkID(device_id)
+        return await self.useFunction(PozyxRegisters.GET_DEVICE_RANGE_INFO, device_id, device_range, remote_id)
+
+    async def doRanging(self, destination_id, device_range, remote_id=None):
+        """Performs ranging with another destination device. See PozyxLib.doRanging
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        if not dataCheck(destination_id):
+            destination_id = NetworkID(destination_id)
+        int_flag = PozyxBitmasks.INT_STATUS_FUNC
+        operation = OPERATION_RANGING
+        if remote_id is not None:
+            int_flag = PozyxBitmasks.INT_STATUS_RX_DATA
+            operation = OPERATION_REMOTE_RANGING
+        # the flag is polled on the master, also when a remote device ranges
+        async with self.deviceLock():
+            await self.clearInterruptStatus()
+            sent = perf_counter()
+            status = await self.useFunction(PozyxRegisters.DO_RANGING, destination_id, Data([]), remote_id=remote_id)
+            if status != POZYX_SUCCESS:
+                return POZYX_FAILURE
+            status = await self.checkForFlag(int_flag, PozyxConstants.DELAY_INTERRUPT, operation=operation)
+            if status == POZYX_SUCCESS:
+                received = perf_counter()
+                range_status = await self.getDeviceRangeInfo(destination_id, device_range, remote_id=remote_id)
+                clock_sync = self.getClockSync()
+                if clock_sync is not None and range_status == POZYX_SUCCESS:
+                    clock_sync.add_exchange(remote_id, device_range.timestamp, sent, received)
+            return status
+
+    async def hasCloudFirmware(self, remote_id=None):
+        """Returns whether the device runs a firmware version above 1.1, reading it once per device"""
+        if remote_id not in self._device_mesh:
+            firmware = SingleRegister()
+            if await self.getFirmwareVersion(firmware, remote_id) != POZYX_SUCCESS:
+                return None
+            device = Device(remote_id)
+            device.firmware_version = firmware
+            self._device_mesh[remote_id] = device
+        return self._device_mesh[remote_id].has_cloud_firmware()
+
+    async def getPositioningData(self, positioning_data):
+        r = await self.serialExchange(positioning_data_command(positioning_data))
+        return load_positioning_data_response(r, positioning_data)
+
+    async def doPositioningWithData(self, positioning_data, remote_id=None, timeout=None):
+        """Performs positioning and reads the positioning data. See PozyxLib.doPositioningWithData
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        async with self.deviceLock():
+            if remote_id is None:
+                timeout = PozyxConstants.TIMEOUT_POSITIONING_DATA if timeout is None else timeout
+                status = await self.useFunction(PozyxRegisters.DO_POSITIONING)
+                if status != POZYX_SUCCESS:
+                    return status
+                status = await self.checkForFlag(PozyxBitmasks.INT_STATUS_POS, timeout, operation=OPERATION_POSITIONING)
+                if status == POZYX_SUCCESS:
+                    try:
+                        return await self.getPositioningData(positioning_data)
+                    except SerialException:
+                        return POZYX_FAILURE
+                return status
+
+            timeout = PozyxConstants.TIMEOUT_REMOTE_POSITIONING_DATA if timeout is None else timeout
+            flags_data = Data([positioning_data.flags], 'H')
+            status = await self.prepareRemoteTX(remote_operation_data(PozyxRegisters.DO_POSITIONING, flags_data))
+            if status != POZYX_SUCCESS:
+                return status
+            status = await self.sendTX(remote_id, PozyxConstants.REMOTE_FUNCTION)
+            if status != POZYX_SUCCESS:
+                return status
+            await self.checkForFlag(PozyxBitmasks.INT_STATUS_FUNC, 0.02)
+            status = await self.checkForFlag(PozyxBitmasks.INT_STATUS_RX_DATA, timeout,
+                                             operation=OPERATION_REMOTE_POSITIONING)
+            if status != POZYX_SUCCESS:
+                return status
+            rx_info = RXInfo()
+            await self.getRxInfo(rx_info)
+            set_remote_amount_of_ranges(positioning_data, rx_info)
+            if rx_info.remote_id == remote_id:
+                return await self.readRXBufferData(positioning_data)
+            return POZYX_FAILURE
+
+    async def doPositioning(self, position, dimension=PozyxConstants.DIMENSION_3D, height=Data([0], 'i'),
+                            algorithm=None, remote_id=None, timeout=None):
+        """Performs positioning with the Pozyx. See PozyxLib.doPositioning
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        if algorithm is not None:
+            await self.setWrite(PozyxRegisters.POSITIONING_ALGORITHM, Data([dimension << 4 | algorithm]), remote_id)
+        if dimension == PozyxConstants.DIMENSION_2_5D:
+            if not dataCheck(height):
+                height = Data([height], 'i')
+            await self.setWrite(PozyxRegisters.POSITION_Z, height, remote_id)
+
+        cloud_firmware = await self.hasCloudFirmware(remote_id)
+        if cloud_firmware is None:
+            return POZYX_FAILURE
+        if cloud_firmware:
+            if timeout is None:
+                timeout = PozyxConstants.TIMEOUT_POSITIONING if remote_id is None else PozyxConstants.TIMEOUT_REMOTE_POSITIONING
+            position_data = PositioningData(0b1)
+            status = await self.doPositioningWithData(position_data, remote_id=remote_id, timeout=timeout)
+            if status == POZYX_SUCCESS:
+                position.load_bytes(position_data.byte_data)
+            return status
+
+        async with self.deviceLock():
+            status = await self.useFunction(PozyxRegisters.DO_POSITIONING, remote_id=remote_id, params=Data([1], "H"))
+            if status != POZYX_SUCCESS:
+                return POZYX_FAILURE
+            if remote_id is None:
+                timeout = PozyxConstants.TIMEOUT_POSITIONING if timeout is None else timeout
+                status = await self.checkForFlag(PozyxBitmasks.INT_STATUS_POS, timeout, operation=OPERATION_POSITIONING)
+                if status == POZYX_SUCCESS:
+                    return await self.getCoordinates(position)
+                return status
+            timeout = PozyxConstants.TIMEOUT_REMOTE_POSITIONING if timeout is None else timeout
+            status = await self.checkForFlag(PozyxBitmasks.INT_STATUS_RX_DATA, timeout,
+                                             operation=OPERATION_REMOTE_POSITIONING)
+            if status != POZYX_SUCCESS:
+                return status
+            rx_info = RXInfo()
+            await self.getRxInfo(rx_info)
+            if rx_info.remote_id == remote_id and rx_info.amount_of_bytes == position.byte_size:
+                status = await self.readRXBufferData(position)
+                position.load(position.data)
+                return status
+            return POZYX_FAILURE
+
+    async def saveConfiguration(self, save_type, registers=None, remote_id=None):
+        """Saves the Pozyx's configuration to its flash memory. See PozyxLib.saveConfiguration
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        if registers is None:
+            registers = Data([])
+        if not dataCheck(registers):
+            registers = Data(registers)
+        async with self.deviceLock():
+            await self.clearInterruptStatus()
+            status = await self.useFunction(PozyxRegisters.SAVE_FLASH_MEMORY, Data([save_type] + registers.data),
+                                            remote_id=remote_id)
+        if status != POZYX_SUCCESS:
+            return status
+        # give the device some time to save to flash memory
+        await asyncio.sleep(PozyxConstants.DELAY_FLASH)
+        return status
@@ -0,0 +1,851 @@
+#!/usr/bin/env python
+"""pypozyx.pozyx_simulator - contains a hardware-free simulated Pozyx network and the PozyxSimulator interface.
+
+The simulation consists of three parts:
+    - SimulatedNetwork: the shared UWB medium and clock of a set of simulated devices. The
+      latency and packet loss of the medium are given by a UWBLinkModel, which is configurable
+      per set of UWB settings.
+    - SimulatedPozyxDevice: a single Pozyx with a virtual register map, interrupt status, device
+      list, flash memory and RX/TX buffers. It performs ranging, positioning, discovery and
+      remote operations over the network, and understands the Pozyx serial text protocol.
+    - the interfaces to the devices: PozyxSimulator, a PozyxLib that accesses a simulated device
+      directly, and SimulatedSerialPort, a pty-backed fake serial device that lets PozyxSerial
+      (or any other serial client) talk to a simulated device over the real text protocol.
+
+Example usage:
+    >>> network = SimulatedNetwork(seed=1)
+    >>> for anchor_id, position in SIMULATED_ANCHORS:
+    ...     network.add_device(anchor_id, position, anchor=True)
+    >>> pozyx = PozyxSimulator(network=network, network_id=0x6000, position=(1000, 2000, 1000))
+    >>> device_range = DeviceRange()
+    >>> pozyx.doRanging(0x6001, device_range)
+
+    >>> with SimulatedSerialPort(network.add_device(0x6100)) as port:
+    ...     pozyx = PozyxSerial(port.name, suppress_warnings=True)
+
+With time_scale=0, the simulated time only advances by exchange_time on every transaction with
+a device, which makes the simulation deterministic for tests.
+
+The unit tests and benchmarks share a reference setup, the master at SIMULATED_LOCAL_ID, four
+anchors and optionally a remote tag, built by reference_network and served by reference_port.
+"""
+import os
+import struct
+import threading
+from binascii import hexlify, unhexlify
+from collections import deque
+from heapq import heappush, heappop
+from math import log10, sqrt
+from random import Random
+from select import select
+from time import perf_counter
+
+from pypozyx.definitions.bitmasks import PozyxBitmasks
+from pypozyx.definitions.constants import PozyxConstants, POZYX_SUCCESS, POZYX_FAILURE
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.lib import PozyxLib
+from pypozyx.structures.generic import SingleRegister, is_reg_writable
+
+# preamble symbols and symbol durations of the UWB settings' register values
+PREAMBLE_SYMBOLS = {0x04: 64, 0x14: 128, 0x24: 256, 0x34: 512, 0x08: 1024, 0x18: 1536, 0x28: 2048, 0x0C: 4096}
+BITRATES_BPS = {0: 110e3, 1: 850e3, 2: 6.81e6}
+SYMBOL_DURATIONS_S = {1: 993.59e-9, 2: 1017.63e-9}
+
+# device list flags
+DEVICE_FLAG_ANCHOR = 1
+DEVICE_FLAG_TAG = 2
+
+MAX_DEVICE_LIST_SIZE = 20
+MAC_OVERHEAD_BYTES = 12
+RANGING_FRAMES = {PozyxConstants.RANGE_PROTOCOL_PRECISION: 4, PozyxConstants.RANGE_PROTOCOL_FAST: 2}
+
+# the reference setup of the unit tests and benchmarks: four anchors, the master and a remote tag
+SIMULATED_ANCHORS = [(0x6001, (0, 0, 2000)), (0x6002, (5000, 0, 2000)),
+                     (0x6003, (0, 5000, 2000)), (0x6004, (5000, 5000, 500))]
+SIMULATED_LOCAL_ID = 0x6000
+SIMULATED_LOCAL_POSITION = (1000, 2000, 1000)
+SIMULATED_REMOTE_ID = 0x6100
+SIMULATED_REMOTE_POSITION = (2000, 1000, 0)
+SIMULATED_ANCHOR_IDS = [anchor_id for anchor_id, position in SIMULATED_ANCHORS]
+
+
+def uwb_key(channel, rates, plen):
+    """Returns the key identifying a set of UWB settings, the gain excluded, from the register values"""
+    return channel, rates & 0x3F, rates >> 6, plen
+
+
+class UWBLinkModel(object):
+    """Model of the UWB link for one set of UWB settings.
+
+    By default, the duration of a frame is its airtime under the UWB settings plus a
+    processing time, which can be overridden with a fixed latency.
+
+    Args:
+        latency (optional): fixed duration of a frame in seconds, overriding the airtime.
+        loss (optional): probability that a frame gets lost.
+        range_noise (optional): standard deviation of the range measurement noise in mm.
+        max_range (optional): distance in mm beyond which all frames get lost.
+        processing_time (optional): time in seconds a device needs to handle a frame.
+    """
+
+    def __init__(self, latency=None, loss=0.0, range_noise=30.0, max_range=60000, processing_time=0.0005):
+        self.latency = latency
+        self.loss = loss
+        self.range_noise = range_noise
+        self.max_range = max_range
+        self.processing_time = processing_time
+
+    def frame_time(self, uwb, payload_size=0):
+        """Returns the duration in seconds of a frame with payload_size bytes under the UWB settings key uwb"""
+        if self.latency is not None:
+            return self.latency
+        channel, bitrate, prf, plen = uwb
+        preamble = PREAMBLE_SYMBOLS.get(plen, 1024) * SYMBOL_DURATIONS_S.get(prf, SYMBOL_DURATIONS_S[2])
+        payload = (payload_size + MAC_OVERHEAD_BYTES) * 8 / BITRATES_BPS.get(bitrate, BITRATES_BPS[0])
+        return preamble + payload + self.processing_time
+
+    def delivers(self, distance, rng):
+        """Returns whether a frame over distance mm arrives"""
+        return distance <= self.max_range and rng.random() >= self.loss
+
+
+class SimulatedNetwork(object):
+    """The UWB medium and clock shared by a set of simulated Pozyx devices.
+
+    Args:
+        seed (optional): seed of the random generator for the packet loss and range noise.
+        time_scale (optional): speed of the simulated clock relative to the real one.
+            With 0, the simulated clock only advances by exchange_time per transaction.
+        exchange_time (optional): time in seconds the clock advances on every transaction
+            with a device, modelling the duration of the host's serial exchange.
+    """
+
+    def __init__(self, seed=None, time_scale=1.0, exchange_time=0.0):
+        self.random = Random(seed)
+        self.time_scale = time_scale
+        self.exchange_time = exchange_time
+        self.devices = {}
+        self.default_link_model = UWBLinkModel()
+        self.link_models = {}
+        self.lock = threading.RLock()
+        self._events = []
+        self._event_count = 0
+        self._start = perf_counter()
+        self._virtual_time = 0.0
+
+    def now(self):
+        """Returns the current simulated time in seconds"""
+        return self._virtual_time + (perf_counter() - self._start) * self.time_scale
+
+    def add_device(self, network_id, position=(0, 0, 0), anchor=False, **kwargs):
+        """Creates a SimulatedPozyxDevice at position (mm) in the network and returns it"""
+        device = SimulatedPozyxDevice(self, network_id, position, anchor, **kwargs)
+        self.devices[network_id] = device
+        return device
+
+    def set_link_model(self, uwb_settings, link_model):
+        """Sets the link model used by devices on the given UWBSettings, the gain is ignored"""
+        self.link_models[uwb_key(uwb_settings.channel, uwb_settings.bitrate + (uwb_settings.prf << 6),
+                                 uwb_settings.plen)] = link_model
+
+    def link_model(self, uwb):
+        return self.link_models.get(uwb, self.default_link_model)
+
+    def schedule(self, when, event):
+        """Schedules event, a function without arguments, to happen at simulated time when"""
+        self._event_count += 1
+        heappush(self._events, (when, self._event_count, event))
+
+    def transaction(self):
+        """Starts a host transaction: advances the clock and performs all events that are due"""
+        self._virtual_time += self.exchange_time
+        now = self.now()
+        while self._events and self._events[0][0] <= now:
+            heappop(self._events)[2]()
+
+    def distance(self, source, destination):
+        return sqrt(sum((a - b) ** 2 for a, b in zip(source.position, destination.position)))
+
+    def reachable(self, source, destination_id):
+        """Returns the destination device if it is on the same UWB settings as source, else None"""
+        destination = self.devices.get(destination_id)
+        if destination is None or destination is source or destination.uwb() != source.uwb():
+            return None
+        return destination
+
+    def transmit(self, source, destination_id, payload_size, deliver, start):
+        """Sends a frame from source, calling deliver(destination) when it arrives.
+
+        Returns:
+            the simulated time at which the frame is sent completely
+        """
+        uwb = source.uwb()
+        link = self.link_model(uwb)
+        end = start + link.frame_time(uwb, payload_size)
+        destination = self.reachable(source, destination_id)
+        if destination is not None and link.delivers(self.distance(source, destination), self.random):
+            self.schedule(end, lambda: deliver(destination))
+        return end
+
+    def range(self, source, destination_id, start):
+        """Performs a ranging exchange from source.
+
+        Returns:
+            (end, measurement) with end the simulated time the exchange finishes and measurement
+            None when a frame got lost, else (distance, RSS) of the destination.
+        """
+        uwb = source.uwb()
+        link = self.link_model(uwb)
+        frames = RANGING_FRAMES.get(source.registers[PozyxRegisters.RANGING_PROTOCOL], 4)
+        end = start + frames * link.frame_time(uwb)
+        destination = self.reachable(source, destination_id)
+        if destination is None:
+            return end, None
+        distance = self.distance(source, destination)
+        for i in range(frames):
+            if not link.delivers(distance, self.random):
+                return end, None
+        measured = max(0, int(round(distance + self.random.gauss(0, link.range_noise))))
+        rss = int(max(-110, min(-70, -79 - 20 * log10(max(distance, 100) / 1000.0))))
+        return end, (measured, rss)
+
+
+class SimulatedPozyxDevice(object):
+    """A simulated Pozyx device with a virtual register map.
+
+    The register map holds the registers from pypozyx.definitions.registers with sensible
+    defaults, of which the interrupt status is cleared on read. Register functions are
+    performed on the device's state, and functions that take time (ranging, positioning,
+    discovery) finish after the time their UWB frames take on the network, setting the
+    interrupt status. Positioning results in the true position plus noise of the size of
+    the range noise, if enough anchors in the device list could be ranged with.
+
+    Args:
+        network: the SimulatedNetwork the device is part of.
+        network_id: the device's network ID.
+        position (optional): the device's true position in mm.
+        anchor (optional): whether the device is an anchor instead of a tag.
+        firmware_version (optional): the firmware version register value.
+    """
+
+    def __init__(self, network, network_id, position=(0, 0, 0), anchor=False, firmware_version=0x13):
+        self.network = network
+        self.position = tuple(position)
+        self.anchor = anchor
+        self.firmware_version = firmware_version
+        self.saved_registers = {}
+        self.saved_devices = None
+        self.saved_anchor_ids = None
+        self.transactions = 0
+        self.reset(network_id)
+
+    # state
+
+    def reset(self, network_id=None):
+        """Resets the device's volatile state, restoring what was saved to flash"""
+        if network_id is None:
+            network_id = self.network_id
+        self.registers = bytearray(256)
+        registers = self.registers
+        registers[PozyxRegisters.WHO_AM_I] = 0x43
+        registers[PozyxRegisters.FIRMWARE_VERSION] = self.firmware_version
+        registers[PozyxRegisters.HARDWARE_VERSION] = (PozyxConstants.ANCHOR_MODE << 5 if self.anchor else 0) | 0x03
+        registers[PozyxRegisters.SELFTEST_RESULT] = 0x3F
+        registers[PozyxRegisters.INTERRUPT_MASK] = PozyxBitmasks.INT_MASK_ALL
+        registers[PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS] = 4 | (PozyxConstants.ANCHOR_SELECT_AUTO << 7)
+        registers[PozyxRegisters.POSITIONING_ALGORITHM] = PozyxConstants.DIMENSION_3D << 4
+        struct.pack_into('<H', registers, PozyxRegisters.NETWORK_ID, network_id)
+        registers[PozyxRegisters.UWB_CHANNEL] = 5
+        registers[PozyxRegisters.UWB_RATES] = PozyxConstants.UWB_BITRATE_110_KBPS | (PozyxConstants.UWB_PRF_64_MHZ << 6)
+        registers[PozyxRegisters.UWB_PLEN] = PozyxConstants.UWB_PLEN_1024
+        registers[PozyxRegisters.UWB_GAIN] = 23
+        registers[PozyxRegisters.OPERATION_MODE] = 1 if self.anchor else 0
+        struct.pack_into('<Ihhhhhhhhhhhhhhhhhhhhhhb', registers, PozyxRegisters.PRESSURE, 101325000,
+                         0, 0, 1000, 320, 0, -640, 0, 0, 0, 0, 0, 0, 16384, 0, 0, 0, 0, 0, 0, 0, 0, 1000, 25)
+        for address, value in self.saved_registers.items():
+            registers[address] = value
+        self.network_id = struct.unpack_from('<H', registers, PozyxRegisters.NETWORK_ID)[0]
+        self.devices = dict(self.saved_devices) if self.saved_devices is not None else {}
+        self.device_ids = sorted(self.devices)
+        self.anchor_ids = list(self.saved_anchor_ids) if self.saved_anchor_ids is not None else []
+        self.ranges = {}
+        self.positioning_ranges = []
+        self.rx_buffer = bytearray()
+        self.tx_buffer = bytearray()
+        self.busy_until = 0.0
+        self.update_device_list_size()
+
+    def uwb(self):
+        """Returns the key of the device's current UWB settings"""
+        return uwb_key(self.registers[PozyxRegisters.UWB_CHANNEL], self.registers[PozyxRegisters.UWB_RATES],
+                       self.registers[PozyxRegisters.UWB_PLEN])
+
+    def set_interrupt(self, flags, error_code=None):
+        self.registers[PozyxRegisters.INTERRUPT_STATUS] |= flags
+        if error_code is not None:
+            self.registers[PozyxRegisters.INTERRUPT_STATUS] |= PozyxBitmasks.INT_STATUS_ERR
+            self.registers[PozyxRegisters.ERROR_CODE] = error_code
+
+    def timestamp(self, when):
+        return int(when * 1000) & 0xFFFFFFFF
+
+    def update_device_list_size(self):
+        self.registers[PozyxRegisters.DEVICE_LIST_SIZE] = len(self.device_ids)
+
+    def add_device(self, network_id, flag, coordinates):
+        if network_id not in self.devices:
+            if len(self.device_ids) >= MAX_DEVICE_LIST_SIZE:
+                return POZYX_FAILURE
+            self.device_ids.append(network_id)
+        self.devices[network_id] = (flag, coordinates)
+        self.update_device_list_size()
+        return POZYX_SUCCESS
+
+    # register access
+
+    def read(self, address, size):
+        """Reads size bytes from the register map starting at address, clearing the interrupt status"""
+        data = bytes(self.registers[address:address + size]).ljust(size, b'\x00')
+        if address <= PozyxRegisters.INTERRUPT_STATUS < address + size:
+            self.registers[PozyxRegisters.INTERRUPT_STATUS] = 0
+        return data
+
+    def write(self, address, data):
+        """Writes data to the register map starting at address, returning POZYX_FAILURE if not all writable"""
+        status = POZYX_SUCCESS
+        for index, value in enumerate(bytearray(data)):
+            if is_reg_writable(address + index) and address + index < len(self.registers):
+                self.registers[address + index] = value
+            else:
+                status = POZYX_FAILURE
+        if address <= PozyxRegisters.NETWORK_ID + 1 and address + len(data) > PozyxRegisters.NETWORK_ID:
+            self.change_network_id(struct.unpack_from('<H', self.registers, PozyxRegisters.NETWORK_ID)[0])
+        return status
+
+    def change_network_id(self, network_id):
+        if self.network.devices.get(self.network_id) is self:
+            del self.network.devices[self.network_id]
+        self.network_id = network_id
+        self.network.devices[network_id] = self
+
+    def function(self, address, params, source=None):
+        """Performs the register function at address with the params bytes.
+
+        Args:
+            source (optional): the network ID of the device that called the function remotely.
+
+        Returns:
+            (status, output bytes)
+        """
+        handler = self.FUNCTIONS.get(address)
+        if handler is None:
+            return POZYX_FAILURE, b''
+        try:
+            return handler(self, bytes(params), source)
+        except struct.error:
+            self.registers[PozyxRegisters.ERROR_CODE] = 0x0D
+            return POZYX_FAILURE, b''
+
+    # host transactions
+
+    def host_read(self, address, size):
+        with self.network.lock:
+            self.network.transaction()
+            self.transactions += 1
+            return self.read(address, size)
+
+    def host_write(self, address, data):
+        with self.network.lock:
+            self.network.transaction()
+            self.transactions += 1
+            return self.write(address, data)
+
+    def host_function(self, address, params, size):
+        """Performs a function for the host, returning the status and the output padded to size bytes"""
+        with self.network.lock:
+            self.network.transaction()
+            self.transactions += 1
+            status, output = self.function(address, params)
+            return status, bytes(output[:size]).ljust(size, b'\x00')
+
+    def handle_line(self, line):
+        """Handles a line of the Pozyx serial text protocol, returning the response line or None"""
+        fields = line.strip().split(',')
+        try:
+            if fields[0] == 'R':
+                data = self.host_read(int(fields[1], 16), int(fields[2]))
+                return 'D,%s\r\n' % hexlify(data).decode()
+            elif fields[0] == 'W':
+                self.host_write(int(fields[1], 16), unhexlify(fields[2]))
+                return None
+            elif fields[0] == 'F':
+                size = int(fields[3]) - 1
+                status, output = self.host_function(int(fields[1], 16), unhexlify(fields[2]), size)
+                return 'D,%0.2x%s\r\n' % (status, hexlify(output).decode())
+        except (IndexError, ValueError, TypeError):
+            pass
+        return 'E,\r\n'
+
+    # remote communication
+
+    def send(self, destination_id, payload, flags, start=None):
+        """Sends payload to the RX buffer of the destination, setting flags there on arrival"""
+        if start is None:
+            start = self.network.now()
+        source_id = self.network_id
+
+        def deliver(destination):
+            destination.receive_data(source_id, payload, flags)
+        return self.network.transmit(self, destination_id, len(payload), deliver, start)
+
+    def receive_data(self, source_id, payload, flags):
+        self.rx_buffer = bytearray(payload)
+        struct.pack_into('<HB', self.registers, PozyxRegisters.RX_NETWORK_ID, source_id, len(payload))
+        self.set_interrupt(flags)
+
+    def receive_operation(self, source_id, operation, payload):
+        """Performs a remote operation received from source_id and answers it"""
+        if operation == PozyxConstants.REMOTE_DATA:
+            self.receive_data(source_id, payload, PozyxBitmasks.INT_STATUS_RX_DATA)
+            return
+        if operation == PozyxConstants.REMOTE_READ:
+            reply = self.read(payload[0], payload[1])
+        elif operation == PozyxConstants.REMOTE_WRITE:
+            reply = bytearray([self.write(payload[0], payload[1:])])
+        elif operation == PozyxConstants.REMOTE_FUNCTION:
+            status, output = self.function(payload[0], payload[1:], source=source_id)
+            reply = bytearray([status]) + bytearray(output)
+        else:
+            return
+        processing_time = self.network.link_model(self.uwb()).processing_time
+        self.send(source_id, bytes(reply), PozyxBitmasks.INT_STATUS_FUNC | PozyxBitmasks.INT_STATUS_RX_DATA,
+                  self.network.now() + processing_time)
+
+    def finish(self, source, local_flags, result=None, error_code=None, remote_payload=b''):
+        """Finishes a time-consuming function, either locally or by notifying the remote caller"""
+        if source is None:
+            self.set_interrupt(local_flags, error_code)
+        elif error_code is None:
+            self.send(source, remote_payload, PozyxBitmasks.INT_STATUS_RX_DATA)
+
+    # register functions
+
+    def fn_reset_system(self, params, source):
+        self.reset()
+        return POZYX_SUCCESS, b''
+
+    def fn_led_control(self, params, source):
+        return POZYX_SUCCESS, b''
+
+    def fn_write_tx_data(self, params, source):
+        offset, data = params[0], params[1:]
+        if offset + len(data) > PozyxConstants.MAX_BUF_SIZE:
+            return POZYX_FAILURE, b''
+        if len(self.tx_buffer) < offset + len(data):
+            self.tx_buffer.extend(bytearray(offset + len(data) - len(self.tx_buffer)))
+        self.tx_buffer[offset:offset + len(data)] = data
+        return POZYX_SUCCESS, b''
+
+    def fn_send_tx_data(self, params, source):
+        destination_id, operation = struct.unpack('<HB', params[:3])
+        payload, self.tx_buffer = bytes(self.tx_buffer), bytearray()
+        source_id = self.network_id
+
+        def deliver(destination):
+            destination.receive_operation(source_id, operation, payload)
+        self.network.transmit(self, destination_id, len(payload), deliver, self.network.now())
+        return POZYX_SUCCESS, b''
+
+    def fn_read_rx_data(self, params, source):
+        offset, size = params[0], params[1]
+        return POZYX_SUCCESS, bytes(self.rx_buffer[offset:offset + size]).ljust(size, b'\x00')
+
+    def fn_do_ranging(self, params, source):
+        destination_id = struct.unpack('<H', params[:2])[0]
+        now = self.network.now()
+        end, measurement = self.network.range(self, destination_id, max(now, self.busy_until))
+        self.busy_until = end
+
+        def done():
+            if measurement is None:
+                self.finish(source, PozyxBitmasks.INT_STATUS_FUNC, error_code=0x11)
+                return
+            if destination_id not in self.devices:
+                self.add_device(destination_id, DEVICE_FLAG_TAG, (0, 0, 0))
+            self.ranges[destination_id] = (self.timestamp(end),) + measurement
+            # a remote ranging answers with the device_range_t: timestamp, distance and RSS
+            self.finish(source, PozyxBitmasks.INT_STATUS_FUNC,
+                        remote_payload=struct.pack('<IIh', *self.ranges[destination_id]))
+        self.network.schedule(end, done)
+        return POZYX_SUCCESS, b''
+
+    def positioning_anchors(self):
+        number_of_anchors = self.registers[PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS] & 0x7F
+        if self.registers[PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS] >> 7 == PozyxConstants.ANCHOR_SELECT_MANUAL:
+            return self.anchor_ids[:number_of_anchors]
+        return [network_id for network_id in self.device_ids
+                if self.devices[network_id][0] == DEVICE_FLAG_ANCHOR][:number_of_anchors]
+
+    def fn_do_positioning(self, params, source):
+        flags = struct.unpack('<H', params[:2])[0] if len(params) >= 2 else 1
+        dimension = self.registers[PozyxRegisters.POSITIONING_ALGORITHM] >> 4
+        required_anchors = 4 if dimension == PozyxConstants.DIMENSION_3D else 3
+        end = max(self.network.now(), self.busy_until)
+        measurements = []
+        for anchor_id in self.positioning_anchors():
+            end, measurement = self.network.range(self, anchor_id, end)
+            if measurement is not None:
+                measurements.append((anchor_id, self.timestamp(end)) + measurement)
+        self.busy_until = end
+        noise = self.network.link_model(self.uwb()).range_noise / sqrt(max(1, len(measurements)))
+        estimate = [int(round(value + self.network.random.gauss(0, noise))) for value in self.position]
+
+        def done():
+            if len(measurements) < required_anchors:
+                self.finish(source, PozyxBitmasks.INT_STATUS_POS, error_code=0x0A)
+                return
+            if dimension == PozyxConstants.DIMENSION_2D:
+                estimate[2] = 0
+            elif dimension == PozyxConstants.DIMENSION_2_5D:
+                estimate[2] = struct.unpack_from('<i', self.registers, PozyxRegisters.POSITION_Z)[0]
+            struct.pack_into('<iii', self.registers, PozyxRegisters.POSITION_X, *estimate)
+            for anchor_id, timestamp, distance, rss in measurements:
+                self.ranges[anchor_id] = (timestamp, distance, rss)
+            self.positioning_ranges = [(anchor_id, distance) for anchor_id, timestamp, distance, rss in measurements]
+            self.finish(source, PozyxBitmasks.INT_STATUS_POS, remote_payload=self.positioning_data(flags))
+        self.network.schedule(end, done)
+        return POZYX_SUCCESS, b''
+
+    # positioning data sources, in the order of PositioningData.SENSOR_ORDER
+    POSITIONING_DATA_SOURCES = [(PozyxRegisters.POSITION_X, 12), (PozyxRegisters.ACCELERATION_X, 6),
+                                (PozyxRegisters.GYRO_X, 6), (PozyxRegisters.MAGNETIC_X, 6),
+                                (PozyxRegisters.EULER_ANGLE_HEADING, 6), (PozyxRegisters.QUATERNION_W, 8),
+                                (PozyxRegisters.LINEAR_ACCELERATION_X, 6), (PozyxRegisters.GRAVITY_VECTOR_X, 6),
+                                (PozyxRegisters.PRESSURE, 4), (PozyxRegisters.MAX_LINEAR_ACCELERATION, 2)]
+
+    def positioning_data(self, flags):
+        """Returns the data of the last positioning as requested by the PositioningData flags"""
+        data = bytearray()
+        for index, (address, size) in enumerate(self.POSITIONING_DATA_SOURCES):
+            if flags & (1 << index):
+                data += self.registers[address:address + size]
+                if index == 0:
+                    data.append(0)
+        if flags & (1 << 15):
+            data.append(len(self.positioning_ranges))
+            for anchor_id, distance in self.positioning_ranges:
+                data += struct.pack('<HI', anchor_id, distance)
+        return bytes(data)
+
+    def fn_do_positioning_with_data(self, params, source):
+        return POZYX_SUCCESS, self.positioning_data(struct.unpack('<H', params[:2])[0])
+
+    def fn_set_positioning_anchor_ids(self, params, source):
+        self.anchor_ids = list(struct.unpack('<%iH' % (len(params) // 2), params[:len(params) // 2 * 2]))
+        return POZYX_SUCCESS, b''
+
+    def fn_get_positioning_anchor_ids(self, params, source):
+        return POZYX_SUCCESS, struct.pack('<%iH' % len(self.anchor_ids), *self.anchor_ids)
+
+    def fn_reset_flash_memory(self, params, source):
+        self.saved_registers, self.saved_devices, self.saved_anchor_ids = {}, None, None
+        return POZYX_SUCCESS, b''
+
+    def fn_save_flash_memory(self, params, source):
+        save_type = params[0]
+        if save_type in (PozyxConstants.FLASH_SAVE_REGISTERS, PozyxConstants.FLASH_SAVE_ALL):
+            for address in bytearray(params[1:]):
+                if not is_reg_writable(address):
+                    return POZYX_FAILURE, b''
+                self.saved_registers[address] = self.registers[address]
+        if save_type in (PozyxConstants.FLASH_SAVE_ANCHOR_IDS, PozyxConstants.FLASH_SAVE_ALL):
+            self.saved_anchor_ids = list(self.anchor_ids)
+        if save_type in (PozyxConstants.FLASH_SAVE_NETWORK, PozyxConstants.FLASH_SAVE_ALL):
+            self.saved_devices = dict(self.devices)
+        return POZYX_SUCCESS, b''
+
+    def fn_get_flash_details(self, params, source):
+        details = bytearray(20)
+        for address in self.saved_registers:
+            details[address // 8] |= 1 << (address % 8)
+        return POZYX_SUCCESS, bytes(details)
+
+    def fn_do_aloha(self, params, source):
+        return POZYX_SUCCESS, b''
+
+    def fn_get_device_list_ids(self, params, source):
+        offset, size = params[0], params[1]
+        device_ids = self.device_ids[offset:offset + size]
+        return POZYX_SUCCESS, struct.pack('<%iH' % len(device_ids), *device_ids)
+
+    def fn_do_discovery(self, params, source):
+        discovery_type, slots, slot_duration = bytearray(params[:3])
+        link = self.network.link_model(self.uwb())
+        if slot_duration == 0:
+            slot_duration = 1000 * 2 * link.frame_time(self.uwb())
+        end = max(self.network.now(), self.busy_until) + slots * slot_duration / 1000.0
+        self.busy_until = end
+        found = []
+        for network_id, device in sorted(self.network.devices.items()):
+            if self.network.reachable(self, network_id) is None:
+                continue
+            if discovery_type == PozyxConstants.DISCOVERY_ANCHORS_ONLY and not device.anchor:
+                continue
+            if discovery_type == PozyxConstants.DISCOVERY_TAGS_ONLY and device.anchor:
+                continue
+            if link.delivers(self.network.distance(self, device), self.network.random):
+                found.append((network_id, DEVICE_FLAG_ANCHOR if device.anchor else DEVICE_FLAG_TAG))
+
+        def done():
+            for network_id, flag in found:
+                if network_id not in self.devices:
+                    self.add_device(network_id, flag, (0, 0, 0))
+            self.finish(source, PozyxBitmasks.INT_STATUS_FUNC)
+        self.network.schedule(end, done)
+        return POZYX_SUCCESS, b''
+
+    def fn_clear_devices(self, params, source):
+        self.devices, self.device_ids, self.ranges = {}, [], {}
+        self.update_device_list_size()
+        return POZYX_SUCCESS, b''
+
+    def fn_add_device(self, params, source):
+        network_id, flag, x, y, z = struct.unpack('<HBiii', params[:15])
+        return self.add_device(network_id, flag, (x, y, z)), b''
+
+    def fn_get_device_coordinates(self, params, source):
+        network_id = struct.unpack('<H', params[:2])[0]
+        if network_id not in self.devices:
+            return POZYX_FAILURE, b''
+        return POZYX_SUCCESS, struct.pack('<iii', *self.devices[network_id][1])
+
+    def fn_get_device_range_info(self, params, source):
+        network_id = struct.unpack('<H', params[:2])[0]
+        if network_id not in self.ranges:
+            return POZYX_FAILURE, b''
+        return POZYX_SUCCESS, struct.pack('<IIh', *self.ranges[network_id])
+
+    FUNCTIONS = {
+        PozyxRegisters.RESET_SYSTEM: fn_reset_system,
+        PozyxRegisters.LED_CONTROL: fn_led_control,
+        PozyxRegisters.WRITE_TX_DATA: fn_write_tx_data,
+        PozyxRegisters.SEND_TX_DATA: fn_send_tx_data,
+        PozyxRegisters.READ_RX_DATA: fn_read_rx_data,
+        PozyxRegisters.DO_RANGING: fn_do_ranging,
+        PozyxRegisters.DO_POSITIONING: fn_do_positioning,
+        PozyxRegisters.SET_POSITIONING_ANCHOR_IDS: fn_set_positioning_anchor_ids,
+        PozyxRegisters.GET_POSITIONING_ANCHOR_IDS: fn_get_positioning_anchor_ids,
+        PozyxRegisters.RESET_FLASH_MEMORY: fn_reset_flash_memory,
+        PozyxRegisters.SAVE_FLASH_MEMORY: fn_save_flash_memory,
+        PozyxRegisters.GET_FLASH_DETAILS: fn_get_flash_details,
+        PozyxRegisters.DO_ALOHA: fn_do_aloha,
+        PozyxRegisters.GET_DEVICE_LIST_IDS: fn_get_device_list_ids,
+        PozyxRegisters.DO_DISCOVERY: fn_do_discovery,
+        PozyxRegisters.CLEAR_DEVICES: fn_clear_devices,
+        PozyxRegisters.ADD_DEVICE: fn_add_device,
+        PozyxRegisters.GET_DEVICE_COORDINATES: fn_get_device_coordinates,
+        PozyxRegisters.GET_DEVICE_RANGE_INFO: fn_get_device_range_info,
+        PozyxRegisters.DO_POSITIONING_WITH_DATA: fn_do_positioning_with_data,
+    }
+
+
+class SimulatedSerialPort(object):
+    """A pty-backed fake serial device, serving the Pozyx serial text protocol of a simulated device.
+
+    The slave end of the pty can be opened by name like any serial port, for instance by
+    PozyxSerial, which has to be created with suppress_warnings=True as the pty isn't
+    a recognized Pozyx port. POSIX only.
+
+    Args:
+        device: the SimulatedPozyxDevice to serve.
+        latency (optional): delay in seconds before each response is sent, modelling the
+            USB round trip. Responses to commands sent back-to-back overlap their latency.
+    """
+
+    def __init__(self, device, latency=0.0):
+        import tty
+        self.device = device
+        self.latency = latency
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.name = os.ttyname(self.slave)
+        self.running = True
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def serve(self):
+        received = b''
+        responses = deque()
+        while self.running:
+            timeout = 0.05 if not responses else max(0.0, responses[0][0] - perf_counter())
+            try:
+                readable = select([self.master], [], [], timeout)[0]
+                if readable:
+                    received += os.read(self.master, 4096)
+                    while b'\r' in received:
+                        line, received = received.split(b'\r', 1)
+                        response = self.device.handle_line(line.decode())
+                        if response is not None:
+                            responses.append((perf_counter() + self.latency, response.encode()))
+                while responses and responses[0][0] <= perf_counter():
+                    os.write(self.master, responses.popleft()[1])
+            except (OSError, ValueError):
+                break
+
+    def close(self):
+        """Stops serving and closes the pty"""
+        self.running = False
+        self.thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PozyxSimulator(PozyxLib):
+    """This class provides a simulated Pozyx interface, without any hardware.
+    All functionality from PozyxLib and PozyxCore is included.
+
+    It accesses the register map of a SimulatedPozyxDevice directly. When no device is
+    passed, one is created with the given network ID and position in the given network,
+    or in a new SimulatedNetwork.
+
+    Args:
+        device (optional): the SimulatedPozyxDevice to use as the local Pozyx.
+        network (optional): the SimulatedNetwork to create the local device in.
+        network_id (optional): network ID of the created local device.
+        position (optional): true position of the created local device in mm.
+        print_output (optional): boolean for printing the exchanges, mainly for debugging purposes
+        suppress_warnings (optional): boolean for suppressing warnings in the Pozyx use, usage not recommended
+
+    Example usage:
+        >>> pozyx = PozyxSimulator()
+        >>> network = pozyx.device.network
+        >>> network.add_device(0x6001, (3000, 0, 0), anchor=True)
+        >>> pozyx.doRanging(0x6001, DeviceRange())
+    """
+
+    def __init__(self, device=None, network=None, network_id=0x6000, position=(0, 0, 0),
+                 print_output=False, suppress_warnings=False):
+        super(PozyxSimulator, self).__init__()
+        if device is None:
+            if network is None:
+                network = SimulatedNetwork()
+            device = network.add_device(network_id, position)
+        self.device = device
+        self.print_output = print_output
+        self.suppress_warnings = suppress_warnings
+
+    def regWrite(self, address, data):
+        """
+        Writes data to the simulated Pozyx registers, starting at a register address.
+
+        Args:
+            address: Register address to start writing at.
+            data: Data to write to the Pozyx registers.
+                Has to be ByteStructure-derived object.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE
+        """
+        data.load_hex_string()
+        return self.device.host_write(address, unhexlify(data.byte_data))
+
+    def regRead(self, address, data):
+        """
+        Reads data from the simulated Pozyx registers, starting at a register address.
+
+        Args:
+            address: Register address to start reading at.
+            data: Container for the read data. Has to be ByteStructure-derived object.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE
+        """
+        data.load_bytes(hexlify(self.device.host_read(address, data.byte_size)).decode())
+        return POZYX_SUCCESS
+
+    def regFunction(self, address, params, data):
+        """
+        Performs a register function on the simulated Pozyx.
+
+        Args:
+            address: Register function address of function to perform.
+            params: Parameters for the register function.
+                Has to be ByteStructure-derived object.
+            data: Container for the data the register function returns.
+                Has to be ByteStructure-derived object.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE
+        """
+        params.load_hex_string()
+        status, output = self.device.host_function(address, unhexlify(params.byte_data), data.byte_size)
+        if len(data) > 0:
+            data.load_bytes(hexlify(output).decode())
+        return status
+
+    def serialExchange(self, s):
+        """
+        Auxiliary. Performs a serial text protocol exchange with the simulated Pozyx.
+
+        Args:
+            s: Serial message to send to the Pozyx
+        Returns:
+            Serial message the Pozyx returns, stripped from 'D,' at its start
+                and NL+CR at the end.
+        """
+        response = self.device.handle_line(s)
+        if self.print_output:
+            print('The response to %s is %s.' % (s.strip(), str(response).strip()))
+        if response is None or response[0] != 'D':
+            raise IOError("Invalid simulated Pozyx exchange")
+        return response[2:-2]
+
+    def waitForFlag(self, interrupt_flag, timeout_s, interrupt=None):
+        """
+        Waits for a certain interrupt flag to be triggered, indicating that
+        that type of interrupt occured.
+
+        Args:
+            interrupt_flag: Flag indicating interrupt type.
+            timeout_s: time in seconds that POZYX_INT_STATUS will be checked
+                for the flag before returning POZYX_TIMEOUT.
+
+        Kwargs:
+            interrupt: Container for the POZYX_INT_STATUS data
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        if interrupt is None:
+            interrupt = SingleRegister()
+        return self.waitForFlagSafe(interrupt_flag, timeout_s, interrupt)
+
+
+def reference_network(remote_id=None, real_time=False, **kwargs):
+    """Returns a SimulatedNetwork of the reference setup, seeded with 0, with the SIMULATED_ANCHORS
+    and, when given, the remote tag remote_id at SIMULATED_REMOTE_POSITION.
+
+    Unless real_time, the simulated clock only advances by 1 ms per transaction with a device, so
+    the network is deterministic and never sleeps, like the unit tests need. Benchmarks timing
+    the UWB frames use real_time. The keyword arguments are passed to SimulatedNetwork.
+    """
+    settings = dict(seed=0) if real_time else dict(seed=0, time_scale=0, exchange_time=0.001)
+    settings.update(kwargs)
+    network = SimulatedNetwork(**settings)
+    for anchor_id, position in SIMULATED_ANCHORS:
+        network.add_device(anchor_id, position, anchor=True)
+    if remote_id is not None:
+        network.add_device(remote_id, SIMULATED_REMOTE_POSITION)
+    return network
+
+
+def reference_port(network, latency=0.0, network_id=SIMULATED_LOCAL_ID, position=SIMULATED_LOCAL_POSITION):
+    """Returns a SimulatedSerialPort serving a new device network_id in the network, the master by default"""
+    return SimulatedSerialPort(network.add_device(network_id, position), latency)
@@ -0,0 +1,936 @@
+#!/usr/bin/env python
+"""pypozyx.pozyxd - contains PozyxDaemon, sharing one Pozyx between processes, and its PozyxClient.
+
+Only one process can open the serial port of a Pozyx. The daemon owns the interface and serves
+any number of local clients over a Unix domain socket, with a compact binary protocol of
+length-prefixed frames:
+
+- a request is a little endian header (request ID u32, opcode u8, priority u8, address u8,
+  timeout f32 in seconds, 0 for none) followed by the payload of its opcode: the size u16 to
+  read, the bytes to write, or the size u16 of the returned data followed by the parameters of a
+  register function.
+- a reply or stream event is a header (request ID u32, kind u8, status u8) followed by the read
+  or returned bytes, or the packed event.
+
+PozyxClient is a PozyxLib forwarding regRead, regWrite and regFunction to the daemon, so it's
+used like PozyxSerial. The daemon executes the register operations of all clients one at a time
+by priority, PRIORITY_CONTROL first and PRIORITY_DIAGNOSTICS last, and answers identical reads
+that are waiting at the same time with a single read of the device. Operations still waiting
+when the timeout of their client has passed are dropped, as the client gave up on them.
+
+Operations that span several register operations and wait on interrupt flags, like doRanging,
+doPositioning and the remote register functions, run with the device locked to the client, as
+they would interfere with the operations of other clients. Other sequences can be locked with
+exclusive().
+
+Ranging and positioning streams are run by the daemon itself and fanned out to every client
+subscribed to the same stream, so several clients using the same ranges don't multiply the
+ranging work.
+
+Run the daemon with:
+    python -m pypozyx.pozyxd [--port PORT | --simulator] [--socket PATH]
+
+Example usage:
+    >>> pozyx = PozyxClient('/tmp/pozyxd.sock', priority=PRIORITY_CONTROL)
+    >>> pozyx.doRanging(0x6e30, device_range)
+    >>> with pozyx.exclusive():
+    ...     pozyx.clearDevices()
+    ...     pozyx.addDevice(anchor)
+    >>> for measurement in pozyx.subscribeRanging([0x6e30, 0x6e31], rate=10):
+    ...     print(measurement.destination, measurement.distance)
+"""
+import os
+import socket
+from argparse import ArgumentParser
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from heapq import heapify, heappush
+from itertools import count
+from struct import Struct
+from threading import Condition, Event, RLock, Thread, current_thread
+from time import perf_counter, sleep
+
+from pypozyx.core import PozyxConnectionError
+from pypozyx.definitions.constants import POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+from pypozyx.lib import ATOMIC_OPERATIONS, PozyxLib
+from pypozyx.multitag import PositioningResult
+from pypozyx.structures.device import RangeMeasurement
+from pypozyx.structures.generic import Data, SingleRegister
+from pypozyx.structures.sensor_data import Coordinates
+
+DEFAULT_SOCKET_PATH = '/tmp/pozyxd.sock'
+
+PRIORITY_CONTROL = 0
+PRIORITY_NORMAL = 1
+PRIORITY_DIAGNOSTICS = 2
+
+OP_READ = 1
+OP_WRITE = 2
+OP_FUNCTION = 3
+OP_LOCK = 4
+OP_UNLOCK = 5
+OP_SUBSCRIBE = 6
+OP_UNSUBSCRIBE = 7
+
+KIND_REPLY = 0
+KIND_EVENT = 1
+
+STREAM_RANGING = 1
+STREAM_POSITIONING = 2
+
+FRAME_LENGTH = Struct('<H')
+REQUEST_HEADER = Struct('<IBBBf')
+REPLY_HEADER = Struct('<IBB')
+SIZE = Struct('<H')
+# has remote, remote ID, rate (0 for as fast as possible), amount of device IDs, followed by the IDs
+SUBSCRIPTION = Struct('<BHfB')
+DEVICE_ID = Struct('<H')
+# destination, timestamp, distance, RSS
+RANGE_EVENT = Struct('<HIIh')
+# has tag ID, tag ID, x, y, z, latency
+POSITION_EVENT = Struct('<BHiiif')
+
+# the operations that must not be interleaved with those of other clients: the atomic operations of
+# PozyxLib, and the ones configuring or waiting on the device's interrupt flags with several exchanges
+EXCLUSIVE_OPERATIONS = ATOMIC_OPERATIONS + ['clearConfiguration', 'doRangingSlave', 'doPositioningSlave',
+                                            'doPositioningWithDataSlave']
+
+
+def send_frame(sock, body):
+    """Sends a length-prefixed frame"""
+    sock.sendall(FRAME_LENGTH.pack(len(body)) + body)
+
+
+def receive_exactly(sock, size):
+    """Returns size bytes received from sock, or None when the connection closed first"""
+    received = b''
+    while len(received) < size:
+        chunk = sock.recv(size - len(received))
+        if not chunk:
+            return None
+        received += chunk
+    return received
+
+
+def receive_frame(sock):
+    """Returns the body of the next frame, or None when the connection closed"""
+    length = receive_exactly(sock, FRAME_LENGTH.size)
+    if length is None:
+        return None
+    return receive_exactly(sock, FRAME_LENGTH.unpack(length)[0])
+
+
+def byte_container(payload):
+    """Returns the bytes of payload as a Data of UINT8"""
+    return Data(list(bytearray(payload)))
+
+
+def container_bytes(data):
+    """Returns the bytes of a Data of UINT8"""
+    return bytes(bytearray(data.data))
+
+
+class DeviceJob(object):
+    """A register operation of a session, waiting to be executed on the device.
+
+    Attributes:
+        session: the session that submitted the job.
+        opcode: OP_READ, OP_WRITE or OP_FUNCTION.
+        priority: the priority of the job, lower goes first.
+        address: the register address.
+        payload: the size to read, the bytes to write, or the (params, size) of a function.
+        callbacks: functions called with the status and returned bytes once executed.
+        deadline: perf_counter time after which nobody waits for the job anymore, None for never.
+    """
+    __slots__ = ['session', 'opcode', 'priority', 'address', 'payload', 'callbacks', 'deadline', 'taken']
+
+    def __init__(self, session, opcode, priority, address, payload, callback, deadline=None):
+        self.session = session
+        self.opcode = opcode
+        self.priority = priority
+        self.address = address
+        self.payload = payload
+        self.callbacks = [callback]
+        self.deadline = deadline
+        self.taken = False
+
+
+class DeviceScheduler(object):
+    """Orders the jobs of all sessions by priority, coalesces identical reads and grants exclusive locks.
+
+    Jobs of equal priority are executed in submission order. While a session holds the lock,
+    only its jobs are executed, and the jobs of other sessions wait. Jobs past their deadline
+    are dropped instead of executed.
+    """
+
+    def __init__(self):
+        self.condition = Condition()
+        self.queue = []
+        self.sequence = count()
+        self.pending_reads = {}
+        self.owner = None
+        self.lock_depth = 0
+        self.lock_waiters = []
+        self.closed = False
+        self.submitted = 0
+        self.coalesced = 0
+        self.expired = 0
+
+    def put(self, job):
+        """Queues a job, or attaches it to an identical read waiting to be executed"""
+        with self.condition:
+            self.submitted += 1
+            if job.opcode == OP_READ:
+                key = (job.address, job.payload)
+                pending = self.pending_reads.get(key)
+                if pending is not None and self.may_share(pending, job):
+                    pending.callbacks += job.callbacks
+                    if pending.deadline is not None:
+                        pending.deadline = None if job.deadline is None else max(pending.deadline, job.deadline)
+                    self.coalesced += 1
+                    if job.priority < pending.priority:
+                        # the read is queued once more at the higher priority, the first one taken is executed
+                        pending.priority = job.priority
+                        heappush(self.queue, (job.priority, next(self.sequence), pending))
+                        self.condition.notify_all()
+                    return
+                self.pending_reads[key] = job
+            heappush(self.queue, (job.priority, next(self.sequence), job))
+            self.condition.notify_all()
+
+    def may_share(self, pending, job):
+        if self.owner is None:
+            return True
+        return pending.session is self.owner and job.session is self.owner
+
+    def runnable(self, job):
+        return not job.taken and (self.owner is None or job.session is self.owner)
+
+    def take(self, timeout=None):
+        """Returns the next job to execute, waiting for one, or None when closed"""
+        with self.condition:
+            while not self.closed:
+                self.queue = [entry for entry in self.queue if not entry[2].taken]
+                heapify(self.queue)
+                now = perf_counter()
+                for entry in sorted(self.queue):
+                    job = entry[2]
+                    if self.runnable(job):
+                        job.taken = True
+                        if job.opcode == OP_READ and self.pending_reads.get((job.address, job.payload)) is job:
+                            del self.pending_reads[(job.address, job.payload)]
+                        if job.deadline is not None and now > job.deadline:
+                            # its client timed out and doesn't wait for the reply anymore
+                            self.expired += 1
+                            continue
+                        return job
+                if not self.condition.wait(timeout) and timeout is not None:
+                    return None
+            return None
+
+    def acquire(self, session, priority, callback):
+        """Locks the device to a session, calling callback with the status once granted. Locks nest."""
+        with self.condition:
+            if self.owner is None or self.owner is session:
+                self.owner = session
+                self.lock_depth += 1
+                self.condition.notify_all()
+                callback(POZYX_SUCCESS)
+                return
+            heappush(self.lock_waiters, (priority, next(self.sequence), session, callback))
+
+    def release(self, session):
+        """Releases a lock of a session, granting it to the next session waiting, by priority"""
+        with self.condition:
+            if self.owner is not session:
+                return POZYX_FAILURE
+            self.lock_depth -= 1
+            if self.lock_depth == 0:
+                self.grant_next()
+            return POZYX_SUCCESS
+
+    def grant_next(self):
+        self.owner = None
+        if self.lock_waiters:
+            priority, sequence, session, callback = sorted(self.lock_waiters)[0]
+            self.lock_waiters.remove((priority, sequence, session, callback))
+            heapify(self.lock_waiters)
+            self.owner = session
+            self.lock_depth = 1
+            callback(POZYX_SUCCESS)
+        self.condition.notify_all()
+
+    def drop(self, session):
+        """Forgets the jobs and lock of a session that went away"""
+        with self.condition:
+            for priority, sequence, job in self.queue:
+                if job.session is session and len(job.callbacks) == 1:
+                    job.taken = True
+            self.pending_reads = {key: job for key, job in self.pending_reads.items() if not job.taken}
+            self.lock_waiters = [waiter for waiter in self.lock_waiters if waiter[2] is not session]
+            heapify(self.lock_waiters)
+            if self.owner is session:
+                self.grant_next()
+            self.condition.notify_all()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def __len__(self):
+        with self.condition:
+            return sum(1 for entry in self.queue if not entry[2].taken)
+
+
+class ForwardingPozyx(PozyxLib):
+    """A PozyxLib whose register operations are executed elsewhere, through request.
+
+    The operations in EXCLUSIVE_OPERATIONS are performed with the device locked to this interface.
+
+    Args:
+        priority (optional): priority of the register operations. Default is PRIORITY_NORMAL.
+        suppress_warnings (optional): boolean for suppressing warnings in the Pozyx use, usage not recommended
+    """
+
+    def __init__(self, priority=PRIORITY_NORMAL, suppress_warnings=False):
+        super(ForwardingPozyx, self).__init__()
+        self.priority = priority
+        self.suppress_warnings = suppress_warnings
+        self._exclusive_lock = RLock()
+        self._exclusive_depth = 0
+
+    def request(self, opcode, address=0, payload=b''):
+        """Performs a request, returns its status and returned bytes.
+
+        This is a virtual function, be sure to implement this in your derived interface.
+        """
+        raise NotImplementedError(
+            'You need to override this function in your derived interface!')
+
+    def regRead(self, address, data):
+        status, payload = self.request(OP_READ, address, SIZE.pack(data.byte_size))
+        if status == POZYX_SUCCESS:
+            data.load_packed(payload)
+        return status
+
+    def regWrite(self, address, data):
+        return self.request(OP_WRITE, address, data.to_packed())[0]
+
+    def regFunction(self, address, params, data):
+        status, payload = self.request(OP_FUNCTION, address, SIZE.pack(data.byte_size) + params.to_packed())
+        if len(data) > 0 and len(payload) == data.byte_size:
+            data.load_packed(payload)
+        return status
+
+    def waitForFlag(self, interrupt_flag, timeout_s, interrupt=None):
+        if interrupt is None:
+            interrupt = SingleRegister()
+        return self.waitForFlagSafe(interrupt_flag, timeout_s, interrupt)
+
+    @contextmanager
+    def exclusive(self):
+        """Locks the device to this interface for the duration of a with block. Nests.
+
+        Example:
+            >>> with pozyx.exclusive():
+            ...     pozyx.clearDevices()
+            ...     pozyx.addDevice(anchor)
+        """
+        with self._exclusive_lock:
+            if self._exclusive_depth == 0:
+                status = self.request(OP_LOCK)[0]
+                if status != POZYX_SUCCESS:
+                    raise IOError("Couldn't lock the Pozyx of the daemon")
+            self._exclusive_depth += 1
+            try:
+                yield self
+            finally:
+                self._exclusive_depth -= 1
+                if self._exclusive_depth == 0:
+                    self.request(OP_UNLOCK)
+
+
+def exclusive_operation(operation):
+    @wraps(operation)
+    def locked(self, *args, **kwargs):
+        with self.exclusive():
+            return operation(self, *args, **kwargs)
+    return locked
+
+
+for name in EXCLUSIVE_OPERATIONS:
+    setattr(ForwardingPozyx, name, exclusive_operation(getattr(ForwardingPozyx, name)))
+
+
+class DaemonInterface(ForwardingPozyx):
+    """A ForwardingPozyx inside the daemon's process, submitting to its scheduler directly.
+
+    Used by the daemon's streams, so their operations are scheduled with those of the clients.
+    """
+
+    def __init__(self, scheduler, priority=PRIORITY_NORMAL):
+        super(DaemonInterface, self).__init__(priority, suppress_warnings=True)
+        self.scheduler = scheduler
+
+    def request(self, opcode, address=0, payload=b''):
+        done = Event()
+        result = []
+
+        def resolve(status, returned=b''):
+            result.append((status, returned))
+            done.set()
+
+        if opcode == OP_LOCK:
+            self.scheduler.acquire(self, self.priority, resolve)
+        elif opcode == OP_UNLOCK:
+            return self.scheduler.release(self), b''
+        else:
+            self.scheduler.put(DeviceJob(self, opcode, self.priority, address, parse_payload(opcode, payload),
+                                         resolve))
+        while not done.wait(0.1):
+            if self.scheduler.closed:
+                return POZYX_FAILURE, b''
+        return result[0]
+
+
+def parse_payload(opcode, payload):
+    """Returns the payload of a request as DeviceJob payload"""
+    if opcode == OP_READ:
+        return SIZE.unpack(payload[:SIZE.size])[0]
+    if opcode == OP_FUNCTION:
+        return payload[SIZE.size:], SIZE.unpack(payload[:SIZE.size])[0]
+    return payload
+
+
+class DaemonStream(object):
+    """A ranging or positioning stream of the daemon, fanned out to its subscriptions.
+
+    It runs at the highest rate of its subscriptions, as fast as possible if one has no rate.
+    """
+
+    def __init__(self, daemon, kind, device_ids, remote_id):
+        self.daemon = daemon
+        self.kind = kind
+        self.device_ids = device_ids
+        self.remote_id = remote_id
+        self.interface = DaemonInterface(daemon.scheduler)
+        self.subscriptions = {}
+        self.lock = RLock()
+        self.running = True
+        self.rounds = 0
+        self.thread = Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def period(self):
+        with self.lock:
+            rates = [rate for rate in self.subscriptions.values()]
+        if not rates or 0 in rates:
+            return 0.0
+        return 1.0 / max(rates)
+
+    def run(self):
+        deadline = perf_counter()
+        while self.running:
+            period = self.period()
+            if period:
+                now = perf_counter()
+                if deadline > now:
+                    sleep(deadline - now)
+                elif now - deadline > period:
+                    deadline = now
+                deadline += period
+            if self.kind == STREAM_RANGING:
+                events = [(measurement.status, RANGE_EVENT.pack(measurement.destination, measurement.timestamp,
+                                                                measurement.distance, measurement.RSS))
+                          for measurement in self.interface.doRangingMany(self.device_ids, self.remote_id)]
+            else:
+                events = []
+                for tag_id in self.device_ids or [None]:
+                    position = Coordinates()
+                    start = perf_counter()
+                    status = self.interface.doPositioning(position, remote_id=tag_id)
+                    events.append((status, POSITION_EVENT.pack(tag_id is not None, tag_id or 0, position.x,
+                                                               position.y, position.z, perf_counter() - start)))
+            if not self.running:
+                return
+            self.rounds += 1
+            with self.lock:
+                subscriptions = list(self.subscriptions)
+            for session, request_id in subscriptions:
+                for status, event in events:
+                    session.reply(request_id, status, event, KIND_EVENT)
+
+    def subscribe(self, session, request_id, rate):
+        with self.lock:
+            self.subscriptions[(session, request_id)] = rate
+
+    def unsubscribe(self, session, request_id=None):
+        """Removes a subscription, or all subscriptions of a session, returns whether any are left"""
+        with self.lock:
+            for key in list(self.subscriptions):
+                if key[0] is session and (request_id is None or key[1] == request_id):
+                    del self.subscriptions[key]
+            return bool(self.subscriptions)
+
+    def stop(self):
+        self.running = False
+
+
+class DaemonSession(object):
+    """The connection of a client to the daemon"""
+
+    def __init__(self, daemon, connection):
+        self.daemon = daemon
+        self.connection = connection
+        self.send_lock = RLock()
+        self.open = True
+
+    def reply(self, request_id, status, payload=b'', kind=KIND_REPLY):
+        try:
+            with self.send_lock:
+                send_frame(self.connection, REPLY_HEADER.pack(request_id, kind, status) + payload)
+        except (OSError, socket.error):
+            self.open = False
+
+    def serve(self):
+        try:
+            while self.daemon.running:
+                body = receive_frame(self.connection)
+                if body is None:
+                    break
+                self.handle(body)
+        except (OSError, socket.error):
+            pass
+        finally:
+            self.open = False
+            self.daemon.disconnect(self)
+
+    def handle(self, body):
+        request_id, opcode, priority, address, timeout = REQUEST_HEADER.unpack(body[:REQUEST_HEADER.size])
+        payload = body[REQUEST_HEADER.size:]
+        deadline = perf_counter() + timeout if timeout > 0 else None
+
+        def resolve(status, returned=b''):
+            self.reply(request_id, status, returned)
+
+        if opcode in (OP_READ, OP_WRITE, OP_FUNCTION):
+            self.daemon.scheduler.put(DeviceJob(self, opcode, priority, address, parse_payload(opcode, payload),
+                                                resolve, deadline))
+        elif opcode == OP_LOCK:
+            self.daemon.scheduler.acquire(self, priority, resolve)
+        elif opcode == OP_UNLOCK:
+            resolve(self.daemon.scheduler.release(self))
+        elif opcode == OP_SUBSCRIBE:
+            has_remote, remote_id, rate, amount = SUBSCRIPTION.unpack(payload[:SUBSCRIPTION.size])
+            device_ids = [DEVICE_ID.unpack_from(payload, SUBSCRIPTION.size + i * DEVICE_ID.size)[0]
+                          for i in range(amount)]
+            self.daemon.subscribe(self, request_id, address, device_ids, remote_id if has_remote else None, rate)
+            resolve(POZYX_SUCCESS)
+        elif opcode == OP_UNSUBSCRIBE:
+            self.daemon.unsubscribe(self, Struct('<I').unpack(payload)[0])
+            resolve(POZYX_SUCCESS)
+        else:
+            resolve(POZYX_FAILURE)
+
+
+class PozyxDaemon(object):
+    """Owns a Pozyx interface and serves its register operations and streams to PozyxClients.
+
+    Args:
+        pozyx: the Pozyx interface to share, like a PozyxSerial.
+        socket_path (optional): path of the Unix domain socket. Default is DEFAULT_SOCKET_PATH.
+
+    When the interface raises, like a PozyxSerial whose Pozyx was unplugged, the daemon stops
+    and wait raises the error.
+
+    Example usage:
+        >>> with PozyxDaemon(PozyxSerial(get_first_pozyx_serial_port())) as daemon:
+        ...     daemon.wait()
+    """
+
+    def __init__(self, pozyx, socket_path=DEFAULT_SOCKET_PATH):
+        self.pozyx = pozyx
+        self.socket_path = socket_path
+        self.scheduler = DeviceScheduler()
+        self.sessions = []
+        self.streams = {}
+        self.lock = RLock()
+        self.server = None
+        self.threads = []
+        self.running = False
+        self.executed = 0
+        self.error = None
+
+    def start(self):
+        """Starts listening on the socket and executing jobs in the background"""
+        if self.running:
+            return
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        self.server.listen(16)
+        # closing the socket doesn't wake up accept everywhere, so it checks whether to stop regularly
+        self.server.settimeout(0.1)
+        self.running = True
+        self.threads = [Thread(target=self.accept), Thread(target=self.work)]
+        for thread in self.threads:
+            thread.daemon = True
+            thread.start()
+
+    def stop(self):
+        """Stops the streams, closes the connections and removes the socket"""
+        if not self.running:
+            return
+        self.running = False
+        with self.lock:
+            for stream in self.streams.values():
+                stream.stop()
+            self.streams = {}
+            sessions, self.sessions = self.sessions, []
+        self.scheduler.close()
+        for session in sessions:
+            try:
+                session.connection.shutdown(socket.SHUT_RDWR)
+            except (OSError, socket.error):
+                pass
+            session.connection.close()
+        self.server.close()
+        for thread in self.threads:
+            # the worker stops the daemon itself when the Pozyx fails
+            if thread is not current_thread():
+                thread.join()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def wait(self):
+        """Serves until interrupted, raises the error of the Pozyx interface that stopped the daemon"""
+        try:
+            while self.running:
+                sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        if self.error is not None:
+            raise self.error
+
+    def accept(self):
+        while self.running:
+            try:
+                connection, address = self.server.accept()
+            except socket.timeout:
+                continue
+            except (OSError, socket.error):
+                return
+            connection.settimeout(None)
+            session = DaemonSession(self, connection)
+            with self.lock:
+                self.sessions.append(session)
+            thread = Thread(target=session.serve)
+            thread.daemon = True
+            thread.start()
+
+    def work(self):
+        while True:
+            job = self.scheduler.take()
+            if job is None:
+                return
+            try:
+                status, returned = self.execute(job)
+            except Exception as exc:
+                # the connection to the Pozyx is lost, or the interface is broken: stop serving
+                self.error = exc
+                for callback in job.callbacks:
+                    callback(POZYX_FAILURE, b'')
+                self.stop()
+                return
+            self.executed += 1
+            for callback in job.callbacks:
+                callback(status, returned)
+
+    def execute(self, job):
+        """Executes a job on the Pozyx, returns its status and returned bytes.
+
+        Malformed requests fail with POZYX_FAILURE, errors of the interface, like a
+        PozyxConnectionError or a SerialException, are raised.
+        """
+        try:
+            if job.opcode == OP_READ:
+                data = Data([0] * job.payload)
+            elif job.opcode == OP_WRITE:
+                data = byte_container(job.payload)
+            else:
+                params, size = job.payload
+                params, data = byte_container(params), Data([0] * size)
+        except (TypeError, ValueError):
+            return POZYX_FAILURE, b''
+        if job.opcode == OP_READ:
+            status = self.pozyx.regRead(job.address, data)
+            return status, container_bytes(data) if status == POZYX_SUCCESS else b''
+        if job.opcode == OP_WRITE:
+            return self.pozyx.regWrite(job.address, data), b''
+        status = self.pozyx.regFunction(job.address, params, data)
+        return status, container_bytes(data)
+
+    def subscribe(self, session, request_id, kind, device_ids, remote_id, rate):
+        key = (kind, tuple(device_ids), remote_id)
+        with self.lock:
+            if key not in self.streams:
+                self.streams[key] = DaemonStream(self, kind, device_ids, remote_id)
+            self.streams[key].subscribe(session, request_id, rate)
+
+    def unsubscribe(self, session, request_id=None):
+        with self.lock:
+            for key, stream in list(self.streams.items()):
+                if not stream.unsubscribe(session, request_id):
+                    stream.stop()
+                    del self.streams[key]
+
+    def disconnect(self, session):
+        self.unsubscribe(session)
+        self.scheduler.drop(session)
+        with self.lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+        session.connection.close()
+
+    def statistics(self):
+        """Returns the amounts of clients, streams, executed, coalesced, expired and queued register operations"""
+        return {'clients': len(self.sessions), 'streams': len(self.streams), 'executed': self.executed,
+                'coalesced': self.scheduler.coalesced, 'expired': self.scheduler.expired,
+                'queued': len(self.scheduler)}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class Subscription(object):
+    """The events of a stream of the daemon for a client, buffered up to capacity, dropping the oldest.
+
+    Iterating yields events until the subscription is closed.
+    """
+
+    def __init__(self, client, request_id, capacity=256):
+        self.client = client
+        self.request_id = request_id
+        self.events = deque(maxlen=capacity)
+        self.condition = Condition()
+        self.closed = False
+
+    def push(self, event):
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """Returns the next event, None on timeout or when closed"""
+        with self.condition:
+            if not self.events and not self.closed:
+                self.condition.wait(timeout)
+            return self.events.popleft() if self.events else None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.client.unsubscribe(self)
+        with self.condition:
+            self.condition.notify_all()
+
+    def __iter__(self):
+        while not self.closed:
+            event = self.get(0.1)
+            if event is not None:
+                yield event
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PozyxClient(ForwardingPozyx):
+    """This class provides the Pozyx interface of a PozyxDaemon. All functionality from PozyxLib
+    and PozyxCore is included.
+
+    Args:
+        socket_path (optional): path of the daemon's socket. Default is DEFAULT_SOCKET_PATH.
+        priority (optional): PRIORITY_CONTROL, PRIORITY_NORMAL (default) or PRIORITY_DIAGNOSTICS.
+        timeout (optional): time in seconds to wait for a reply of the daemon. Default is 1.
+        suppress_warnings (optional): boolean for suppressing warnings in the Pozyx use, usage not recommended
+
+    Example usage:
+        >>> pozyx = PozyxClient(priority=PRIORITY_DIAGNOSTICS)
+        >>> who_am_i = SingleRegister()
+        >>> pozyx.getWhoAmI(who_am_i)
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, priority=PRIORITY_NORMAL, timeout=1.0,
+                 suppress_warnings=False):
+        super(PozyxClient, self).__init__(priority, suppress_warnings)
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.request_ids = count(1)
+        self.pending = {}
+        self.subscriptions = {}
+        self.send_lock = RLock()
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.connection.connect(socket_path)
+        except (OSError, socket.error) as exc:
+            raise PozyxConnectionError("Couldn't connect to pozyxd at {}: {}".format(socket_path, str(exc)))
+        self.connected = True
+        self.reader = Thread(target=self.read_replies)
+        self.reader.daemon = True
+        self.reader.start()
+
+    def read_replies(self):
+        try:
+            while True:
+                body = receive_frame(self.connection)
+                if body is None:
+                    break
+                request_id, kind, status = REPLY_HEADER.unpack(body[:REPLY_HEADER.size])
+                payload = body[REPLY_HEADER.size:]
+                if kind == KIND_EVENT:
+                    subscription = self.subscriptions.get(request_id)
+                    if subscription is not None:
+                        subscription.push(self.decode_event(subscription.kind, status, payload))
+                    continue
+                pending = self.pending.pop(request_id, None)
+                if pending is not None:
+                    pending[1].append((status, payload))
+                    pending[0].set()
+        except (OSError, socket.error):
+            pass
+        finally:
+            self.connected = False
+            for done, result in list(self.pending.values()):
+                done.set()
+            for subscription in list(self.subscriptions.values()):
+                subscription.closed = True
+                with subscription.condition:
+                    subscription.condition.notify_all()
+
+    @staticmethod
+    def decode_event(kind, status, payload):
+        if kind == STREAM_RANGING:
+            destination, timestamp, distance, RSS = RANGE_EVENT.unpack(payload)
+            return RangeMeasurement(destination, timestamp, distance, RSS, status)
+        has_tag, tag_id, x, y, z, latency = POSITION_EVENT.unpack(payload)
+        return PositioningResult(tag_id if has_tag else None, status, Coordinates(x, y, z), None, latency)
+
+    def send(self, opcode, address=0, payload=b'', wait=True, timeout=None):
+        request_id = next(self.request_ids) & 0xFFFFFFFF
+        done, result = Event(), []
+        self.pending[request_id] = (done, result)
+        body = REQUEST_HEADER.pack(request_id, opcode, self.priority, address, timeout or 0) + payload
+        try:
+            with self.send_lock:
+                send_frame(self.connection, body)
+        except (OSError, socket.error):
+            self.pending.pop(request_id, None)
+            return request_id, (POZYX_FAILURE, b'')
+        if not done.wait(timeout):
+            self.pending.pop(request_id, None)
+            return request_id, (POZYX_TIMEOUT, b'')
+        return request_id, result[0] if result else (POZYX_FAILURE, b'')
+
+    def request(self, opcode, address=0, payload=b''):
+        # waiting for the lock can take as long as the operations of other clients
+        timeout = None if opcode == OP_LOCK else self.timeout
+        return self.send(opcode, address, payload, timeout=timeout)[1]
+
+    def subscribe(self, kind, device_ids, remote_id=None, rate=None, capacity=256):
+        """Subscribes to a stream of the daemon, returns the Subscription"""
+        device_ids = list(device_ids)
+        payload = SUBSCRIPTION.pack(remote_id is not None, remote_id or 0, rate or 0, len(device_ids))
+        payload += b''.join(DEVICE_ID.pack(device_id) for device_id in device_ids)
+        request_id = next(self.request_ids) & 0xFFFFFFFF
+        subscription = Subscription(self, request_id, capacity)
+        subscription.kind = kind
+        self.subscriptions[request_id] = subscription
+        done, result = Event(), []
+        self.pending[request_id] = (done, result)
+        with self.send_lock:
+            send_frame(self.connection, REQUEST_HEADER.pack(request_id, OP_SUBSCRIBE, self.priority, kind, 0) + payload)
+        if not done.wait(self.timeout) or result[0][0] != POZYX_SUCCESS:
+            self.subscriptions.pop(request_id, None)
+            raise IOError("Couldn't subscribe to the stream of pozyxd")
+        return subscription
+
+    def subscribeRanging(self, destination_ids, remote_id=None, rate=None, capacity=256):
+        """Subscribes to ranging with the destinations, shared with the clients ranging with the same.
+
+        Args:
+            destination_ids: network IDs of the devices to range with.
+            remote_id (optional): Remote Pozyx ID performing the ranging.
+            rate (optional): requested rate in rounds per second. None ranges as fast as possible.
+            capacity (optional): amount of measurements buffered. Default is 256.
+
+        Returns:
+            Subscription yielding a RangeMeasurement per measurement.
+        """
+        return self.subscribe(STREAM_RANGING, destination_ids, remote_id, rate, capacity)
+
+    def subscribePositioning(self, tag_ids=(), rate=None, capacity=256):
+        """Subscribes to positioning of the tags, the local device without tags.
+
+        Returns:
+            Subscription yielding a PositioningResult per position, without positioning data.
+        """
+        return self.subscribe(STREAM_POSITIONING, tag_ids, None, rate, capacity)
+
+    def unsubscribe(self, subscription):
+        self.subscriptions.pop(subscription.request_id, None)
+        if self.connected:
+            self.request(OP_UNSUBSCRIBE, 0, Struct('<I').pack(subscription.request_id))
+
+    def close(self):
+        """Closes the connection with the daemon"""
+        for subscription in list(self.subscriptions.values()):
+            subscription.close()
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except (OSError, socket.error):
+            pass
+        self.connection.close()
+        self.reader.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    parser = ArgumentParser(description="Shares a Pozyx with local clients over a Unix domain socket")
+    parser.add_argument('--port', default=None, help="serial port of the Pozyx, defaults to the first one found")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help="path of the Unix domain socket")
+    parser.add_argument('--simulator', action='store_true', help="share a simulated Pozyx")
+    args = parser.parse_args()
+
+    if args.simulator:
+        from pypozyx.pozyx_simulator import PozyxSimulator
+        pozyx = PozyxSimulator()
+    else:
+        from pypozyx.pozyx_serial import PozyxSerial, get_first_pozyx_serial_port
+        port = args.port or get_first_pozyx_serial_port()
+        if port is None:
+            print("No Pozyx connected. Check your USB cable or your driver!")
+            return
+        pozyx = PozyxSerial(port)
+    with PozyxDaemon(pozyx, args.socket) as daemon:
+        print("pozyxd serving on %s" % args.socket)
+        daemon.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+"""pypozyx.ranging_stream - contains RangingStream, a continuous stream of range measurements.
+
+A RangingStream ranges with one or more destinations in a background thread, at a target rate
+or as fast as possible, and hands the measurements to its consumer through a bounded ring of
+preallocated records. When the consumer can't keep up, the stream either drops measurements or
+blocks the ranging until there's room again, so memory use stays constant on runs of hours.
+The achieved rate and the jitter of the measurement intervals are reported by statistics().
+
+While the stream runs, the Pozyx interface shouldn't be used by other threads.
+
+Example usage:
+    >>> with RangingStream(pozyx, 0x6e30, rate=50) as stream:
+    ...     for record in stream:
+    ...         print(record.destination, record.device_range.distance)
+    ...         if record.time > 60:
+    ...             break
+    >>> stream.statistics()['rate']
+    49.97
+"""
+from collections import deque
+from threading import Condition, Thread
+from time import perf_counter, sleep
+
+from pypozyx.definitions.constants import POZYX_SUCCESS
+from pypozyx.structures.device import DeviceRange
+from pypozyx.structures.generic import dataCheck
+
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_DROP_NEWEST = 'drop_newest'
+OVERFLOW_BLOCK = 'block'
+
+
+def percentile(sorted_values, fraction):
+    """Returns the fraction percentile of the sorted values, interpolating linearly"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class RangingRecord(object):
+    """A preallocated slot of the ring, holding one range measurement.
+
+    Attributes:
+        destination: network ID of the device ranged with.
+        device_range: the DeviceRange container of the measurement.
+        status: POZYX_SUCCESS, POZYX_FAILURE or POZYX_TIMEOUT.
+        time: host time of the measurement in seconds, relative to the start of the stream.
+        host_time: perf_counter time at which the device measured, with the ClockSync of the
+            Pozyx interface, None without.
+        time_error: error bound of host_time in seconds.
+    """
+    __slots__ = ['destination', 'device_range', 'status', 'time', 'host_time', 'time_error']
+
+    def __init__(self):
+        self.destination = 0
+        self.device_range = DeviceRange()
+        self.status = POZYX_SUCCESS
+        self.time = 0.0
+        self.host_time = None
+        self.time_error = float('inf')
+
+
+class RecordRing(object):
+    """Bounded ring of preallocated RangingRecords between one producer and one consumer.
+
+    The record last taken by the consumer stays untouched until the consumer takes the next one.
+
+    Args:
+        capacity: the amount of records the ring holds for the consumer.
+        overflow: what happens to a new record when the ring is full, OVERFLOW_DROP_OLDEST,
+            OVERFLOW_DROP_NEWEST or OVERFLOW_BLOCK.
+    """
+
+    def __init__(self, capacity=256, overflow=OVERFLOW_DROP_OLDEST):
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_BLOCK):
+            raise ValueError("Unknown overflow policy %s" % overflow)
+        # one extra slot for the record being written and one for the record held by the consumer
+        self.records = [RangingRecord() for i in range(capacity + 2)]
+        self.capacity = capacity
+        self.overflow = overflow
+        self.free = deque(self.records)
+        self.ready = deque()
+        self.taken = None
+        self.dropped = 0
+        self.closed = False
+        self.condition = Condition()
+
+    def __len__(self):
+        return len(self.ready)
+
+    def acquire(self):
+        """Returns a free record for the producer to fill, None if the ring is closed"""
+        with self.condition:
+            while not self.free and not self.closed:
+                # only possible when blocking, the other policies free a record on publish
+                self.condition.wait()
+            if self.closed:
+                return None
+            return self.free.popleft()
+
+    def publish(self, record):
+        """Hands a filled record to the consumer, applying the overflow policy when the ring is full"""
+        with self.condition:
+            if len(self.ready) >= self.capacity:
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    self.free.append(record)
+                    return
+                if self.overflow == OVERFLOW_DROP_OLDEST:
+                    self.dropped += 1
+                    self.free.append(self.ready.popleft())
+                else:
+                    while len(self.ready) >= self.capacity and not self.closed:
+                        self.condition.wait()
+            self.ready.append(record)
+            self.condition.notify_all()
+
+    def take(self, timeout=None):
+        """Returns the next record for the consumer, None when the ring is closed and empty or on timeout"""
+        with self.condition:
+            if self.taken is not None:
+                self.free.append(self.taken)
+                self.taken = None
+                self.condition.notify_all()
+            if not self.ready and not self.closed:
+                self.condition.wait(timeout)
+            if not self.ready:
+                return None
+            self.taken = self.ready.popleft()
+            self.condition.notify_all()
+            return self.taken
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class RangingStream(object):
+    """Ranges continuously with one or more destinations in a background thread.
+
+    Every round ranges once with every destination, using doRangingMany. The stream yields a
+    RangingRecord per measurement; a record is reused once the next one is taken, so copy
+    what needs to be kept.
+
+    Args:
+        pozyx: the Pozyx interface to range with.
+        destination_ids: network ID or list of network IDs to range with.
+        remote_id (optional): Remote Pozyx ID performing the ranging.
+        rate (optional): target rate in rounds per second. None ranges as fast as possible.
+        capacity (optional): amount of records buffered for the consumer. Default is 256.
+        overflow (optional): OVERFLOW_DROP_OLDEST (default), OVERFLOW_DROP_NEWEST or OVERFLOW_BLOCK.
+        include_failures (optional): whether failed measurements are yielded too. Default is False.
+        jitter_window (optional): amount of recent intervals the jitter percentiles are taken over.
+    """
+
+    def __init__(self, pozyx, destination_ids, remote_id=None, rate=None, capacity=256,
+                 overflow=OVERFLOW_DROP_OLDEST, include_failures=False, jitter_window=1024):
+        if dataCheck(destination_ids) or not hasattr(destination_ids, '__iter__'):
+            destination_ids = [destination_ids]
+        self.pozyx = pozyx
+        self.destination_ids = list(destination_ids)
+        self.remote_id = remote_id
+        self.rate = rate
+        self.include_failures = include_failures
+        self.ring = RecordRing(capacity, overflow)
+        self.intervals = deque(maxlen=jitter_window)
+        self.thread = None
+        self.running = False
+        self.start_time = None
+        self.last_round_time = None
+        self.measurements = 0
+        self.failures = 0
+        self.rounds = 0
+        self.error = None
+
+    def start(self):
+        """Starts ranging in the background"""
+        if self.thread is not None:
+            return
+        self.running = True
+        self.start_time = perf_counter()
+        self.thread = Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stops ranging, the records that are buffered can still be consumed.
+
+        Raises the exception that stopped the ranging thread, if the iteration didn't raise it already.
+        """
+        self.running = False
+        self.ring.close()
+        if self.thread is not None:
+            self.thread.join()
+        self.raise_error()
+
+    def raise_error(self):
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def run(self):
+        period = 1.0 / self.rate if self.rate else 0.0
+        deadline = perf_counter()
+        try:
+            while self.running:
+                if period:
+                    now = perf_counter()
+                    if deadline > now:
+                        sleep(deadline - now)
+                    elif now - deadline > period:
+                        # too late for this round, start a new schedule instead of catching up in a burst
+                        deadline = now
+                    deadline += period
+                self.range_round()
+                self.rounds += 1
+        except Exception as error:
+            self.error = error
+        finally:
+            # the consumer would otherwise wait for records forever
+            self.running = False
+            self.ring.close()
+
+    def range_round(self):
+        measurements = self.pozyx.doRangingMany(self.destination_ids, remote_id=self.remote_id)
+        now = perf_counter()
+        clock_sync = self.pozyx.getClockSync()
+        if self.last_round_time is not None:
+            self.intervals.append(now - self.last_round_time)
+        self.last_round_time = now
+        for measurement in measurements:
+            if measurement.status == POZYX_SUCCESS:
+                self.measurements += 1
+            else:
+                self.failures += 1
+                if not self.include_failures:
+                    continue
+            record = self.ring.acquire()
+            if record is None:
+                return
+            record.destination = measurement.destination
+            record.device_range.data[:] = [measurement.timestamp, measurement.distance, measurement.RSS]
+            record.status = measurement.status
+            record.time = now - self.start_time
+            if clock_sync is not None:
+                record.host_time, record.time_error = clock_sync.to_host(self.remote_id, measurement.timestamp)
+            self.ring.publish(record)
+
+    def statistics(self):
+        """Returns the achieved rate, the jitter percentiles and the drop and failure counts.
+
+        The rate is in successful measurements per second. The jitter is the deviation of the intervals
+        between rounds from the target interval, or from the mean interval without target rate, in
+        seconds over the last jitter_window rounds.
+        """
+        elapsed = (perf_counter() - self.start_time) if self.start_time is not None else 0.0
+        intervals = list(self.intervals)
+        if self.rate:
+            target = 1.0 / self.rate
+        else:
+            target = sum(intervals) / len(intervals) if intervals else 0.0
+        jitter = sorted(abs(interval - target) for interval in intervals)
+        return {'rate': self.measurements / elapsed if elapsed else 0.0,
+                'round_rate': self.rounds / elapsed if elapsed else 0.0,
+                'measurements': self.measurements,
+                'failures': self.failures,
+                'dropped': self.ring.dropped,
+                'buffered': len(self.ring),
+                'jitter_p50': percentile(jitter, 0.5),
+                'jitter_p90': percentile(jitter, 0.9),
+                'jitter_p99': percentile(jitter, 0.99)}
+
+    def __iter__(self):
+        self.start()
+        while True:
+            record = self.ring.take(timeout=0.1)
+            if record is not None:
+                yield record
+            elif not self.running and not len(self.ring):
+                self.raise_error()
+                return
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+"""pypozyx.recording - contains SerialRecorder and ReplayTransport, recording and replaying serial sessions.
+
+A SerialRecorder sits between a PozyxSerial and its serial port and logs every command written
+and every response line read, with the host time, to a compact binary file. Since it records
+the port itself, the exchanges of serialExchange, regWrite and command pipelines are all
+captured. The hexadecimal payloads of the text protocol are stored as bytes, which halves them.
+
+A ReplayTransport is a PozyxSerial without a port, that serves the responses of a recording
+back to the same sequence of commands, which makes the session reproducible without hardware.
+Every command is checked against the recording and a ReplayError is raised when they differ.
+The responses come either as fast as possible, which benchmarks the decoding and processing
+of the library on real traffic at CPU speed, or at their original times. Interrupt polling
+follows the recording: the transport polls exactly as often as the recorded session did,
+and in fast mode the delays after local and remote writes are skipped. Other fixed delays of
+the library, like the ones of flash operations and discovery, are still slept.
+
+File format: the header FILE_MAGIC and the wall clock time the recording started as little
+endian double, followed by the records. A record is the microseconds since the previous record
+as varint, its kind as byte and the fields of that kind in RECORD_FIELDS: the register address
+as byte, a number as varint and a payload as varint length followed by its bytes. A register
+read and its response take about 5 bytes each, against 7 and 6 and more as text.
+
+Example usage:
+    >>> with SerialRecorder(pozyx, 'session.pzxrec'):
+    ...     pozyx.doRanging(0x6e30, device_range)
+    >>> replay = ReplayTransport('session.pzxrec')
+    >>> replay.doRanging(0x6e30, device_range)
+    1
+    >>> replay.finished
+    True
+"""
+from binascii import Error as BinasciiError, hexlify, unhexlify
+from struct import Struct
+from time import perf_counter, sleep, time
+
+from pypozyx.core import PozyxException
+from pypozyx.definitions.constants import PozyxConstants
+from pypozyx.lib import PozyxLib
+from pypozyx.locking import InstrumentedLock
+from pypozyx.polling import FixedPolling
+from pypozyx.pozyx_serial import PozyxSerial
+
+FILE_MAGIC = b'PZXREC1\n'
+FILE_HEADER = Struct('<d')
+
+# commands, as in the text protocol
+KIND_READ = ord('R')
+KIND_WRITE = ord('W')
+KIND_FUNCTION = ord('F')
+# a command that isn't in the compact form, stored as text
+KIND_RAW_COMMAND = ord('c')
+# responses: 'D,' with lowercase or uppercase hexadecimal data
+KIND_DATA = ord('D')
+KIND_DATA_UPPER = ord('U')
+# a response that isn't in the compact form, stored as text
+KIND_RAW_RESPONSE = ord('r')
+# a read that timed out without response
+KIND_TIMEOUT = ord('T')
+
+COMMAND_KINDS = (KIND_READ, KIND_WRITE, KIND_FUNCTION, KIND_RAW_COMMAND)
+
+# the fields stored for every kind of record
+RECORD_FIELDS = {KIND_READ: ('address', 'number'), KIND_WRITE: ('address', 'payload'),
+                 KIND_FUNCTION: ('address', 'number', 'payload'), KIND_RAW_COMMAND: ('payload',),
+                 KIND_DATA: ('payload',), KIND_DATA_UPPER: ('payload',), KIND_RAW_RESPONSE: ('payload',),
+                 KIND_TIMEOUT: ()}
+
+
+class ReplayError(PozyxException):
+    """A command differs from the recording, or the recording ended"""
+    pass
+
+
+def pack_varint(value):
+    """Returns an unsigned integer as LEB128 varint"""
+    packed = bytearray()
+    while value > 0x7F:
+        packed.append(value & 0x7F | 0x80)
+        value >>= 7
+    packed.append(value)
+    return bytes(packed)
+
+
+def unpack_varint(content, offset):
+    """Returns the varint at offset in content and the offset after it"""
+    value = shift = 0
+    while True:
+        byte = content[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def pack_record(delta, kind, address, number, payload):
+    """Returns a record as bytes, see RECORD_FIELDS"""
+    packed = pack_varint(delta) + bytes(bytearray([kind]))
+    for field in RECORD_FIELDS[kind]:
+        if field == 'address':
+            packed += bytes(bytearray([address]))
+        elif field == 'number':
+            packed += pack_varint(number)
+        else:
+            packed += pack_varint(len(payload)) + payload
+    return packed
+
+
+def format_command(kind, address, number, payload):
+    """Returns the serial command of a command record"""
+    if kind == KIND_READ:
+        return 'R,%0.2x,%i\r' % (address, number)
+    if kind == KIND_WRITE:
+        return 'W,%0.2x,%s\r' % (address, hexlify(payload).decode())
+    if kind == KIND_FUNCTION:
+        return 'F,%0.2x,%s,%i\r' % (address, hexlify(payload).decode(), number)
+    return payload.decode('latin-1')
+
+
+def encode_command(command):
+    """Returns (kind, address, number, payload) of a serial command, raw when it isn't in the compact form"""
+    fields = command.rstrip('\r').split(',')
+    record = None
+    try:
+        address = int(fields[1], 16)
+        if fields[0] == 'R' and len(fields) == 3:
+            record = (KIND_READ, address, int(fields[2]), b'')
+        elif fields[0] == 'W' and len(fields) == 3:
+            record = (KIND_WRITE, address, 0, unhexlify(fields[2]))
+        elif fields[0] == 'F' and len(fields) == 4:
+            record = (KIND_FUNCTION, address, int(fields[3]), unhexlify(fields[2]))
+    except (IndexError, ValueError, TypeError, BinasciiError):
+        pass
+    if record is None or record[1] > 0xFF or format_command(*record) != command:
+        return KIND_RAW_COMMAND, 0, 0, command.encode('latin-1')
+    return record
+
+
+def format_response(kind, address, number, payload):
+    """Returns the response line of a response record, empty on a timeout"""
+    if kind == KIND_DATA:
+        return 'D,%s\r\n' % hexlify(payload).decode()
+    if kind == KIND_DATA_UPPER:
+        return 'D,%s\r\n' % hexlify(payload).decode().upper()
+    if kind == KIND_TIMEOUT:
+        return ''
+    return payload.decode('latin-1')
+
+
+def encode_response(line):
+    """Returns (kind, address, number, payload) of a response line, raw when it isn't in the compact form"""
+    if not line:
+        return KIND_TIMEOUT, 0, 0, b''
+    if line.startswith('D,') and line.endswith('\r\n'):
+        data = line[2:-2]
+        try:
+            record = (KIND_DATA if data == data.lower() else KIND_DATA_UPPER, 0, 0, unhexlify(data))
+            if format_response(*record) == line:
+                return record
+        except (ValueError, TypeError, BinasciiError):
+            pass
+    return KIND_RAW_RESPONSE, 0, 0, line.encode('latin-1')
+
+
+def read_recording(path):
+    """Returns the wall clock start time of a recording and its records as (time, kind, address, number, payload)
+
+    The times are in seconds since the recording started.
+    """
+    with open(path, 'rb') as recording:
+        content = recording.read()
+    if not content.startswith(FILE_MAGIC):
+        raise ValueError("%s isn't a Pozyx recording" % path)
+    offset = len(FILE_MAGIC)
+    start = FILE_HEADER.unpack_from(content, offset)[0]
+    offset += FILE_HEADER.size
+    records = []
+    elapsed = 0
+    while offset < len(content):
+        delta, offset = unpack_varint(content, offset)
+        kind = content[offset]
+        offset += 1
+        address, number, payload = 0, 0, b''
+        for field in RECORD_FIELDS[kind]:
+            if field == 'address':
+                address = content[offset]
+                offset += 1
+            elif field == 'number':
+                number, offset = unpack_varint(content, offset)
+            else:
+                length, offset = unpack_varint(content, offset)
+                payload = content[offset:offset + length]
+                offset += length
+        elapsed += delta
+        records.append((elapsed * 1e-6, kind, address, number, payload))
+    return start, records
+
+
+class RecordingSerial(object):
+    """Serial port wrapper passing every command written and response line read to a SerialRecorder"""
+
+    def __init__(self, serial, recorder):
+        self.serial = serial
+        self.recorder = recorder
+        self.pending = ''
+
+    def write(self, data):
+        written = self.serial.write(data)
+        # commands can be split over writes, record the complete ones
+        commands = (self.pending + data.decode('latin-1')).split('\r')
+        self.pending = commands.pop()
+        for command in commands:
+            self.recorder.record(*encode_command(command + '\r'))
+        return written
+
+    def readline(self, *args, **kwargs):
+        line = self.serial.readline(*args, **kwargs)
+        self.recorder.record(*encode_response(line.decode('latin-1')))
+        return line
+
+    def __getattr__(self, name):
+        return getattr(self.serial, name)
+
+
+class SerialRecorder(object):
+    """Records the serial exchanges of a PozyxSerial to a file, until stopped.
+
+    Args:
+        pozyx: the PozyxSerial to record.
+        path: the file to write the recording to, which is overwritten.
+    """
+
+    def __init__(self, pozyx, path):
+        self.pozyx = pozyx
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(FILE_MAGIC + FILE_HEADER.pack(time()))
+        self.last_time = perf_counter()
+        self.records = 0
+        self.serial = pozyx.ser
+        self.recording_serial = RecordingSerial(self.serial, self)
+        pozyx.ser = self.recording_serial
+
+    def record(self, kind, address, number, payload):
+        now = perf_counter()
+        delta = max(0, int(round((now - self.last_time) * 1e6)))
+        # advance by the recorded delta, so rounding doesn't accumulate
+        self.last_time += delta * 1e-6
+        self.file.write(pack_record(delta, kind, address, number, payload))
+        self.records += 1
+
+    def stop(self):
+        """Stops recording, the PozyxSerial uses its serial port directly again.
+
+        Raises a RuntimeError when the serial port was wrapped again after recording started,
+        like by a Tracer, which has to be removed first.
+        """
+        if self.file.closed:
+            return
+        if self.pozyx.ser is not self.recording_serial:
+            raise RuntimeError("The serial port of the Pozyx was wrapped after recording started, "
+                               "remove that wrapper first")
+        self.pozyx.ser = self.serial
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class ReplaySerial(object):
+    """Serial port stand-in serving the responses of recorded records to the recorded commands.
+
+    Args:
+        records: the records of a recording, see read_recording.
+        timing: whether responses are held back until their time in the recording.
+    """
+
+    def __init__(self, records, timing=False):
+        self.records = records
+        self.timing = timing
+        self.position = 0
+        self.last_command = None
+        self.start = None
+        self.pending = ''
+
+    @property
+    def finished(self):
+        return self.position >= len(self.records)
+
+    def next_record(self):
+        if self.finished:
+            raise ReplayError("The recording ended")
+        record = self.records[self.position]
+        self.position += 1
+        if self.start is None:
+            self.start = perf_counter() - record[0]
+        return record
+
+    def next_command(self):
+        """Returns the next command of the recording, None when a response or nothing is next"""
+        if self.finished or self.records[self.position][1] not in COMMAND_KINDS:
+            return None
+        return self.records[self.position][1:]
+
+    def write(self, data):
+        commands = (self.pending + data.decode('latin-1')).split('\r')
+        self.pending = commands.pop()
+        for command in commands:
+            command = encode_command(command + '\r')
+            recorded = self.next_record()[1:]
+            if recorded != command:
+                self.position -= 1
+                raise ReplayError("Command %r at record %i differs from the recorded %r" %
+                                  (format_command(*command), self.position, format_command(*recorded)
+                                   if recorded[0] in COMMAND_KINDS else format_response(*recorded)))
+            self.last_command = command
+        return len(data)
+
+    def readline(self):
+        if self.next_command() is not None:
+            raise ReplayError("No response at record %i, the recording has command %r" %
+                              (self.position, format_command(*self.next_command())))
+        record = self.next_record()
+        if self.timing:
+            delay = self.start + record[0] - perf_counter()
+            if delay > 0:
+                sleep(delay)
+        return format_response(*record[1:]).encode('latin-1')
+
+    def reset_input_buffer(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ReplayPolling(FixedPolling):
+    """Polls as often as the recorded session did: until the flag is set or the recording moves on"""
+
+    def __init__(self, serial):
+        super(ReplayPolling, self).__init__(0.0)
+        self.serial = serial
+
+    def wait(self, poll, timeout_s, operation=None, interval=None):
+        polls = 0
+        found = False
+        while True:
+            polls += 1
+            if poll():
+                found = True
+                break
+            if self.serial.next_command() != self.serial.last_command:
+                break
+        self.last_polls = polls
+        self.total_polls += polls
+        self.calls += 1
+        return found
+
+
+class ReplayTransport(PozyxSerial):
+    """A PozyxSerial replaying a recording of a SerialRecorder instead of using a serial port.
+
+    Args:
+        path: the file of the recording.
+        timing (optional): whether the responses come at their original times instead of as
+            fast as possible. Default is False.
+        print_output (optional): boolean for printing the serial exchanges, mainly for debugging purposes
+        suppress_warnings (optional): boolean for suppressing warnings in the Pozyx use, usage not recommended
+        thread_safe (optional): boolean for sharing the interface between threads, see PozyxSerial.
+    """
+
+    def __init__(self, path, timing=False, print_output=False, suppress_warnings=True, thread_safe=False):
+        # there's no port to connect to, so PozyxSerial's initialisation is skipped
+        PozyxLib.__init__(self)
+        self.lock = InstrumentedLock() if thread_safe else None
+        self.print_output = print_output
+        self.suppress_warnings = suppress_warnings
+        self.port = path
+        self.timing = timing
+        self.start_time, records = read_recording(path)
+        self.ser = ReplaySerial(records, timing)
+        self.setPollingStrategy(ReplayPolling(self.ser))
+
+    @property
+    def finished(self):
+        """Whether every record of the recording is replayed"""
+        return self.ser.finished
+
+    def setWrite(self, address, data, remote_id=None, local_delay=PozyxConstants.DELAY_LOCAL_WRITE,
+                 remote_delay=PozyxConstants.DELAY_REMOTE_WRITE):
+        if not self.timing:
+            local_delay = remote_delay = 0
+        return super(ReplayTransport, self).setWrite(address, data, remote_id, local_delay, remote_delay)
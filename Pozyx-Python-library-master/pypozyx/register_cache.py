@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""pypozyx.register_cache - contains RegisterCache, a shadow copy of the configuration registers of Pozyx devices.
+
+Configuration registers like the UWB settings, the positioning algorithm, the filter and the
+network ID rarely change, yet a lot of library functions read them again and again, locally or
+over the radio. A RegisterCache keeps a shadow copy of these registers per device: reads fill it,
+writes go through it, and functions that change the configuration invalidate it. The results of
+the device list functions, like the positioning anchor IDs, are kept as well.
+
+Volatile registers, like the interrupt status, sensor data, positions and RX info, are never cached.
+
+Example usage:
+    >>> pozyx.setRegisterCache(RegisterCache())
+    >>> pozyx.getUWBSettings(uwb_settings, remote_id=0x6e30)  # read over the radio
+    >>> pozyx.getUWBSettings(uwb_settings, remote_id=0x6e30)  # served from the cache
+    >>> pozyx.getRegisterCache().hits, pozyx.getRegisterCache().saved_remote_exchanges
+    (1, 1)
+"""
+from binascii import hexlify, unhexlify
+
+from pypozyx.definitions.constants import POZYX_SUCCESS
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.structures.generic import is_reg_readable
+
+# identification and configuration registers that only change when written or by configuration functions
+CACHEABLE_REGISTERS = frozenset([reg for reg in range(PozyxRegisters.WHO_AM_I, PozyxRegisters.HARDWARE_VERSION + 1)] +
+                                [reg for reg in range(PozyxRegisters.INTERRUPT_MASK, PozyxRegisters.CONFIG_GPIO_4 + 1)
+                                 if is_reg_readable(reg)] +
+                                [PozyxRegisters.DEVICE_LIST_SIZE])
+
+# functions that don't change any cached register
+PURE_FUNCTIONS = frozenset([PozyxRegisters.LED_CONTROL, PozyxRegisters.WRITE_TX_DATA, PozyxRegisters.SEND_TX_DATA,
+                            PozyxRegisters.READ_RX_DATA, PozyxRegisters.GET_FLASH_DETAILS,
+                            PozyxRegisters.GET_DEVICE_RANGE_INFO, PozyxRegisters.CIR_DATA])
+
+# functions returning the device list, whose output is cached
+DEVICE_LIST_FUNCTIONS = frozenset([PozyxRegisters.GET_POSITIONING_ANCHOR_IDS, PozyxRegisters.GET_DEVICE_LIST_IDS,
+                                   PozyxRegisters.GET_DEVICE_INFO, PozyxRegisters.GET_DEVICE_COORDINATES])
+
+# functions changing the device list, and with it the device list size and positioning anchors.
+# Ranging and positioning add the devices they range with to the device list.
+DEVICE_LIST_CHANGING_FUNCTIONS = frozenset([PozyxRegisters.SET_POSITIONING_ANCHOR_IDS, PozyxRegisters.DO_DISCOVERY,
+                                            PozyxRegisters.CLEAR_DEVICES, PozyxRegisters.ADD_DEVICE,
+                                            PozyxRegisters.DO_RANGING, PozyxRegisters.DO_POSITIONING,
+                                            PozyxRegisters.DO_POSITIONING_WITH_DATA])
+
+
+class RegisterCache(object):
+    """Write-through shadow cache of the configuration registers of the local and remote devices.
+
+    Attributes:
+        hits: amount of reads and functions served from the cache.
+        misses: amount of cacheable reads and functions that had to go to the device.
+        saved_round_trips: amount of local exchanges with the device avoided by the cache.
+        saved_remote_exchanges: amount of remote register cycles over UWB avoided by the cache.
+    """
+
+    def __init__(self):
+        self.registers = {}
+        self.functions = {}
+        self.hits = 0
+        self.misses = 0
+        self.saved_round_trips = 0
+        self.saved_remote_exchanges = 0
+
+    @staticmethod
+    def is_cacheable(address, size):
+        """Returns whether all registers in the range are cacheable"""
+        return size > 0 and all(reg in CACHEABLE_REGISTERS for reg in range(address, address + size))
+
+    def hit_rate(self):
+        """Returns the fraction of cacheable reads and functions served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / float(total) if total else 0.0
+
+    def count_hit(self, remote_id):
+        self.hits += 1
+        if remote_id is None:
+            self.saved_round_trips += 1
+        else:
+            self.saved_remote_exchanges += 1
+
+    def load(self, remote_id, address, data):
+        """Loads the cached registers into data, returns whether they were all cached"""
+        if not self.is_cacheable(address, data.byte_size):
+            return False
+        registers = self.registers.get(remote_id, {})
+        try:
+            values = bytearray(registers[reg] for reg in range(address, address + data.byte_size))
+        except KeyError:
+            self.misses += 1
+            return False
+        data.load_bytes(hexlify(values).decode())
+        self.count_hit(remote_id)
+        return True
+
+    def store(self, remote_id, address, data):
+        """Stores the register values of data, as read from or written to the device, starting at address"""
+        if not self.is_cacheable(address, data.byte_size):
+            return
+        values = bytearray(unhexlify(data.byte_data))
+        registers = self.registers.setdefault(remote_id, {})
+        for offset, value in enumerate(values[:data.byte_size]):
+            registers[address + offset] = value
+
+    def store_written(self, remote_id, address, data):
+        """Stores the register values of data written to the device, starting at address"""
+        if self.is_cacheable(address, data.byte_size):
+            data.load_hex_string()
+            self.store(remote_id, address, data)
+
+    def invalidate(self, remote_id=None, address=None, size=1):
+        """Drops the registers in the range from the cache, or the whole device without address"""
+        if address is None:
+            self.registers.pop(remote_id, None)
+            self.functions.pop(remote_id, None)
+            return
+        registers = self.registers.get(remote_id, {})
+        for reg in range(address, address + size):
+            registers.pop(reg, None)
+
+    def clear(self):
+        """Drops the cached registers of all devices"""
+        self.registers.clear()
+        self.functions.clear()
+
+    def function_key(self, function, params, data):
+        params.load_hex_string()
+        return function, params.byte_data, data.byte_size
+
+    def load_function(self, remote_id, function, params, data):
+        """Loads the cached output of a device list function into data, returns its status or None if not cached"""
+        if function not in DEVICE_LIST_FUNCTIONS:
+            return None
+        cached = self.functions.get(remote_id, {}).get(self.function_key(function, params, data))
+        if cached is None:
+            self.misses += 1
+            return None
+        status, byte_data = cached
+        if len(data) > 0:
+            data.load_bytes(byte_data)
+        self.count_hit(remote_id)
+        return status
+
+    def function_called(self, remote_id, function, params, data, status):
+        """Updates the cache after a function was performed on the device"""
+        if function in DEVICE_LIST_FUNCTIONS:
+            if status == POZYX_SUCCESS:
+                byte_data = ''
+                if len(data) > 0:
+                    data.load_hex_string()
+                    byte_data = data.byte_data
+                self.functions.setdefault(remote_id, {})[self.function_key(function, params, data)] = (status, byte_data)
+        elif function in DEVICE_LIST_CHANGING_FUNCTIONS:
+            self.functions.pop(remote_id, None)
+            self.invalidate(remote_id, PozyxRegisters.DEVICE_LIST_SIZE)
+            self.invalidate(remote_id, PozyxRegisters.POSITIONING_NUMBER_OF_ANCHORS)
+        elif function not in PURE_FUNCTIONS:
+            # resets, flash operations and unknown functions can change any register
+            self.invalidate(remote_id)
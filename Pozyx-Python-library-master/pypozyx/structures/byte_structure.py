@@ -2,6 +2,24 @@
 """ pypozyx.structures.byte_structure - contains the ByteStructure class, thank you struct."""
 
 import struct
+from binascii import hexlify, unhexlify
+
+# precompiled little-endian Struct objects, one per encountered data format
+_compiled_formats = {}
+
+
+def get_struct(data_format):
+    """Returns the precompiled struct.Struct for a data format, compiling it on first use.
+
+    Pozyx data is little-endian and unpadded, so the formats are compiled with '<'.
+    Class formats are compiled once on first use, and dynamic formats (Data, DeviceList,
+    PositioningData) share the same cache, keyed on their format string.
+    """
+    try:
+        return _compiled_formats[data_format]
+    except KeyError:
+        compiled = _compiled_formats[data_format] = struct.Struct('<' + data_format)
+        return compiled
 
 
 class ByteStructure(object):
@@ -26,45 +44,34 @@ class ByteStructure(object):
 
     def bytes_to_data(self):
         """Transforms hex data into packed UINT8 byte values"""
-        s = ''.encode()
-        for i in range(int(len(self.byte_data) / 2)):
-            index = 2 * i
-            s += struct.pack('B',
-                             int(self.byte_data[index:index + 2], 16))
-        self.load_packed(s)
+        byte_data = self.byte_data
+        if len(byte_data) & 1:
+            byte_data = byte_data[:-1]
+        self.load_packed(unhexlify(byte_data))
 
     def load_packed(self, packed):
         """Unpacks the packed UINT8 bytes in their right format as given in data_format"""
-        index = 0
-        self.data = [0] * len(self.data_format)
-        for i in range(len(self.data_format)):
-            data_len = struct.calcsize(self.data_format[i])
-            self.data[i] = struct.unpack(self.data_format[i], packed[
-                                         index:index + data_len])[0]
-            index += data_len
+        self.data = list(get_struct(self.data_format).unpack_from(packed))
         self.load(self.data)
 
+    def to_packed(self):
+        """Packs the data in its data format, returning the UINT8 bytestring"""
+        data_format = self.data_format
+        if len(data_format) != len(self.data):
+            data_format = data_format[:len(self.data)]
+        return get_struct(data_format).pack(*self.data)
+
     def load_hex_string(self):
         """Loads the data's hex string for sending"""
-        byte_data = self.transform_to_bytes()
-        s = ''
-        for i in range(len(byte_data)):
-            s += '%0.2x' % byte_data[i]
-        self.byte_data = s
+        self.byte_data = hexlify(self.to_packed()).decode()
 
     def transform_to_bytes(self):
         """Transforms the data to a UINT8 bytestring in hex"""
-        new_format = ''
-        for i in range(len(self.data)):
-            new_format += 'B' * struct.calcsize(self.data_format[i])
-        return self.transform_data(new_format)
+        return list(bytearray(self.to_packed()))
 
     def set_packed_size(self):
         """Sets the size (bytesize) to the structures data format, but packed"""
-        new_format = ''
-        for i in range(len(self.data)):
-            new_format += 'B' * struct.calcsize(self.data_format[i])
-        self.byte_size = 1 * len(new_format)
+        self.byte_size = get_struct(self.data_format[:len(self.data)]).size
 
     def set_unpacked_size(self):
         """Sets the size (bytesize) to the structures data format, unpacked"""
@@ -72,10 +79,7 @@ class ByteStructure(object):
 
     def transform_data(self, new_format):
         """Transforms the data to a new format, handy for decoding to bytes"""
-        s = ''.encode()
-        for i in range(len(self.data)):
-            s += struct.pack(self.data_format[i], self.data[i])
-        return list(struct.unpack(new_format, s))
+        return list(struct.unpack(new_format, self.to_packed()))
 
     def load(self, data, convert=True):
         """Loads data in its relevant class components."""
@@ -8,6 +8,8 @@ DeviceCoordinates
     consists of a device's ID, flag, and coordinates
 DeviceRange
     consists of a range measurements timestamp, distance, and RSS
+RangeMeasurement
+    a named tuple of a range measurement's destination, timestamp, distance, RSS and status
 NetworkID
     container for a device's ID. Prints in 0xID format.
 DeviceList
@@ -15,6 +17,7 @@ DeviceList
 UWBSettings
     contains all of the UWB settings: channel, bitrate, prf, plen, and gain.
 """
+from collections import namedtuple
 
 from pypozyx.definitions.constants import PozyxConstants
 from pypozyx.structures.byte_structure import ByteStructure
@@ -80,6 +83,10 @@ class DeviceCoordinates(ByteStructure):
         self.data[4] = value.z
 
 
+RangeMeasurement = namedtuple('RangeMeasurement', ['destination', 'timestamp', 'distance', 'RSS', 'status'])
+RangeMeasurement.__doc__ = """Result of one of the range measurements of doRangingMany, with its status"""
+
+
 class DeviceRange(ByteStructure):
     """
     Container for the device range data, resulting from a range measurement.
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""pypozyx.tools.multilateration - contains Multilateration, a host-side position solver for many tags at once.
+
+Instead of letting every tag solve its own position in firmware, the tags can just range with
+the anchors, using doRanging or the RangeInformation entries of PositioningData, after which
+Multilateration solves the positions of all tags of an epoch in one batch. The solve is a
+linear least squares initialisation followed by a few Gauss-Newton iterations, vectorized over
+the tags with NumPy, so hundreds of tags take about as long as one.
+
+Every position comes with its covariance in mm^2, like the PositionError the firmware reports,
+estimated from the residuals of the ranges or from a given range standard deviation.
+
+Example usage:
+    >>> solver = Multilateration(anchors, dimension=PozyxConstants.DIMENSION_3D)
+    >>> ranges = solver.range_matrix([{0x6001: 4021, 0x6002: 3511, 0x6003: 2980, 0x6004: 5012}])
+    >>> positions, covariances, valid = solver.solve(ranges)
+    >>> solver.position_error(covariances[0])
+    X: 412, Y: 380, Z: 2210, XY: -12, XZ: 95, YZ: 40
+"""
+import numpy as np
+
+from pypozyx.definitions.constants import PozyxConstants
+from pypozyx.structures.sensor_data import Coordinates, PositionError, RangeInformation
+
+
+def ranges_from_positioning_data(positioning_data):
+    """Returns the ranges in PositioningData as a dictionary of device ID to distance in mm"""
+    return {container.device_id: container.distance for container in positioning_data.containers
+            if isinstance(container, RangeInformation)}
+
+
+class Multilateration(object):
+    """Solves the positions of many tags from their ranges to a set of anchors.
+
+    Args:
+        anchors: the anchors, as a list of DeviceCoordinates.
+        dimension (optional): DIMENSION_3D (default), DIMENSION_2D or DIMENSION_2_5D.
+        height (optional): the height of the tags in mm for 2.5D positioning. Default is 1000.
+        iterations (optional): the amount of Gauss-Newton iterations after the linear solve. Default is 5.
+        range_std (optional): standard deviation of the ranges in mm. When not given, it's estimated
+            from the residuals of every tag, which needs more anchors than unknowns.
+    """
+
+    def __init__(self, anchors, dimension=PozyxConstants.DIMENSION_3D, height=1000, iterations=5, range_std=None):
+        if dimension not in PozyxConstants.DIMENSIONS:
+            raise ValueError("Unknown dimension %s" % dimension)
+        self.anchor_ids = [anchor.network_id for anchor in anchors]
+        self.anchor_index = {anchor_id: index for index, anchor_id in enumerate(self.anchor_ids)}
+        self.anchor_positions = np.array([[anchor.pos.x, anchor.pos.y, anchor.pos.z] for anchor in anchors],
+                                         dtype=float)
+        self.dimension = dimension
+        self.height = height
+        self.iterations = iterations
+        self.range_std = range_std
+
+    @property
+    def unknowns(self):
+        """The amount of solved coordinates, 3 in 3D and 2 otherwise"""
+        return 3 if self.dimension == PozyxConstants.DIMENSION_3D else 2
+
+    def range_matrix(self, measurements):
+        """Returns the ranges of the tags as a (tags, anchors) array with NaN for missing ranges.
+
+        Args:
+            measurements: a list with per tag a dictionary of anchor ID to distance in mm, a list of
+                RangeInformation, or PositioningData with ranges.
+        """
+        ranges = np.full((len(measurements), len(self.anchor_ids)), np.nan)
+        for tag, tag_measurements in enumerate(measurements):
+            if hasattr(tag_measurements, 'containers'):
+                tag_measurements = ranges_from_positioning_data(tag_measurements)
+            elif not hasattr(tag_measurements, 'items'):
+                tag_measurements = {info.device_id: info.distance for info in tag_measurements}
+            for anchor_id, distance in tag_measurements.items():
+                if anchor_id in self.anchor_index:
+                    ranges[tag, self.anchor_index[anchor_id]] = distance
+        return ranges
+
+    def fixed_anchor_positions(self):
+        """Returns the anchor positions in the solved coordinates and the squared offset in the fixed coordinate"""
+        if self.dimension == PozyxConstants.DIMENSION_3D:
+            return self.anchor_positions, np.zeros(len(self.anchor_ids))
+        if self.dimension == PozyxConstants.DIMENSION_2D:
+            # all devices are assumed to be in the same plane
+            return self.anchor_positions[:, :2], np.zeros(len(self.anchor_ids))
+        return self.anchor_positions[:, :2], (self.height - self.anchor_positions[:, 2]) ** 2
+
+    def linear_solve(self, ranges, weights, anchors, offsets):
+        """Returns the linear least squares positions, solving for the position and its squared norm.
+
+        Solving |p|^2 as an extra unknown makes the equations linear and the same for every tag,
+        only the weights of the missing ranges differ, so all tags are solved in one batch.
+        """
+        design = np.hstack([-2 * anchors, np.ones((len(anchors), 1))])
+        targets = np.nan_to_num(ranges) ** 2 - (anchors ** 2).sum(axis=1) - offsets
+        weighted_design = weights[:, :, np.newaxis] * design
+        normal = np.einsum('tai,aj->tij', weighted_design, design)
+        projected = np.einsum('tai,ta->ti', weighted_design, targets)
+        solution = np.einsum('tij,tj->ti', np.linalg.pinv(normal), projected)
+        return solution[:, :-1]
+
+    def solve(self, ranges):
+        """Solves the positions of the tags.
+
+        Args:
+            ranges: (tags, anchors) array of ranges in mm, in the order of the anchors, NaN or 0 if missing.
+
+        Returns:
+            positions: (tags, 3) array of coordinates in mm.
+            covariances: (tags, 3, 3) array of position covariances in mm^2, zero for the fixed coordinate.
+            valid: (tags,) boolean array, False for tags with too few ranges, whose position is NaN.
+        """
+        ranges = np.atleast_2d(np.asarray(ranges, dtype=float))
+        weights = (np.isfinite(ranges) & (ranges > 0)).astype(float)
+        ranges = np.where(weights > 0, ranges, 0.0)
+        anchors, offsets = self.fixed_anchor_positions()
+        unknowns = self.unknowns
+        counts = weights.sum(axis=1)
+        valid = counts >= unknowns + 1
+
+        positions = self.linear_solve(ranges, weights, anchors, offsets)
+        for iteration in range(self.iterations):
+            differences = positions[:, np.newaxis, :] - anchors[np.newaxis, :, :]
+            distances = np.sqrt((differences ** 2).sum(axis=2) + offsets)
+            distances = np.maximum(distances, 1e-6)
+            jacobians = differences / distances[:, :, np.newaxis]
+            residuals = (distances - ranges) * weights
+            normal = np.einsum('tai,ta,taj->tij', jacobians, weights, jacobians)
+            gradient = np.einsum('tai,ta->ti', jacobians, residuals)
+            positions = positions - np.einsum('tij,tj->ti', np.linalg.pinv(normal), gradient)
+
+        differences = positions[:, np.newaxis, :] - anchors[np.newaxis, :, :]
+        distances = np.maximum(np.sqrt((differences ** 2).sum(axis=2) + offsets), 1e-6)
+        jacobians = differences / distances[:, :, np.newaxis]
+        normal = np.einsum('tai,ta,taj->tij', jacobians, weights, jacobians)
+        if self.range_std is not None:
+            variances = np.full(len(ranges), float(self.range_std) ** 2)
+        else:
+            residuals = (distances - ranges) * weights
+            degrees_of_freedom = np.maximum(counts - unknowns, 1)
+            variances = (residuals ** 2).sum(axis=1) / degrees_of_freedom
+        solved_covariances = variances[:, np.newaxis, np.newaxis] * np.linalg.pinv(normal)
+
+        full_positions = np.zeros((len(ranges), 3))
+        covariances = np.zeros((len(ranges), 3, 3))
+        full_positions[:, :unknowns] = positions
+        covariances[:, :unknowns, :unknowns] = solved_covariances
+        if self.dimension == PozyxConstants.DIMENSION_2_5D:
+            full_positions[:, 2] = self.height
+        full_positions[~valid] = np.nan
+        covariances[~valid] = np.nan
+        return full_positions, covariances, valid
+
+    def solve_measurements(self, measurements):
+        """Solves the positions of the tags from their measurements, see range_matrix and solve"""
+        return self.solve(self.range_matrix(measurements))
+
+    @staticmethod
+    def coordinates(position):
+        """Returns a solved position as Coordinates"""
+        return Coordinates(int(round(position[0])), int(round(position[1])), int(round(position[2])))
+
+    @staticmethod
+    def position_error(covariance):
+        """Returns a solved covariance as PositionError, clipped to its 16 bit registers"""
+        limit = 2 ** 15 - 1
+        values = [covariance[0, 0], covariance[1, 1], covariance[2, 2],
+                  covariance[0, 1], covariance[0, 2], covariance[1, 2]]
+        return PositionError(*[int(max(-limit, min(limit, round(value)))) for value in values])
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+"""pypozyx.tools.range_filter - contains RangeFilter, a streaming outlier rejection and NLOS detection stage.
+
+Raw range measurements contain spikes, dropouts of zero distance and stretches without line of
+sight (NLOS), in which the signal reflects around obstacles and the ranges come out too long.
+A RangeFilter judges every measurement against the measurements before it:
+
+- a distance further than threshold robust standard deviations from the median of the previous
+  window distances is rejected as outlier. The robust standard deviation is derived from the
+  median absolute deviation (MAD).
+- a measurement with an RSS more than nlos_drop dB below the RSS baseline, a slow moving average
+  of the RSS, is flagged as likely NLOS.
+- every measurement gets a confidence between 0 and 1, 0 for rejected measurements.
+
+The window has a fixed size, so every measurement takes constant time and memory. Measurements
+can be filtered one at a time, or in batches as NumPy arrays with the same results. The filter
+is a stage: filter() takes any iterable of measurements, like a RangingStream or another stage,
+and yields the filtered ones, so stages can be chained. Measurements of different devices
+should be filtered separately, which RangeFilterBank does.
+
+Example usage:
+    >>> range_filter = RangeFilter(window=15)
+    >>> pozyx.doRanging(0x6e30, device_range)
+    >>> filtered = range_filter.process_range(device_range)
+    >>> filtered.accepted, filtered.nlos, filtered.confidence
+    (True, False, 0.97)
+    >>> filtered_log = range_filter.process_batch(read_spill('ranges.bin'))
+    >>> filtered_log['distance'][filtered_log['accepted']].mean()
+    4521.3
+"""
+from bisect import insort
+from collections import deque, namedtuple
+from math import log
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from pypozyx.definitions.constants import POZYX_SUCCESS
+from pypozyx.tools.time_series import RANGE_DTYPE
+
+# RANGE_DTYPE extended with the judgement of the filter
+FILTERED_RANGE_DTYPE = np.dtype(RANGE_DTYPE.descr + [('median', '<f4'), ('accepted', '?'), ('nlos', '?'),
+                                                     ('confidence', '<f4')])
+
+FilteredRange = namedtuple('FilteredRange', ['timestamp', 'distance', 'RSS', 'median', 'accepted', 'nlos',
+                                             'confidence'])
+FilteredRange.__doc__ = """A range measurement with the judgement of a RangeFilter"""
+
+# the MAD of normally distributed values times this is their standard deviation
+MAD_TO_STD = 1.4826
+
+
+def sorted_median(values):
+    """Returns the median of a sorted list"""
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def exponential_average(values, alpha, initial):
+    """Returns the moving average before every value, starting at initial, and the average after the last value.
+
+    The recursion is solved in closed form per block, with blocks short enough for the powers of
+    1 - alpha to stay well within float precision.
+    """
+    decay = 1.0 - alpha
+    if decay <= 0:
+        return np.concatenate([[initial], values[:-1]]).astype(float), float(values[-1]) if len(values) else initial
+    block = int(max(1, min(512, 15.0 / -log(decay)))) if decay < 1 else len(values) or 1
+    averages = np.empty(len(values))
+    current = float(initial)
+    for start in range(0, len(values), block):
+        chunk = np.asarray(values[start:start + block], dtype=float)
+        powers = decay ** np.arange(len(chunk) + 1)
+        # average before element k: decay^k * current + alpha * sum_{m<k} decay^(k-1-m) * chunk[m]
+        weighted = np.concatenate([[0.0], np.cumsum(alpha * chunk / powers[1:])])
+        before = powers * (current + weighted)
+        averages[start:start + len(chunk)] = before[:-1]
+        current = before[-1]
+    return averages, current
+
+
+class RangeFilter(object):
+    """Streaming outlier rejection and NLOS detection for the range measurements with one device.
+
+    Args:
+        window (optional): amount of previous distances the median and MAD are taken over. Default is 15.
+        threshold (optional): amount of robust standard deviations from the median at which a
+            distance is rejected. Default is 3.
+        min_std (optional): lower bound of the robust standard deviation in mm, so a window of
+            nearly equal distances doesn't reject every change. Default is 30.
+        warmup (optional): amount of previous distances needed before rejecting. Default is 5.
+        rss_alpha (optional): weight of a new RSS in the RSS baseline. Default is 0.01.
+        nlos_drop (optional): drop in dB below the RSS baseline that flags NLOS. Default is 6.
+        nlos_confidence (optional): factor on the confidence of NLOS measurements. Default is 0.5.
+    """
+
+    def __init__(self, window=15, threshold=3.0, min_std=30.0, warmup=5, rss_alpha=0.01, nlos_drop=6.0,
+                 nlos_confidence=0.5):
+        self.window = window
+        self.threshold = threshold
+        self.min_std = min_std
+        self.warmup = min(warmup, window)
+        self.rss_alpha = rss_alpha
+        self.nlos_drop = nlos_drop
+        self.nlos_confidence = nlos_confidence
+        self.history = deque(maxlen=window)
+        self.sorted_history = []
+        self.baseline = None
+        self.count = 0
+        self.rejected = 0
+        self.nlos = 0
+
+    def reset(self):
+        """Forgets the window and the RSS baseline"""
+        self.history.clear()
+        self.sorted_history = []
+        self.baseline = None
+
+    def confidence(self, score, count):
+        """Returns the confidence of a distance score robust standard deviations from the median"""
+        if count < self.warmup:
+            return 0.5
+        relative = score / self.threshold
+        return 0.0 if relative > 1 else 1.0 - relative * relative
+
+    def process(self, distance, RSS, timestamp=0):
+        """Filters one measurement, returns it as FilteredRange.
+
+        A distance of 0 is a dropout, which is rejected and left out of the window and RSS baseline.
+        """
+        self.count += 1
+        distance, RSS = float(distance), float(RSS)
+        if distance <= 0:
+            self.rejected += 1
+            return FilteredRange(timestamp, distance, RSS, float('nan'), False, False, 0.0)
+
+        values = self.sorted_history
+        median = float('nan')
+        score = 0.0
+        if values:
+            median = sorted_median(values)
+            mad = sorted_median(sorted(abs(value - median) for value in values))
+            score = abs(distance - median) / max(MAD_TO_STD * mad, self.min_std)
+        accepted = len(values) < self.warmup or score <= self.threshold
+        confidence = self.confidence(score, len(values)) if accepted else 0.0
+
+        nlos = self.baseline is not None and self.baseline - RSS > self.nlos_drop
+        if nlos:
+            self.nlos += 1
+            confidence *= self.nlos_confidence
+        if not accepted:
+            self.rejected += 1
+        self.baseline = RSS if self.baseline is None else (1 - self.rss_alpha) * self.baseline + self.rss_alpha * RSS
+
+        if len(self.history) == self.window:
+            values.remove(self.history[0])
+        self.history.append(distance)
+        insort(values, distance)
+        return FilteredRange(timestamp, distance, RSS, median, accepted, nlos, confidence)
+
+    def process_range(self, device_range):
+        """Filters a DeviceRange, returns it as FilteredRange"""
+        return self.process(device_range.distance, device_range.RSS, device_range.timestamp)
+
+    def filter(self, measurements, accepted_only=True):
+        """Yields the FilteredRange of every DeviceRange, RangingRecord or FilteredRange in measurements.
+
+        Args:
+            measurements: iterable of measurements, RangingRecords with a failed status are skipped.
+            accepted_only (optional): whether only the accepted measurements are yielded. Default is True.
+        """
+        for measurement in measurements:
+            if getattr(measurement, 'status', POZYX_SUCCESS) != POZYX_SUCCESS:
+                continue
+            measurement = getattr(measurement, 'device_range', measurement)
+            filtered = self.process(measurement.distance, measurement.RSS, measurement.timestamp)
+            if filtered.accepted or not accepted_only:
+                yield filtered
+
+    def process_batch(self, samples):
+        """Filters a batch of measurements, returns them as FILTERED_RANGE_DTYPE array.
+
+        Args:
+            samples: structured array with at least the distance and RSS fields, like RANGE_DTYPE.
+        """
+        filtered = np.zeros(len(samples), dtype=FILTERED_RANGE_DTYPE)
+        for name in samples.dtype.names:
+            if name in RANGE_DTYPE.names:
+                filtered[name] = samples[name]
+        self.count += len(samples)
+        distances = np.asarray(samples['distance'], dtype=float)
+        valid = distances > 0
+        filtered['median'] = np.nan
+        if not valid.any():
+            self.rejected += len(samples)
+            return filtered
+        valid_distances = distances[valid]
+        rss = np.asarray(samples['RSS'], dtype=float)[valid]
+
+        # the previous window distances of every valid distance, NaN padded at the start
+        padding = np.full(self.window - len(self.history), np.nan)
+        extended = np.concatenate([padding, np.asarray(self.history, dtype=float), valid_distances])
+        windows = sliding_window_view(extended, self.window)[:len(valid_distances)]
+        counts = np.minimum(np.arange(len(self.history), len(self.history) + len(valid_distances)), self.window)
+        medians = np.full(len(valid_distances), np.nan)
+        mads = np.full(len(valid_distances), np.nan)
+        full = counts == self.window
+        if full.any():
+            medians[full] = np.median(windows[full], axis=1)
+            mads[full] = np.median(np.abs(windows[full] - medians[full, np.newaxis]), axis=1)
+        for index in np.flatnonzero(~full & (counts > 0)):
+            values = windows[index][-counts[index]:]
+            medians[index] = np.median(values)
+            mads[index] = np.median(np.abs(values - medians[index]))
+        with np.errstate(invalid='ignore'):
+            scores = np.where(counts > 0, np.abs(valid_distances - medians) /
+                              np.maximum(MAD_TO_STD * np.nan_to_num(mads), self.min_std), 0.0)
+            accepted = (counts < self.warmup) | (scores <= self.threshold)
+            relative = scores / self.threshold
+            confidence = np.where(counts < self.warmup, 0.5, np.where(accepted, 1.0 - relative * relative, 0.0))
+
+        first = self.baseline is None
+        baselines, self.baseline = exponential_average(rss, self.rss_alpha, rss[0] if first else self.baseline)
+        nlos = baselines - rss > self.nlos_drop
+        if first:
+            # there's no baseline before the very first measurement
+            nlos[0] = False
+        confidence = np.where(nlos, confidence * self.nlos_confidence, confidence)
+
+        filtered['median'][valid] = medians
+        filtered['accepted'][valid] = accepted
+        filtered['nlos'][valid] = nlos
+        filtered['confidence'][valid] = confidence
+        self.rejected += len(samples) - int(accepted.sum())
+        self.nlos += int(nlos.sum())
+
+        for distance in valid_distances[-self.window:]:
+            if len(self.history) == self.window:
+                self.sorted_history.remove(self.history[0])
+            self.history.append(distance)
+            insort(self.sorted_history, distance)
+        return filtered
+
+    def statistics(self):
+        """Returns the amounts of measurements, rejected measurements and NLOS measurements"""
+        return {'count': self.count, 'rejected': self.rejected, 'nlos': self.nlos,
+                'rss_baseline': self.baseline}
+
+
+class RangeFilterBank(object):
+    """A RangeFilter per device, for streams with the measurements of several devices.
+
+    Args:
+        kwargs: the arguments of the RangeFilter of every device.
+    """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.filters = {}
+
+    def __getitem__(self, device_id):
+        if device_id not in self.filters:
+            self.filters[device_id] = RangeFilter(**self.kwargs)
+        return self.filters[device_id]
+
+    def process(self, device_id, distance, RSS, timestamp=0):
+        return self[device_id].process(distance, RSS, timestamp)
+
+    def filter(self, records, accepted_only=True):
+        """Yields (destination, FilteredRange) for the RangingRecords of a RangingStream"""
+        for record in records:
+            if record.status != POZYX_SUCCESS:
+                continue
+            filtered = self[record.destination].process_range(record.device_range)
+            if filtered.accepted or not accepted_only:
+                yield record.destination, filtered
+
+    def process_batch(self, samples):
+        """Filters a batch with the device_id field, returns it as FILTERED_RANGE_DTYPE array"""
+        filtered = np.zeros(len(samples), dtype=FILTERED_RANGE_DTYPE)
+        device_ids = samples['device_id']
+        for device_id in np.unique(device_ids):
+            selection = device_ids == device_id
+            filtered[selection] = self[int(device_id)].process_batch(samples[selection])
+        return filtered
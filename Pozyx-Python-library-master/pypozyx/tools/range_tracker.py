@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+"""pypozyx.tools.range_tracker - contains RangeTracker, tracking the distance and closing speed of many links.
+
+A controller following another vehicle needs a smooth distance and the speed at which it
+changes at a fixed rate, while range measurements arrive irregularly or not at all. A
+RangeTracker runs a constant-velocity Kalman filter per link, a link being anything ranged
+with, like a device ID or a pair of device IDs, with as state the distance in mm and the range
+rate in mm/s, which is negative when closing in.
+
+The filters step on the timestamps of the measurements, the millisecond clock of the device
+that measured, so host delays don't add noise. The 32 bit wraparound of that clock is handled,
+and a link whose clock jumps back further than max_delay starts over, as its device restarted.
+Measurements are queued with add() and applied with tick(), which updates all links
+in a few NumPy operations and returns a TrackSnapshot of every link predicted to the same host
+time. The device clock of a link is mapped on host time with the smallest offset seen between
+them, the measurement with the least host delay.
+
+Example usage:
+    >>> tracker = RangeTracker([0x6e66, 0x6e67])
+    >>> for record in stream:
+    ...     tracker.add_record(record)
+    ...     snapshot = tracker.tick()
+    ...     print(snapshot.distances, snapshot.rates)
+    [4521.3 8012.9] [-310.2 12.5]
+"""
+from collections import namedtuple
+from time import perf_counter
+
+import numpy as np
+
+from pypozyx.definitions.constants import POZYX_SUCCESS
+
+TrackSnapshot = namedtuple('TrackSnapshot', ['time', 'link_ids', 'distances', 'rates', 'distance_std', 'rate_std',
+                                             'valid'])
+TrackSnapshot.__doc__ = """Distances in mm and range rates in mm/s of all links at a host time, with their standard
+deviations. Links that were never measured or not for longer than max_gap are not valid."""
+
+# the timestamps of the devices are milliseconds in 32 bits
+TIMESTAMP_WRAP = 2 ** 32
+
+
+class RangeTracker(object):
+    """Constant-velocity Kalman filters on the distance and range rate of a set of links.
+
+    Args:
+        link_ids (optional): the IDs of the links to track, more can be added with add_link.
+        acceleration_std (optional): standard deviation of the relative acceleration in mm/s^2,
+            the process noise. Default is 1000.
+        measurement_std (optional): standard deviation of a range measurement in mm. Default is 100.
+        initial_rate_std (optional): standard deviation of the range rate before it's measured in
+            mm/s. Default is 2000.
+        max_gap (optional): time in seconds without measurements after which a link isn't valid. Default is 2.
+        max_delay (optional): time in seconds a measurement can arrive late, older ones are ignored. A
+            timestamp further back than this is a restart of the device's clock, which restarts the link. Default is 1.
+    """
+
+    def __init__(self, link_ids=(), acceleration_std=1000.0, measurement_std=100.0, initial_rate_std=2000.0,
+                 max_gap=2.0, max_delay=1.0):
+        self.acceleration_std = acceleration_std
+        self.measurement_std = measurement_std
+        self.initial_rate_std = initial_rate_std
+        self.max_gap = max_gap
+        self.max_delay = max_delay
+        self.link_ids = []
+        self.index = {}
+        self.distance = np.zeros(0)
+        self.rate = np.zeros(0)
+        # the covariance of the state, which is symmetric
+        self.p_distance = np.zeros(0)
+        self.p_cross = np.zeros(0)
+        self.p_rate = np.zeros(0)
+        # the last timestamp in ms, the same unwrapped in seconds, and host time minus device time
+        self.timestamp = np.zeros(0, dtype=np.int64)
+        self.device_time = np.zeros(0)
+        self.offset = np.zeros(0)
+        self.initialised = np.zeros(0, dtype=bool)
+        self.updates = np.zeros(0, dtype=int)
+        self.queue = []
+        for link_id in link_ids:
+            self.add_link(link_id)
+
+    def __len__(self):
+        return len(self.link_ids)
+
+    def add_link(self, link_id):
+        """Starts tracking a link, returns its index in the arrays of the tracker"""
+        if link_id in self.index:
+            return self.index[link_id]
+        self.index[link_id] = len(self.link_ids)
+        self.link_ids.append(link_id)
+        for name, value in (('distance', 0.0), ('rate', 0.0), ('p_distance', 0.0), ('p_cross', 0.0),
+                            ('p_rate', 0.0), ('timestamp', 0), ('device_time', 0.0), ('offset', np.inf),
+                            ('initialised', False), ('updates', 0)):
+            setattr(self, name, np.append(getattr(self, name), np.array([value], dtype=getattr(self, name).dtype)))
+        return self.index[link_id]
+
+    def add(self, link_id, distance, timestamp, host_time=None):
+        """Queues a measurement of a link for the next tick.
+
+        Args:
+            link_id: the link measured, which is added when it's new.
+            distance: the measured distance in mm.
+            timestamp: the timestamp of the measurement in ms, by the clock of the measuring device.
+            host_time (optional): host time in seconds the measurement was received. Default is now.
+        """
+        self.queue.append((self.add_link(link_id), distance, timestamp,
+                           perf_counter() if host_time is None else host_time))
+
+    def add_range(self, link_id, device_range, host_time=None):
+        """Queues a DeviceRange of a link for the next tick, unless it's a dropout of distance 0"""
+        if device_range.distance > 0:
+            self.add(link_id, device_range.distance, device_range.timestamp, host_time)
+
+    def add_record(self, record, host_time=None):
+        """Queues a successful RangingRecord of a RangingStream, keyed on its destination.
+
+        Without host time, the host time of the record by the ClockSync of the stream is used if it has one.
+        """
+        if record.status == POZYX_SUCCESS:
+            if host_time is None:
+                host_time = getattr(record, 'host_time', None)
+            self.add_range(record.destination, record.device_range, host_time)
+
+    def predict_covariance(self, dt, p_distance, p_cross, p_rate):
+        """Returns the covariance after dt seconds, with the process noise of a random acceleration"""
+        q = self.acceleration_std ** 2
+        return (p_distance + 2 * dt * p_cross + dt * dt * p_rate + q * dt ** 3 / 3,
+                p_cross + dt * p_rate + q * dt * dt / 2,
+                p_rate + q * dt)
+
+    def update(self, indices, distances, timestamps, host_times):
+        """Applies measurements of distinct links at once, see add"""
+        indices = np.asarray(indices, dtype=int)
+        distances = np.asarray(distances, dtype=float)
+        timestamps = np.asarray(timestamps, dtype=np.int64) % TIMESTAMP_WRAP
+        host_times = np.asarray(host_times, dtype=float)
+
+        elapsed = (timestamps - self.timestamp[indices]) % TIMESTAMP_WRAP
+        # a timestamp more than half the wraparound back went back in time, up to max_delay it's an old
+        # measurement arriving late
+        back = self.initialised[indices] & (elapsed >= TIMESTAMP_WRAP // 2)
+        late = back & (TIMESTAMP_WRAP - elapsed <= self.max_delay * 1000)
+        if late.any():
+            keep = ~late
+            indices, distances, timestamps, host_times, elapsed, back = (
+                indices[keep], distances[keep], timestamps[keep], host_times[keep], elapsed[keep], back[keep])
+        # further back the device restarted its clock, and the link starts over like a new one
+        new = ~self.initialised[indices] | back
+        dt = np.where(new, 0.0, elapsed / 1000.0)
+
+        distance = self.distance[indices] + dt * self.rate[indices]
+        p_distance, p_cross, p_rate = self.predict_covariance(
+            dt, self.p_distance[indices], self.p_cross[indices], self.p_rate[indices])
+        # a new link starts at its first measurement, with an unknown rate
+        r = float(self.measurement_std) ** 2
+        distance = np.where(new, distances, distance)
+        p_distance = np.where(new, r, p_distance)
+        p_cross = np.where(new, 0.0, p_cross)
+        p_rate = np.where(new, float(self.initial_rate_std) ** 2, p_rate)
+
+        innovation = distances - distance
+        gain_distance = p_distance / (p_distance + r)
+        gain_rate = p_cross / (p_distance + r)
+        self.distance[indices] = distance + gain_distance * innovation
+        self.rate[indices] = np.where(new, 0.0, self.rate[indices]) + gain_rate * innovation
+        self.p_rate[indices] = p_rate - gain_rate * p_cross
+        self.p_cross[indices] = (1 - gain_distance) * p_cross
+        self.p_distance[indices] = (1 - gain_distance) * p_distance
+
+        device_time = np.where(new, timestamps / 1000.0, self.device_time[indices] + dt)
+        self.device_time[indices] = device_time
+        self.timestamp[indices] = timestamps
+        self.offset[indices] = np.where(new, host_times - device_time,
+                                        np.minimum(self.offset[indices], host_times - device_time))
+        self.initialised[indices] = True
+        self.updates[indices] += 1
+
+    def flush(self):
+        """Applies the queued measurements, in rounds of distinct links"""
+        queue, self.queue = self.queue, []
+        while queue:
+            seen = set()
+            batch = []
+            rest = []
+            for measurement in queue:
+                if measurement[0] in seen:
+                    rest.append(measurement)
+                else:
+                    seen.add(measurement[0])
+                    batch.append(measurement)
+            self.update(*zip(*batch))
+            queue = rest
+
+    def predict(self, host_time=None):
+        """Returns the TrackSnapshot of all links predicted to a host time, default now, without changing them"""
+        host_time = perf_counter() if host_time is None else host_time
+        dt = np.where(self.initialised, host_time - self.offset - self.device_time, 0.0)
+        # extrapolate from the last measurement, never back before it
+        dt = np.maximum(dt, 0.0)
+        p_distance, p_cross, p_rate = self.predict_covariance(dt, self.p_distance, self.p_cross, self.p_rate)
+        valid = self.initialised & (dt <= self.max_gap)
+        return TrackSnapshot(host_time, list(self.link_ids), self.distance + dt * self.rate, self.rate.copy(),
+                             np.sqrt(p_distance), np.sqrt(p_rate), valid)
+
+    def tick(self, host_time=None):
+        """Applies the queued measurements and returns the TrackSnapshot of all links at a host time, default now"""
+        self.flush()
+        return self.predict(host_time)
+
+    def track(self, link_id, host_time=None):
+        """Returns the predicted distance, range rate and validity of one link"""
+        snapshot = self.predict(host_time)
+        index = self.index[link_id]
+        return snapshot.distances[index], snapshot.rates[index], snapshot.valid[index]
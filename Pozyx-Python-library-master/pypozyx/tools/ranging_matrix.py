@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+"""pypozyx.tools.ranging_matrix - contains RangingMatrix, keeping the ranges between many devices up to date.
+
+For convoys and other formations, ranges are needed between the devices themselves instead of
+between tags and fixed anchors. A RangingMatrix takes the IDs of the devices, in convoy order,
+and a topology deciding which pairs are ranged:
+
+- TOPOLOGY_CHAIN ranges every device with the next one.
+- TOPOLOGY_K_NEAREST ranges every device with the k next and previous ones.
+- TOPOLOGY_FULL ranges every pair.
+
+The links are scheduled in slots in which no device is part of two links, so the devices of a
+slot range concurrently through the master without ever being asked for two rangings at once.
+Every link is ranged by the device that has initiated the fewest rangings so far.
+
+The distances, in mm, their host times, their RSS and the timestamps of the initiating devices
+are kept in dense NumPy matrices. They're updated
+copy-on-write and published per slot, so latest() returns the freshest consistent matrices in
+O(1) without locking, even while the matrix is being updated in the background.
+
+Example usage:
+    >>> matrix = RangingMatrix(pozyx, [None, 0x6e66, 0x6e67, 0x6e68], TOPOLOGY_CHAIN)
+    >>> matrix.schedule
+    [[(None, 0x6e66), (0x6e67, 0x6e68)], [(0x6e66, 0x6e67)]]
+    >>> with matrix:
+    ...     snapshot = matrix.latest()
+    ...     print(snapshot.distances[0, 1], matrix.link_age(None, 0x6e66))
+"""
+from collections import namedtuple
+from threading import Thread
+from time import perf_counter, sleep
+
+import numpy as np
+
+from pypozyx.definitions.bitmasks import PozyxBitmasks
+from pypozyx.definitions.constants import PozyxConstants, POZYX_SUCCESS, POZYX_FAILURE
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.multitag import RemoteFunctionScheduler
+from pypozyx.structures.device import DeviceCoordinates, DeviceRange
+from pypozyx.structures.generic import Data
+from pypozyx.structures.sensor_data import Coordinates
+
+TOPOLOGY_CHAIN = 'chain'
+TOPOLOGY_K_NEAREST = 'k_nearest'
+TOPOLOGY_FULL = 'full'
+
+RangingMatrixSnapshot = namedtuple('RangingMatrixSnapshot', ['distances', 'times', 'rss', 'timestamps', 'sequence'])
+RangingMatrixSnapshot.__doc__ = """The distances in mm, their host times in seconds, their RSS in dBm and the
+timestamps in ms of the devices that initiated them, NaN if never measured"""
+
+LinkResult = namedtuple('LinkResult', ['initiator', 'destination', 'status', 'distance', 'latency', 'timestamp', 'rss'])
+LinkResult.__doc__ = """Result of the ranging of one link by a RangingMatrix, with the timestamp in ms of the
+initiator and the RSS in dBm of the range"""
+
+
+def topology_links(count, topology, k=2):
+    """Returns the (i, j) index pairs, i < j, of the links of count devices in convoy order"""
+    if topology == TOPOLOGY_CHAIN:
+        k = 1
+    elif topology == TOPOLOGY_FULL:
+        k = count
+    elif topology != TOPOLOGY_K_NEAREST:
+        raise ValueError("Unknown topology %s" % topology)
+    return [(i, j) for i in range(count) for j in range(i + 1, min(count, i + k + 1))]
+
+
+def schedule_links(links):
+    """Returns the links divided in slots in which no device is part of two links.
+
+    The links with the busiest devices are placed first, every link in the first slot where both
+    devices are free, which needs at most twice the maximum amount of links of a device minus one.
+    """
+    degree = {}
+    for i, j in links:
+        degree[i] = degree.get(i, 0) + 1
+        degree[j] = degree.get(j, 0) + 1
+    slots = []
+    busy = []
+    for i, j in sorted(links, key=lambda link: (-max(degree[link[0]], degree[link[1]]), link)):
+        for slot, devices in zip(slots, busy):
+            if i not in devices and j not in devices:
+                slot.append((i, j))
+                devices.update((i, j))
+                break
+        else:
+            slots.append([(i, j)])
+            busy.append({i, j})
+    return [sorted(slot) for slot in slots]
+
+
+class RangingScheduler(RemoteFunctionScheduler):
+    """Ranges concurrently from a set of initiators to their destinations of the current slot.
+
+    The local device can only range alone, as its ranging and the acknowledgements of the remote
+    devices both set the FUNC interrupt flag.
+    """
+    local_flag = PozyxBitmasks.INT_STATUS_FUNC
+
+    def __init__(self, pozyx, device_ids, timeout=PozyxConstants.TIMEOUT_REMOTE_RANGING, **kwargs):
+        super(RangingScheduler, self).__init__(pozyx, device_ids, timeout, **kwargs)
+        self.destinations = {}
+
+    def function(self, initiator):
+        return PozyxRegisters.DO_RANGING, Data([self.destinations[initiator]], 'H')
+
+    def reply_size(self):
+        return DeviceRange.byte_size
+
+    def remote_result(self, initiator, byte_data):
+        # the initiator answers with its DeviceRange of the destination
+        if len(byte_data) != 2 * DeviceRange.byte_size:
+            return None
+        device_range = DeviceRange()
+        device_range.load_bytes(byte_data)
+        return POZYX_SUCCESS, device_range
+
+    def local_result(self, interrupt):
+        if interrupt & PozyxBitmasks.INT_STATUS_ERR:
+            return POZYX_FAILURE, None
+        device_range = DeviceRange()
+        status = self.pozyx.getDeviceRangeInfo(self.destinations[None], device_range)
+        return status, device_range
+
+    def make_result(self, initiator, status, device_range, latency):
+        if device_range is None:
+            return LinkResult(initiator, self.destinations.get(initiator), status, None, latency, None, None)
+        return LinkResult(initiator, self.destinations.get(initiator), status, device_range.distance, latency,
+                          device_range.timestamp, device_range.RSS)
+
+    def may_trigger(self, initiator):
+        if initiator is None and self.in_flight:
+            return False
+        if None in self.in_flight:
+            return False
+        return super(RangingScheduler, self).may_trigger(initiator)
+
+
+class RangingMatrix(object):
+    """Keeps the ranges between a set of devices up to date, following a topology.
+
+    Args:
+        pozyx: the Pozyx interface of the master.
+        device_ids: the network IDs of the devices in convoy order, None for the local device.
+        topology (optional): TOPOLOGY_CHAIN (default), TOPOLOGY_K_NEAREST or TOPOLOGY_FULL.
+        k (optional): the amount of neighbours on each side for TOPOLOGY_K_NEAREST. Default is 2.
+        rate (optional): target rate in rounds over all slots per second. None ranges as fast as possible.
+        timeout (optional): time in seconds to wait for a range. Default is TIMEOUT_REMOTE_RANGING.
+        max_in_flight (optional): the maximum amount of links ranging at once. Default is all links of a slot.
+    """
+
+    def __init__(self, pozyx, device_ids, topology=TOPOLOGY_CHAIN, k=2, rate=None,
+                 timeout=PozyxConstants.TIMEOUT_REMOTE_RANGING, max_in_flight=None):
+        self.pozyx = pozyx
+        self.device_ids = list(device_ids)
+        self.index = {device_id: index for index, device_id in enumerate(self.device_ids)}
+        self.topology = topology
+        self.rate = rate
+        self.initiated = [0] * len(self.device_ids)
+        self.slots = []
+        for slot in schedule_links(topology_links(len(self.device_ids), topology, k)):
+            self.slots.append([self.orient(i, j) for i, j in slot])
+        self.scheduler = RangingScheduler(pozyx, self.device_ids, timeout=timeout, max_in_flight=max_in_flight)
+
+        count = len(self.device_ids)
+        self.snapshot = RangingMatrixSnapshot(*[np.full((count, count), np.nan) for i in range(4)], sequence=0)
+        self.attempts = np.zeros((count, count), dtype=int)
+        self.successes = np.zeros((count, count), dtype=int)
+        self.rounds = 0
+        self.thread = None
+        self.running = False
+
+    def orient(self, i, j):
+        """Returns the link as (initiator, destination) index pair, initiated by the least busy device"""
+        if self.initiated[j] < self.initiated[i]:
+            i, j = j, i
+        self.initiated[i] += 1
+        return i, j
+
+    @property
+    def schedule(self):
+        """The slots of (initiator, destination) network ID pairs"""
+        return [[(self.device_ids[i], self.device_ids[j]) for i, j in slot] for slot in self.slots]
+
+    def configure(self):
+        """Adds the destinations of every initiator to its device list, clearing it first.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        status = POZYX_SUCCESS
+        destinations = {}
+        for slot in self.slots:
+            for i, j in slot:
+                destinations.setdefault(i, []).append(j)
+        for i, js in destinations.items():
+            initiator = self.device_ids[i]
+            status &= self.pozyx.clearDevices(remote_id=initiator)
+            for j in js:
+                status &= self.pozyx.addDevice(DeviceCoordinates(self.device_ids[j], 0, Coordinates(0, 0, 0)),
+                                               remote_id=initiator)
+        return status
+
+    def latest(self):
+        """Returns the freshest RangingMatrixSnapshot, which is never modified afterwards"""
+        return self.snapshot
+
+    def distance(self, a, b):
+        """Returns the last distance between two devices in mm, NaN if never measured"""
+        return self.snapshot.distances[self.index[a], self.index[b]]
+
+    def link_age(self, a, b):
+        """Returns the time in seconds since the link between two devices was last measured, inf if never"""
+        measured = self.snapshot.times[self.index[a], self.index[b]]
+        return float('inf') if np.isnan(measured) else perf_counter() - measured
+
+    def success_rate(self, a, b):
+        """Returns the fraction of successful rangings of the link between two devices"""
+        i, j = self.index[a], self.index[b]
+        return self.successes[i, j] / float(self.attempts[i, j]) if self.attempts[i, j] else 0.0
+
+    def link_statistics(self):
+        """Returns the age, success rate and amount of attempts of every link, by (initiator, destination)"""
+        return {(a, b): {'age': self.link_age(a, b), 'success_rate': self.success_rate(a, b),
+                         'attempts': int(self.attempts[self.index[a], self.index[b]])}
+                for slot in self.schedule for a, b in slot}
+
+    def range_slot(self, slot):
+        """Ranges the links of a slot concurrently and publishes the results, returns the LinkResults"""
+        self.scheduler.destinations = {self.device_ids[i]: self.device_ids[j] for i, j in slot}
+        results = self.scheduler.run_round([self.device_ids[i] for i, j in slot])
+        distances = self.snapshot.distances.copy()
+        times = self.snapshot.times.copy()
+        rss = self.snapshot.rss.copy()
+        timestamps = self.snapshot.timestamps.copy()
+        now = perf_counter()
+        for result in results:
+            i, j = self.index[result.initiator], self.index[result.destination]
+            self.attempts[i, j] += 1
+            self.attempts[j, i] += 1
+            if result.status == POZYX_SUCCESS:
+                self.successes[i, j] += 1
+                self.successes[j, i] += 1
+                distances[i, j] = distances[j, i] = result.distance
+                times[i, j] = times[j, i] = now
+                rss[i, j] = rss[j, i] = result.rss
+                timestamps[i, j] = timestamps[j, i] = result.timestamp
+        self.snapshot = RangingMatrixSnapshot(distances, times, rss, timestamps, self.snapshot.sequence + 1)
+        return results
+
+    def range_round(self):
+        """Ranges every link once, slot after slot, returns the LinkResults"""
+        results = []
+        for slot in self.slots:
+            results += self.range_slot(slot)
+        self.rounds += 1
+        return results
+
+    def start(self):
+        """Starts ranging continuously in the background"""
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        period = 1.0 / self.rate if self.rate else 0.0
+        deadline = perf_counter()
+        while self.running:
+            if period:
+                now = perf_counter()
+                if deadline > now:
+                    sleep(deadline - now)
+                elif now - deadline > period:
+                    deadline = now
+                deadline += period
+            self.range_round()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""pypozyx.tools.shared_ring - contains SharedRing, publishing measurements to other processes in shared memory.
+
+A SharedRing is a ring of fixed-layout records, a NumPy structured dtype like RANGE_DTYPE, in a
+block of shared memory. One process writes, any number of processes read the records straight
+from the shared memory as NumPy arrays, without pickling or copying. Like in a TimeSeriesBuffer,
+every record is written twice, at its slot and one capacity further, so every window of the
+latest records is one contiguous view.
+
+Every slot has a sequence number, a seqlock: the writer makes it odd before writing the slot and
+even again after, so a reader copying a record knows it's consistent when the sequence is even
+and unchanged around the copy. Zero-copy windows of the latest records are checked the same way
+with the total amount of records written: a window is valid as long as the writer hasn't started
+on any of its slots again.
+
+The header holds the layout of the records, so readers only need the name of the ring.
+
+Needs NumPy, pip install pypozyx[tools], and Python 3.8 or newer for multiprocessing.shared_memory.
+
+Example usage:
+    >>> ring = SharedRing(capacity=4096, name='pozyx_ranges')
+    >>> pozyx.doRanging(0x6e30, device_range)
+    >>> ring.publish_range(0x6e30, device_range)
+
+    >>> reader = SharedRing.attach('pozyx_ranges')  # in another process
+    >>> reader.latest()
+    (1043, 4521, -79, 28208)
+    >>> window, token = reader.window(100)
+    >>> mean = window['distance'].mean()
+    >>> reader.valid(token, 100)
+    True
+"""
+import json
+from time import sleep
+
+import numpy as np
+from multiprocessing import shared_memory
+
+from pypozyx.definitions.constants import POZYX_SUCCESS
+from pypozyx.tools.time_series import RANGE_DTYPE, SENSOR_DTYPES
+
+POSITION_DTYPE = SENSOR_DTYPES['coordinates']
+
+MAGIC = 0x505a5852
+# magic, capacity, record size, total amount of records written
+HEADER_DTYPE = np.dtype([('magic', '<u4'), ('capacity', '<u4'), ('itemsize', '<u4'), ('padding', '<u4'),
+                         ('written', '<u8')])
+# the layout of the records, as JSON of the dtype description
+LAYOUT_SIZE = 1024
+
+
+# names of the shared memory created by this process, which its resource tracker cleans up
+created_names = set()
+
+
+def open_shared_memory(name):
+    """Opens existing shared memory without the resource tracker unlinking it when this process exits"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before Python 3.13, every process opening the memory registers it with its resource tracker
+        memory = shared_memory.SharedMemory(name=name)
+        if name in created_names:
+            return memory
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(memory._name, 'shared_memory')
+        except (ImportError, AttributeError, KeyError):
+            pass
+        return memory
+
+
+class SharedRing(object):
+    """Ring of fixed-layout records in shared memory, with one writer and any amount of readers.
+
+    Args:
+        capacity (optional): the amount of records in the ring. Default is 4096.
+        dtype (optional): the structured dtype of a record. Default is RANGE_DTYPE.
+        name (optional): the name of the shared memory, a unique name is generated without.
+    """
+
+    def __init__(self, capacity=4096, dtype=RANGE_DTYPE, name=None, memory=None):
+        if memory is None:
+            if capacity <= 0:
+                raise ValueError("capacity should be positive, not %i" % capacity)
+            dtype = np.dtype(dtype)
+            size = HEADER_DTYPE.itemsize + LAYOUT_SIZE + capacity * (8 + 2 * dtype.itemsize)
+            memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+            created_names.add(memory.name)
+            layout = json.dumps(dtype.descr).encode()
+            if len(layout) > LAYOUT_SIZE:
+                raise ValueError("The layout of the records is too large for the header")
+            memory.buf[HEADER_DTYPE.itemsize:HEADER_DTYPE.itemsize + len(layout)] = layout
+            self.map(memory, capacity, dtype)
+            self.header['magic'] = MAGIC
+            self.header['capacity'] = capacity
+            self.header['itemsize'] = dtype.itemsize
+            self.writer = True
+        else:
+            self.map(memory, capacity, dtype)
+            self.writer = False
+
+    @classmethod
+    def attach(cls, name):
+        """Returns the SharedRing with the given name, created by another process, for reading"""
+        memory = open_shared_memory(name)
+        header = np.ndarray((), HEADER_DTYPE, buffer=memory.buf)
+        if header['magic'] != MAGIC:
+            memory.close()
+            raise ValueError("%s isn't a SharedRing" % name)
+        layout = bytes(memory.buf[HEADER_DTYPE.itemsize:HEADER_DTYPE.itemsize + LAYOUT_SIZE]).rstrip(b'\0')
+        dtype = np.dtype([tuple(field) for field in json.loads(layout.decode())])
+        capacity = int(header['capacity'])
+        del header
+        return cls(capacity, dtype, memory=memory)
+
+    def map(self, memory, capacity, dtype):
+        self.memory = memory
+        self.name = memory.name
+        self.capacity = capacity
+        self.dtype = dtype
+        offset = HEADER_DTYPE.itemsize + LAYOUT_SIZE
+        self.header = np.ndarray((), HEADER_DTYPE, buffer=memory.buf)
+        self.sequences = np.ndarray((capacity,), '<u8', buffer=memory.buf, offset=offset)
+        self.records = np.ndarray((2 * capacity,), dtype, buffer=memory.buf, offset=offset + 8 * capacity)
+
+    @property
+    def written(self):
+        """The total amount of records written"""
+        return int(self.header['written'])
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def publish(self, *values):
+        """Writes a record, given as its field values in dtype order"""
+        written = int(self.header['written'])
+        index = written % self.capacity
+        self.sequences[index] += 1
+        self.records[index] = values
+        self.records[index + self.capacity] = values
+        self.sequences[index] += 1
+        self.header['written'] = written + 1
+
+    def publish_range(self, device_id, device_range):
+        """Writes a DeviceRange measured with a device, for the RANGE_DTYPE layout"""
+        self.publish(device_range.timestamp, device_range.distance, device_range.RSS, device_id)
+
+    def publish_ranges(self, measurements, successful_only=True):
+        """Writes the RangeMeasurements of doRangingMany, for the RANGE_DTYPE layout"""
+        for measurement in measurements:
+            if measurement.status == POZYX_SUCCESS or not successful_only:
+                self.publish(measurement.timestamp, measurement.distance, measurement.RSS, measurement.destination)
+
+    def publish_position(self, device_id, coordinates, timestamp):
+        """Writes the Coordinates of a device at a timestamp, for the POSITION_DTYPE layout"""
+        self.publish(timestamp, coordinates.x, coordinates.y, coordinates.z, device_id or 0)
+
+    def read(self, number):
+        """Returns a consistent copy of the record with the given number, None if it's overwritten already"""
+        index = number % self.capacity
+        while True:
+            sequence = self.sequences[index]
+            if sequence & 1:
+                # the writer is busy with this slot
+                sleep(0)
+                continue
+            if number >= self.written or number + self.capacity <= self.written:
+                return None
+            record = self.records[index].copy()
+            if self.sequences[index] == sequence and number + self.capacity > self.written:
+                return record
+
+    def latest(self):
+        """Returns a consistent copy of the latest record, None if nothing's written"""
+        while True:
+            written = self.written
+            if not written:
+                return None
+            record = self.read(written - 1)
+            if record is not None:
+                return record
+
+    def window(self, size=None):
+        """Returns a zero-copy view of the latest size records, oldest first, and a token to validate it with.
+
+        The view is only guaranteed to hold these records when valid(token, size) is True after using it.
+        The latest record may be behind the slot that is being written.
+        """
+        written = self.written
+        size = min(self.capacity, written) if size is None else min(size, self.capacity, written)
+        end = written % self.capacity + self.capacity if written >= self.capacity else written
+        return self.records[end - size:end], written
+
+    def valid(self, token, size):
+        """Returns whether the window with the token isn't touched by the writer since it was taken"""
+        return self.written - token < self.capacity - size
+
+    def read_since(self, cursor):
+        """Returns a copy of the records written since the cursor, the next cursor and the amount lost.
+
+        Records that were overwritten before they could be read are lost, start with cursor 0.
+        """
+        written = self.written
+        lost = max(0, written - cursor - (self.capacity - 1))
+        cursor += lost
+        size = written - cursor
+        if size <= 0:
+            return self.records[:0].copy(), written, lost
+        window, token = self.window(size)
+        records = window.copy()
+        # records that got overwritten during the copy are lost too
+        overwritten = max(0, self.written - token - (self.capacity - 1 - size))
+        return records[overwritten:], written, lost + overwritten
+
+    def close(self):
+        """Unmaps the shared memory, the views of the records can't be used anymore"""
+        self.header = self.sequences = self.records = None
+        self.memory.close()
+
+    def unlink(self):
+        """Removes the shared memory, done by the writer when it's finished"""
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if self.writer:
+            self.unlink()
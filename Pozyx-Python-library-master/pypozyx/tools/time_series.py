@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""pypozyx.tools.time_series - contains TimeSeriesBuffer, a fixed-capacity NumPy ring buffer of measurements.
+
+A TimeSeriesBuffer stores range or sensor samples in a preallocated NumPy structured array, so
+appending is O(1) without boxing every value in a Python object, and the most recent samples are
+available as zero-copy views for windowed statistics. Every sample is written twice, at its ring
+position and one capacity further, which keeps every window of the most recent samples contiguous.
+
+When the buffer is full, the oldest samples are overwritten. With a spill path, every full lap of
+samples is appended to that file before it gets overwritten, so nothing is lost on long runs.
+
+Example usage:
+    >>> buffer = TimeSeriesBuffer(10000, spill_path='ranges.bin')
+    >>> buffer.append_range(0x6e30, device_range)
+    >>> buffer.window(100)['distance'].mean()
+    4521.3
+    >>> buffer.stats('distance', 100)
+    {'mean': 4521.3, 'std': 21.7, 'var': 470.9}
+"""
+import numpy as np
+
+RANGE_DTYPE = np.dtype([('timestamp', '<u4'), ('distance', '<u4'), ('RSS', '<i2'), ('device_id', '<u2')])
+
+SENSOR_DTYPES = {
+    'range': RANGE_DTYPE,
+    'coordinates': np.dtype([('timestamp', '<f8'), ('x', '<i4'), ('y', '<i4'), ('z', '<i4'), ('device_id', '<u2')]),
+    'acceleration': np.dtype([('timestamp', '<f8'), ('x', '<f4'), ('y', '<f4'), ('z', '<f4')]),
+    'magnetic': np.dtype([('timestamp', '<f8'), ('x', '<f4'), ('y', '<f4'), ('z', '<f4')]),
+    'angular_velocity': np.dtype([('timestamp', '<f8'), ('x', '<f4'), ('y', '<f4'), ('z', '<f4')]),
+    'euler_angles': np.dtype([('timestamp', '<f8'), ('heading', '<f4'), ('roll', '<f4'), ('pitch', '<f4')]),
+    'quaternion': np.dtype([('timestamp', '<f8'), ('w', '<f4'), ('x', '<f4'), ('y', '<f4'), ('z', '<f4')]),
+    'pressure': np.dtype([('timestamp', '<f8'), ('value', '<f4')]),
+}
+
+
+def read_spill(spill_path, dtype=RANGE_DTYPE):
+    """Returns the samples spilled to spill_path as a structured array"""
+    return np.fromfile(spill_path, dtype=dtype)
+
+
+class TimeSeriesBuffer(object):
+    """Fixed-capacity ring buffer of samples in a NumPy structured array.
+
+    Args:
+        capacity: the amount of samples kept in memory.
+        dtype (optional): the structured dtype of a sample, or the name of a layout in SENSOR_DTYPES.
+            Default is RANGE_DTYPE.
+        spill_path (optional): file to append every full lap of samples to before they're overwritten.
+    """
+
+    def __init__(self, capacity, dtype=RANGE_DTYPE, spill_path=None):
+        if capacity <= 0:
+            raise ValueError("capacity should be positive, not %i" % capacity)
+        if not isinstance(dtype, np.dtype):
+            dtype = SENSOR_DTYPES[dtype] if dtype in SENSOR_DTYPES else np.dtype(dtype)
+        self.capacity = capacity
+        self.dtype = dtype
+        self.data = np.zeros(2 * capacity, dtype=dtype)
+        self.head = 0
+        self.total = 0
+        self.spilled = 0
+        self.spill_path = spill_path
+        if spill_path is not None:
+            # start a new spill file
+            open(spill_path, 'wb').close()
+
+    def __len__(self):
+        """Returns the amount of samples in memory"""
+        return min(self.total, self.capacity)
+
+    def append(self, *values):
+        """Appends a sample, given as its field values in dtype order"""
+        if self.head == 0 and self.total >= self.capacity and self.spill_path is not None:
+            self.spill()
+        self.data[self.head] = values
+        self.data[self.head + self.capacity] = values
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        self.total += 1
+
+    def append_range(self, device_id, device_range):
+        """Appends a DeviceRange measurement with the device it was measured with, for the range layout"""
+        self.append(device_range.timestamp, device_range.distance, device_range.RSS, device_id)
+
+    def extend(self, samples):
+        """Appends all samples of a structured array or a list of tuples"""
+        for sample in samples:
+            self.append(*sample)
+
+    def spill(self):
+        """Appends the lap of samples that is about to be overwritten to the spill file"""
+        with open(self.spill_path, 'ab') as spill_file:
+            self.data[:self.capacity].tofile(spill_file)
+        self.spilled += self.capacity
+
+    def window(self, size=None):
+        """Returns a zero-copy view of the most recent size samples, oldest first, all samples in memory without size.
+
+        The view is only valid until size more samples are appended.
+        """
+        size = len(self) if size is None else min(size, len(self))
+        end = self.head + self.capacity if self.total >= self.capacity else self.head
+        return self.data[end - size:end]
+
+    def stats(self, field, size=None):
+        """Returns the mean, standard deviation and variance of a field over the most recent size samples"""
+        values = self.window(size)[field]
+        if len(values) == 0:
+            return {'mean': float('nan'), 'std': float('nan'), 'var': float('nan')}
+        return {'mean': float(values.mean()), 'std': float(values.std()), 'var': float(values.var())}
+
+    def to_array(self):
+        """Returns a copy of every sample, including the spilled ones, oldest first"""
+        in_memory = self.window(self.total - self.spilled)
+        if self.spilled == 0:
+            return in_memory.copy()
+        return np.concatenate([read_spill(self.spill_path, self.dtype), in_memory])
+
+    def clear(self):
+        """Drops the samples in memory, and the spilled ones"""
+        self.head = 0
+        self.total = 0
+        self.spilled = 0
+        if self.spill_path is not None:
+            open(self.spill_path, 'wb').close()
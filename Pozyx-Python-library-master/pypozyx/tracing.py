@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+"""pypozyx.tracing - contains Tracer, tracing where the time of every Pozyx operation goes.
+
+A Tracer attached to a Pozyx interface opens a Span for every call of a public operation of
+PozyxLib, like doRanging, remoteRegRead or getAllSensorData, and the operations it calls in
+turn become child spans. A span records its duration, the serial exchanges done in it, the
+bytes sent and received, the time spent waiting on the serial port, the polls of the interrupt
+status and the time slept between those polls. The counts of a span include its children.
+
+The durations feed a LatencyHistogram per operation, with the log-linear buckets of
+HdrHistogram, and the serial writes and response reads feed their own, so latency percentiles
+are available at any time with dump(), or as JSON with export(). The most recent traces are kept
+as trees of spans.
+
+The operations of an AsyncPozyxSerial are traced too, every task tracing its own spans.
+
+Attaching a tracer switches the class of the interface to a subclass with the operations
+traced, and detaching switches it back, so an interface without tracer runs exactly the code
+it runs without this module: tracing off costs nothing.
+
+Example usage:
+    >>> tracer = Tracer()
+    >>> pozyx.setTracer(tracer)
+    >>> pozyx.doRanging(0x6e30, device_range)
+    >>> print(tracer.traces[-1])
+    doRanging 12.104 ms, 6 exchanges, 47 B sent, 38 B received, 3 polls, 9.512 ms slept
+      useFunction 0.612 ms, 1 exchanges, 14 B sent, 6 B received, 0 polls, 0.000 ms slept
+      ...
+    >>> print(tracer.dump())
+    >>> pozyx.setTracer(None)
+"""
+import json
+from asyncio import iscoroutinefunction
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from types import FunctionType
+
+from pypozyx.core import PozyxCore
+from pypozyx.histogram import LatencyHistogram, log_linear_edges
+from pypozyx.lib import PozyxLib
+
+# public methods of PozyxCore and PozyxLib that aren't operations on the device
+UNTRACED_METHODS = ['getPollingStrategy', 'setPollingStrategy', 'getRegisterCache', 'setRegisterCache',
+                    'getClockSync', 'setClockSync', 'getTracer', 'setTracer', 'pipeline', 'multitagScheduler',
+                    'printDeviceInfo', 'printDeviceList', 'getErrorMessage', 'has_firmware_version',
+                    'has_cloud_firmware']
+
+SERIAL_WRITE = 'serial_write'
+SERIAL_RESPONSE = 'serial_response'
+
+# the operation waiting for an interrupt flag, the time it doesn't spend polling with POLL_METHOD is slept
+POLLING_METHOD = 'waitForFlagSafe'
+POLL_METHOD = 'getInterruptStatus'
+
+# the traced subclasses of the interface classes
+traced_classes = {}
+
+
+def traced_method(name, method):
+    """Returns method wrapped in a span with the name, by the tracer of the interface"""
+    if iscoroutinefunction(method):
+        @wraps(method)
+        async def traced_coroutine(self, *args, **kwargs):
+            tracer = self.getTracer()
+            span = tracer.open(name)
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                tracer.close(span)
+        return traced_coroutine
+
+    @wraps(method)
+    def traced(self, *args, **kwargs):
+        tracer = self.getTracer()
+        span = tracer.open(name)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            tracer.close(span)
+    return traced
+
+
+def traced_class(cls):
+    """Returns the subclass of an interface class with every public operation of PozyxLib it has traced"""
+    if cls not in traced_classes:
+        names = set()
+        for base in (PozyxCore, PozyxLib):
+            for name, member in vars(base).items():
+                if (isinstance(member, FunctionType) and not name.startswith('_') and name not in UNTRACED_METHODS
+                        and hasattr(cls, name)):
+                    names.add(name)
+        namespace = {name: traced_method(name, getattr(cls, name)) for name in names}
+        traced_classes[cls] = type(cls.__name__, (cls,), namespace)
+    return traced_classes[cls]
+
+
+class Span(object):
+    """A traced call of an operation, with the spans of the operations it called as children"""
+    __slots__ = ['name', 'start', 'duration', 'exchanges', 'bytes_sent', 'bytes_received', 'io_time', 'polls',
+                 'sleep_time', 'children']
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.exchanges = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.io_time = 0.0
+        self.polls = 0
+        self.sleep_time = 0.0
+        self.children = []
+
+    def add_counts(self, span):
+        self.exchanges += span.exchanges
+        self.bytes_sent += span.bytes_sent
+        self.bytes_received += span.bytes_received
+        self.io_time += span.io_time
+        self.polls += span.polls
+        self.sleep_time += span.sleep_time
+
+    def to_dict(self):
+        return {'name': self.name, 'start': self.start, 'duration': self.duration, 'exchanges': self.exchanges,
+                'bytes_sent': self.bytes_sent, 'bytes_received': self.bytes_received, 'io_time': self.io_time,
+                'polls': self.polls, 'sleep_time': self.sleep_time,
+                'children': [child.to_dict() for child in self.children]}
+
+    def format(self, indent=0):
+        line = '%s%s %.3f ms, %i exchanges, %i B sent, %i B received, %i polls, %.3f ms slept' % (
+            '  ' * indent, self.name, self.duration * 1e3, self.exchanges, self.bytes_sent, self.bytes_received,
+            self.polls, self.sleep_time * 1e3)
+        return '\n'.join([line] + [child.format(indent + 1) for child in self.children])
+
+    def __str__(self):
+        return self.format()
+
+
+class TracingSerial(object):
+    """Serial port wrapper attributing the writes and response reads to the current span"""
+
+    def __init__(self, serial, tracer):
+        self.serial = serial
+        self.tracer = tracer
+
+    def write(self, data):
+        start = perf_counter()
+        written = self.serial.write(data)
+        self.tracer.serial_io(SERIAL_WRITE, perf_counter() - start, len(data), 0)
+        return written
+
+    def readline(self, *args, **kwargs):
+        start = perf_counter()
+        line = self.serial.readline(*args, **kwargs)
+        self.tracer.serial_io(SERIAL_RESPONSE, perf_counter() - start, 0, len(line))
+        return line
+
+    def __getattr__(self, name):
+        return getattr(self.serial, name)
+
+
+class Tracer(object):
+    """Traces the operations of the Pozyx interfaces it's attached to, see setTracer.
+
+    Args:
+        keep (optional): amount of most recent traces, spans without parent, kept. Default is 100.
+        histogram_arguments (optional): lowest, highest and significant_digits of the histogram buckets,
+            see log_linear_edges.
+    """
+
+    def __init__(self, keep=100, **histogram_arguments):
+        self.histogram_arguments = histogram_arguments
+        self.histograms = {}
+        self.traces = deque(maxlen=keep)
+        # the open spans, per thread and per asyncio task
+        self.stack = ContextVar('pozyx_trace_stack', default=())
+        self.lock = Lock()
+        self.attached = {}
+
+    def histogram(self, name):
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram(log_linear_edges(**self.histogram_arguments))
+        return self.histograms[name]
+
+    def current(self):
+        """Returns the innermost open span of this thread or task, None outside of operations"""
+        stack = self.stack.get()
+        return stack[-1] if stack else None
+
+    def open(self, name):
+        span = Span(name, perf_counter())
+        self.stack.set(self.stack.get() + (span,))
+        return span
+
+    def close(self, span):
+        span.duration = perf_counter() - span.start
+        stack = self.stack.get()[:-1]
+        self.stack.set(stack)
+        if span.name == POLLING_METHOD:
+            span.polls += sum(child.name == POLL_METHOD for child in span.children)
+            span.sleep_time += span.duration - sum(child.duration for child in span.children)
+        with self.lock:
+            self.histogram(span.name).record(span.duration)
+            if stack:
+                stack[-1].children.append(span)
+                stack[-1].add_counts(span)
+            else:
+                self.traces.append(span)
+
+    def serial_io(self, kind, duration, sent, received):
+        with self.lock:
+            self.histogram(kind).record(duration)
+        span = self.current()
+        if span is not None:
+            span.io_time += duration
+            span.bytes_sent += sent
+            span.bytes_received += received
+            span.exchanges += kind == SERIAL_RESPONSE
+
+    def attach(self, pozyx):
+        """Installs tracing on a Pozyx interface, done by its setTracer"""
+        if id(pozyx) in self.attached:
+            return
+        cls = type(pozyx)
+        serial = getattr(pozyx, 'ser', None)
+        pozyx.__class__ = traced_class(cls)
+        if serial is not None:
+            pozyx.ser = TracingSerial(serial, self)
+        self.attached[id(pozyx)] = (cls, serial, getattr(pozyx, 'ser', None))
+
+    def detach(self, pozyx):
+        """Removes the tracing from a Pozyx interface, done by its setTracer.
+
+        Raises a RuntimeError when the serial port of the interface was wrapped again after
+        attaching, like by a SerialRecorder, which has to be removed first.
+        """
+        if id(pozyx) not in self.attached:
+            return
+        cls, serial, wrapper = self.attached[id(pozyx)]
+        if getattr(pozyx, 'ser', None) is not wrapper:
+            raise RuntimeError("The serial port of the Pozyx was wrapped after attaching the tracer, "
+                               "remove that wrapper first")
+        del self.attached[id(pozyx)]
+        pozyx.__class__ = cls
+        if serial is not None:
+            pozyx.ser = serial
+
+    def reset(self):
+        """Forgets the histograms and traces"""
+        with self.lock:
+            self.histograms = {}
+            self.traces.clear()
+
+    def dump(self):
+        """Returns a table of the latency percentiles of every operation in milliseconds"""
+        lines = ['%-32s %8s %9s %9s %9s %9s %9s %9s' % ('operation', 'count', 'mean', 'p50', 'p90', 'p99', 'p99.9',
+                                                         'max')]
+        with self.lock:
+            for name in sorted(self.histograms):
+                histogram = self.histograms[name]
+                lines.append('%-32s %8i %9.3f %9.3f %9.3f %9.3f %9.3f %9.3f' % (
+                    name, histogram.count, histogram.mean() * 1e3, histogram.percentile(0.5) * 1e3,
+                    histogram.percentile(0.9) * 1e3, histogram.percentile(0.99) * 1e3,
+                    histogram.percentile(0.999) * 1e3, (histogram.maximum or 0.0) * 1e3))
+        return '\n'.join(lines)
+
+    def export(self, path=None, traces=False):
+        """Returns the histograms, and the kept traces when asked, as JSON, writing it to path when given"""
+        with self.lock:
+            exported = {'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()}}
+            if traces:
+                exported['traces'] = [span.to_dict() for span in self.traces]
+        content = json.dumps(exported, indent=1)
+        if path is not None:
+            with open(path, 'w') as exported_file:
+                exported_file.write(content)
+        return content
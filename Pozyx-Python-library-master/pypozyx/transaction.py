@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+"""pypozyx.transaction - contains RegisterTransaction, fusing several register reads and writes on one device.
+
+Every remote register operation costs a full UWB exchange: writing the TX buffer, sending it,
+waiting for the answer and reading the RX buffer. A remote frame carries a single register
+operation on a contiguous register range, so a transaction merges its operations into as few
+ranges as the buffer size, MAX_BUF_SIZE, allows: consecutive reads are merged into one read
+when the registers in between are readable and have no side effects on reading, adjacent
+writes are merged into one write. Operations keep their order with respect to operations of
+the other kind. Locally, the operations are pipelined instead, with adjacent writes merged too.
+
+execute sleeps DELAY_LOCAL_WRITE or DELAY_REMOTE_WRITE after writing, like setWrite, and
+DELAY_FLASH after the configuration saves added with save, like saveConfiguration. commit
+performs the transaction without those sleeps: it sends the merged writes back to back and
+confirms them by reading the written registers back until they hold the written values, and
+confirms the saves of registers by reading the flash details back until those are marked saved.
+Saves the flash details can't confirm, of the network, the anchors or registers that were saved
+before, are still waited for with DELAY_FLASH. Locally, the first read back goes out in
+the same pipeline as the writes, so a configuration commonly costs a single round trip.
+
+Example usage:
+    >>> transaction = pozyx.registerTransaction(remote_id=0x6e30)
+    >>> uwb_settings, algorithm, anchors = UWBSettings(), SingleRegister(), SingleRegister()
+    >>> pozyx.getUWBSettings(uwb_settings, transaction=transaction)
+    >>> pozyx.getPositionAlgorithm(algorithm, transaction=transaction)
+    >>> pozyx.getNumberOfAnchors(anchors, transaction=transaction)
+    >>> transaction.execute()  # a single remote read of the registers 0x16 to 0x1F
+    1
+
+    >>> transaction = pozyx.registerTransaction(remote_id=0x6e30)
+    >>> pozyx.setUpdateInterval(200, transaction=transaction)
+    >>> pozyx.setPositionFilter(PozyxConstants.FILTER_TYPE_MOVING_AVERAGE, 5, transaction=transaction)
+    >>> pozyx.setPositionAlgorithm(PozyxConstants.POSITIONING_ALGORITHM_UWB_ONLY, 3, transaction=transaction)
+    >>> transaction.save(PozyxConstants.FLASH_SAVE_REGISTERS, PozyxRegisters.ALL_POSITIONING_REGISTERS)
+    >>> transaction.commit()  # a remote write of 0x14 to 0x16, a read back, the flash details, the save and its check
+    1
+"""
+from time import sleep
+
+from pypozyx.definitions.constants import PozyxConstants, POZYX_SUCCESS, POZYX_TIMEOUT
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.structures.generic import Data, dataCheck, is_reg_readable, is_reg_writable
+
+from warnings import warn
+
+# registers that change the device's state when read, which a fused read can't read in passing
+SIDE_EFFECT_REGISTERS = (PozyxRegisters.INTERRUPT_STATUS, PozyxRegisters.MAX_LINEAR_ACCELERATION)
+
+# time in seconds commit reads written registers back before giving up on them
+WRITE_CONFIRM_TIMEOUT = 0.1
+# time in seconds commit reads the flash details back before giving up on a save
+FLASH_CONFIRM_TIMEOUT = 2 * PozyxConstants.DELAY_FLASH
+
+
+def is_reg_passable(reg):
+    """Returns whether a register can be read in passing by a fused read"""
+    return is_reg_readable(reg) and reg not in SIDE_EFFECT_REGISTERS
+
+
+def combine_status(status, other):
+    """Returns the first status that isn't POZYX_SUCCESS"""
+    return other if status == POZYX_SUCCESS else status
+
+
+class RegisterTransaction(object):
+    """Collects register reads and writes on one device and performs them in as few exchanges as possible.
+
+    Args:
+        pozyx: the interface to perform the transaction on.
+        remote_id (optional): Remote Pozyx ID, None for the local device.
+        max_size (optional): the maximum amount of bytes of a fused operation. Default is MAX_BUF_SIZE.
+    """
+    READ = 0
+    WRITE = 1
+    CACHED = 2
+
+    def __init__(self, pozyx, remote_id=None, max_size=PozyxConstants.MAX_BUF_SIZE):
+        self.pozyx = pozyx
+        self.remote_id = remote_id
+        self.max_size = max_size
+        self.operations = []
+        self.saves = []
+        self.statuses = []
+        self.exchanges = 0
+
+    def read(self, address, data, callback=None):
+        """Adds a read of data's size starting at address into data.
+
+        The callback, if given, is called with data after a successful read.
+        """
+        if not is_reg_readable(address) and not self.pozyx.suppress_warnings:
+            warn("Register 0x%0.02x isn't readable" % address, stacklevel=3)
+        register_cache = self.pozyx.getRegisterCache()
+        if register_cache is not None and not self.writes_to(address, data.byte_size) and \
+                register_cache.load(self.remote_id, address, data):
+            self.operations.append((self.CACHED, address, data, callback, len(self.operations)))
+        else:
+            self.operations.append((self.READ, address, data, callback, len(self.operations)))
+
+    def writes_to(self, address, size):
+        """Returns whether the transaction writes to a register in the range"""
+        return any(kind == self.WRITE and address < write_address + write_data.byte_size and
+                   write_address < address + size
+                   for kind, write_address, write_data, callback, index in self.operations)
+
+    def write(self, address, data):
+        """Adds a write of data starting at address"""
+        if not is_reg_writable(address) and not self.pozyx.suppress_warnings:
+            warn("Register 0x%0.02x isn't writable" % address, stacklevel=3)
+        self.operations.append((self.WRITE, address, data, None, len(self.operations)))
+
+    def save(self, save_type, registers=None):
+        """Adds saving the configuration to the flash memory after the other operations, see saveConfiguration"""
+        if registers is None:
+            registers = Data([])
+        if not dataCheck(registers):
+            registers = Data(registers)
+        self.saves.append((save_type, registers))
+
+    def store(self, kind, address, data):
+        """Writes the result of a successful operation through to the register cache"""
+        register_cache = self.pozyx.getRegisterCache()
+        if register_cache is None:
+            return
+        if kind == self.READ:
+            register_cache.store(self.remote_id, address, data)
+        else:
+            register_cache.store_written(self.remote_id, address, data)
+
+    def invalidate(self, address, data):
+        register_cache = self.pozyx.getRegisterCache()
+        if register_cache is not None:
+            register_cache.invalidate(self.remote_id, address, data.byte_size)
+
+    def runs(self, operations):
+        """Splits the operations in runs of consecutive operations of the same kind"""
+        runs = []
+        for operation in operations:
+            if runs and runs[-1][0][0] == operation[0]:
+                runs[-1].append(operation)
+            else:
+                runs.append([operation])
+        return runs
+
+    def fuse_reads(self, operations):
+        """Returns the reads merged in (address, size, operations) ranges, in address order"""
+        ranges = []
+        for operation in sorted(operations, key=lambda operation: operation[1]):
+            kind, address, data, callback, index = operation
+            if ranges:
+                start, size, fused = ranges[-1]
+                end = max(start + size, address + data.byte_size)
+                gap = range(start + size, address)
+                if end - start <= self.max_size and all(is_reg_passable(reg) for reg in gap):
+                    ranges[-1] = (start, end - start, fused + [operation])
+                    continue
+            ranges.append((address, data.byte_size, [operation]))
+        return ranges
+
+    def fuse_writes(self, operations):
+        """Returns the writes merged in (address, Data, operations) ranges of adjacent registers.
+
+        Writes to disjoint registers are merged in address order, overlapping ones keep their order.
+        """
+        ordered = sorted(operations, key=lambda operation: operation[1])
+        if any(following[1] < preceding[1] + preceding[2].byte_size
+               for preceding, following in zip(ordered, ordered[1:])):
+            ordered = operations
+        ranges = []
+        for operation in ordered:
+            kind, address, data, callback, index = operation
+            if ranges:
+                start, fused_data, fused = ranges[-1]
+                if start + fused_data.byte_size == address and \
+                        fused_data.byte_size + data.byte_size <= self.max_size - 1:
+                    ranges[-1] = (start, Data(fused_data.data + data.data, fused_data.data_format + data.data_format),
+                                  fused + [operation])
+                    continue
+            ranges.append((address, Data(list(data.data), data.data_format), [operation]))
+        return ranges
+
+    def execute_reads(self, operations):
+        status = POZYX_SUCCESS
+        for start, size, fused in self.fuse_reads(operations):
+            if len(fused) == 1:
+                range_data = fused[0][2]
+            else:
+                range_data = Data([0] * size)
+            range_status = self.pozyx.remoteRegRead(self.remote_id, start, range_data)
+            self.exchanges += 1
+            for kind, address, data, callback, index in fused:
+                if range_status == POZYX_SUCCESS:
+                    if data is not range_data:
+                        offset = 2 * (address - start)
+                        data.load_bytes(range_data.byte_data[offset:offset + 2 * data.byte_size])
+                    self.store(kind, address, data)
+                    if callback is not None:
+                        callback(data)
+                self.statuses[index] = range_status
+            status = combine_status(status, range_status)
+        return status
+
+    def execute_writes(self, operations, verify=False):
+        status = POZYX_SUCCESS
+        written = []
+        for start, range_data, fused in self.fuse_writes(operations):
+            range_status = self.pozyx.remoteRegWrite(self.remote_id, start, range_data)
+            if not verify:
+                sleep(PozyxConstants.DELAY_REMOTE_WRITE)
+            self.exchanges += 1
+            if range_status == POZYX_SUCCESS:
+                written.append((start, range_data, fused))
+            else:
+                self.finish_write(fused, range_status)
+            status = combine_status(status, range_status)
+        if verify:
+            status = combine_status(status, self.confirm_writes(written, PozyxConstants.DELAY_REMOTE_WRITE))
+        else:
+            for start, range_data, fused in written:
+                self.finish_write(fused, POZYX_SUCCESS)
+        return status
+
+    def finish_write(self, fused, status):
+        """Stores the status of the written operations, and their data in the register cache when written"""
+        for kind, address, data, callback, index in fused:
+            if status == POZYX_SUCCESS:
+                self.store(kind, address, data)
+            else:
+                self.invalidate(address, data)
+            self.statuses[index] = status
+
+    def read_back(self, ranges):
+        """Reads the written ranges back, returning the ones that don't hold the written data yet"""
+        check = RegisterTransaction(self.pozyx, self.remote_id, self.max_size)
+        readbacks = [Data([0] * range_data.byte_size) for start, range_data, fused in ranges]
+        check.operations = [(self.READ, start, readback, None, index)
+                            for index, ((start, range_data, fused), readback) in enumerate(zip(ranges, readbacks))]
+        check.execute()
+        self.exchanges += check.exchanges
+        return [written for written, readback, read_status in zip(ranges, readbacks, check.statuses)
+                if read_status != POZYX_SUCCESS or readback.byte_data != written[1].byte_data]
+
+    def confirm_writes(self, ranges, delay, unconfirmed=None):
+        """Reads the written ranges back until they hold the written data, instead of sleeping delay.
+
+        Ranges with registers that can't be read back are waited for with delay after all.
+
+        Args:
+            ranges: the written (address, Data, operations) ranges.
+            delay: the fixed delay after a write.
+            unconfirmed (optional): the ranges of ranges that weren't confirmed by a read back yet,
+                all of them when None.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_TIMEOUT
+        """
+        for start, range_data, fused in ranges:
+            range_data.load_hex_string()
+        unverifiable = [written for written in ranges
+                        if not all(is_reg_readable(reg) for reg in range(written[0], written[0] + written[1].byte_size))]
+        if unverifiable:
+            sleep(delay)
+        pending = [written for written in (ranges if unconfirmed is None else unconfirmed)
+                   if written not in unverifiable]
+
+        def poll():
+            pending[:] = self.read_back(pending)
+            return not pending
+
+        status = POZYX_SUCCESS
+        if pending and not self.pozyx.getPollingStrategy().wait(poll, WRITE_CONFIRM_TIMEOUT):
+            status = POZYX_TIMEOUT
+        for written in ranges:
+            self.finish_write(written[2], POZYX_TIMEOUT if written in pending else POZYX_SUCCESS)
+        return status
+
+    def execute_local(self, operations, verify=False):
+        pending = []
+        with self.pozyx.pipeline() as pipeline:
+            for run in self.runs(operations):
+                if run[0][0] == self.READ:
+                    for operation in run:
+                        pending.append((pipeline.read(operation[1], operation[2]), [operation], None, None))
+                    continue
+                for start, range_data, fused in self.fuse_writes(run):
+                    readback = None
+                    future = pipeline.write(start, range_data)
+                    if verify and all(is_reg_readable(reg) for reg in range(start, start + range_data.byte_size)):
+                        # the first read back follows the write in the same round trip
+                        readback = Data([0] * range_data.byte_size)
+                        pipeline.read(start, readback)
+                    pending.append((future, fused, range_data, readback))
+        status = POZYX_SUCCESS
+        written = []
+        unconfirmed = []
+        for future, fused, range_data, readback in pending:
+            operation_status = future.result()
+            kind = fused[0][0]
+            if kind == self.READ:
+                kind, address, data, callback, index = fused[0]
+                if operation_status == POZYX_SUCCESS:
+                    self.store(kind, address, data)
+                    if callback is not None:
+                        callback(data)
+                self.statuses[index] = operation_status
+            elif operation_status == POZYX_SUCCESS and verify:
+                written.append((fused[0][1], range_data, fused))
+                if readback is None or readback.byte_data != range_data.byte_data:
+                    unconfirmed.append(written[-1])
+            else:
+                self.finish_write(fused, operation_status)
+            status = combine_status(status, operation_status)
+        self.exchanges += 1
+        if verify and written:
+            status = combine_status(status, self.confirm_writes(written, PozyxConstants.DELAY_LOCAL_WRITE,
+                                                                unconfirmed))
+        elif any(operation[0] == self.WRITE for operation in operations):
+            sleep(PozyxConstants.DELAY_LOCAL_WRITE)
+        return status
+
+    def read_flash_details(self, details):
+        """Reads which registers are saved in the flash memory into details, a Data([0] * 20)"""
+        self.exchanges += 1
+        return self.pozyx.useFunction(PozyxRegisters.GET_FLASH_DETAILS, data=details, remote_id=self.remote_id)
+
+    def unsaved_registers(self, save_type, registers):
+        """Returns the registers of a save that the flash details don't mark saved yet.
+
+        Only those can confirm the save, by getting marked saved. Saves of the network or the
+        anchors aren't in the flash details, so they, like registers that were saved before,
+        can't be confirmed and give an empty list.
+        """
+        if save_type != PozyxConstants.FLASH_SAVE_REGISTERS or len(registers) == 0:
+            return []
+        details = Data([0] * 20)
+        if self.read_flash_details(details) != POZYX_SUCCESS:
+            return []
+        return [register for register in registers.data if not (details[register // 8] >> (register % 8)) & 0x1]
+
+    def confirm_save(self, registers):
+        """Reads the flash details back until the device answers with the registers marked saved.
+
+        Args:
+            registers: registers that weren't marked saved before the save, see unsaved_registers.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_TIMEOUT
+        """
+        details = Data([0] * 20)
+
+        def poll():
+            if self.read_flash_details(details) != POZYX_SUCCESS:
+                return False
+            return all((details[register // 8] >> (register % 8)) & 0x1 for register in registers)
+
+        if self.pozyx.getPollingStrategy().wait(poll, FLASH_CONFIRM_TIMEOUT):
+            return POZYX_SUCCESS
+        return POZYX_TIMEOUT
+
+    def execute_saves(self, verify=False):
+        status = POZYX_SUCCESS
+        for save_type, registers in self.saves:
+            unsaved = self.unsaved_registers(save_type, registers) if verify else []
+            # a save that can't be confirmed is waited for like saveConfiguration does
+            save_status = self.pozyx.saveConfiguration(save_type, registers, self.remote_id,
+                                                       delay=0 if unsaved else PozyxConstants.DELAY_FLASH)
+            self.exchanges += 1
+            if save_status == POZYX_SUCCESS and unsaved:
+                save_status = self.confirm_save(unsaved)
+            status = combine_status(status, save_status)
+        return status
+
+    def execute(self, verify=False):
+        """Performs all operations of the transaction, then the configuration saves.
+
+        The status of every operation is stored in statuses, in the order they were added.
+
+        Args:
+            verify (optional): whether to confirm the writes and saves by reading them back instead
+                of sleeping a fixed time after them, see commit.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        self.statuses = [None] * len(self.operations)
+        operations = []
+        for kind, address, data, callback, index in self.operations:
+            if kind == self.CACHED:
+                if callback is not None:
+                    callback(data)
+                self.statuses[index] = POZYX_SUCCESS
+            else:
+                operations.append((kind, address, data, callback, index))
+        status = POZYX_SUCCESS
+        if operations and self.remote_id is None:
+            status = self.execute_local(operations, verify)
+        elif operations:
+            for run in self.runs(operations):
+                if run[0][0] == self.READ:
+                    status = combine_status(status, self.execute_reads(run))
+                else:
+                    status = combine_status(status, self.execute_writes(run, verify))
+        if self.saves:
+            status = combine_status(status, self.execute_saves(verify))
+        self.operations = []
+        self.saves = []
+        return status
+
+    def commit(self):
+        """Performs all operations of the transaction, then the configuration saves, confirming the
+        writes and saves by reading them back instead of sleeping a fixed time after them.
+
+        A write whose registers don't hold the written data within WRITE_CONFIRM_TIMEOUT gets the
+        status POZYX_TIMEOUT, registers that can't be read back are waited for with the fixed delay.
+        Likewise, saves that the flash details can't confirm are waited for with DELAY_FLASH.
+
+        Returns:
+            POZYX_SUCCESS, POZYX_FAILURE, POZYX_TIMEOUT
+        """
+        return self.execute(verify=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
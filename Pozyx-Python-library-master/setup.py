@@ -16,9 +16,14 @@ setup(
               'pypozyx.structures'],
     version=PYPOZYX_VERSION,
     description='Python library for Pozyx devices',
+    python_requires='>=3.8',
     install_requires=[
         'pyserial>=3.0'
     ],
+    extras_require={
+        # pypozyx.tools: time series, multilateration, ranging matrix, range filter and tracker, shared ring
+        'tools': ['numpy'],
+    },
     long_description=long_description,
     author='Laurent Van Acker',
     license='GPLv3',
@@ -28,6 +33,7 @@ setup(
     keywords=['pozyx', 'serial', 'positioning', 'localisation'],
     classifiers=[
         'Programming Language :: Python',
+        'Programming Language :: Python :: 3',
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: End Users/Desktop',
         'Operating System :: OS Independent',
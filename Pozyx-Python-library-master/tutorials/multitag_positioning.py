@@ -32,6 +32,7 @@ class MultitagPositioning(object):
         self.algorithm = algorithm
         self.dimension = dimension
         self.height = height
+        self.scheduler = self.pozyx.multitagScheduler(self.tag_ids)
 
     def setup(self):
         """Sets up the Pozyx for positioning by calibrating its anchor list."""
@@ -52,19 +53,17 @@ class MultitagPositioning(object):
         print("")
 
         self.setAnchorsManual(save_to_flash=False)
+        self.scheduler.configure(self.dimension, self.height, self.algorithm)
 
         self.printPublishAnchorConfiguration()
 
     def loop(self):
-        """Performs positioning and prints the results."""
-        for tag_id in self.tag_ids:
-            position = Coordinates()
-            status = self.pozyx.doPositioning(
-                position, self.dimension, self.height, self.algorithm, remote_id=tag_id)
-            if status == POZYX_SUCCESS:
-                self.printPublishPosition(position, tag_id)
+        """Performs positioning on all tags concurrently and prints the results as each tag finishes."""
+        for result in self.scheduler.round():
+            if result.status == POZYX_SUCCESS:
+                self.printPublishPosition(result.position, result.tag_id)
             else:
-                self.printPublishErrorCode("positioning", tag_id)
+                self.printPublishErrorCode("positioning", result.tag_id)
 
     def printPublishPosition(self, position, network_id):
         """Prints the Pozyx's position and possibly sends it as a OSC packet"""
@@ -1,5 +1,8 @@
 import pytest
 from pypozyx import *
+from pypozyx.pozyx_simulator import (SIMULATED_ANCHORS, SIMULATED_LOCAL_ID, SIMULATED_LOCAL_POSITION,
+                                     SIMULATED_REMOTE_ID, PozyxSimulator, reference_network, reference_port)
+
 
 def pytest_addoption(parser):
     parser.addoption("--dec", action="store", default=False,
@@ -7,7 +10,7 @@ def pytest_addoption(parser):
     parser.addoption("--remote", action="store", default=None,
                      help="the remote ID for testing when applicable")
     parser.addoption("--interface", action="store", default=None,
-                     help="the interface to test, defaults to serial")
+                     help="the interface to test, serial or simulator. Defaults to serial, or simulator without a Pozyx connected")
     # TODO: add port for serial
 
 
@@ -22,12 +25,63 @@ def remote(request):
     return remote
 
 
+def make_simulated_pozyx():
+    """Returns a PozyxSimulator at SIMULATED_LOCAL_ID in a new reference network with the remote tag"""
+    return PozyxSimulator(network=reference_network(SIMULATED_REMOTE_ID), network_id=SIMULATED_LOCAL_ID,
+                          position=SIMULATED_LOCAL_POSITION)
+
+
 @pytest.fixture(scope='session')
 def pozyx(request):
     interface = request.config.getoption("--interface")
-    return PozyxSerial(get_serial_ports()[0].device)
+    if interface == 'simulator' or (interface is None and get_first_pozyx_serial_port() is None):
+        return make_simulated_pozyx()
     if interface == 'serial' or interface is None:
         return PozyxSerial(get_serial_ports()[0].device)
     else:
         print("not a valid setting for interface option, better not use it right now... giving a pozyx serial anyway")
         return PozyxSerial(get_serial_ports()[0].device)
+
+
+@pytest.fixture
+def simulated_anchors():
+    """The (network ID, coordinates) of the anchors in the simulated network"""
+    return list(SIMULATED_ANCHORS)
+
+
+@pytest.fixture
+def anchor_ids(simulated_anchors):
+    """The network IDs of the anchors in the simulated network"""
+    return [anchor_id for anchor_id, position in simulated_anchors]
+
+
+@pytest.fixture
+def simulated_network():
+    """Factory of reference networks, simulated_network(remote_id=None, real_time=False, **kwargs).
+
+    See pypozyx.pozyx_simulator.reference_network.
+    """
+    return reference_network
+
+
+@pytest.fixture
+def simulated_pozyx():
+    """A PozyxSimulator at 0x6000 in a fresh simulated network with the remote tag 0x6100"""
+    return make_simulated_pozyx()
+
+
+@pytest.fixture
+def pty_port():
+    """Factory of SimulatedSerialPorts, pty_port(network, latency=0.0, network_id=0x6000, position=...).
+
+    Adds the device to the network and serves it on a pty, closed after the test, see reference_port.
+    """
+    ports = []
+
+    def open_port(*args, **kwargs):
+        port = reference_port(*args, **kwargs)
+        ports.append(port)
+        return port
+    yield open_port
+    for port in ports:
+        port.close()
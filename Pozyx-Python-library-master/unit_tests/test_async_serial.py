@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from pypozyx import *
+from pypozyx.polling import FixedPolling
+from pypozyx.pozyx_simulator import SIMULATED_REMOTE_ID
+from pypozyx.pozyx_serial_async import AsyncPozyxSerial
+from pypozyx.register_cache import RegisterCache
+from pypozyx.tracing import Tracer
+from serial import SerialException
+
+
+@pytest.fixture
+def run_with_simulated_port(simulated_network, pty_port):
+    def run(test, latency=0.0, network=None):
+        port = pty_port(simulated_network(SIMULATED_REMOTE_ID) if network is None else network, latency)
+
+        async def main():
+            pozyx = await AsyncPozyxSerial.open(port.name, timeout=0.5, suppress_warnings=True)
+            try:
+                await test(pozyx)
+            finally:
+                pozyx.close()
+
+        asyncio.run(main())
+    return run
+
+
+def test_concurrent_reads(run_with_simulated_port):
+    async def test(pozyx):
+        registers = [SingleRegister() for i in range(8)]
+        statuses = await asyncio.gather(*[pozyx.getWhoAmI(register) for register in registers])
+        assert statuses == [POZYX_SUCCESS] * 8
+        assert all(register.value == 0x43 for register in registers), "responses matched to the wrong reads"
+    run_with_simulated_port(test, latency=0.002)
+
+
+def test_ranging(run_with_simulated_port, anchor_ids):
+    async def test(pozyx):
+        ranges = [DeviceRange() for anchor_id in anchor_ids]
+        statuses = await asyncio.gather(*[pozyx.doRanging(anchor_id, device_range)
+                                          for anchor_id, device_range in zip(anchor_ids, ranges)])
+        assert statuses == [POZYX_SUCCESS] * len(anchor_ids), "ranging unsuccessful"
+        assert abs(ranges[0].distance - 2449) < 200, "range too far off the true distance"
+    run_with_simulated_port(test)
+
+
+def test_concurrent_remote_ranging(run_with_simulated_port, simulated_network):
+    # the masters' interrupt status is cleared on read, the rangings mustn't poll each other's flags away
+    network = simulated_network(SIMULATED_REMOTE_ID)
+    network.add_device(0x6101, (3000, 2000, 0))
+
+    async def test(pozyx):
+        for i in range(5):
+            ranges = [DeviceRange() for j in range(3)]
+            statuses = await asyncio.gather(pozyx.doRanging(0x6001, ranges[0], 0x6100),
+                                            pozyx.doRanging(0x6002, ranges[1], 0x6101),
+                                            pozyx.doRanging(0x6003, ranges[2]))
+            assert statuses == [POZYX_SUCCESS] * 3
+            assert all(device_range.distance > 0 for device_range in ranges)
+    run_with_simulated_port(test, network=network)
+
+
+def test_remote_register_cycle(run_with_simulated_port):
+    async def test(pozyx):
+        assert await pozyx.setWrite(PozyxRegisters.CONFIG_GPIO_1, SingleRegister(0x10), 0x6100) == POZYX_SUCCESS
+        config_gpio1, who_am_i = SingleRegister(), SingleRegister()
+        statuses = await asyncio.gather(pozyx.getRead(PozyxRegisters.CONFIG_GPIO_1, config_gpio1, 0x6100),
+                                        pozyx.getWhoAmI(who_am_i, 0x6100))
+        assert statuses == [POZYX_SUCCESS, POZYX_SUCCESS]
+        assert config_gpio1.value == 0x10, "remote write didn't reach the remote device"
+        assert who_am_i.value == 0x43
+    run_with_simulated_port(test)
+
+
+def test_failed_write_isnt_matched_to_a_response(run_with_simulated_port):
+    async def test(pozyx):
+        serial = pozyx.ser
+        write = serial.write
+
+        def failing_write(data):
+            serial.write = write
+            raise SerialException("write failed")
+        serial.write = failing_write
+        with pytest.raises(SerialException):
+            await pozyx.serialExchange('R,00,1\r')
+        firmware, who_am_i = SingleRegister(), SingleRegister()
+        assert await pozyx.getFirmwareVersion(firmware) == POZYX_SUCCESS
+        assert await pozyx.getWhoAmI(who_am_i) == POZYX_SUCCESS
+        assert who_am_i.value == 0x43, "responses matched to the wrong reads after a failed write"
+    run_with_simulated_port(test)
+
+
+def test_shares_the_polling_cache_and_tracer_hooks(run_with_simulated_port, anchor_ids):
+    async def test(pozyx):
+        polling = FixedPolling()
+        register_cache = RegisterCache()
+        tracer = Tracer()
+        pozyx.setPollingStrategy(polling)
+        pozyx.setRegisterCache(register_cache)
+        pozyx.setTracer(tracer)
+
+        assert await pozyx.doRanging(anchor_ids[0], DeviceRange()) == POZYX_SUCCESS
+        assert polling.calls == 1, "the polling strategy wasn't used"
+        uwb_settings = Data([0] * 5)
+        for i in range(2):
+            assert await pozyx.getRead(PozyxRegisters.UWB_CHANNEL, uwb_settings) == POZYX_SUCCESS
+        assert register_cache.hits == 1, "the register cache wasn't used"
+
+        ranging = tracer.traces[0]
+        assert ranging.name == 'doRanging' and ranging.exchanges > 0 and ranging.polls == polling.last_polls
+        assert [span.name for span in tracer.traces] == ['doRanging', 'getRead', 'getRead']
+        pozyx.setTracer(None)
+    run_with_simulated_port(test)
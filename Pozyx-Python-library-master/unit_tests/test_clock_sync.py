@@ -0,0 +1,64 @@
+from random import Random
+from time import perf_counter
+
+from pypozyx import DeviceRange, NetworkID, POZYX_SUCCESS
+from pypozyx.clock_sync import ClockSync, DeviceClock, TIMESTAMP_WRAP
+from pypozyx.pozyx_simulator import PozyxSimulator
+from pypozyx.ranging_stream import RangingStream
+
+
+def simulate_exchanges(clock, start, skew, count, random):
+    """Adds exchanges of a device clock starting at start ms, returns the true host time of device time 0"""
+    offset = 1000.0
+    for i in range(count):
+        device_time = start / 1000.0 + i * 0.05
+        event = offset + device_time * (1 + skew)
+        send = event - random.uniform(0.0005, 0.005)
+        receive = event + random.uniform(0.0005, 0.005)
+        clock.add_exchange(int(round(device_time * 1000)) % TIMESTAMP_WRAP, send, receive)
+    return offset
+
+
+def test_estimates_offset_and_skew():
+    clock = DeviceClock(forgetting=0.999)
+    offset = simulate_exchanges(clock, 0, 50e-6, 2000, Random(0))
+    assert abs(clock.skew * 1e6 - 50) < 5
+    host_time, error = clock.to_host(100000)
+    true_time = offset + 100.0 * (1 + 50e-6)
+    assert abs(host_time - true_time) <= error < 0.002
+
+
+def test_device_clock_wraparound():
+    clock = DeviceClock()
+    offset = simulate_exchanges(clock, TIMESTAMP_WRAP - 2000, 0.0, 100, Random(1))
+    assert clock.last_timestamp < 5000
+    host_time, error = clock.to_host(clock.last_timestamp)
+    assert abs(host_time - (offset + (TIMESTAMP_WRAP - 2000) / 1000.0 + 99 * 0.05)) <= error
+
+
+def test_devices_are_keyed_on_their_network_id():
+    clock_sync = ClockSync()
+    simulate_exchanges(clock_sync.clock(NetworkID(0x6e30)), 0, 0.0, 100, Random(2))
+    assert list(clock_sync.statistics()) == [0x6e30]
+    assert clock_sync.to_host(NetworkID(0x6e30), 1000) == clock_sync.to_host(0x6e30, 1000)
+    assert clock_sync.latency(NetworkID(0x6e30), 1000, 2000.0) == clock_sync.latency(0x6e30, 1000, 2000.0)
+    assert clock_sync.to_host(NetworkID(0x6e31), 1000)[0] is None
+
+
+def test_ranging_records_exchanges_and_stamps_records(simulated_network, anchor_ids):
+    # on the real clock, for host times to fall between perf_counter calls
+    network = simulated_network(real_time=True)
+    pozyx = PozyxSimulator(network=network, network_id=0x6000, position=(1000, 2000, 1000))
+    pozyx.setClockSync(ClockSync())
+    before = perf_counter()
+    for i in range(5):
+        assert pozyx.doRanging(0x6001, DeviceRange()) == POZYX_SUCCESS
+    assert all(measurement.status == POZYX_SUCCESS for measurement in pozyx.doRangingMany(anchor_ids))
+    assert pozyx.getClockSync().statistics()[None]['exchanges'] == 9
+
+    stream = RangingStream(pozyx, anchor_ids)
+    with stream:
+        record = next(iter(stream))
+        assert before < record.host_time < perf_counter()
+        assert record.time_error < 0.05
+        assert 0 <= pozyx.getClockSync().latency(None, record.device_range.timestamp) < 1
@@ -1,4 +1,7 @@
+import pytest
 from pypozyx import *
+from pypozyx.pozyx_serial import SerialCommandPipeline
+from pypozyx.pozyx_simulator import PozyxSimulator
 from pypozyx.definitions.registers import POZYX_WHO_AM_I, POZYX_CONFIG_GPIO1
 
 
@@ -42,3 +45,151 @@ def test_no_write_who_am_i(pozyx, remote):
     status = pozyx.getRead(POZYX_WHO_AM_I, who_am_i, remote)
     assert status == POZYX_SUCCESS, "couldn't read POZYX_WHO_AM_I register"
     assert who_am_i.value != 0x10, "Could write to POZYX_WHO_AM_I"
+
+
+def test_read_batch(pozyx):
+    who_am_i, config_gpio1, whole_block = SingleRegister(), SingleRegister(), Data(data=[0] * 50)
+    statuses = pozyx.regReadBatch([(POZYX_WHO_AM_I, who_am_i), (POZYX_CONFIG_GPIO1, config_gpio1),
+                                   (POZYX_WHO_AM_I, whole_block)])
+    assert statuses == [POZYX_SUCCESS] * 3, "batch read unsuccessful"
+    assert who_am_i.value == 0x43, "POZYX_WHO_AM_I register has a wrong value"
+    assert whole_block[0] == 0x43, "batch reads didn't match their responses in order"
+
+
+def test_write_batch(pozyx):
+    statuses = pozyx.regWriteBatch([(POZYX_CONFIG_GPIO1, SingleRegister(0x10))])
+    assert statuses == [POZYX_SUCCESS], "batch write unsuccessful"
+    config_gpio1 = SingleRegister()
+    pozyx.regRead(POZYX_CONFIG_GPIO1, config_gpio1)
+    assert config_gpio1.value == 0x10, "written and read values don't match"
+
+
+def test_pipeline_callbacks(pozyx):
+    results = []
+    with pozyx.pipeline() as pipeline:
+        futures = [pipeline.read(POZYX_WHO_AM_I, SingleRegister(),
+                                 callback=lambda future: results.append(future.result())) for i in range(20)]
+    assert results == [POZYX_SUCCESS] * 20, "callbacks weren't called for every operation"
+    assert all(future.done() for future in futures)
+
+
+def test_serial_pipeline_is_opt_in(simulated_network, pty_port):
+    port = pty_port(simulated_network())
+    pozyx = PozyxSerial(port.name, suppress_warnings=True)
+    assert not isinstance(pozyx.pipeline(), SerialCommandPipeline), "commands pipelined without pipelined=True"
+    assert pozyx.regReadBatch([(POZYX_WHO_AM_I, SingleRegister())]) == [POZYX_SUCCESS]
+    pozyx.ser.close()
+
+
+def test_pipeline_truncated_response(simulated_network, pty_port):
+    port = pty_port(simulated_network())
+    pozyx = PozyxSerial(port.name, suppress_warnings=True, pipelined=True)
+    handle_line = port.device.handle_line
+
+    def truncate_gpio_reads(line):
+        response = handle_line(line)
+        return 'D,\r\n' if line.startswith('R,%0.2x' % POZYX_CONFIG_GPIO1) else response
+    port.device.handle_line = truncate_gpio_reads
+    with pozyx.pipeline() as pipeline:
+        futures = [pipeline.read(POZYX_WHO_AM_I, SingleRegister()), pipeline.read(POZYX_CONFIG_GPIO1, SingleRegister()),
+                   pipeline.read(POZYX_WHO_AM_I, SingleRegister()), pipeline.read(POZYX_WHO_AM_I, SingleRegister())]
+    assert [future.result() for future in futures] == [POZYX_SUCCESS] + [POZYX_FAILURE] * 3
+    network_id = NetworkID()
+    assert pozyx.getNetworkId(network_id) == POZYX_SUCCESS and network_id.id == 0x6000, "late response was matched"
+    pozyx.ser.close()
+
+
+def simulated_remote(pozyx, remote):
+    if remote is None:
+        if not isinstance(pozyx, PozyxSimulator):
+            pytest.skip("needs a remote device, pass one with --remote")
+        remote = 0x6100
+    return remote
+
+
+def test_remote_transaction_fuses_reads(pozyx, remote):
+    remote = simulated_remote(pozyx, remote)
+    uwb_settings, algorithm, nr_anchors = UWBSettings(), SingleRegister(), SingleRegister()
+    transaction = pozyx.registerTransaction(remote)
+    pozyx.getUWBSettings(uwb_settings, transaction=transaction)
+    pozyx.getPositionAlgorithm(algorithm, transaction=transaction)
+    pozyx.getNumberOfAnchors(nr_anchors, transaction=transaction)
+    assert transaction.execute() == POZYX_SUCCESS
+    assert transaction.exchanges == 1, "reads weren't fused into one remote read"
+    expected_uwb_settings = UWBSettings()
+    assert pozyx.getUWBSettings(expected_uwb_settings, remote) == POZYX_SUCCESS
+    assert uwb_settings == expected_uwb_settings
+
+
+def test_remote_transaction_fuses_writes(pozyx, remote):
+    remote = simulated_remote(pozyx, remote)
+    transaction = pozyx.registerTransaction(remote)
+    for gpio, register in enumerate(range(PozyxRegisters.CONFIG_GPIO_1, PozyxRegisters.CONFIG_GPIO_4 + 1)):
+        transaction.write(register, SingleRegister(gpio))
+    transaction.read(PozyxRegisters.CONFIG_GPIO_3, SingleRegister())
+    assert transaction.execute() == POZYX_SUCCESS
+    assert transaction.exchanges == 2, "adjacent writes weren't fused into one remote write"
+    gpio_config = Data([0] * 4)
+    assert pozyx.getRead(PozyxRegisters.CONFIG_GPIO_1, gpio_config, remote) == POZYX_SUCCESS
+    assert gpio_config.data == [0, 1, 2, 3]
+    assert pozyx.setWrite(PozyxRegisters.CONFIG_GPIO_1, Data([0] * 4), remote) == POZYX_SUCCESS
+
+
+def test_transaction_skips_side_effect_registers(pozyx):
+    transaction = pozyx.registerTransaction(0x6100)
+    transaction.read(PozyxRegisters.WHO_AM_I, SingleRegister())
+    transaction.read(PozyxRegisters.CALIBRATION_STATUS, SingleRegister())
+    assert len(transaction.fuse_reads(transaction.operations)) == 2, "fused read would clear the interrupt status"
+
+
+def configure_positioning(pozyx, transaction):
+    pozyx.setUpdateInterval(200, transaction=transaction)
+    pozyx.setPositionFilter(PozyxConstants.FILTER_TYPE_MOVING_AVERAGE, 5, transaction=transaction)
+    pozyx.setPositionAlgorithm(PozyxConstants.POSITIONING_ALGORITHM_UWB_ONLY, PozyxConstants.DIMENSION_3D,
+                               transaction=transaction)
+    pozyx.setSelectionOfAnchors(PozyxConstants.ANCHOR_SELECT_AUTO, 4, transaction=transaction)
+    pozyx.setLedConfig(0x3f, transaction=transaction)
+    transaction.save(PozyxConstants.FLASH_SAVE_REGISTERS, [PozyxRegisters.POSITIONING_FILTER])
+
+
+@pytest.mark.parametrize('remote_id', [None, 0x6100])
+def test_commit_confirms_without_sleeping(monkeypatch, simulated_pozyx, remote_id):
+    import pypozyx.lib
+    import pypozyx.transaction
+    pozyx = simulated_pozyx
+    for module in (pypozyx.lib, pypozyx.transaction):
+        monkeypatch.setattr(module, 'sleep', lambda seconds: pytest.fail("slept %s s" % seconds) if seconds else None)
+    transaction = pozyx.registerTransaction(remote_id)
+    configure_positioning(pozyx, transaction)
+    assert len(transaction.fuse_writes(transaction.operations)) == 1, "adjacent writes weren't coalesced"
+    assert transaction.commit() == POZYX_SUCCESS
+    assert transaction.statuses == [POZYX_SUCCESS] * 5
+    filter_data, nr_anchors = FilterData(), SingleRegister()
+    pozyx.getPositionFilterData(filter_data, remote_id)
+    pozyx.getNumberOfAnchors(nr_anchors, remote_id)
+    assert filter_data.filter_strength == 5 and nr_anchors.value == 4
+    assert pozyx.isRegisterSaved(PozyxRegisters.POSITIONING_FILTER, remote_id) == 1
+
+
+def test_commit_waits_for_saving_a_saved_register(monkeypatch, simulated_pozyx):
+    import pypozyx.lib
+    pozyx = simulated_pozyx
+    assert pozyx.saveRegisters([PozyxRegisters.POSITIONING_FILTER]) == POZYX_SUCCESS
+    slept = []
+    monkeypatch.setattr(pypozyx.lib, 'sleep', slept.append)
+    for save_type, registers in [(PozyxConstants.FLASH_SAVE_REGISTERS, [PozyxRegisters.POSITIONING_FILTER]),
+                                 (PozyxConstants.FLASH_SAVE_NETWORK, None)]:
+        del slept[:]
+        transaction = pozyx.registerTransaction()
+        transaction.save(save_type, registers)
+        assert transaction.commit() == POZYX_SUCCESS
+        assert slept == [PozyxConstants.DELAY_FLASH], "an unconfirmable save wasn't waited for"
+
+
+def test_commit_times_out_on_unconfirmed_write(simulated_pozyx):
+    pozyx = simulated_pozyx
+    pozyx.device.write = lambda address, data: POZYX_SUCCESS
+    transaction = pozyx.registerTransaction()
+    pozyx.setUpdateInterval(200, transaction=transaction)
+    assert transaction.commit() == POZYX_TIMEOUT
+    assert transaction.statuses == [POZYX_TIMEOUT]
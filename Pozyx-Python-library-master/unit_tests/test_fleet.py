@@ -0,0 +1,55 @@
+import pytest
+
+from pypozyx import *
+from pypozyx.fleet import PozyxFleet, JOB_POSITIONING, JOB_RANGING
+from pypozyx.pozyx_simulator import PozyxSimulator
+
+
+@pytest.fixture
+def simulated_masters(simulated_network, simulated_anchors):
+    def masters_at(positions):
+        network = simulated_network()
+        masters = [PozyxSimulator(network=network, network_id=0x6200 + index, position=position)
+                   for index, position in enumerate(positions)]
+        for master in masters:
+            for anchor_id, position in simulated_anchors:
+                master.addDevice(DeviceCoordinates(anchor_id, 1, Coordinates(*position)))
+        return masters
+    return masters_at
+
+
+def test_round_spreads_over_masters(simulated_masters, anchor_ids):
+    with PozyxFleet(simulated_masters([(1000, 2000, 1000), (4000, 3000, 1000)])) as fleet:
+        results = fleet.round(anchor_ids * 3)
+        assert len(results) == 12
+        assert all(result.status == POZYX_SUCCESS and result.kind == JOB_RANGING for result in results)
+        assert {result.master for result in results} == {0, 1}
+        assert [result.time for result in results] == sorted(result.time for result in results)
+        assert list(fleet) == [] and fleet.results == [], "round results were kept for the stream"
+
+
+def test_merged_stream_is_time_ordered(simulated_masters, anchor_ids):
+    masters = simulated_masters([(1000, 2000, 1000), (4000, 3000, 1000), (2500, 2500, 1000)])
+    with PozyxFleet(masters, stream=True) as fleet:
+        fleet.round(anchor_ids)
+        for i in range(5):
+            for anchor_id in anchor_ids:
+                fleet.submit_ranging(anchor_id)
+            fleet.submit_positioning(None, dimension=PozyxConstants.DIMENSION_2D, height=1000)
+        results = list(fleet)
+    assert len(results) == 25
+    assert [result.time for result in results] == sorted(result.time for result in results)
+    assert sum(result.kind == JOB_POSITIONING for result in results) == 5
+    assert all(result.status == POZYX_SUCCESS for result in results)
+
+
+def test_unreachable_master_is_avoided(simulated_masters, anchor_ids):
+    # the second master is out of range of every anchor
+    with PozyxFleet(simulated_masters([(1000, 2000, 1000), (200000, 0, 1000)])) as fleet:
+        results = fleet.round(anchor_ids)
+        assert all(result.status == POZYX_SUCCESS and result.master == 0 for result in results)
+        reachability = fleet.reachability()
+        assert all(rate < 1.0 for rate in reachability[1].values())
+        results = fleet.round(anchor_ids * 2)
+        assert all(result.status == POZYX_SUCCESS for result in results)
+        assert fleet.statistics()[0]['completed'] > fleet.statistics()[1]['completed']
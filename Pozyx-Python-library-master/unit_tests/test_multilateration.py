@@ -0,0 +1,58 @@
+import numpy as np
+
+from pypozyx import Coordinates, DeviceCoordinates, PozyxConstants, RangeInformation
+from pypozyx.tools.multilateration import Multilateration
+
+ANCHORS = [DeviceCoordinates(0x6001, 1, Coordinates(0, 0, 2000)),
+           DeviceCoordinates(0x6002, 1, Coordinates(5000, 0, 500)),
+           DeviceCoordinates(0x6003, 1, Coordinates(5000, 4000, 2500)),
+           DeviceCoordinates(0x6004, 1, Coordinates(0, 4000, 1000)),
+           DeviceCoordinates(0x6005, 1, Coordinates(2500, 2000, 3000))]
+
+
+def exact_ranges(tags, anchors=ANCHORS):
+    positions = np.array([[anchor.pos.x, anchor.pos.y, anchor.pos.z] for anchor in anchors])
+    return np.sqrt(((tags[:, np.newaxis, :] - positions[np.newaxis, :, :]) ** 2).sum(axis=2))
+
+
+def test_solves_many_tags_in_3d():
+    rng = np.random.RandomState(0)
+    tags = rng.uniform([500, 500, 0], [4500, 3500, 2000], size=(300, 3))
+    ranges = exact_ranges(tags) + rng.normal(0, 20, size=(300, len(ANCHORS)))
+    positions, covariances, valid = Multilateration(ANCHORS).solve(ranges)
+    assert valid.all()
+    errors = np.sqrt(((positions - tags) ** 2).sum(axis=1))
+    assert np.median(errors) < 100
+    assert (np.linalg.eigvalsh(covariances) >= -1e-6).all()
+
+
+def test_solves_2_5d_with_missing_ranges():
+    tags = np.array([[1000.0, 1500.0, 1000.0], [4000.0, 3000.0, 1000.0]])
+    ranges = exact_ranges(tags)
+    ranges[0, 4] = np.nan
+    ranges[1, 0] = 0
+    solver = Multilateration(ANCHORS, dimension=PozyxConstants.DIMENSION_2_5D, height=1000)
+    positions, covariances, valid = solver.solve(ranges)
+    assert valid.all()
+    assert np.allclose(positions, tags, atol=1)
+    assert (covariances[:, 2, :] == 0).all()
+
+
+def test_too_few_ranges_is_invalid():
+    solver = Multilateration(ANCHORS)
+    ranges = solver.range_matrix([[RangeInformation(0x6001, 1000), RangeInformation(0x6002, 4000)]])
+    positions, covariances, valid = solver.solve(ranges)
+    assert not valid[0]
+    assert np.isnan(positions[0]).all()
+
+
+def test_range_matrix_and_conversions():
+    solver = Multilateration(ANCHORS, range_std=10)
+    tag = np.array([[2000.0, 1000.0, 1500.0]])
+    distances = exact_ranges(tag)[0]
+    measurements = [{anchor.network_id: distance for anchor, distance in zip(ANCHORS, distances)}]
+    positions, covariances, valid = solver.solve_measurements(measurements)
+    coordinates = solver.coordinates(positions[0])
+    assert (coordinates.x, coordinates.y, coordinates.z) == (2000, 1000, 1500)
+    error = solver.position_error(covariances[0])
+    assert error.x > 0 and error.y > 0 and error.z > 0
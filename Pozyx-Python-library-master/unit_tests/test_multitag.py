@@ -0,0 +1,69 @@
+import pytest
+
+from pypozyx import *
+from pypozyx.histogram import LatencyHistogram
+from pypozyx.pozyx_simulator import PozyxSimulator, DEVICE_FLAG_ANCHOR
+
+TAG_IDS = [0x6100 + i for i in range(6)]
+
+
+@pytest.fixture
+def simulated_tags(simulated_network, simulated_anchors):
+    network = simulated_network()
+    for index, tag_id in enumerate(TAG_IDS):
+        tag = network.add_device(tag_id, (1000 + 300 * index, 1000 + 200 * index, 0))
+        for anchor_id, position in simulated_anchors:
+            tag.add_device(anchor_id, DEVICE_FLAG_ANCHOR, position)
+    pozyx = PozyxSimulator(network=network, position=(1000, 2000, 1000))
+    for anchor_id, position in simulated_anchors:
+        pozyx.device.add_device(anchor_id, DEVICE_FLAG_ANCHOR, position)
+    return network, pozyx
+
+
+def test_rounds_overlap_tags(simulated_tags):
+    network, pozyx = simulated_tags
+    start = network.now()
+    for tag_id in TAG_IDS:
+        assert pozyx.doPositioning(Coordinates(), remote_id=tag_id) == POZYX_SUCCESS
+    sequential = network.now() - start
+
+    scheduler = pozyx.multitagScheduler(TAG_IDS)
+    scheduler.run_round()
+    start = network.now()
+    results = scheduler.run_round()
+    concurrent = network.now() - start
+
+    assert sorted(result.tag_id for result in results) == TAG_IDS
+    assert all(result.status == POZYX_SUCCESS for result in results)
+    for index, result in enumerate(sorted(results, key=lambda result: result.tag_id)):
+        assert abs(result.position.x - (1000 + 300 * index)) < 150
+    assert concurrent < 0.75 * sequential, "round wasn't faster than positioning the tags one by one"
+    assert scheduler.histograms[TAG_IDS[0]].count == 2
+    assert scheduler.statistics()['tags'][TAG_IDS[0]]['p50'] > 0
+
+
+def test_local_tag_and_in_flight_limit(simulated_tags):
+    network, pozyx = simulated_tags
+    scheduler = pozyx.multitagScheduler([None, TAG_IDS[0], TAG_IDS[1]], max_in_flight=1)
+    results = scheduler.run_round()
+    assert [result.status for result in results] == [POZYX_SUCCESS] * 3
+    assert abs(results[0].position.x - 1000) < 150
+
+
+def test_configure_takes_the_heights_of_doPositioning(simulated_tags):
+    network, pozyx = simulated_tags
+    scheduler = pozyx.multitagScheduler(TAG_IDS[:2])
+    assert scheduler.configure(PozyxConstants.DIMENSION_2_5D, 1200) == POZYX_SUCCESS
+    assert scheduler.configure(PozyxConstants.DIMENSION_2_5D, Data([800], 'i')) == POZYX_SUCCESS
+    height = Data([0], 'i')
+    assert pozyx.getRead(PozyxRegisters.POSITION_Z, height, TAG_IDS[1]) == POZYX_SUCCESS
+    assert height[0] == 800
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram([0.01, 0.02, 0.05])
+    for latency in [0.005, 0.015, 0.015, 0.04, 0.2]:
+        histogram.record(latency)
+    assert histogram.percentile(0.5) == 0.02
+    assert histogram.percentile(1.0) == 0.2
+    assert histogram.buckets() == [(0.01, 1), (0.02, 2), (0.05, 1), (None, 1)]
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from pypozyx import *
+from pypozyx.definitions.registers import PozyxRegisters
+from pypozyx.network_config import (DEVICE_APPLIED, DEVICE_FAILED, DEVICE_ROLLED_BACK, DEVICE_SKIPPED,
+                                    DEVICE_UNCHANGED, LOCAL, NetworkConfigError, NetworkConfigurator,
+                                    load_network_config, parse_network_config)
+from pypozyx.pozyx_simulator import PozyxSimulator
+
+CONFIGURATION_REGISTERS = slice(PozyxRegisters.POSITIONING_FILTER, PozyxRegisters.UWB_GAIN + 1)
+
+
+@pytest.fixture
+def network_config(simulated_anchors):
+    return {
+        'uwb': {'channel': 2, 'bitrate': 1, 'prf': 2, 'plen': 0x08, 'gain_db': 11.5},
+        'positioning': {'algorithm': 'tracking', 'dimension': '2d', 'filter': 'moving_average', 'filter_strength': 5,
+                        'update_interval': 200},
+        'save_to_flash': True,
+        'devices': {
+            'local': {'anchors': [{'id': anchor_id, 'coordinates': list(position)}
+                                  for anchor_id, position in simulated_anchors]},
+            '0x6001': {'positioning': {'update_interval': 500}},
+            0x6100: {},
+        },
+    }
+
+
+def test_apply_is_minimal_and_idempotent(simulated_pozyx, network_config, anchor_ids):
+    pozyx = simulated_pozyx
+    devices = pozyx.device.network.devices
+    pozyx.setPositionFilter(PozyxConstants.FILTER_TYPE_MOVING_AVERAGE, 5, remote_id=0x6100)
+    configurator = NetworkConfigurator(pozyx, parse_network_config(network_config))
+
+    plans = {result.device: result.plan for result in configurator.plan().results}
+    assert [address for address, new, current in plans['0x6100'].writes] == [
+        PozyxRegisters.POSITIONING_ALGORITHM, PozyxRegisters.POSITIONING_INTERVAL]
+    assert PozyxRegisters.POSITIONING_FILTER in plans['0x6100'].saves
+    assert plans['0x6001'].anchors is None and plans[LOCAL].anchors is not None
+    assert devices[0x6001].registers[PozyxRegisters.POSITIONING_ALGORITHM] == PozyxConstants.DIMENSION_3D << 4
+
+    report = configurator.apply()
+    assert report.success and [result.status for result in report.results] == [DEVICE_APPLIED] * 3
+    for device_id in (0x6000, 0x6001, 0x6100):
+        assert devices[device_id].uwb() == devices[0x6000].uwb()
+        assert devices[device_id].registers[PozyxRegisters.POSITIONING_ALGORITHM] == (
+            PozyxConstants.POSITIONING_ALGORITHM_TRACKING + (PozyxConstants.DIMENSION_2D << 4))
+    assert devices[0x6001].registers[PozyxRegisters.POSITIONING_INTERVAL] == 500 & 0xFF
+    assert sorted(devices[0x6000].saved_devices) == anchor_ids
+
+    again = configurator.apply()
+    assert [result.status for result in again.results] == [DEVICE_UNCHANGED] * 3
+    assert all(result.writes == 0 and result.saves == 0 for result in again.results)
+    assert '0 changed' in again.format()
+
+
+def test_failure_rolls_back_changed_devices(simulated_pozyx, network_config):
+    pozyx = simulated_pozyx
+    devices = pozyx.device.network.devices
+    before = {device_id: bytes(devices[device_id].registers[CONFIGURATION_REGISTERS])
+              for device_id in (0x6000, 0x6001, 0x6100)}
+    add_device = pozyx.addDevice
+
+    def failing_add_device(device_coordinates, remote_id=None):
+        return POZYX_FAILURE if remote_id == 0x6100 else add_device(device_coordinates, remote_id)
+    pozyx.addDevice = failing_add_device
+    config = dict(network_config, anchors=[{'id': 0x6002, 'coordinates': [5000, 0, 2000]}])
+
+    report = NetworkConfigurator(pozyx, parse_network_config(config)).apply()
+    assert not report.success
+    # 0x6100 failed on its anchors and keeps its status, its applied steps are undone all the same
+    assert [result.status for result in report.results] == [DEVICE_ROLLED_BACK, DEVICE_FAILED, DEVICE_SKIPPED]
+    for device_id, registers in before.items():
+        assert bytes(devices[device_id].registers[CONFIGURATION_REGISTERS]) == registers
+    assert devices[0x6100].device_ids == [] and devices[0x6001].device_ids == []
+
+
+def test_devices_are_spread_over_masters(simulated_pozyx, network_config, anchor_ids):
+    pozyx = simulated_pozyx
+    masters = [pozyx, PozyxSimulator(network=pozyx.device.network, network_id=0x6200, position=(4000, 3000, 1000))]
+    device_ids = anchor_ids + [0x6100]
+    config = dict(network_config, devices={device_id: {} for device_id in device_ids})
+    config['devices'][LOCAL] = {}
+
+    report = NetworkConfigurator(masters, parse_network_config(config)).apply()
+    assert report.success
+    assert [result.device for result in report.results] == ['0x%04x' % device_id for device_id in device_ids] + [
+        LOCAL, LOCAL]
+    assert {result.master for result in report.results[:-2]} == {0, 1}
+    assert [result.master for result in report.results[-2:]] == [0, 1]
+    devices = pozyx.device.network.devices
+    assert len({devices[device_id].uwb() for device_id in device_ids + [0x6000, 0x6200]}) == 1
+    assert report.duration < report.device_time
+
+
+def test_load_network_config(tmp_path, network_config):
+    path = tmp_path / 'network.json'
+    path.write_text(json.dumps(network_config))
+    config = load_network_config(str(path))
+    assert sorted(config, key=str) == [0x6001, 0x6100, LOCAL]
+    assert config[0x6001].positioning['update_interval'] == 500
+    assert config[0x6100].positioning['update_interval'] == 200
+    assert config[0x6100].uwb.gain_db == 11.5 and config[0x6100].anchors is None
+    assert [anchor.network_id for anchor in config[LOCAL].anchors] == [0x6001, 0x6002, 0x6003, 0x6004]
+
+    yaml = pytest.importorskip('yaml')
+    path = tmp_path / 'network.yaml'
+    path.write_text(yaml.safe_dump(network_config))
+    assert sorted(load_network_config(str(path)), key=str) == [0x6001, 0x6100, LOCAL]
+
+    for invalid in ({'positioning': {'filter': 'kalman', 'filter_strength': 1}}, {'positioning': {'algorithm': 'tracking'}},
+                    {'uwb': {'channel': 5}}, {'devices': {'tag': {}}}, {'gain': 11.5}):
+        with pytest.raises(NetworkConfigError):
+            parse_network_config(invalid)
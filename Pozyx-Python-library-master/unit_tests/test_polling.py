@@ -0,0 +1,45 @@
+from time import perf_counter
+
+from pypozyx import *
+from pypozyx.polling import AdaptivePolling, FixedPolling, OPERATION_RANGING
+
+
+def completing_after(duration):
+    start = perf_counter()
+    return lambda: perf_counter() - start >= duration
+
+
+def test_fixed_polling_times_out():
+    polling = FixedPolling(interval=0.001)
+    assert not polling.wait(lambda: False, 0.01)
+    assert polling.last_polls > 1
+
+
+def test_adaptive_polling_learns_completion_time():
+    fixed, adaptive = FixedPolling(), AdaptivePolling()
+    fixed_polls = adaptive_polls = 0
+    for i in range(10):
+        assert fixed.wait(completing_after(0.01), 0.1, OPERATION_RANGING)
+        assert adaptive.wait(completing_after(0.01), 0.1, OPERATION_RANGING)
+        fixed_polls += fixed.last_polls
+        adaptive_polls += adaptive.last_polls
+    assert 0.005 < adaptive.expected_time(OPERATION_RANGING) < 0.02, "learned time too far off"
+    assert adaptive_polls < fixed_polls / 2, "adaptive polling didn't reduce the polls"
+
+
+def test_adaptive_polling_per_uwb_setting():
+    polling = AdaptivePolling()
+    polling.wait(completing_after(0.005), 0.1, OPERATION_RANGING)
+    polling.set_uwb_settings(UWBSettings(2, 0, 2, 0x08, 11.5))
+    assert polling.expected_time(OPERATION_RANGING) is None, "learned time shared between UWB settings"
+
+
+def test_checkforflag_uses_strategy(pozyx):
+    polling = AdaptivePolling()
+    pozyx.setPollingStrategy(polling)
+    try:
+        assert pozyx.doRanging(0x6001, DeviceRange()) == POZYX_SUCCESS
+        assert polling.last_polls >= 1
+        assert polling.expected_time(OPERATION_RANGING) is not None
+    finally:
+        pozyx.setPollingStrategy(None)
@@ -0,0 +1,147 @@
+from threading import Thread
+from time import perf_counter, sleep
+
+import pytest
+
+from pypozyx import (DeviceRange, SingleRegister, NetworkID, PozyxConnectionError, PozyxConstants, PozyxRegisters,
+                     POZYX_FAILURE, POZYX_SUCCESS, POZYX_TIMEOUT)
+from pypozyx.pozyxd import (PozyxDaemon, PozyxClient, DeviceScheduler, DeviceJob, OP_READ, OP_WRITE,
+                            PRIORITY_CONTROL, PRIORITY_DIAGNOSTICS, PRIORITY_NORMAL)
+
+
+@pytest.fixture
+def daemon(tmpdir, simulated_pozyx):
+    with PozyxDaemon(simulated_pozyx, str(tmpdir.join('pozyxd.sock'))) as daemon:
+        yield daemon
+
+
+def test_scheduler_orders_by_priority_and_coalesces_reads():
+    scheduler = DeviceScheduler()
+    results = []
+    scheduler.put(DeviceJob('logger', OP_READ, PRIORITY_DIAGNOSTICS, 0x00, 1, results.append))
+    scheduler.put(DeviceJob('other', OP_WRITE, PRIORITY_NORMAL, 0x1C, b'\x01', results.append))
+    scheduler.put(DeviceJob('controller', OP_READ, PRIORITY_CONTROL, 0x00, 1, results.append))
+    assert scheduler.coalesced == 1
+    job = scheduler.take()
+    assert job.opcode == OP_READ and job.priority == PRIORITY_CONTROL and len(job.callbacks) == 2
+    assert scheduler.take().opcode == OP_WRITE
+    assert scheduler.take(timeout=0.01) is None
+
+
+def test_scheduler_lock_holds_back_other_sessions():
+    scheduler = DeviceScheduler()
+    granted = []
+    scheduler.acquire('a', PRIORITY_NORMAL, granted.append)
+    scheduler.acquire('b', PRIORITY_NORMAL, lambda status: granted.append('b'))
+    scheduler.put(DeviceJob('b', OP_READ, PRIORITY_CONTROL, 0x00, 1, None))
+    scheduler.put(DeviceJob('a', OP_READ, PRIORITY_DIAGNOSTICS, 0x01, 1, None))
+    assert scheduler.take().session == 'a'
+    assert scheduler.take(timeout=0.01) is None
+    scheduler.release('a')
+    assert granted == [POZYX_SUCCESS, 'b'] and scheduler.owner == 'b'
+    assert scheduler.take().session == 'b'
+
+
+def test_scheduler_drops_expired_jobs():
+    scheduler = DeviceScheduler()
+    scheduler.put(DeviceJob('a', OP_WRITE, PRIORITY_CONTROL, 0x1C, b'\x01', None, perf_counter() - 0.1))
+    scheduler.put(DeviceJob('b', OP_READ, PRIORITY_NORMAL, 0x00, 1, None, perf_counter() + 10))
+    assert scheduler.take().session == 'b'
+    assert scheduler.take(timeout=0.01) is None and scheduler.expired == 1
+
+
+def test_timed_out_request_is_not_executed(daemon):
+    owner, other = PozyxClient(daemon.socket_path), PozyxClient(daemon.socket_path, timeout=0.1)
+    with owner.exclusive():
+        assert other.setWrite(PozyxRegisters.CONFIG_GPIO_1, SingleRegister(0x10)) == POZYX_TIMEOUT
+        sleep(0.1)
+    config_gpio1 = SingleRegister()
+    assert owner.getRead(PozyxRegisters.CONFIG_GPIO_1, config_gpio1) == POZYX_SUCCESS
+    assert config_gpio1.value != 0x10, "the write ran after its client gave up on it"
+    assert daemon.statistics()['expired'] == 1
+    owner.close()
+    other.close()
+
+
+def test_clients_share_the_device(daemon, anchor_ids):
+    clients = [PozyxClient(daemon.socket_path, priority=priority) for priority in (PRIORITY_CONTROL,
+                                                                                    PRIORITY_DIAGNOSTICS)]
+    who_am_i = SingleRegister()
+    assert clients[0].getWhoAmI(who_am_i) == POZYX_SUCCESS and who_am_i.value == 0x43
+    network_id = NetworkID()
+    assert clients[1].getNetworkId(network_id) == POZYX_SUCCESS and network_id.id == 0x6000
+
+    statuses = []
+
+    def range_repeatedly(client):
+        for i in range(10):
+            statuses.append(client.doRanging(anchor_ids[i % 4], DeviceRange()))
+
+    threads = [Thread(target=range_repeatedly, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [POZYX_SUCCESS] * 20
+    for client in clients:
+        client.close()
+
+
+def test_ranging_stream_is_fanned_out(daemon, anchor_ids):
+    first, second = PozyxClient(daemon.socket_path), PozyxClient(daemon.socket_path)
+    with first.subscribeRanging(anchor_ids) as first_stream, second.subscribeRanging(anchor_ids) as second_stream:
+        measurements = [first_stream.get(1.0) for i in range(8)] + [second_stream.get(1.0) for i in range(8)]
+        assert daemon.statistics()['streams'] == 1
+    assert all(measurement.status == POZYX_SUCCESS and measurement.distance > 0 for measurement in measurements)
+    assert set(measurement.destination for measurement in measurements) == set(anchor_ids)
+    first.close()
+    second.close()
+
+
+def test_connection_error_stops_the_daemon(daemon, monkeypatch):
+    def unplugged(address, data):
+        raise PozyxConnectionError("The Pozyx was unplugged")
+
+    client = PozyxClient(daemon.socket_path)
+    monkeypatch.setattr(daemon.pozyx, 'regRead', unplugged)
+    assert client.getWhoAmI(SingleRegister()) == POZYX_FAILURE
+    with pytest.raises(PozyxConnectionError):
+        daemon.wait()
+    assert not daemon.running
+    client.close()
+
+
+def test_saving_isnt_interleaved_with_ranging(daemon, anchor_ids):
+    saver, ranger = PozyxClient(daemon.socket_path), PozyxClient(daemon.socket_path)
+    execute = daemon.execute
+    executed = []
+
+    def record_execute(job):
+        executed.append((job.session, job.address))
+        return execute(job)
+    daemon.execute = record_execute
+    statuses = []
+
+    def save_repeatedly():
+        for i in range(10):
+            statuses.append(saver.saveConfiguration(PozyxConstants.FLASH_SAVE_REGISTERS,
+                                                    [PozyxRegisters.POSITIONING_FILTER], delay=0))
+
+    def range_repeatedly():
+        for i in range(20):
+            statuses.append(ranger.doRanging(anchor_ids[i % 4], DeviceRange()))
+
+    threads = [Thread(target=save_repeatedly), Thread(target=range_repeatedly)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert statuses == [POZYX_SUCCESS] * 30
+    saves = [index for index, (session, address) in enumerate(executed)
+             if address == PozyxRegisters.SAVE_FLASH_MEMORY]
+    assert len(saves) == 10
+    for index in saves:
+        assert executed[index - 1] == (executed[index][0], PozyxRegisters.INTERRUPT_STATUS), \
+            "another client's job came between clearing the interrupt status and saving"
+    saver.close()
+    ranger.close()
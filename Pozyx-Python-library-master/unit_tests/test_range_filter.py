@@ -0,0 +1,72 @@
+import numpy as np
+
+from pypozyx import DeviceRange
+from pypozyx.tools.range_filter import RangeFilter, RangeFilterBank
+from pypozyx.tools.time_series import RANGE_DTYPE
+
+
+def synthetic_log(count, seed=0):
+    random = np.random.RandomState(seed)
+    samples = np.zeros(count, dtype=RANGE_DTYPE)
+    samples['timestamp'] = np.arange(count)
+    samples['distance'] = 5000 + random.normal(0, 20, count)
+    samples['RSS'] = -80 + random.normal(0, 1, count)
+    samples['device_id'] = 0x6001
+    spikes = random.rand(count) < 0.05
+    samples['distance'][spikes] += 3000
+    samples['distance'][random.rand(count) < 0.05] = 0
+    samples['RSS'][random.rand(count) < 0.05] -= 12
+    return samples
+
+
+def test_spike_and_dropout_are_rejected():
+    range_filter = RangeFilter(window=9)
+    for i in range(20):
+        assert range_filter.process(5000 + (i % 3) * 10, -80, i).accepted
+    spike = range_filter.process(9000, -80)
+    assert not spike.accepted and spike.confidence == 0.0
+    assert spike.median == 5010
+    dropout = range_filter.process_range(DeviceRange(21, 0, -80))
+    assert not dropout.accepted
+    assert range_filter.process(5005, -80).confidence > 0.9
+    assert range_filter.statistics()['rejected'] == 2
+
+
+def test_nlos_is_flagged_on_rss_drop():
+    range_filter = RangeFilter()
+    for i in range(50):
+        assert not range_filter.process(5000, -80).nlos
+    filtered = range_filter.process(5050, -90)
+    assert filtered.accepted and filtered.nlos
+    assert filtered.confidence <= 0.5
+
+
+def test_batch_matches_streaming():
+    samples = synthetic_log(2000)
+    streaming = RangeFilter(window=11)
+    expected = [streaming.process(sample['distance'], sample['RSS'], sample['timestamp']) for sample in samples]
+    batch = RangeFilter(window=11)
+    # split in uneven batches, so the state is carried between them
+    filtered = np.concatenate([batch.process_batch(samples[start:start + 333]) for start in range(0, 2000, 333)])
+    assert list(filtered['accepted']) == [result.accepted for result in expected]
+    assert list(filtered['nlos']) == [result.nlos for result in expected]
+    assert np.allclose(filtered['confidence'], [result.confidence for result in expected], atol=1e-5)
+    assert np.allclose(filtered['median'], [result.median for result in expected], equal_nan=True)
+    assert batch.statistics()['rejected'] == streaming.statistics()['rejected']
+    assert abs(batch.baseline - streaming.baseline) < 1e-6
+    assert list(batch.history) == list(streaming.history)
+
+
+def test_stages_chain_per_device():
+    bank = RangeFilterBank(window=5)
+    samples = synthetic_log(200)
+    samples['device_id'][::2] = 0x6002
+    filtered = bank.process_batch(samples)
+    assert set(bank.filters) == {0x6001, 0x6002}
+    assert (filtered['device_id'] == samples['device_id']).all()
+
+    first, second = RangeFilter(threshold=5.0), RangeFilter(threshold=3.0)
+    ranges = [DeviceRange(i, int(distance), int(rss)) for i, distance, rss, device_id in synthetic_log(200)]
+    chained = list(second.filter(first.filter(ranges)))
+    assert 0 < len(chained) < len(ranges)
+    assert all(result.accepted and result.distance > 0 for result in chained)
@@ -0,0 +1,68 @@
+import numpy as np
+
+from pypozyx import DeviceRange
+from pypozyx.tools.range_tracker import RangeTracker, TIMESTAMP_WRAP
+
+
+def test_tracks_distance_and_closing_speed_from_irregular_samples():
+    random = np.random.RandomState(0)
+    tracker = RangeTracker([0x6e66], measurement_std=50.0)
+    # closing in at 500 mm/s from 10 m, sampled irregularly with dropouts
+    times = np.cumsum(random.uniform(0.02, 0.2, 100))
+    for time in times:
+        distance = 10000 - 500 * time + random.normal(0, 50)
+        tracker.add_range(0x6e66, DeviceRange(int(time * 1000), int(distance), -80), host_time=time + 0.01)
+        tracker.tick(time + 0.01)
+    distance, rate, valid = tracker.track(0x6e66, times[-1] + 0.5)
+    assert valid
+    assert abs(rate + 500) < 100
+    assert abs(distance - (10000 - 500 * (times[-1] + 0.5))) < 150
+    assert not tracker.track(0x6e66, times[-1] + 5)[2]
+
+
+def test_vectorized_links_match_single_link_trackers():
+    random = np.random.RandomState(1)
+    links = list(range(50))
+    tracker = RangeTracker(links)
+    singles = [RangeTracker([link]) for link in links]
+    for step in range(20):
+        distances = random.uniform(1000, 20000, len(links))
+        timestamps = step * 100 + random.randint(0, 50, len(links))
+        for link in links:
+            tracker.add(link, distances[link], timestamps[link], host_time=step)
+            singles[link].add(link, distances[link], timestamps[link], host_time=step)
+        snapshot = tracker.tick(step + 0.1)
+        for link in links:
+            single = singles[link].tick(step + 0.1)
+            assert np.isclose(snapshot.distances[link], single.distances[0])
+            assert np.isclose(snapshot.rates[link], single.rates[0])
+
+
+def test_timestamp_wraparound_and_queued_samples_of_one_link():
+    tracker = RangeTracker()
+    start = TIMESTAMP_WRAP - 150
+    for i in range(4):
+        tracker.add('a', 5000 + 10 * i, (start + 100 * i) % TIMESTAMP_WRAP, host_time=0.1 * i)
+    snapshot = tracker.tick(0.3)
+    assert tracker.updates[0] == 4
+    assert np.isclose(tracker.device_time[0] - start / 1000.0, 0.3)
+    assert snapshot.valid[0] and snapshot.rates[0] > 0
+    # a sample older than the last one is ignored
+    tracker.add('a', 9000, start, host_time=0.4)
+    tracker.tick()
+    assert tracker.updates[0] == 4
+
+
+def test_device_clock_reset_restarts_the_link():
+    tracker = RangeTracker()
+    for i in range(10):
+        tracker.add('a', 8000 - 50 * i, 600000 + 100 * i, host_time=0.1 * i)
+        tracker.tick(0.1 * i)
+    assert tracker.rate[0] < 0
+    # the device restarted, its clock counting from 0 again
+    for i in range(3):
+        tracker.add('a', 3000, 200 + 100 * i, host_time=1.5 + 0.1 * i)
+        snapshot = tracker.tick(1.5 + 0.1 * i)
+    assert tracker.updates[0] == 13
+    assert np.isclose(tracker.device_time[0], 0.4)
+    assert snapshot.valid[0] and abs(snapshot.distances[0] - 3000) < 100
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from pypozyx import *
+from pypozyx.pozyx_simulator import PozyxSimulator
+from pypozyx.tools.ranging_matrix import (RangingMatrix, schedule_links, topology_links, TOPOLOGY_CHAIN,
+                                          TOPOLOGY_FULL, TOPOLOGY_K_NEAREST)
+
+CONVOY_IDS = [0x6100 + i for i in range(5)]
+
+
+@pytest.fixture
+def simulated_convoy(simulated_network):
+    network = simulated_network()
+    for index, device_id in enumerate(CONVOY_IDS):
+        network.add_device(device_id, (3000 * (index + 1), 0, 0))
+    return PozyxSimulator(network=network, position=(0, 0, 0))
+
+
+def test_topologies():
+    assert topology_links(4, TOPOLOGY_CHAIN) == [(0, 1), (1, 2), (2, 3)]
+    assert len(topology_links(6, TOPOLOGY_K_NEAREST, k=2)) == 9
+    assert len(topology_links(6, TOPOLOGY_FULL)) == 15
+
+
+def test_schedule_is_collision_free():
+    links = topology_links(8, TOPOLOGY_FULL)
+    slots = schedule_links(links)
+    assert sorted(link for slot in slots for link in slot) == sorted(links)
+    for slot in slots:
+        devices = [device for link in slot for device in link]
+        assert len(devices) == len(set(devices))
+    assert len(schedule_links(topology_links(8, TOPOLOGY_CHAIN))) == 2
+
+
+def test_matrix_follows_the_convoy(simulated_convoy):
+    pozyx = simulated_convoy
+    matrix = RangingMatrix(pozyx, [None] + CONVOY_IDS, TOPOLOGY_CHAIN)
+    first = matrix.latest()
+    for i in range(3):
+        matrix.range_round()
+    snapshot = matrix.latest()
+    assert np.isnan(first.distances).all(), "published snapshots shouldn't change"
+    assert snapshot.sequence == 3 * len(matrix.slots)
+    for index in range(len(CONVOY_IDS)):
+        assert abs(snapshot.distances[index, index + 1] - 3000) < 200
+        assert snapshot.distances[index, index + 1] == snapshot.distances[index + 1, index]
+    assert np.isnan(snapshot.distances[0, 2])
+    for index in range(len(CONVOY_IDS)):
+        assert -120 < snapshot.rss[index, index + 1] < 0
+        assert snapshot.timestamps[index, index + 1] > 0
+    assert np.isnan(snapshot.rss[0, 2]) and np.isnan(snapshot.timestamps[0, 2])
+    remote = [result for result in matrix.range_slot(matrix.slots[0]) if result.initiator is not None]
+    assert remote and all(result.status == POZYX_SUCCESS and result.rss < 0 and result.timestamp > 0
+                          for result in remote)
+    assert matrix.success_rate(CONVOY_IDS[-2], CONVOY_IDS[-1]) > 0.5
+    assert matrix.link_age(None, CONVOY_IDS[0]) < 10
+    assert matrix.link_age(None, CONVOY_IDS[1]) == float('inf')
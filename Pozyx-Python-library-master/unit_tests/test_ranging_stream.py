@@ -0,0 +1,66 @@
+import pytest
+
+from pypozyx import *
+from pypozyx.ranging_stream import RangingStream, RecordRing, OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST
+
+
+def test_stream_rate_and_statistics(pozyx):
+    records = 0
+    with RangingStream(pozyx, [0x6001, 0x6002], rate=200) as stream:
+        for record in stream:
+            assert record.destination in (0x6001, 0x6002)
+            assert record.device_range.distance > 0
+            records += 1
+            if records == 40:
+                break
+    statistics = stream.statistics()
+    assert statistics['measurements'] >= 40
+    assert statistics['round_rate'] < 220, "stream ran faster than the target rate"
+    assert 0 <= statistics['jitter_p50'] <= statistics['jitter_p90'] <= statistics['jitter_p99']
+
+
+def test_ring_drops_oldest_records():
+    ring = RecordRing(capacity=4)
+    for i in range(10):
+        record = ring.acquire()
+        record.destination = i
+        ring.publish(record)
+    assert ring.dropped == 6
+    assert [ring.take().destination for i in range(4)] == [6, 7, 8, 9]
+
+
+def test_ring_drops_newest_records():
+    ring = RecordRing(capacity=4, overflow=OVERFLOW_DROP_NEWEST)
+    for i in range(10):
+        record = ring.acquire()
+        record.destination = i
+        ring.publish(record)
+    assert [ring.take().destination for i in range(4)] == [0, 1, 2, 3]
+
+
+def test_blocking_stream_keeps_every_measurement(pozyx):
+    stream = RangingStream(pozyx, 0x6001, capacity=2, overflow=OVERFLOW_BLOCK)
+    stream.start()
+    records = [record.device_range.timestamp for record, i in zip(stream, range(20))]
+    stream.stop()
+    assert stream.statistics()['dropped'] == 0
+    assert records == sorted(records), "records were reordered"
+
+
+def test_ranging_error_ends_the_iteration(simulated_pozyx):
+    do_ranging_many = simulated_pozyx.doRangingMany
+    rounds = []
+
+    def failing_ranging_many(destination_ids, remote_id=None):
+        rounds.append(destination_ids)
+        if len(rounds) > 3:
+            raise PozyxConnectionError("device disconnected")
+        return do_ranging_many(destination_ids, remote_id=remote_id)
+    simulated_pozyx.doRangingMany = failing_ranging_many
+    stream = RangingStream(simulated_pozyx, 0x6001)
+    records = []
+    with pytest.raises(PozyxConnectionError):
+        for record in stream:
+            records.append(record.device_range.timestamp)
+    assert len(records) == 3 and not stream.running
+    stream.stop()
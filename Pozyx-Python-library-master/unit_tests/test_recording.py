@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from pypozyx import *
+from pypozyx.recording import (COMMAND_KINDS, KIND_DATA, KIND_DATA_UPPER, KIND_RAW_COMMAND, KIND_RAW_RESPONSE,
+                               KIND_READ, ReplayError, ReplayTransport, SerialRecorder, encode_command,
+                               encode_response, format_command, format_response, read_recording)
+from pypozyx.pozyx_simulator import SIMULATED_REMOTE_ID as REMOTE_ID
+
+
+def session(pozyx, anchors):
+    """Returns what a session of ranging, positioning, remote reads and pipelined reads measured"""
+    results = []
+    for anchor_id, position in anchors:
+        pozyx.addDevice(DeviceCoordinates(anchor_id, 1, Coordinates(*position)))
+    for i in range(3):
+        for anchor_id, position in anchors:
+            device_range = DeviceRange()
+            results.append((pozyx.doRanging(anchor_id, device_range), device_range.distance, device_range.RSS))
+        position = Coordinates()
+        results.append((pozyx.doPositioning(position), position.x, position.y, position.z))
+        whoami = SingleRegister()
+        results.append((pozyx.getWhoAmI(whoami, remote_id=REMOTE_ID), whoami.value))
+        network_id = NetworkID()
+        with pozyx.pipeline() as pipeline:
+            pipeline.read(PozyxRegisters.WHO_AM_I, whoami)
+            pipeline.read(PozyxRegisters.NETWORK_ID, network_id)
+        results.append((whoami.value, network_id.id))
+    return results
+
+
+def test_compact_encoding_round_trips():
+    for command in ['R,05,1\r', 'W,10,0a0b\r', 'F,b0,6e30,1\r', 'X,weird\r']:
+        assert format_command(*encode_command(command)) == command
+    assert encode_command('R,05,1\r')[0] == KIND_READ
+    assert encode_command('X,weird\r')[0] == KIND_RAW_COMMAND
+    for line in ['D,43\r\n', 'D,0A0B\r\n', 'D,\r\n', 'E,\r\n', '']:
+        assert format_response(*encode_response(line)) == line
+    assert encode_response('D,0a0b\r\n')[0] == KIND_DATA
+    assert encode_response('D,0A0B\r\n')[0] == KIND_DATA_UPPER
+    assert encode_response('E,\r\n')[0] == KIND_RAW_RESPONSE
+
+
+def test_record_and_replay(tmp_path, simulated_network, simulated_anchors, pty_port):
+    path = str(tmp_path / 'session.pzxrec')
+    pozyx = PozyxSerial(pty_port(simulated_network(REMOTE_ID)).name, suppress_warnings=True)
+    with SerialRecorder(pozyx, path) as recorder:
+        recorded = session(pozyx, simulated_anchors)
+    pozyx.ser.close()
+    assert recorder.records > 0
+    start, records = read_recording(path)
+    assert len(records) == recorder.records
+    assert [record[0] for record in records] == sorted(record[0] for record in records)
+    # smaller than the text exchanged, timestamps included
+    text_size = sum(len(format_command(*record[1:])) if record[1] in COMMAND_KINDS
+                    else len(format_response(*record[1:])) for record in records)
+    assert os.path.getsize(path) < text_size
+
+    replay = ReplayTransport(path)
+    assert session(replay, simulated_anchors) == recorded
+    assert replay.finished
+
+    timed = ReplayTransport(path, timing=True)
+    assert session(timed, simulated_anchors) == recorded
+
+    diverging = ReplayTransport(path)
+    with pytest.raises(ReplayError):
+        diverging.doRanging(0x6002, DeviceRange())
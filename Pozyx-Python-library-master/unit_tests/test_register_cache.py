@@ -0,0 +1,69 @@
+import pytest
+
+from pypozyx import *
+from pypozyx.register_cache import RegisterCache
+
+
+@pytest.fixture
+def cached_simulator(simulated_pozyx):
+    simulated_pozyx.setRegisterCache(RegisterCache())
+    return simulated_pozyx
+
+
+def test_cached_reads_skip_the_device(cached_simulator):
+    pozyx = cached_simulator
+    for remote_id in [None, 0x6100]:
+        uwb_settings = UWBSettings()
+        assert pozyx.getUWBSettings(uwb_settings, remote_id) == POZYX_SUCCESS
+        transactions = pozyx.device.transactions
+        cached_uwb_settings = UWBSettings()
+        assert pozyx.getUWBSettings(cached_uwb_settings, remote_id) == POZYX_SUCCESS
+        assert pozyx.device.transactions == transactions, "cached read reached the device"
+        assert cached_uwb_settings == uwb_settings
+    register_cache = pozyx.getRegisterCache()
+    assert register_cache.hits == 2 and register_cache.misses == 2
+    assert register_cache.saved_round_trips == 1 and register_cache.saved_remote_exchanges == 1
+
+
+def test_write_through_and_invalidation(cached_simulator):
+    pozyx = cached_simulator
+    assert pozyx.setPositionAlgorithm(PozyxConstants.POSITIONING_ALGORITHM_TRACKING,
+                                      PozyxConstants.DIMENSION_2D) == POZYX_SUCCESS
+    algorithm = SingleRegister()
+    assert pozyx.getPositionAlgorithm(algorithm) == POZYX_SUCCESS
+    assert algorithm[0] == PozyxConstants.POSITIONING_ALGORITHM_TRACKING
+    assert pozyx.getRegisterCache().hits == 1, "written register wasn't cached"
+
+    assert pozyx.resetSystem() == POZYX_SUCCESS
+    assert pozyx.getPositionAlgorithm(algorithm) == POZYX_SUCCESS
+    assert algorithm[0] == PozyxConstants.POSITIONING_ALGORITHM_UWB_ONLY, "reset didn't invalidate the cache"
+
+
+def test_volatile_registers_bypass_the_cache(cached_simulator):
+    pozyx = cached_simulator
+    interrupt_status = SingleRegister()
+    pozyx.getInterruptStatus(interrupt_status)
+    pozyx.getInterruptStatus(interrupt_status)
+    assert pozyx.getRegisterCache().hits == 0 and pozyx.getRegisterCache().misses == 0
+
+
+def test_ranging_invalidates_the_device_list(cached_simulator):
+    pozyx = cached_simulator
+    for remote_id, destination_id in [(None, 0x6001), (0x6100, 0x6001)]:
+        list_size = SingleRegister()
+        assert pozyx.getDeviceListSize(list_size, remote_id) == POZYX_SUCCESS and list_size[0] == 0
+        assert pozyx.doRanging(destination_id, DeviceRange(), remote_id) == POZYX_SUCCESS
+        assert pozyx.getDeviceListSize(list_size, remote_id) == POZYX_SUCCESS
+        assert list_size[0] == 1, "device list size served stale from the cache after ranging"
+        device_list = DeviceList(list_size=1)
+        assert pozyx.getDeviceIds(device_list, remote_id) == POZYX_SUCCESS and device_list[0] == destination_id
+
+
+def test_ranging_many_invalidates_the_device_list(cached_simulator):
+    pozyx = cached_simulator
+    list_size = SingleRegister()
+    assert pozyx.getDeviceListSize(list_size) == POZYX_SUCCESS and list_size[0] == 0
+    measurements = pozyx.doRangingMany([0x6001, 0x6002])
+    assert [measurement.status for measurement in measurements] == [POZYX_SUCCESS, POZYX_SUCCESS]
+    assert pozyx.getDeviceListSize(list_size) == POZYX_SUCCESS
+    assert list_size[0] == 2, "device list size served stale from the cache after ranging"
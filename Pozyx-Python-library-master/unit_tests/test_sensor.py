@@ -10,7 +10,7 @@ from time import sleep
 
 
 def test_conversions(pozyx, remote):
-    assert POZYX_ACCEL_DIV_MG == 16.0, "POZYX_ACCEL_DIV_MG wrong, should be 16.0"
+    assert POZYX_ACCEL_DIV_MG == 1.0, "POZYX_ACCEL_DIV_MG wrong, should be 1.0"
     assert POZYX_MAX_LIN_ACCEL_DIV_MG == 1.0, "POZYX_MAX_LIN_ACCEL_DIV_MG wrong, should be 1.0"
     assert POZYX_GYRO_DIV_DPS == 16.0, "POZYX_GYRO_DIV_DPS wrong, should be 16.0"
     assert POZYX_PRESS_DIV_PA == 1000.0, "POZYX_PRESS_DIV_PA wrong, should be 1000.0"
@@ -0,0 +1,63 @@
+from multiprocessing import Process, Queue
+
+import numpy as np
+
+from pypozyx import DeviceRange
+from pypozyx.tools.shared_ring import SharedRing
+
+
+def read_latest(name, queue):
+    reader = SharedRing.attach(name)
+    queue.put(int(reader.latest()['distance']))
+    reader.close()
+
+
+def test_readers_see_the_records_without_copies():
+    with SharedRing(capacity=8) as ring:
+        reader = SharedRing.attach(ring.name)
+        assert reader.latest() is None
+        for i in range(5):
+            ring.publish_range(0x6001, DeviceRange(i, 1000 + i, -80))
+        assert reader.latest()['distance'] == 1004
+        window, token = reader.window(3)
+        assert list(window['distance']) == [1002, 1003, 1004]
+        assert np.shares_memory(window, reader.records)
+        assert reader.valid(token, 3)
+        ring.publish(0, 0, 0, 0)
+        assert reader.valid(token, 3)
+        for i in range(4):
+            ring.publish(0, 0, 0, 0)
+        assert not reader.valid(token, 3)
+        reader.close()
+
+
+def test_wrapping_window_is_a_view():
+    with SharedRing(capacity=4) as ring:
+        for i in range(6):
+            ring.publish(i, i, 0, 0)
+        window, token = ring.window(4)
+        assert list(window['distance']) == [2, 3, 4, 5]
+        assert np.shares_memory(window, ring.records)
+        assert ring.valid(token, 3)
+
+
+def test_read_since_counts_lost_records():
+    with SharedRing(capacity=4) as ring:
+        for i in range(10):
+            ring.publish(i, i, 0, 0)
+        records, cursor, lost = ring.read_since(0)
+        assert list(records['distance']) == [7, 8, 9]
+        assert cursor == 10 and lost == 7
+        ring.publish(10, 10, 0, 0)
+        records, cursor, lost = ring.read_since(cursor)
+        assert list(records['distance']) == [10] and lost == 0
+
+
+def test_reader_in_other_process():
+    with SharedRing(capacity=16) as ring:
+        ring.publish_range(0x6001, DeviceRange(1, 4521, -80))
+        queue = Queue()
+        process = Process(target=read_latest, args=(ring.name, queue))
+        process.start()
+        assert queue.get(timeout=10) == 4521
+        process.join()
@@ -0,0 +1,59 @@
+from pypozyx import *
+from pypozyx.pozyx_simulator import SIMULATED_REMOTE_ID, PozyxSimulator, UWBLinkModel
+
+
+def test_local_ranging(simulated_network):
+    pozyx = PozyxSimulator(network=simulated_network(), position=(3000, 4000, 2000))
+    device_range = DeviceRange()
+    assert pozyx.doRanging(0x6001, device_range) == POZYX_SUCCESS, "ranging unsuccessful"
+    assert abs(device_range.distance - 5000) < 200, "range too far off the true distance"
+
+
+def test_ranging_with_unknown_device_fails(simulated_network):
+    pozyx = PozyxSimulator(network=simulated_network())
+    assert pozyx.doRanging(0x1234, DeviceRange()) != POZYX_SUCCESS, "ranged with a device that doesn't exist"
+
+
+def test_link_model_per_uwb_setting(simulated_network):
+    network = simulated_network()
+    network.set_link_model(UWBSettings(5, 0, 2, 0x08, 11.5), UWBLinkModel(loss=1.0))
+    pozyx = PozyxSimulator(network=network)
+    assert pozyx.doRanging(0x6001, DeviceRange()) == POZYX_FAILURE, "frames should all be lost"
+
+
+def test_positioning(simulated_network, simulated_anchors):
+    pozyx = PozyxSimulator(network=simulated_network(), position=(1000, 2000, 1000))
+    for anchor_id, position in simulated_anchors:
+        pozyx.addDevice(DeviceCoordinates(anchor_id, 1, Coordinates(*position)))
+    position = Coordinates()
+    assert pozyx.doPositioning(position) == POZYX_SUCCESS, "positioning unsuccessful"
+    assert abs(position.x - 1000) < 200 and abs(position.y - 2000) < 200, "position too far off"
+
+
+def test_remote_positioning_statuses(simulated_network, simulated_anchors):
+    pozyx = PozyxSimulator(network=simulated_network(SIMULATED_REMOTE_ID))
+    # without anchors the remote tag never answers
+    assert pozyx.doPositioningWithData(PositioningData(0b1), remote_id=0x6100, timeout=0.05) == POZYX_TIMEOUT
+    assert pozyx.doPositioning(Coordinates(), remote_id=0x6100, timeout=0.05) == POZYX_TIMEOUT
+    for anchor_id, position in simulated_anchors:
+        pozyx.addDevice(DeviceCoordinates(anchor_id, 1, Coordinates(*position)), remote_id=0x6100)
+    assert pozyx.doPositioningWithData(PositioningData(0b1), remote_id=0x6100) == POZYX_SUCCESS
+    assert pozyx.doPositioning(Coordinates(), remote_id=0x6100) == POZYX_SUCCESS
+
+
+def test_remote_register_cycle(simulated_network):
+    pozyx = PozyxSimulator(network=simulated_network(SIMULATED_REMOTE_ID))
+    assert pozyx.setWrite(PozyxRegisters.CONFIG_GPIO_1, SingleRegister(0x10), 0x6100) == POZYX_SUCCESS
+    config_gpio1 = SingleRegister()
+    assert pozyx.getRead(PozyxRegisters.CONFIG_GPIO_1, config_gpio1, 0x6100) == POZYX_SUCCESS
+    assert config_gpio1.value == 0x10, "remote write didn't reach the remote device"
+
+
+def test_serial_protocol_over_pty(simulated_network, pty_port):
+    port = pty_port(simulated_network())
+    pozyx = PozyxSerial(port.name, suppress_warnings=True)
+    who_am_i = SingleRegister()
+    assert pozyx.getWhoAmI(who_am_i) == POZYX_SUCCESS
+    assert who_am_i.value == 0x43
+    assert pozyx.doRanging(0x6002, DeviceRange()) == POZYX_SUCCESS, "ranging over the pty unsuccessful"
+    pozyx.ser.close()
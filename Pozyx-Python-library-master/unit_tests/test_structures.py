@@ -1 +1,52 @@
 # DATA AND BYTESTRUCTURES AND SINGLEREGISTER
+from pypozyx import *
+from pypozyx.structures.byte_structure import get_struct
+
+
+def test_device_range_decode():
+    device_range = DeviceRange()
+    device_range.load_bytes('e8030000' + 'd2040000' + 'b5ff')
+    assert device_range.timestamp == 1000, "timestamp decoded wrongly"
+    assert device_range.distance == 1234, "distance decoded wrongly"
+    assert device_range.RSS == -75, "RSS decoded wrongly"
+
+
+def test_device_coordinates_hex_round_trip():
+    coordinates = DeviceCoordinates(0x6e30, 1, Coordinates(-1000, 2000, 300))
+    coordinates.load_hex_string()
+    assert coordinates.byte_data == '306e' + '01' + '18fcffff' + 'd0070000' + '2c010000'
+    decoded = DeviceCoordinates()
+    decoded.load_bytes(coordinates.byte_data)
+    assert decoded == coordinates, "hex round trip changed the data"
+
+
+def test_transform_to_bytes_is_packed_uint8():
+    data = Data([0x1234, -2], 'Hb')
+    assert data.byte_size == 3
+    assert data.transform_to_bytes() == [0x34, 0x12, 0xfe]
+
+
+def test_partial_data_uses_format_prefix():
+    settings = UWBSettings(5, 0, 2, 0x08, 11.5)
+    settings.load_hex_string()
+    assert settings.byte_data == '05800817', "only the formats of the given data should be packed"
+
+
+def test_sensor_data_decode():
+    sensor_data = SensorData()
+    assert get_struct(sensor_data.data_format).size == sensor_data.byte_size
+    sensor_data.load_bytes('00' * sensor_data.byte_size)
+    assert sensor_data.data == [0] * len(sensor_data.data_format)
+
+
+def test_positioning_data_with_ranges_decode():
+    positioning_data = PositioningData(1 << 15)
+    positioning_data.set_amount_of_ranges(2)
+    assert positioning_data.byte_size == 13
+    positioning_data.load_bytes('02' + '1a00' + 'e8030000' + '1b00' + 'd0070000')
+    assert positioning_data.data == [2, 0x1a, 1000, 0x1b, 2000]
+
+
+def test_struct_cache_is_shared():
+    assert get_struct('IIh') is get_struct(DeviceRange.data_format)
+    assert get_struct('IIh').size == DeviceRange.byte_size
@@ -0,0 +1,73 @@
+from threading import Thread
+
+from pypozyx import *
+from pypozyx.locking import InstrumentedLock
+from pypozyx.pozyx_simulator import SIMULATED_REMOTE_ID as REMOTE_ID
+
+
+def run_threads(pozyx, workers):
+    errors = []
+
+    def run(worker):
+        try:
+            worker(pozyx)
+        except Exception as exception:
+            errors.append(exception)
+
+    threads = [Thread(target=run, args=(worker,)) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_instrumented_lock_is_reentrant():
+    lock = InstrumentedLock()
+    with lock:
+        with lock:
+            pass
+    statistics = lock.statistics()
+    assert statistics['acquisitions'] == 1
+    assert statistics['contended'] == 0
+
+
+def test_stress_shared_serial_interface(simulated_network, pty_port, anchor_ids):
+    network = simulated_network(REMOTE_ID)
+    port = pty_port(network)
+    local = port.device
+
+    def poll_sensors(pozyx):
+        whoami, network_id = SingleRegister(), NetworkID()
+        for i in range(150):
+            assert pozyx.getWhoAmI(whoami) == POZYX_SUCCESS and whoami.value == 0x43
+            assert pozyx.getNetworkId(network_id) == POZYX_SUCCESS and network_id.id == 0x6000
+
+    def range_anchors(pozyx):
+        for i in range(10):
+            for anchor_id in anchor_ids:
+                device_range = DeviceRange()
+                assert pozyx.doRanging(anchor_id, device_range) == POZYX_SUCCESS
+                true_distance = network.distance(local, network.devices[anchor_id])
+                assert abs(device_range.distance - true_distance) < 300
+
+    def read_remote(pozyx):
+        whoami = SingleRegister()
+        for i in range(20):
+            assert pozyx.getWhoAmI(whoami, remote_id=REMOTE_ID) == POZYX_SUCCESS and whoami.value == 0x43
+
+    def read_batches(pozyx):
+        for i in range(50):
+            with pozyx.atomic():
+                whoami, network_id = SingleRegister(), NetworkID()
+                with pozyx.pipeline() as pipeline:
+                    pipeline.read(PozyxRegisters.WHO_AM_I, whoami)
+                    pipeline.read(PozyxRegisters.NETWORK_ID, network_id)
+                assert whoami.value == 0x43 and network_id.id == 0x6000
+
+    pozyx = PozyxSerial(port.name, suppress_warnings=True, thread_safe=True)
+    run_threads(pozyx, [poll_sensors, range_anchors, read_remote, read_batches])
+    statistics = pozyx.lock.statistics()
+    pozyx.ser.close()
+    assert statistics['contended'] > 0
+    assert statistics['wait_max'] >= statistics['wait_p50'] >= 0
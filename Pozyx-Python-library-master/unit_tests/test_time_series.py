@@ -0,0 +1,52 @@
+import numpy as np
+
+from pypozyx import DeviceRange
+from pypozyx.tools.time_series import TimeSeriesBuffer, read_spill
+
+
+def test_window_is_a_view_of_the_latest_samples():
+    buffer = TimeSeriesBuffer(4)
+    for i in range(10):
+        buffer.append_range(0x6001, DeviceRange(i, 1000 + i, -80))
+    window = buffer.window()
+    assert len(buffer) == 4
+    assert list(window['distance']) == [1006, 1007, 1008, 1009]
+    assert np.shares_memory(window, buffer.data)
+    assert list(buffer.window(2)['timestamp']) == [8, 9]
+    assert buffer.stats('distance', 2)['mean'] == 1008.5
+
+
+def test_stats_match_numpy():
+    buffer = TimeSeriesBuffer(100)
+    distances = [1000, 1010, 990, 1005, 995]
+    for distance in distances:
+        buffer.append(0, distance, -80, 0x6001)
+    stats = buffer.stats('distance')
+    assert stats['mean'] == np.mean(distances)
+    assert abs(stats['std'] - np.std(distances)) < 1e-9
+    assert abs(stats['var'] - np.var(distances)) < 1e-9
+
+
+def test_sensor_layout():
+    buffer = TimeSeriesBuffer(8, 'acceleration')
+    buffer.append(0.5, 1.0, 2.0, 980.0)
+    assert buffer.window()['z'][0] == 980.0
+
+
+def test_spill_to_disk_keeps_every_sample(tmpdir):
+    spill_path = str(tmpdir.join('ranges.bin'))
+    buffer = TimeSeriesBuffer(4, spill_path=spill_path)
+    for i in range(11):
+        buffer.append(i, i, 0, 0)
+    assert len(read_spill(spill_path)) == 8
+    assert list(buffer.to_array()['timestamp']) == list(range(11))
+
+
+def test_clear_drops_the_spilled_samples(tmpdir):
+    buffer = TimeSeriesBuffer(4, spill_path=str(tmpdir.join('ranges.bin')))
+    for i in range(7):
+        buffer.append(i, i, 0, 0)
+    buffer.clear()
+    for i in range(7):
+        buffer.append(i, 100 + i, 0, 0)
+    assert list(buffer.to_array()['distance']) == [100, 101, 102, 103, 104, 105, 106]
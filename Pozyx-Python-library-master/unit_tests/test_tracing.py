@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from pypozyx import *
+from pypozyx.histogram import LatencyHistogram, log_linear_edges
+from pypozyx.pozyx_simulator import SIMULATED_REMOTE_ID, PozyxSimulator
+from pypozyx.recording import SerialRecorder
+from pypozyx.tracing import SERIAL_RESPONSE, SERIAL_WRITE, Tracer
+
+
+def test_hdr_histogram_precision():
+    histogram = LatencyHistogram(log_linear_edges(significant_digits=3))
+    for microseconds in range(1, 100001):
+        histogram.record(microseconds * 1e-6)
+    assert histogram.count == 100000
+    for fraction in (0.5, 0.9, 0.99, 0.999):
+        expected = fraction * 0.1
+        assert abs(histogram.percentile(fraction) - expected) <= expected * 1e-3 + 1e-6
+    assert histogram.percentile(1.0) == histogram.maximum
+    merged = LatencyHistogram(log_linear_edges(significant_digits=3))
+    merged.merge(histogram)
+    merged.merge(histogram)
+    assert merged.count == 200000 and merged.percentile(0.5) == histogram.percentile(0.5)
+
+
+def test_spans_nest_and_detach(simulated_pozyx):
+    pozyx = simulated_pozyx
+    tracer = Tracer()
+    pozyx.setTracer(tracer)
+    assert pozyx.doRanging(0x6001, DeviceRange()) == POZYX_SUCCESS
+    trace = tracer.traces[-1]
+    assert trace.name == 'doRanging' and trace.children
+    assert trace.polls >= 1
+    assert trace.duration >= sum(child.duration for child in trace.children)
+    assert tracer.histograms['doRanging'].count == 1
+    assert 'doRanging' in tracer.dump()
+    exported = json.loads(tracer.export(traces=True))
+    assert exported['histograms']['doRanging']['count'] == 1
+    assert exported['traces'][0]['name'] == 'doRanging'
+
+    pozyx.setTracer(None)
+    assert type(pozyx) is PozyxSimulator
+    pozyx.doRanging(0x6001, DeviceRange())
+    assert tracer.histograms['doRanging'].count == 1
+
+
+def test_serial_exchanges_are_attributed(simulated_network, pty_port):
+    pozyx = PozyxSerial(pty_port(simulated_network(SIMULATED_REMOTE_ID)).name, suppress_warnings=True)
+    tracer = Tracer()
+    pozyx.setTracer(tracer)
+    whoami = SingleRegister()
+    assert pozyx.getWhoAmI(whoami, remote_id=0x6100) == POZYX_SUCCESS and whoami.value == 0x43
+    trace = tracer.traces[-1]
+    assert trace.name == 'getWhoAmI'
+    assert trace.exchanges == tracer.histograms[SERIAL_RESPONSE].count
+    assert trace.bytes_sent > 0 and trace.bytes_received > 0
+    assert 'remoteRegRead' in trace.format()
+    pozyx.setTracer(None)
+    assert not hasattr(pozyx.ser, 'tracer')
+    pozyx.ser.close()
+    assert tracer.histograms[SERIAL_WRITE].count > 0
+
+
+def test_detaching_out_of_order_keeps_the_serial_wrappers(simulated_network, pty_port, tmp_path):
+    pozyx = PozyxSerial(pty_port(simulated_network(SIMULATED_REMOTE_ID)).name, suppress_warnings=True)
+    serial = pozyx.ser
+    tracer = Tracer()
+    pozyx.setTracer(tracer)
+    recorder = SerialRecorder(pozyx, str(tmp_path / 'session.pzxrec'))
+    with pytest.raises(RuntimeError):
+        pozyx.setTracer(None)
+    assert pozyx.getTracer() is tracer and pozyx.ser.recorder is recorder
+    recorder.stop()
+    pozyx.setTracer(None)
+    assert pozyx.ser is serial
+
+    recorder = SerialRecorder(pozyx, str(tmp_path / 'session.pzxrec'))
+    pozyx.setTracer(tracer)
+    with pytest.raises(RuntimeError):
+        recorder.stop()
+    pozyx.setTracer(None)
+    recorder.stop()
+    assert pozyx.ser is serial
+    pozyx.ser.close()
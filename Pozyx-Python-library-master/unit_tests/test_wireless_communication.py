@@ -0,0 +1,14 @@
+from pypozyx import *
+
+ANCHOR_IDS = [0x6001, 0x6002, 0x6003, 0x6004]
+
+
+def test_ranging_many(pozyx, remote):
+    measurements = pozyx.doRangingMany(ANCHOR_IDS + [0x1234], remote_id=remote)
+    assert [measurement.destination for measurement in measurements] == ANCHOR_IDS + [0x1234]
+    assert [measurement.status for measurement in measurements[:4]] == [POZYX_SUCCESS] * 4
+    assert measurements[4].status != POZYX_SUCCESS, "ranged with a device that doesn't exist"
+    for measurement in measurements[:4]:
+        device_range = DeviceRange()
+        assert pozyx.doRanging(measurement.destination, device_range, remote) == POZYX_SUCCESS
+        assert abs(measurement.distance - device_range.distance) < 500, "batched range differs from a single one"
@@ -1,9 +1,9 @@
 #!/usr/bin/env python
 """change_uwb_settings.py - Changes the UWB settings of all devices listed.
 
-This assumes all listed devices are on the same UWB settings already,
-otherwise you should run the set_same_settings.py script, as that one
-finds all devices on all settings.
+This assumes all listed devices are on the same UWB settings already.
+To bring the devices to the settings declared in a configuration file,
+with only the changed settings written, run the set_same_settings.py script.
 """
 
 from pypozyx import *
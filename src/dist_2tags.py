@@ -7,6 +7,7 @@ import numpy as np
 import time
 
 from pypozyx.lib import Device
+from pypozyx.clock_sync import ClockSync
 
 class TagsDistance():
     def __init__(self,pozyx,remote_id):        
@@ -28,9 +29,19 @@ class TagsDistance():
         self.device_range = DeviceRange()
         status = self.pozyx.doRanging(
             destination_id=self.remote_id, device_range=self.device_range, remote_id=None)
-        if self.init_time is None:
-            self.init_time = self.device_range.timestamp
         if status == POZYX_SUCCESS:
+            # Device timestamp in host time (ms), corrected for clock offset, drift and serial latency
+            clock_sync = self.pozyx.getClockSync()
+            host_time, time_error = None, None
+            if clock_sync is not None:
+                host_time, time_error = clock_sync.to_host(None, self.device_range.timestamp)
+            if host_time is None:
+                # No clock synchronisation (yet), use the device timestamp (ms) as is
+                host_time, time_error = float(self.device_range.timestamp), None
+            else:
+                host_time *= 1000
+            if self.init_time is None:
+                self.init_time = host_time
             # Update sampling rate if larger
             if self.prev_time is None:
                 self.prev_time = time.time()
@@ -41,11 +52,14 @@ class TagsDistance():
                 elif curr_range_rate > self.max_rate:
                     self.max_rate = curr_range_rate
             # Append distance and correlated time measurements
-            print("Distance(m):",self.device_range.distance/1000,"at",(self.device_range.timestamp-self.init_time)/1000,"sec")
+            if time_error is None:
+                print("Distance(m):",self.device_range.distance/1000,"at",(host_time-self.init_time)/1000,"sec")
+            else:
+                print("Distance(m):",self.device_range.distance/1000,"at",(host_time-self.init_time)/1000,"sec","+/-",time_error*1000,"ms")
             if self.device_range.distance > self.max_dist:
                 self.max_dist = self.device_range.distance
-            if self.device_range.timestamp - self.init_time > 0. and self.device_range.distance/1000 < 200.:
-                self.list_of_times.append(self.device_range.timestamp-self.init_time)
+            if host_time - self.init_time > 0. and self.device_range.distance/1000 < 200.:
+                self.list_of_times.append(host_time-self.init_time)
                 self.list_of_dist.append(self.device_range.distance)
         else:
             error_code = SingleRegister()
@@ -107,6 +121,7 @@ if __name__ == "__main__":
     remote_id = 0x7607                 # remote tag device network ID
     
     pozyx = PozyxSerial(serial_port)
+    pozyx.setClockSync(ClockSync())
 
     # # Configure Network
     pozyx.clearDevices(remote_id)